@@ -5,8 +5,13 @@ import sys
 
 import websockets
 
-from protocol import RegisterMessage, ActionMessage, parse_message
+from protocol import (
+    RegisterMessage, ActionMessage, decode_message,
+    TurnStartMessage, ActionResultMessage,
+    AgentJoinedMessage, AgentLeftMessage, ErrorMessage,
+)
 from behaviors import ScriptedBehavior
+from world_store import WorldStateStore
 
 BRIDGE_URL = "ws://localhost:3001"
 
@@ -17,7 +22,7 @@ async def main():
     agent_color = int(sys.argv[3], 16) if len(sys.argv) > 3 else 0xFF3300
 
     behavior = ScriptedBehavior(agent_id)
-    world_state: dict = {}
+    world = WorldStateStore(agent_id)
 
     async with websockets.connect(BRIDGE_URL) as ws:
         # Register with the bridge
@@ -26,18 +31,16 @@ async def main():
         print(f"[{agent_id}] Registered as {agent_name}")
 
         async for raw in ws:
-            msg = parse_message(raw)
-            msg_type = msg.get("type")
+            msg = decode_message(raw)
+            # Keep the local world view current (positions, joins, map changes)
+            world.apply(msg)
 
-            if msg_type == "world:state":
-                world_state = msg
-
-            elif msg_type == "turn:start":
+            if isinstance(msg, TurnStartMessage):
                 # NOTE: Server does not currently send turn:start. Server-managed
                 # agents use Claude Agent SDK follow-ups. Kept for forward-compat.
-                if msg["agent_id"] == agent_id:
-                    turn_id = msg["turn_id"]
-                    chosen = behavior.next_action(world_state)
+                if msg.agent_id == agent_id:
+                    turn_id = msg.turn_id
+                    chosen = behavior.next_action(world)
                     action_msg = ActionMessage(
                         agent_id=agent_id,
                         turn_id=turn_id,
@@ -47,26 +50,19 @@ async def main():
                     await ws.send(action_msg.to_json())
                     print(f"[{agent_id}] Turn {turn_id}: {chosen['action']} {chosen['params']}")
 
-            elif msg_type == "action:result":
-                # Update local position tracking from successful moves
-                if msg.get("success") and msg.get("action") == "move":
-                    for agent in world_state.get("agents", []):
-                        if agent["agent_id"] == msg["agent_id"]:
-                            agent["x"] = msg["params"]["x"]
-                            agent["y"] = msg["params"]["y"]
-
+            elif isinstance(msg, ActionResultMessage):
                 # Only log own failures
-                if msg["agent_id"] == agent_id and not msg["success"]:
-                    print(f"[{agent_id}] FAIL: {msg.get('error')}")
+                if msg.agent_id == agent_id and not msg.success:
+                    print(f"[{agent_id}] FAIL: {msg.error}")
 
-            elif msg_type == "agent:joined":
-                print(f"[{agent_id}] Agent joined: {msg['agent']['name']}")
+            elif isinstance(msg, AgentJoinedMessage):
+                print(f"[{agent_id}] Agent joined: {msg.agent['name']}")
 
-            elif msg_type == "agent:left":
-                print(f"[{agent_id}] Agent left: {msg['agent_id']}")
+            elif isinstance(msg, AgentLeftMessage):
+                print(f"[{agent_id}] Agent left: {msg.agent_id}")
 
-            elif msg_type == "error":
-                print(f"[{agent_id}] Error: {msg['message']}")
+            elif isinstance(msg, ErrorMessage):
+                print(f"[{agent_id}] Error: {msg.message}")
 
 
 if __name__ == "__main__":
@@ -1,3 +1,8 @@
+from protocol import AgentInfo
+from tile_grid import DIRECTIONS
+from world_store import WorldStateStore
+
+
 class ScriptedBehavior:
     """Cycles through a scripted sequence demonstrating all 6 action types."""
 
@@ -19,7 +24,7 @@ class ScriptedBehavior:
             {"action": "emote", "params": {"type": "heart"}},
         ]
 
-    def next_action(self, world_state: dict) -> dict:
+    def next_action(self, world: WorldStateStore) -> dict:
         template = self.sequence[self.step % len(self.sequence)]
         self.step += 1
 
@@ -27,9 +32,9 @@ class ScriptedBehavior:
         params = dict(template["params"])
 
         if action == "move":
-            params = self._compute_move(world_state)
+            params = self._compute_move(world)
         elif action == "skill":
-            target = self._find_target(world_state)
+            target = self._find_target(world)
             if target:
                 params["target_id"] = target
             else:
@@ -38,52 +43,30 @@ class ScriptedBehavior:
 
         return {"action": action, "params": params}
 
-    def _compute_move(self, world_state: dict) -> dict:
-        me = self._find_self(world_state)
+    def _compute_move(self, world: WorldStateStore) -> dict:
+        me = world.agents.get(self.agent_id)
         if not me:
             return {"x": 2, "y": 2}
 
-        directions = [(1, 0), (0, 1), (-1, 0), (0, -1)]
-        dx, dy = directions[self.step % len(directions)]
-        new_x = me["x"] + dx
-        new_y = me["y"] + dy
-
-        # Basic bounds check (server will validate fully)
-        tiles = world_state.get("map", {}).get("tiles", [])
-        w = world_state.get("map", {}).get("width", 20)
-        h = world_state.get("map", {}).get("height", 15)
-
-        if 0 <= new_x < w and 0 <= new_y < h:
-            tile = tiles[new_y][new_x] if new_y < len(tiles) and new_x < len(tiles[0]) else 1
-            if tile == 0:
+        # Basic walkability check (server will validate fully)
+        grid = world.grid
+        if grid is not None:
+            dx, dy = DIRECTIONS[self.step % len(DIRECTIONS)]
+            new_x, new_y = me["x"] + dx, me["y"] + dy
+            if grid.is_walkable(new_x, new_y):
                 return {"x": new_x, "y": new_y}
 
-        # If not walkable, try other directions
-        for ddx, ddy in directions:
-            nx, ny = me["x"] + ddx, me["y"] + ddy
-            if 0 <= nx < w and 0 <= ny < h:
-                tile = tiles[ny][nx] if ny < len(tiles) and nx < len(tiles[0]) else 1
-                if tile == 0:
-                    # Check not occupied by another agent
-                    occupied = any(
-                        a["x"] == nx and a["y"] == ny
-                        for a in world_state.get("agents", [])
-                        if a["agent_id"] != self.agent_id
-                    )
-                    if not occupied:
-                        return {"x": nx, "y": ny}
+            # If not walkable, try other directions
+            for nx, ny in grid.neighbors(me["x"], me["y"]):
+                # Check not occupied by another agent
+                if not world.occupied(nx, ny, ignore=self.agent_id):
+                    return {"x": nx, "y": ny}
 
         # Stuck — just stay (will be rejected, that's OK)
         return {"x": me["x"] + 1, "y": me["y"]}
 
-    def _find_self(self, world_state: dict) -> dict | None:
-        for agent in world_state.get("agents", []):
-            if agent["agent_id"] == self.agent_id:
-                return agent
-        return None
-
-    def _find_target(self, world_state: dict) -> str | None:
-        for agent in world_state.get("agents", []):
-            if agent["agent_id"] != self.agent_id:
-                return agent["agent_id"]
+    def _find_target(self, world: WorldStateStore) -> str | None:
+        for agent_id in world.agents:
+            if agent_id != self.agent_id:
+                return agent_id
         return None
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Encode/decode throughput of the protocol codec.
+
+Compares protocol.py's generated codecs (with each available JSON
+backend) against the previous approach: dataclasses.asdict() plus
+json.dumps() to encode, and json.loads() into a raw dict to decode.
+world:state is timed both alone (map and objects left deferred) and
+with its map read.
+
+Usage:
+    python3 bench_protocol.py [--seconds 0.5] [--map 64x48] [--objects 200]
+"""
+
+import argparse
+import json
+import time
+from dataclasses import asdict, dataclass, field
+
+import protocol
+from protocol import ActionMessage, decode_message
+
+
+@dataclass
+class BaselineActionMessage:
+    agent_id: str
+    turn_id: int
+    action: str
+    params: dict = field(default_factory=dict)
+    type: str = "agent:action"
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+
+def world_state(width: int, height: int, objects: int) -> str:
+    agents = [
+        {"agent_id": f"agent_{i}", "name": f"Agent {i}", "color": 0xFF3300, "x": i, "y": i,
+         "role": "Explorer", "realm": "src/", "status": "running",
+         "stats": {"realm_knowledge": {}, "expertise": {}, "codebase_fluency": 0, "collaboration_score": 0}}
+        for i in range(8)
+    ]
+    return json.dumps({
+        "type": "world:state",
+        "tick": 1,
+        "agents": agents,
+        "map": {"width": width, "height": height, "tile_size": 32,
+                "tiles": [[(x * y) % 3 for x in range(width)] for y in range(height)]},
+        "objects": [{"id": f"obj_{i}", "type": "file", "x": i % width, "y": i // width,
+                     "label": f"file_{i}.py", "metadata": {}} for i in range(objects)],
+        "quests": [],
+    }, separators=(",", ":"))  # compact, like the server's JSON.stringify
+
+
+ACTION_RESULT = json.dumps({
+    "type": "action:result", "turn_id": 7, "agent_id": "agent_1", "action": "move",
+    "params": {"x": 3, "y": 4}, "success": True,
+})
+
+
+def rate(fn, seconds: float) -> float:
+    """Calls per second of fn, measured for about the given time."""
+    calls, batch = 0, 64
+    start = time.perf_counter()
+    while True:
+        for _ in range(batch):
+            fn()
+        calls += batch
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return calls / elapsed
+        batch *= 2
+
+
+def backends():
+    """Yield the JSON backends available, switching protocol.py to each."""
+    saved = protocol._dumps, protocol._loads
+    protocol._dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    protocol._loads = json.loads
+    yield "json"
+    protocol._dumps, protocol._loads = saved
+    if protocol.JSON_BACKEND != "json":
+        yield protocol.JSON_BACKEND
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=0.5, help="Time per measurement")
+    parser.add_argument("--map", default="64x48", help="world:state map size, WIDTHxHEIGHT")
+    parser.add_argument("--objects", type=int, default=200, help="world:state object count")
+    args = parser.parse_args()
+
+    width, height = (int(n) for n in args.map.lower().split("x"))
+    world = world_state(width, height, args.objects)
+    params = {"x": 3, "y": 4}
+
+    cases = [
+        ("encode agent:action", "baseline",
+         lambda: BaselineActionMessage("agent_1", 7, "move", params).to_json()),
+        ("decode action:result", "baseline", lambda: json.loads(ACTION_RESULT)),
+        (f"decode world:state ({len(world) // 1024}KB)", "baseline", lambda: json.loads(world)),
+        (f"decode world:state ({len(world) // 1024}KB) + map", "baseline", lambda: json.loads(world)["map"]),
+    ]
+    rows = [(name, impl, rate(fn, args.seconds)) for name, impl, fn in cases]
+    for backend in backends():
+        for name, fn in (
+            ("encode agent:action", lambda: ActionMessage("agent_1", 7, "move", params).to_json()),
+            ("decode action:result", lambda: decode_message(ACTION_RESULT)),
+            (f"decode world:state ({len(world) // 1024}KB)", lambda: decode_message(world)),
+            (f"decode world:state ({len(world) // 1024}KB) + map", lambda: decode_message(world).map),
+        ):
+            rows.append((name, f"codec/{backend}", rate(fn, args.seconds)))
+
+    baselines = {name: ops for name, impl, ops in rows if impl == "baseline"}
+    print(f"{'case':<38} {'implementation':<16} {'ops/s':>12} {'speedup':>8}")
+    for name, impl, ops in sorted(rows, key=lambda row: row[0]):
+        print(f"{name:<38} {impl:<16} {ops:>12,.0f} {ops / baselines[name]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Turn decisions that never block the event loop.
+
+Behaviors decide with a blocking call (next_action() on LLMBehavior waits
+seconds for the Claude API). DecisionRunner runs it on a worker thread so
+the agent keeps handling world:state, action:result and pings meanwhile,
+and answers with a fallback action when the turn's deadline is about to
+pass.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+# Sent when the behavior cannot decide before the deadline
+FALLBACK_ACTION = {"action": "wait", "params": {"duration_ms": 1000}}
+
+# Time kept back from turn:start's timeout_ms to send the action
+DEADLINE_MARGIN_MS = 500
+
+# Used when turn:start carries no timeout_ms
+DEFAULT_TIMEOUT_MS = 5000
+
+
+class DecisionRunner:
+    """
+    Runs a behavior's next_action() off the event loop, within a deadline.
+
+    Decisions run one at a time on a single worker thread, so behaviors
+    that keep state (LLMBehavior's conversation history) are never called
+    concurrently, and an API call that outlives its turn delays the next
+    decision instead of piling up threads.
+    """
+
+    def __init__(self, behavior, margin_ms: int = DEADLINE_MARGIN_MS):
+        self.behavior = behavior
+        self.margin_ms = margin_ms
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="decision")
+
+    async def decide(self, world_state: Dict[str, Any], timeout_ms: int | None = None) -> Dict[str, Any]:
+        """
+        Decide an action, or return a fallback if it takes too long.
+
+        Args:
+            world_state: World state to decide on
+            timeout_ms: Turn timeout from turn:start (DEFAULT_TIMEOUT_MS if None)
+
+        Returns:
+            Action dict with 'action' and 'params' keys
+        """
+        if timeout_ms is None:
+            timeout_ms = DEFAULT_TIMEOUT_MS
+        budget = max(0, timeout_ms - self.margin_ms) / 1000
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self.behavior.next_action, world_state)
+        try:
+            return await asyncio.wait_for(future, budget)
+        except asyncio.TimeoutError:
+            # The call keeps running on the worker; its answer is dropped
+            print(f"[Decision] No action within {timeout_ms}ms, sending fallback")
+        except Exception as e:
+            print(f"[Decision] Behavior failed: {e}")
+        return {"action": FALLBACK_ACTION["action"], "params": dict(FALLBACK_ACTION["params"])}
+
+    def close(self):
+        """Stop the worker, dropping decisions that have not started."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -22,11 +22,18 @@ import argparse
 import json
 import sys
 import os
-from typing import Dict, Any
 
 try:
     import websockets
     from llm_behavior import LLMBehavior, SimpleReflexBehavior
+    from decision import DecisionRunner, DEFAULT_TIMEOUT_MS
+    from world_store import WorldStateStore
+    from protocol import (
+        RegisterMessage, ActionMessage, Message, decode_message,
+        WorldStateMessage, TurnStartMessage, ActionResultMessage,
+        AgentJoinedMessage, AgentLeftMessage, FindingsPostedMessage,
+        KnowledgeLevelUpMessage, SpawnRequestMessage,
+    )
 except ImportError as e:
     print(f"Error: Missing dependency: {e}")
     print("Install with: pip install anthropic websockets")
@@ -59,8 +66,13 @@ class LLMAgent:
             self.behavior = LLMBehavior(agent_id, mission, role=name)
             print(f"[Agent] Using LLMBehavior (full conversation history)")
 
-        self.world_state: Dict[str, Any] = {}
+        # Decides off the event loop, so messages keep flowing during API calls
+        self.decisions = DecisionRunner(self.behavior)
+
+        # Kept current from every server message
+        self.world = WorldStateStore(agent_id)
         self.current_turn_id: int | None = None
+        self._turn_task: asyncio.Task | None = None
 
     async def run(self):
         """Main agent loop: connect, register, respond to turns."""
@@ -81,7 +93,7 @@ class LLMAgent:
                 # Main message loop
                 async for raw_message in ws:
                     try:
-                        msg = json.loads(raw_message)
+                        msg = decode_message(raw_message)
                         await self._handle_message(ws, msg)
                     except json.JSONDecodeError as e:
                         print(f"[Agent] Failed to parse message: {e}")
@@ -92,93 +104,98 @@ class LLMAgent:
             print(f"❌ Connection closed")
         except Exception as e:
             print(f"❌ Error: {e}")
+        finally:
+            if self._turn_task and not self._turn_task.done():
+                self._turn_task.cancel()
+            self.decisions.close()
 
     async def _register(self, ws):
         """Register agent with the server."""
-        register_msg = {
-            "type": "agent:register",
-            "agent_id": self.agent_id,
-            "name": self.name,
-            "color": self.color
-        }
-        await ws.send(json.dumps(register_msg))
+        register_msg = RegisterMessage(agent_id=self.agent_id, name=self.name, color=self.color)
+        await ws.send(register_msg.to_json())
         print(f"📤 Sent registration")
 
-    async def _handle_message(self, ws, msg: Dict[str, Any]):
+    async def _take_turn(self, ws, turn_id: int, timeout_ms: int):
+        """Decide and send an action for a turn, within its timeout."""
+        try:
+            # Decide action using LLM (falls back to waiting near the deadline);
+            # the snapshot keeps messages applied meanwhile out of its view
+            action_data = await self.decisions.decide(self.world.snapshot(), timeout_ms)
+
+            # Send action to server
+            action_msg = ActionMessage(
+                agent_id=self.agent_id,
+                turn_id=turn_id,
+                action=action_data["action"],
+                params=action_data["params"],
+            )
+
+            await ws.send(action_msg.to_json())
+            print(f"📤 Sent action: {action_data['action']} with params {action_data['params']}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Agent] Error taking turn {turn_id}: {e}")
+
+    async def _handle_message(self, ws, msg: Message):
         """Handle incoming messages from server."""
 
-        msg_type = msg.get("type")
+        # Update the world view used for decision making
+        self.world.apply(msg)
 
-        if msg_type == "world:state":
-            # Store world state for decision making
-            self.world_state = msg
-            print(f"🌍 Received world state ({len(msg.get('agents', []))} agents, {len(msg.get('objects', []))} objects)")
+        if isinstance(msg, WorldStateMessage):
+            print(f"🌍 Received world state (tick {msg.tick}, {len(self.world.agents)} agents)")
 
-        elif msg_type == "turn:start":
+        elif isinstance(msg, TurnStartMessage):
             # NOTE: The server does not currently send turn:start messages.
             # Server-managed agents use Claude Agent SDK follow-up prompts instead.
             # This handler is kept for forward-compatibility if the turn protocol
             # is implemented for external (non-SDK) agents in the future.
-            if msg.get("agent_id") == self.agent_id:
-                turn_id = msg.get("turn_id")
-                timeout_ms = msg.get("timeout_ms", 5000)
+            if msg.agent_id == self.agent_id:
+                turn_id = msg.turn_id
+                timeout_ms = msg.timeout_ms if msg.timeout_ms is not None else DEFAULT_TIMEOUT_MS
                 print(f"\n⏰ Turn {turn_id} started (timeout: {timeout_ms}ms)")
 
-                # Decide action using LLM
-                action_data = self.behavior.next_action(self.world_state)
-
-                # Send action to server
-                action_msg = {
-                    "type": "agent:action",
-                    "agent_id": self.agent_id,
-                    "turn_id": turn_id,
-                    "action": action_data["action"],
-                    "params": action_data["params"]
-                }
+                # A new turn supersedes one still deciding
+                if self._turn_task and not self._turn_task.done():
+                    self._turn_task.cancel()
+                self.current_turn_id = turn_id
+                self._turn_task = asyncio.create_task(self._take_turn(ws, turn_id, timeout_ms))
 
-                await ws.send(json.dumps(action_msg))
-                print(f"📤 Sent action: {action_data['action']} with params {action_data['params']}")
-
-        elif msg_type == "action:result":
+        elif isinstance(msg, ActionResultMessage):
             # Result of our action
-            if msg.get("agent_id") == self.agent_id:
-                success = msg.get("success")
-                error = msg.get("error")
-                if success:
+            if msg.agent_id == self.agent_id:
+                if msg.success:
                     print(f"✅ Action succeeded")
                 else:
-                    print(f"❌ Action failed: {error}")
+                    print(f"❌ Action failed: {msg.error}")
 
-        elif msg_type == "agent:joined":
+        elif isinstance(msg, AgentJoinedMessage):
             # Another agent joined
-            agent = msg.get("agent")
+            agent = msg.agent
             if agent and agent["agent_id"] != self.agent_id:
                 print(f"👋 Agent joined: {agent['name']} ({agent['role']})")
 
-        elif msg_type == "agent:left":
+        elif isinstance(msg, AgentLeftMessage):
             # Another agent left
-            agent_id = msg.get("agent_id")
-            if agent_id != self.agent_id:
-                print(f"👋 Agent left: {agent_id}")
-
-        elif msg_type == "findings:posted":
-            # Team finding posted — server sends flat structure:
-            # { type, agent_id, agent_name, realm, finding: string, severity: string }
-            severity = msg.get("severity", "low")
-            finding_text = msg.get("finding", "")
-            agent_name = msg.get("agent_name", "unknown")
+            if msg.agent_id != self.agent_id:
+                print(f"👋 Agent left: {msg.agent_id}")
+
+        elif isinstance(msg, FindingsPostedMessage):
+            # Team finding posted
+            severity = msg.severity or "low"
+            finding_text = msg.finding or ""
+            agent_name = msg.agent_name or "unknown"
             print(f"📢 Finding [{severity.upper()}] by {agent_name}: {finding_text[:100]}...")
 
-        elif msg_type == "agent:level-up":
+        elif isinstance(msg, KnowledgeLevelUpMessage):
             # Agent gained expertise
-            if msg.get("agent_id") == self.agent_id:
-                area = msg.get("area")
-                level = msg.get("level")
-                print(f"📈 Level up! {area}: {level}")
-
-        elif msg_type == "agent:spawn-request":
-            # Agent summoned — protocol fields: requested_name, requested_role, requested_mission
-            print(f"🔮 Agent summoned: {msg.get('requested_name')} for {msg.get('requested_mission')}")
+            if msg.agent_id == self.agent_id:
+                print(f"📈 Level up! {msg.area}: {msg.new_level}")
+
+        elif isinstance(msg, SpawnRequestMessage):
+            # Agent summoned
+            print(f"🔮 Agent summoned: {msg.requested_name} for {msg.requested_mission}")
 
         # Ignore other message types silently
 
@@ -16,6 +16,9 @@ import json
 from typing import Any, Dict, List
 from anthropic import Anthropic
 
+from protocol import AgentInfo
+from world_store import WorldStateStore
+
 
 class LLMBehavior:
     """
@@ -101,18 +104,18 @@ Example:
 }}
 """
 
-    def next_action(self, world_state: Dict[str, Any]) -> Dict[str, Any]:
+    def next_action(self, world: WorldStateStore) -> Dict[str, Any]:
         """
         Given the current world state, decide what action to take.
 
         Args:
-            world_state: Current state including agents, map, objects, etc.
+            world: The agent's view of the world
 
         Returns:
             Action dict with 'action' and 'params' keys
         """
         # Build observation from world state
-        observation = self._observe_world(world_state)
+        observation = self._observe_world(world)
 
         # Add observation to conversation history
         self.conversation_history.append({
@@ -155,16 +158,11 @@ Example:
                 "params": {"duration_ms": 1000}
             }
 
-    def _observe_world(self, world_state: Dict[str, Any]) -> str:
+    def _observe_world(self, world: WorldStateStore) -> str:
         """Convert world state to natural language observation."""
 
         # Find self
-        me = None
-        for agent in world_state.get("agents", []):
-            if agent["agent_id"] == self.agent_id:
-                me = agent
-                break
-
+        me = world.agents.get(self.agent_id)
         if not me:
             return "You are not yet in the world."
 
@@ -178,32 +176,27 @@ Example:
         if me.get("current_activity"):
             obs_parts.append(f"STATUS: {me['current_activity']}")
 
-        # Nearby objects (within 3 tiles)
-        nearby_objects = []
-        for obj in world_state.get("objects", []):
-            dist = abs(obj["x"] - me["x"]) + abs(obj["y"] - me["y"])
-            if dist <= 3:
-                nearby_objects.append(obj)
+        # Nearby objects (within 3 tiles), nearest first
+        nearby_objects = world.objects_near(me["x"], me["y"], 3)
 
         if nearby_objects:
             obs_parts.append("\nNEARBY OBJECTS:")
-            for obj in nearby_objects:
+            for obj, distance in nearby_objects:
                 obj_type = obj.get("type", "unknown")
                 label = obj.get("label", "unlabeled")
-                distance = abs(obj["x"] - me["x"]) + abs(obj["y"] - me["y"])
                 obs_parts.append(f"  - {obj_type} '{label}' at ({obj['x']}, {obj['y']}) - {distance} tiles away - ID: {obj['id']}")
         else:
             obs_parts.append("\nNEARBY OBJECTS: None within 3 tiles")
 
         # Other agents
-        other_agents = [a for a in world_state.get("agents", []) if a["agent_id"] != self.agent_id]
+        other_agents = [a for agent_id, a in world.agents.items() if agent_id != self.agent_id]
         if other_agents:
             obs_parts.append("\nOTHER AGENTS:")
             for agent in other_agents:
                 obs_parts.append(f"  - {agent['name']} ({agent['role']}) at ({agent['x']}, {agent['y']})")
 
         # Map info
-        map_data = world_state.get("map", {})
+        map_data = world.map or {}
         width = map_data.get("width", 20)
         height = map_data.get("height", 15)
         obs_parts.append(f"\nMAP: {width}x{height} tiles")
@@ -284,10 +277,10 @@ class SimpleReflexBehavior:
         self.mission = mission
         self.client = Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
 
-    def next_action(self, world_state: Dict[str, Any]) -> Dict[str, Any]:
+    def next_action(self, world: WorldStateStore) -> Dict[str, Any]:
         """Simple reflex: observe world, decide action, forget."""
 
-        me = self._find_self(world_state)
+        me = world.agents.get(self.agent_id)
         if not me:
             return {"action": "wait", "params": {"duration_ms": 1000}}
 
@@ -296,8 +289,8 @@ class SimpleReflexBehavior:
 
 Current situation:
 - Position: ({me['x']}, {me['y']})
-- Nearby objects: {self._list_nearby_objects(world_state, me)}
-- Other agents: {len([a for a in world_state.get('agents', []) if a['agent_id'] != self.agent_id])}
+- Nearby objects: {self._list_nearby_objects(world, me)}
+- Other agents: {len(world.agents) - 1}
 
 Choose ONE action to take right now:
 - move to adjacent tile
@@ -337,16 +330,9 @@ Respond with JSON:
         # Fallback
         return {"action": "wait", "params": {"duration_ms": 1000}}
 
-    def _find_self(self, world_state: Dict[str, Any]) -> Dict[str, Any] | None:
-        for agent in world_state.get("agents", []):
-            if agent["agent_id"] == self.agent_id:
-                return agent
-        return None
-
-    def _list_nearby_objects(self, world_state: Dict[str, Any], me: Dict[str, Any]) -> str:
-        nearby = []
-        for obj in world_state.get("objects", []):
-            dist = abs(obj["x"] - me["x"]) + abs(obj["y"] - me["y"])
-            if dist <= 2:
-                nearby.append(f"{obj.get('type', 'object')} '{obj.get('label', 'unknown')}' ({obj['id']})")
+    def _list_nearby_objects(self, world: WorldStateStore, me: AgentInfo) -> str:
+        nearby = [
+            f"{obj.get('type', 'object')} '{obj.get('label', 'unknown')}' ({obj['id']})"
+            for obj, _ in world.objects_near(me["x"], me["y"], 2)
+        ]
         return ", ".join(nearby) if nearby else "none"
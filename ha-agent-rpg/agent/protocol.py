@@ -1,29 +1,674 @@
+"""
+Agent RPG wire protocol for Python agents.
+
+Mirrors shared/protocol.ts: every message an agent sends, and every
+message the server broadcasts, is a slotted dataclass whose attributes
+are the wire keys. Nested objects (AgentInfo, TileMapData, MapObject,
+...) stay plain dicts, typed with TypedDicts, so decoding never walks
+into the map or object lists.
+
+Each message class gets generated to_dict()/from_dict() functions that
+read and write its fields directly, instead of dataclasses.asdict()'s
+recursive deep copy. JSON goes through orjson when it is installed and
+the standard library otherwise (JSON_BACKEND says which).
+
+    msg = decode_message(raw)
+    if isinstance(msg, ActionResultMessage) and not msg.success:
+        print(msg.error)
+
+    await ws.send(ActionMessage(agent_id="a1", turn_id=3, action="wait").to_json())
+"""
+
 import json
-from dataclasses import dataclass, field, asdict
+import threading
+from dataclasses import MISSING, dataclass, field, fields
+from typing import Any, Callable, Dict, List, Optional, TypedDict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# ── JSON backend ──
+
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    _loads: Callable[[Any], Any] = orjson.loads
+else:
+    JSON_BACKEND = "json"
+    _dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    _loads = json.loads
+
 
+# ── Nested payloads (plain dicts) ──
 
-@dataclass
-class RegisterMessage:
+class Position(TypedDict):
+    x: int
+    y: int
+
+
+class SpectatorInfo(TypedDict):
+    spectator_id: str
+    name: str
+    color: int
+
+
+class AgentStats(TypedDict):
+    realm_knowledge: Dict[str, float]
+    expertise: Dict[str, float]
+    codebase_fluency: float
+    collaboration_score: float
+
+
+class AgentInfo(TypedDict, total=False):
     agent_id: str
     name: str
     color: int
-    type: str = "agent:register"
+    x: int
+    y: int
+    role: str
+    realm: str
+    stats: AgentStats
+    status: str
+    current_activity: str
+
+
+class TileMapData(TypedDict):
+    width: int
+    height: int
+    tile_size: int
+    tiles: List[List[int]]
+
+
+class MapObject(TypedDict):
+    id: str
+    type: str
+    x: int
+    y: int
+    label: str
+    metadata: Dict[str, Any]
+
+
+class Quest(TypedDict):
+    quest_id: str
+    title: str
+    body: str
+    labels: List[str]
+    priority: str
+    source_url: str
+    related_files: List[str]
+
+
+class RepoStats(TypedDict):
+    total_files: int
+    total_lines: int
+    languages: Dict[str, int]
+    open_issues: int
+    last_commit: str
+
+
+class PlayerPresence(TypedDict):
+    id: str
+    name: str
+    path: str
+    depth: int
+
+
+# ── Codec ──
+
+# Message classes by their "type" value
+MESSAGE_TYPES: Dict[str, type] = {}
+
+
+class Message:
+    """Base of all protocol messages."""
+
+    __slots__ = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the wire representation (generated per class)."""
+        raise NotImplementedError
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Message":
+        """Build a message from its wire representation (generated per class)."""
+        raise NotImplementedError
 
     def to_json(self) -> str:
-        return json.dumps(asdict(self))
+        return _dumps(self.to_dict())
+
+
+def message(cls):
+    """
+    Make cls a slotted dataclass message and register it by type.
+
+    The last field must be `type` with the message's type as its default.
+    Fields defaulting to None are optional (`?` in protocol.ts) and left
+    out of the encoded message when unset.
+    """
+    cls = dataclass(slots=True)(cls)
+    specs = fields(cls)
+    msg_type = specs[-1].default
+    if specs[-1].name != "type" or not isinstance(msg_type, str):
+        raise TypeError(f"{cls.__name__} must end with a `type` field defaulting to its message type")
+
+    cls.to_dict = _generate(_encoder_source(specs), "to_dict", {})
+    namespace = {}
+    cls.from_dict = classmethod(_generate(_decoder_source(specs, namespace), "from_dict", namespace))
+    MESSAGE_TYPES[msg_type] = cls
+    return cls
+
+
+def _encoder_source(specs) -> str:
+    required = [spec.name for spec in specs if spec.default is not None]
+    optional = [spec.name for spec in specs if spec.default is None]
+    # "type" first, as the server writes it
+    required.insert(0, required.pop())
+    lines = ["def to_dict(self):"]
+    lines.append("    data = {" + ", ".join(f"{name!r}: self.{name}" for name in required) + "}")
+    for name in optional:
+        lines.append(f"    if self.{name} is not None:")
+        lines.append(f"        data[{name!r}] = self.{name}")
+    lines.append("    return data")
+    return "\n".join(lines)
 
 
-@dataclass
-class ActionMessage:
+def _decoder_source(specs, namespace: Dict[str, Any]) -> str:
+    args = []
+    for spec in specs:
+        if spec.default_factory is not MISSING:
+            namespace[f"_factory_{spec.name}"] = spec.default_factory
+            args.append(f"data[{spec.name!r}] if {spec.name!r} in data else _factory_{spec.name}()")
+        elif spec.default is not MISSING and spec.default is not None:
+            namespace[f"_default_{spec.name}"] = spec.default
+            args.append(f"get({spec.name!r}, _default_{spec.name})")
+        else:
+            # Missing required keys decode as None rather than failing
+            args.append(f"get({spec.name!r})")
+    return "def from_dict(cls, data):\n    get = data.get\n    return cls(" + ", ".join(args) + ")"
+
+
+def _generate(source: str, name: str, namespace: Dict[str, Any]):
+    exec(source, namespace)
+    return namespace[name]
+
+
+@dataclass(slots=True)
+class UnknownMessage(Message):
+    """A message whose type this module does not know; data is the raw dict."""
+
+    data: Dict[str, Any]
+    type: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.data
+
+
+def decode_message(raw: str | bytes) -> Message:
+    """
+    Decode a wire message into its message class.
+
+    Large world:state messages decode to LazyWorldState, which parses map
+    and objects on first access. Unknown types decode to UnknownMessage;
+    input that is not a JSON object raises ValueError
+    (json.JSONDecodeError for invalid JSON).
+    """
+    if isinstance(raw, str) and len(raw) >= LAZY_WORLD_STATE_MIN_CHARS and _WORLD_STATE_TYPE in raw[:64]:
+        lazy = _decode_lazy_world_state(raw)
+        if lazy is not None:
+            return lazy
+    data = _loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+    cls = MESSAGE_TYPES.get(data.get("type"))
+    if cls is None:
+        return UnknownMessage(data, data.get("type"))
+    return cls.from_dict(data)
+
+
+def parse_message(raw: str) -> dict:
+    return _loads(raw)
+
+
+# ── Messages: Agent → Server ──
+
+@message
+class RegisterMessage(Message):
+    agent_id: str
+    name: str
+    color: int
+    type: str = "agent:register"
+
+
+@message
+class ActionMessage(Message):
     agent_id: str
     turn_id: int
     action: str
     params: dict = field(default_factory=dict)
     type: str = "agent:action"
 
-    def to_json(self) -> str:
-        return json.dumps(asdict(self))
 
+# ── Messages: Server → Agent ──
 
-def parse_message(raw: str) -> dict:
-    return json.loads(raw)
+# Not yet sent by the server (see agent.py); kept for the documented turn protocol
+@message
+class TurnStartMessage(Message):
+    agent_id: str
+    turn_id: int
+    timeout_ms: Optional[int] = None
+    type: str = "turn:start"
+
+
+# ── Messages: Server → All ──
+
+@message
+class WorldStateMessage(Message):
+    tick: int
+    agents: List[AgentInfo]
+    map: TileMapData
+    objects: List[MapObject]
+    quests: List[Quest]
+    spectators: Optional[List[SpectatorInfo]] = None
+    type: str = "world:state"
+
+
+# ── Lazy world:state ──
+
+# Smaller world:state messages are cheaper to parse whole than to split
+LAZY_WORLD_STATE_MIN_CHARS = 16 * 1024
+
+_WORLD_STATE_TYPE = '"world:state"'
+
+# Stands in for a deferred value while the rest of the message is parsed
+_DEFERRED = "\x00deferred"
+_DEFERRED_JSON = json.dumps(_DEFERRED)
+
+
+# Serializes first-access parses; a snapshot shares its message with the
+# live store, so two threads can read the same deferred field at once
+_parse_lock = threading.Lock()
+
+
+def _lazy_field(name: str) -> property:
+    slot = WorldStateMessage.__dict__[name]
+
+    def get(self):
+        if name in self._raw:
+            with _parse_lock:
+                raw = self._raw.get(name)
+                if raw is not None:
+                    # Set before dropping the text: a reader that finds it
+                    # gone outside the lock must find the slot filled
+                    slot.__set__(self, _loads(raw))
+                    del self._raw[name]
+        return slot.__get__(self, type(self))
+
+    def set(self, value):
+        with _parse_lock:
+            slot.__set__(self, value)
+            self._raw.pop(name, None)
+
+    return property(get, set, doc=f"{name}, parsed on first access")
+
+
+class LazyWorldState(WorldStateMessage):
+    """
+    A world:state whose map and objects are parsed on first access.
+
+    The tile grid and object list are most of a world:state's size, and
+    many agents only look at tick and agents; they never pay for the rest.
+    Behaves as a WorldStateMessage in every other way.
+    """
+
+    __slots__ = ("_raw",)
+
+    map = _lazy_field("map")
+    objects = _lazy_field("objects")
+
+    def __init__(self, data: Dict[str, Any], raw: Dict[str, str]):
+        self._raw = raw
+        get = data.get
+        self.tick = get("tick")
+        self.agents = get("agents")
+        self.quests = get("quests")
+        self.spectators = get("spectators")
+        self.type = get("type", "world:state")
+
+    @property
+    def deferred(self) -> List[str]:
+        """Names of the fields not parsed yet."""
+        return list(self._raw)
+
+    def deferred_json(self, name: str) -> str | None:
+        """JSON text of a field not parsed yet, else None."""
+        return self._raw.get(name)
+
+
+def _value_start(raw: str, key: str, opener: str) -> int:
+    """Index of the value of the first `"key":<opener>` in raw, or -1."""
+    start = raw.find(f'"{key}":{opener}')
+    return start if start < 0 else start + len(key) + 3
+
+
+def _decode_lazy_world_state(raw: str) -> LazyWorldState | None:
+    """
+    Parse a world:state except for its map and objects values.
+
+    In compact JSON, as the server sends it, the map is a flat object of
+    numbers (it ends at its first "}") and objects is a list of objects
+    whose metadata is flat (it ends at its first "}]"), so both spans are
+    found with str.find() instead of a parse. Each span is swapped for a placeholder and the rest is parsed
+    as usual. A wrong guess leaves unbalanced brackets behind, which the
+    parser rejects, or misplaces a placeholder; either way this returns
+    None and the caller parses the whole message.
+    """
+    map_start = _value_start(raw, "map", "{")
+    objects_start = _value_start(raw, "objects", "[")
+    if map_start < 0 or objects_start < 0:
+        return None
+    map_end = raw.find("}", map_start) + 1
+    if raw.startswith("]", objects_start + 1):
+        objects_end = objects_start + 2
+    elif raw.startswith("{", objects_start + 1):
+        objects_end = raw.find("}]", objects_start) + 2
+    else:
+        return None
+    if map_end <= 0 or objects_end <= 1:
+        return None
+
+    spans = sorted([(map_start, map_end, "map"), (objects_start, objects_end, "objects")])
+    (first_start, first_end, _), (second_start, second_end, _) = spans
+    if first_end > second_start:
+        return None
+    rest = (raw[:first_start] + _DEFERRED_JSON + raw[first_end:second_start]
+            + _DEFERRED_JSON + raw[second_end:])
+    try:
+        data = _loads(rest)
+    except ValueError:
+        return None
+    if (not isinstance(data, dict) or data.get("type") != "world:state"
+            or data.get("map") != _DEFERRED or data.get("objects") != _DEFERRED):
+        return None
+    return LazyWorldState(data, {name: raw[start:end] for start, end, name in spans})
+
+
+@message
+class SpectatorWelcomeMessage(Message):
+    spectator_id: str
+    name: str
+    type: str = "spectator:welcome"
+
+
+@message
+class SpectatorJoinedMessage(Message):
+    spectator_id: str
+    name: str
+    color: int
+    type: str = "spectator:joined"
+
+
+@message
+class SpectatorLeftMessage(Message):
+    spectator_id: str
+    type: str = "spectator:left"
+
+
+@message
+class SpectatorCommandMessage(Message):
+    spectator_id: str
+    name: str
+    color: int
+    text: str
+    type: str = "spectator:command"
+
+
+@message
+class ActionResultMessage(Message):
+    turn_id: int
+    agent_id: str
+    action: str
+    params: Dict[str, Any]
+    success: bool
+    error: Optional[str] = None
+    type: str = "action:result"
+
+
+@message
+class AgentJoinedMessage(Message):
+    agent: AgentInfo
+    type: str = "agent:joined"
+
+
+@message
+class AgentLeftMessage(Message):
+    agent_id: str
+    type: str = "agent:left"
+
+
+@message
+class RepoReadyMessage(Message):
+    repo_name: str
+    map: TileMapData
+    quests: List[Quest]
+    objects: List[MapObject]
+    stats: RepoStats
+    type: str = "repo:ready"
+
+
+@message
+class QuestUpdateMessage(Message):
+    quest_id: str
+    status: str
+    agent_id: Optional[str] = None
+    type: str = "quest:update"
+
+
+@message
+class AgentThoughtMessage(Message):
+    agent_id: str
+    text: str
+    type: str = "agent:thought"
+
+
+@message
+class SpawnRequestMessage(Message):
+    requesting_agent_id: str
+    requested_name: str
+    requested_role: str
+    requested_realm: str
+    requested_mission: str
+    priority: str
+    type: str = "agent:spawn-request"
+
+
+@message
+class AgentActivityMessage(Message):
+    agent_id: str
+    activity: str
+    tool_name: Optional[str] = None
+    type: str = "agent:activity"
+
+
+@message
+class FindingsPostedMessage(Message):
+    agent_id: str
+    agent_name: str
+    realm: str
+    finding: str
+    severity: str
+    type: str = "findings:posted"
+
+
+@message
+class KnowledgeLevelUpMessage(Message):
+    agent_id: str
+    area: str
+    new_level: int
+    type: str = "agent:level-up"
+
+
+@message
+class AgentDetailsMessage(Message):
+    agent_id: str
+    info: AgentInfo
+    knowledge: Dict[str, Any]
+    findings: List[Dict[str, Any]]
+    transcript: Dict[str, Any]
+    tools: List[str]
+    type: str = "agent:details"
+
+
+@message
+class RealmListMessage(Message):
+    realms: List[Dict[str, Any]]
+    type: str = "realm:list"
+
+
+@message
+class RealmRemovedMessage(Message):
+    realm_id: str
+    type: str = "realm:removed"
+
+
+@message
+class MapChangeMessage(Message):
+    path: str
+    map: TileMapData
+    objects: List[MapObject]
+    position: Position
+    breadcrumb: Position
+    type: str = "map:change"
+
+
+@message
+class RealmPresenceMessage(Message):
+    players: List[PlayerPresence]
+    type: str = "realm:presence"
+
+
+@message
+class RealmTreeMessage(Message):
+    root: Dict[str, Any]
+    type: str = "realm:tree"
+
+
+@message
+class ErrorMessage(Message):
+    message: str
+    type: str = "error"
+
+
+@message
+class ServerInfoMessage(Message):
+    addresses: List[str]
+    port: int
+    gamePhase: str
+    activeRealmId: Optional[str]
+    type: str = "server:info"
+
+
+@message
+class OracleDecisionMessage(Message):
+    activityType: str
+    processId: str
+    heroes: List[Dict[str, str]]
+    type: str = "oracle:decision"
+
+
+@message
+class HeroSummonedMessage(Message):
+    agentId: str
+    name: str
+    role: str
+    type: str = "hero:summoned"
+
+
+@message
+class HeroDismissedMessage(Message):
+    agentId: str
+    reason: str
+    type: str = "hero:dismissed"
+
+
+@message
+class ProcessStartedMessage(Message):
+    processId: str
+    problem: str
+    processName: str
+    currentStageId: str
+    currentStageName: str
+    totalStages: int
+    type: str = "process:started"
+
+
+@message
+class ProcessErrorMessage(Message):
+    message: str
+    type: str = "process:error"
+
+
+@message
+class StageAdvancedMessage(Message):
+    fromStageId: str
+    fromStageName: str
+    toStageId: Optional[str]
+    toStageName: Optional[str]
+    stageIndex: int
+    totalStages: int
+    type: str = "stage:advanced"
+
+
+@message
+class StageCompletedMessage(Message):
+    stageId: str
+    artifacts: Dict[str, str]
+    isFinal: bool
+    type: str = "stage:completed"
+
+
+@message
+class IdeaProposedMessage(Message):
+    ideaId: str
+    agentId: str
+    agentName: str
+    stageId: str
+    content: str
+    type: str = "idea:proposed"
+
+
+@message
+class IdeaVotedMessage(Message):
+    ideaId: str
+    agentId: str
+    vote: str
+    type: str = "idea:voted"
+
+
+@message
+class FogRevealMessage(Message):
+    tiles: List[Position]
+    agentId: str
+    type: str = "fog:reveal"
+
+
+@message
+class FortUpdateMessage(Message):
+    agentId: str
+    stage: int
+    position: Position
+    type: str = "fort:update"
+
+
+@message
+class FortViewMessage(Message):
+    agentId: str
+    roomImage: str
+    agentInfo: AgentInfo
+    type: str = "fort:view"
@@ -0,0 +1,110 @@
+"""
+Uniform-grid spatial index over things on the map.
+
+Positions are bucketed into square cells of cell_size tiles. A radius
+query visits only the cells the radius overlaps, and an occupancy check
+is a dict lookup, so neither depends on how many things the map holds.
+
+    index = SpatialIndex.build((obj["id"], obj["x"], obj["y"]) for obj in objects)
+    for obj_id, distance in index.within(x, y, 3):
+        ...
+    index.move("agent_2", 5, 6)
+    index.occupied(5, 6, ignore="agent_1")
+"""
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Cell edge in tiles; about the radius behaviors look around them
+DEFAULT_CELL_SIZE = 8
+
+Point = Tuple[int, int]
+
+
+class SpatialIndex:
+    """Ids by map position, with Manhattan-radius and occupancy queries."""
+
+    __slots__ = ("cell_size", "_positions", "_cells", "_tiles")
+
+    def __init__(self, cell_size: int = DEFAULT_CELL_SIZE):
+        if cell_size < 1:
+            raise ValueError(f"cell_size must be at least 1, got {cell_size}")
+        self.cell_size = cell_size
+        self._positions: Dict[str, Point] = {}
+        self._cells: Dict[Point, Set[str]] = {}
+        self._tiles: Dict[Point, Set[str]] = {}
+
+    @classmethod
+    def build(cls, items: Iterable[Tuple[str, int, int]], cell_size: int = DEFAULT_CELL_SIZE) -> "SpatialIndex":
+        """Index (id, x, y) items."""
+        index = cls(cell_size)
+        for item_id, x, y in items:
+            index.add(item_id, x, y)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._positions
+
+    def position(self, item_id: str) -> Point | None:
+        return self._positions.get(item_id)
+
+    def add(self, item_id: str, x: int, y: int):
+        """Index item_id at (x, y), moving it if it is already indexed."""
+        if item_id in self._positions:
+            self.remove(item_id)
+        self._positions[item_id] = (x, y)
+        self._cells.setdefault((x // self.cell_size, y // self.cell_size), set()).add(item_id)
+        self._tiles.setdefault((x, y), set()).add(item_id)
+
+    move = add
+
+    def remove(self, item_id: str) -> bool:
+        """Drop item_id; False if it was not indexed."""
+        position = self._positions.pop(item_id, None)
+        if position is None:
+            return False
+        x, y = position
+        self._discard(self._cells, (x // self.cell_size, y // self.cell_size), item_id)
+        self._discard(self._tiles, position, item_id)
+        return True
+
+    @staticmethod
+    def _discard(buckets: Dict[Point, Set[str]], key: Point, item_id: str):
+        bucket = buckets[key]
+        bucket.discard(item_id)
+        if not bucket:
+            del buckets[key]
+
+    def at(self, x: int, y: int) -> Set[str]:
+        """Ids on tile (x, y)."""
+        return set(self._tiles.get((x, y), ()))
+
+    def occupied(self, x: int, y: int, ignore: str | None = None) -> bool:
+        """Whether anything but ignore is on tile (x, y)."""
+        ids = self._tiles.get((x, y))
+        if not ids:
+            return False
+        return len(ids) > 1 or ignore not in ids
+
+    def within(self, x: int, y: int, radius: int) -> List[Tuple[str, int]]:
+        """(id, distance) of everything within Manhattan distance radius, nearest first."""
+        size = self.cell_size
+        found = []
+        for cx in range((x - radius) // size, (x + radius) // size + 1):
+            for cy in range((y - radius) // size, (y + radius) // size + 1):
+                for item_id in self._cells.get((cx, cy), ()):
+                    ix, iy = self._positions[item_id]
+                    distance = abs(ix - x) + abs(iy - y)
+                    if distance <= radius:
+                        found.append((distance, item_id))
+        found.sort()
+        return [(item_id, distance) for distance, item_id in found]
+
+    def copy(self) -> "SpatialIndex":
+        index = SpatialIndex(self.cell_size)
+        index._positions = dict(self._positions)
+        index._cells = {cell: set(ids) for cell, ids in self._cells.items()}
+        index._tiles = {tile: set(ids) for tile, ids in self._tiles.items()}
+        return index
@@ -0,0 +1,137 @@
+"""Tests for deadline-bounded turn decisions."""
+import asyncio
+import threading
+import time
+
+from decision import DecisionRunner, FALLBACK_ACTION
+
+
+class FixedBehavior:
+    def __init__(self, action, delay=0.0):
+        self.action = action
+        self.delay = delay
+        self.calls = 0
+
+    def next_action(self, world_state):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.action
+
+
+class FailingBehavior:
+    def next_action(self, world_state):
+        raise RuntimeError("API down")
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestDecide:
+    def test_returns_behavior_action(self):
+        action = {"action": "speak", "params": {"text": "hi"}}
+        runner = DecisionRunner(FixedBehavior(action))
+        try:
+            assert run(runner.decide({}, 5000)) == action
+        finally:
+            runner.close()
+
+    def test_passes_world_state_to_behavior(self):
+        seen = []
+
+        class Recording:
+            def next_action(self, world_state):
+                seen.append(world_state)
+                return {"action": "wait", "params": {}}
+
+        state = {"tick": 7}
+        runner = DecisionRunner(Recording())
+        try:
+            run(runner.decide(state, 5000))
+        finally:
+            runner.close()
+        assert seen == [state]
+
+    def test_falls_back_before_deadline(self):
+        runner = DecisionRunner(FixedBehavior({"action": "speak", "params": {}}, delay=1.0), margin_ms=50)
+        try:
+            start = time.monotonic()
+            action = run(runner.decide({}, 200))
+            elapsed = time.monotonic() - start
+        finally:
+            runner.close()
+        assert action == FALLBACK_ACTION
+        assert elapsed < 0.5
+
+    def test_fallback_is_a_fresh_copy(self):
+        runner = DecisionRunner(FailingBehavior())
+        try:
+            action = run(runner.decide({}, 5000))
+        finally:
+            runner.close()
+        action["params"]["duration_ms"] = 0
+        assert FALLBACK_ACTION["params"]["duration_ms"] == 1000
+
+    def test_falls_back_when_behavior_raises(self):
+        runner = DecisionRunner(FailingBehavior())
+        try:
+            assert run(runner.decide({}, 5000)) == FALLBACK_ACTION
+        finally:
+            runner.close()
+
+    def test_uses_default_timeout_when_missing(self):
+        action = {"action": "wait", "params": {}}
+        runner = DecisionRunner(FixedBehavior(action))
+        try:
+            assert run(runner.decide({}, None)) == action
+        finally:
+            runner.close()
+
+    def test_event_loop_keeps_running_while_deciding(self):
+        runner = DecisionRunner(FixedBehavior({"action": "wait", "params": {}}, delay=0.3))
+        ticks = []
+
+        async def main():
+            async def ticker():
+                while True:
+                    ticks.append(time.monotonic())
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.create_task(ticker())
+            await runner.decide({}, 5000)
+            task.cancel()
+
+        try:
+            run(main())
+        finally:
+            runner.close()
+        assert len(ticks) > 10
+
+
+class TestSerialization:
+    def test_decisions_never_overlap(self):
+        active = []
+        overlaps = []
+        lock = threading.Lock()
+
+        class Tracking:
+            def next_action(self, world_state):
+                with lock:
+                    active.append(1)
+                    if len(active) > 1:
+                        overlaps.append(True)
+                time.sleep(0.05)
+                with lock:
+                    active.pop()
+                return {"action": "wait", "params": {}}
+
+        runner = DecisionRunner(Tracking())
+
+        async def main():
+            await asyncio.gather(*(runner.decide({}, 5000) for _ in range(4)))
+
+        try:
+            run(main())
+        finally:
+            runner.close()
+        assert overlaps == []
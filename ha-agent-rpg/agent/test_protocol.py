@@ -1,7 +1,13 @@
 """Tests for the protocol message builders and parser."""
 import json
+import threading
 import pytest
-from protocol import RegisterMessage, ActionMessage, parse_message
+from protocol import (
+    RegisterMessage, ActionMessage, parse_message, decode_message, MESSAGE_TYPES,
+    UnknownMessage, WorldStateMessage, ActionResultMessage, AgentLeftMessage,
+    AgentThoughtMessage, FogRevealMessage, QuestUpdateMessage, StageAdvancedMessage,
+    LazyWorldState, LAZY_WORLD_STATE_MIN_CHARS,
+)
 
 
 class TestRegisterMessage:
@@ -119,3 +125,216 @@ class TestRoundTrip:
         assert parsed["turn_id"] == 42
         assert parsed["action"] == "move"
         assert parsed["params"] == {"x": 5, "y": 3}
+
+
+class TestDecodeMessage:
+    def test_decodes_action_result(self):
+        raw = json.dumps({
+            "type": "action:result", "turn_id": 3, "agent_id": "a1", "action": "move",
+            "params": {"x": 1, "y": 2}, "success": False, "error": "blocked",
+        })
+        msg = decode_message(raw)
+        assert isinstance(msg, ActionResultMessage)
+        assert msg.turn_id == 3
+        assert msg.params == {"x": 1, "y": 2}
+        assert msg.success is False
+        assert msg.error == "blocked"
+
+    def test_decodes_world_state_with_nested_dicts(self):
+        raw = json.dumps({
+            "type": "world:state", "tick": 5,
+            "agents": [{"agent_id": "a1", "x": 1, "y": 2}],
+            "map": {"width": 2, "height": 1, "tile_size": 32, "tiles": [[0, 1]]},
+            "objects": [], "quests": [],
+        })
+        msg = decode_message(raw)
+        assert isinstance(msg, WorldStateMessage)
+        assert msg.tick == 5
+        assert msg.agents[0]["x"] == 1
+        assert msg.map["tiles"] == [[0, 1]]
+        assert msg.spectators is None
+
+    def test_decodes_camel_case_messages(self):
+        msg = decode_message('{"type": "fog:reveal", "tiles": [{"x": 1, "y": 1}], "agentId": "a1"}')
+        assert isinstance(msg, FogRevealMessage)
+        assert msg.agentId == "a1"
+        assert msg.tiles == [{"x": 1, "y": 1}]
+
+    def test_missing_fields_decode_as_none(self):
+        msg = decode_message('{"type": "agent:left"}')
+        assert isinstance(msg, AgentLeftMessage)
+        assert msg.agent_id is None
+
+    def test_missing_defaulted_field_uses_default(self):
+        msg = ActionMessage.from_dict({"agent_id": "a1", "turn_id": 1, "action": "wait"})
+        assert msg.params == {}
+        assert msg.type == "agent:action"
+
+    def test_unknown_type_keeps_raw_data(self):
+        msg = decode_message('{"type": "future:thing", "value": 1}')
+        assert isinstance(msg, UnknownMessage)
+        assert msg.type == "future:thing"
+        assert msg.data == {"type": "future:thing", "value": 1}
+
+    def test_raises_on_invalid_json(self):
+        with pytest.raises(json.JSONDecodeError):
+            decode_message("not valid json")
+
+    def test_raises_on_non_object(self):
+        with pytest.raises(ValueError):
+            decode_message("[1, 2]")
+
+    def test_every_server_message_type_is_registered(self):
+        for msg_type in (
+            "world:state", "action:result", "agent:joined", "agent:left", "repo:ready",
+            "quest:update", "agent:thought", "agent:activity", "agent:spawn-request",
+            "findings:posted", "agent:level-up", "agent:details", "realm:list",
+            "realm:removed", "map:change", "realm:presence", "realm:tree", "error",
+            "process:started", "process:error", "stage:advanced", "stage:completed",
+            "idea:proposed", "idea:voted", "spectator:welcome", "spectator:joined",
+            "spectator:left", "spectator:command", "server:info", "fog:reveal",
+            "fort:update", "fort:view", "oracle:decision", "hero:summoned", "hero:dismissed",
+        ):
+            assert msg_type in MESSAGE_TYPES, msg_type
+
+
+def big_world_state(**overrides):
+    """A compact world:state large enough to decode lazily."""
+    width = 100
+    data = {
+        "type": "world:state", "tick": 9,
+        "agents": [{"agent_id": "a1", "x": 1, "y": 2}],
+        "map": {"width": width, "height": 100, "tile_size": 32,
+                "tiles": [[(x + y) % 3 for x in range(width)] for y in range(100)]},
+        "objects": [{"id": f"o{i}", "type": "file", "x": i, "y": 0, "label": f"f{i}.py",
+                     "metadata": {"fullPath": f"src/f{i}.py"}} for i in range(50)],
+        "quests": [{"quest_id": "q1", "title": "Fix it", "labels": []}],
+    }
+    data.update(overrides)
+    raw = json.dumps(data, separators=(",", ":"))
+    assert len(raw) >= LAZY_WORLD_STATE_MIN_CHARS
+    return data, raw
+
+
+class TestLazyWorldState:
+    def test_defers_map_and_objects(self):
+        data, raw = big_world_state()
+        msg = decode_message(raw)
+        assert isinstance(msg, LazyWorldState)
+        assert isinstance(msg, WorldStateMessage)
+        assert msg.tick == 9
+        assert msg.agents == data["agents"]
+        assert msg.quests == data["quests"]
+        assert sorted(msg.deferred) == ["map", "objects"]
+
+    def test_parses_fields_on_first_access(self):
+        data, raw = big_world_state()
+        msg = decode_message(raw)
+        assert msg.map == data["map"]
+        assert msg.deferred == ["objects"]
+        assert msg.objects == data["objects"]
+        assert msg.deferred == []
+        assert msg.map is msg.map
+
+    def test_assignment_replaces_deferred_field(self):
+        _, raw = big_world_state()
+        msg = decode_message(raw)
+        msg.objects = []
+        assert msg.objects == []
+        assert msg.deferred == ["map"]
+
+    def test_round_trips(self):
+        data, raw = big_world_state()
+        assert decode_message(raw).to_dict() == data
+
+    def test_concurrent_first_access(self):
+        data, raw = big_world_state()
+        for _ in range(20):
+            msg = decode_message(raw)
+            barrier = threading.Barrier(4)
+            results, errors = [], []
+
+            def read():
+                barrier.wait()
+                try:
+                    results.append(msg.map)
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=read) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert errors == []
+            assert results == [data["map"]] * 4
+
+    def test_empty_objects(self):
+        _, raw = big_world_state(objects=[])
+        msg = decode_message(raw)
+        assert isinstance(msg, LazyWorldState)
+        assert msg.objects == []
+
+    def test_small_messages_decode_eagerly(self):
+        raw = json.dumps({"type": "world:state", "tick": 1, "agents": [],
+                          "map": {"width": 0, "height": 0, "tile_size": 32, "tiles": []},
+                          "objects": [], "quests": []})
+        assert type(decode_message(raw)) is WorldStateMessage
+
+    def test_pretty_printed_json_decodes_eagerly(self):
+        data, _ = big_world_state()
+        msg = decode_message(json.dumps(data, indent=1))
+        assert type(msg) is WorldStateMessage
+        assert msg.to_dict() == data
+
+    @pytest.mark.parametrize("label", ['x}]', 'x}],"quests":[],"y":"', '"map":{}'])
+    def test_brackets_in_strings_fall_back_to_full_parse(self, label):
+        data, _ = big_world_state()
+        data["objects"][0]["label"] = label
+        msg = decode_message(json.dumps(data, separators=(",", ":")))
+        assert msg.objects == data["objects"]
+        assert msg.to_dict() == data
+
+
+class TestEncode:
+    def test_messages_use_slots(self):
+        msg = ActionMessage(agent_id="a1", turn_id=1, action="wait")
+        assert not hasattr(msg, "__dict__")
+        with pytest.raises(AttributeError):
+            msg.extra = 1
+
+    def test_type_is_encoded_first(self):
+        msg = ActionMessage(agent_id="a1", turn_id=1, action="wait")
+        assert list(msg.to_dict())[0] == "type"
+
+    def test_unset_optional_fields_are_omitted(self):
+        msg = ActionResultMessage(turn_id=1, agent_id="a1", action="move", params={}, success=True)
+        assert "error" not in json.loads(msg.to_json())
+
+    def test_set_optional_fields_are_encoded(self):
+        msg = QuestUpdateMessage(quest_id="q1", status="done", agent_id="a1")
+        assert json.loads(msg.to_json())["agent_id"] == "a1"
+
+    def test_nullable_required_fields_encode_null(self):
+        msg = StageAdvancedMessage(
+            fromStageId="s1", fromStageName="One", toStageId=None, toStageName=None,
+            stageIndex=1, totalStages=1,
+        )
+        data = json.loads(msg.to_json())
+        assert data["toStageId"] is None
+
+    def test_to_dict_does_not_copy_nested_values(self):
+        params = {"x": 1}
+        msg = ActionMessage(agent_id="a1", turn_id=1, action="move", params=params)
+        assert msg.to_dict()["params"] is params
+
+    def test_non_ascii_text_round_trips(self):
+        msg = AgentThoughtMessage(agent_id="a1", text="héllo ✨")
+        assert decode_message(msg.to_json()).text == "héllo ✨"
+
+    @pytest.mark.parametrize("msg_type", sorted(MESSAGE_TYPES))
+    def test_round_trip_every_type(self, msg_type):
+        cls = MESSAGE_TYPES[msg_type]
+        data = {"type": msg_type}
+        data.update({name: f"value_{name}" for name in cls.__dataclass_fields__ if name != "type"})
+        assert decode_message(json.dumps(data)).to_dict() == data
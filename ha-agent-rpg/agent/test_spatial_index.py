@@ -0,0 +1,113 @@
+"""Tests for the uniform-grid spatial index."""
+import random
+
+import pytest
+
+from protocol import ActionResultMessage, AgentJoinedMessage, AgentLeftMessage, WorldStateMessage
+from spatial_index import SpatialIndex
+from world_store import WorldStateStore
+
+
+def brute_force(points, x, y, radius):
+    found = [(abs(px - x) + abs(py - y), item_id) for item_id, (px, py) in points.items()]
+    return [(item_id, distance) for distance, item_id in sorted(found) if distance <= radius]
+
+
+class TestSpatialIndex:
+    def test_within_returns_nearest_first(self):
+        index = SpatialIndex.build([("far", 3, 0), ("near", 1, 0), ("here", 0, 0), ("out", 4, 0)])
+        assert index.within(0, 0, 3) == [("here", 0), ("near", 1), ("far", 3)]
+
+    def test_within_uses_manhattan_distance(self):
+        index = SpatialIndex.build([("diagonal", 2, 2), ("straight", 0, 3)])
+        assert index.within(0, 0, 3) == [("straight", 3)]
+
+    def test_within_spans_cells_and_negative_coordinates(self):
+        index = SpatialIndex.build([("a", 7, 7), ("b", 8, 8), ("c", -1, 0)], cell_size=8)
+        assert index.within(7, 8, 1) == [("a", 1), ("b", 1)]
+        assert index.within(0, 0, 1) == [("c", 1)]
+
+    @pytest.mark.parametrize("cell_size", [1, 3, 8, 64])
+    def test_matches_brute_force(self, cell_size):
+        rng = random.Random(cell_size)
+        points = {f"o{i}": (rng.randrange(-20, 60), rng.randrange(-20, 60)) for i in range(400)}
+        index = SpatialIndex.build(((item_id, x, y) for item_id, (x, y) in points.items()), cell_size)
+        for item_id in rng.sample(sorted(points), 100):
+            points[item_id] = (rng.randrange(0, 40), rng.randrange(0, 40))
+            index.move(item_id, *points[item_id])
+        for item_id in rng.sample(sorted(points), 50):
+            del points[item_id]
+            index.remove(item_id)
+        for _ in range(50):
+            x, y, radius = rng.randrange(-10, 50), rng.randrange(-10, 50), rng.randrange(0, 12)
+            assert index.within(x, y, radius) == brute_force(points, x, y, radius)
+        assert len(index) == len(points)
+
+    def test_occupancy(self):
+        index = SpatialIndex.build([("a1", 2, 3)])
+        assert index.occupied(2, 3)
+        assert not index.occupied(2, 3, ignore="a1")
+        assert not index.occupied(3, 3)
+        index.add("a2", 2, 3)
+        assert index.occupied(2, 3, ignore="a1")
+        assert index.at(2, 3) == {"a1", "a2"}
+
+    def test_move_and_remove(self):
+        index = SpatialIndex.build([("a1", 0, 0)])
+        index.move("a1", 20, 20)
+        assert index.position("a1") == (20, 20)
+        assert not index.occupied(0, 0)
+        assert index.within(0, 0, 5) == []
+        assert index.remove("a1") is True
+        assert index.remove("a1") is False
+        assert "a1" not in index
+        assert index.within(20, 20, 0) == []
+
+    def test_copy_is_independent(self):
+        index = SpatialIndex.build([("a1", 0, 0)])
+        copy = index.copy()
+        index.move("a1", 5, 5)
+        assert copy.position("a1") == (0, 0)
+        assert copy.occupied(0, 0)
+
+    def test_rejects_empty_cells(self):
+        with pytest.raises(ValueError):
+            SpatialIndex(0)
+
+
+class TestWorldStoreIndexes:
+    def make_world(self, objects=()):
+        world = WorldStateStore("a1")
+        world.apply(WorldStateMessage(
+            tick=1,
+            agents=[{"agent_id": "a1", "x": 1, "y": 1}, {"agent_id": "a2", "x": 4, "y": 4}],
+            map={"width": 10, "height": 10, "tile_size": 32, "tiles": []},
+            objects=list(objects), quests=[],
+        ))
+        return world
+
+    def test_objects_near(self):
+        world = self.make_world([{"id": "o1", "x": 2, "y": 1}, {"id": "o2", "x": 9, "y": 9}])
+        near = world.objects_near(1, 1, 3)
+        assert [(obj["id"], distance) for obj, distance in near] == [("o1", 1)]
+
+    def test_agent_index_follows_deltas(self):
+        world = self.make_world()
+        assert world.occupied(4, 4, ignore="a1")
+        world.apply(ActionResultMessage(turn_id=0, agent_id="a2", action="move",
+                                        params={"x": 5, "y": 4}, success=True))
+        assert not world.occupied(4, 4)
+        assert world.occupied(5, 4)
+        world.apply(AgentJoinedMessage(agent={"agent_id": "a3", "x": 7, "y": 7}))
+        assert world.occupied(7, 7)
+        world.apply(AgentLeftMessage(agent_id="a3"))
+        assert not world.occupied(7, 7)
+        assert not world.occupied(1, 1, ignore="a1")
+
+    def test_snapshot_keeps_its_own_agent_index(self):
+        world = self.make_world()
+        view = world.snapshot()
+        world.apply(ActionResultMessage(turn_id=0, agent_id="a2", action="move",
+                                        params={"x": 5, "y": 4}, success=True))
+        assert view.occupied(4, 4)
+        assert not world.occupied(4, 4)
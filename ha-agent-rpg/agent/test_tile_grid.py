@@ -0,0 +1,131 @@
+"""Tests for the compact tile grid."""
+import pytest
+
+from behaviors import ScriptedBehavior
+from protocol import AgentJoinedMessage, MapChangeMessage, WorldStateMessage, decode_message
+from test_protocol import big_world_state
+from tile_grid import DIRECTIONS, WALL, TileGrid, shared_grid
+from world_store import WorldStateStore
+
+# 0=grass, 1=wall, 2=water, 3=door, 8=path
+TILES = [
+    [1, 1, 1, 1],
+    [1, 0, 2, 1],
+    [1, 3, 8, 1],
+]
+
+
+def grid_map(tiles=TILES):
+    return {"width": len(tiles[0]), "height": len(tiles), "tile_size": 32, "tiles": tiles}
+
+
+class TestTileGrid:
+    def test_stores_one_byte_per_tile(self):
+        grid = TileGrid.from_map(grid_map())
+        assert grid.tiles == bytes([1, 1, 1, 1, 1, 0, 2, 1, 1, 3, 8, 1])
+        assert (grid.width, grid.height, grid.tile_size) == (4, 3, 32)
+
+    def test_tile_outside_map_is_wall(self):
+        grid = TileGrid.from_map(grid_map())
+        assert grid.tile(2, 1) == 2
+        assert grid.tile(-1, 0) == WALL
+        assert grid.tile(4, 0) == WALL
+        assert grid.tile(0, 3) == WALL
+
+    def test_is_walkable_matches_server_tiles(self):
+        grid = TileGrid.from_map(grid_map())
+        assert grid.is_walkable(1, 1)
+        assert not grid.is_walkable(2, 1)
+        assert grid.is_walkable(1, 2)
+        assert grid.is_walkable(2, 2)
+        assert not grid.is_walkable(0, 0)
+        assert not grid.is_walkable(-1, 1)
+
+    def test_neighbors_are_walkable_in_direction_order(self):
+        grid = TileGrid.from_map(grid_map())
+        assert list(grid.neighbors(2, 1)) == [(2, 2), (1, 1)]
+        assert list(grid.neighbors(1, 1, directions=DIRECTIONS[::-1])) == [(1, 2)]
+
+    def test_masks(self):
+        grid = TileGrid.from_map(grid_map())
+        assert grid.walkable_mask == bytes([0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 1, 0])
+        assert grid.mask({2}) == bytes([0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0])
+        assert grid.walkable_count() == 3
+
+    def test_ragged_rows_are_padded_with_walls(self):
+        grid = TileGrid.from_map({"width": 3, "height": 2, "tiles": [[0]]})
+        assert grid.tiles == bytes([0, WALL, WALL, WALL, WALL, WALL])
+
+    def test_tile_ids_beyond_a_byte_are_not_walkable(self):
+        grid = TileGrid.from_map(grid_map([[0, 300]]))
+        assert not grid.is_walkable(1, 0)
+
+    def test_rejects_wrong_tile_count(self):
+        with pytest.raises(ValueError):
+            TileGrid(2, 2, b"\x00")
+
+    def test_numpy_round_trip(self):
+        pytest.importorskip("numpy")
+        grid = TileGrid.from_map(grid_map())
+        array = grid.to_numpy()
+        assert array.shape == (3, 4)
+        assert array[2, 1] == 3
+        assert TileGrid.from_numpy(array) == grid
+
+
+class TestSharedGrid:
+    def test_same_map_shares_one_grid(self):
+        assert shared_grid(grid_map()) is shared_grid(grid_map())
+
+    def test_map_text_is_parsed_once(self):
+        _, raw = big_world_state()
+        first, second = decode_message(raw), decode_message(raw)
+        grid = shared_grid(first.deferred_json("map"))
+        assert shared_grid(second.deferred_json("map")) is grid
+        assert grid == TileGrid.from_map(first.map)
+
+    def test_stores_share_the_grid_without_parsing_the_map(self):
+        _, raw = big_world_state()
+        stores = []
+        for agent_id in ("a1", "a2"):
+            msg = decode_message(raw)
+            world = WorldStateStore(agent_id)
+            world.apply(msg)
+            stores.append(world)
+            assert world.grid is stores[0].grid
+            assert "map" in msg.deferred
+
+    def test_map_change_replaces_grid(self):
+        world = WorldStateStore("a1")
+        world.apply(decode_message(big_world_state()[1]))
+        before = world.grid
+        world.apply(MapChangeMessage(path="src", map=grid_map(), objects=[],
+                                     position={"x": 1, "y": 1}, breadcrumb={"x": 1, "y": 1}))
+        assert world.grid is not before
+        assert world.grid.width == 4
+
+
+class TestScriptedMove:
+    def make_world(self, agents):
+        world = WorldStateStore("a1")
+        world.apply(WorldStateMessage(tick=1, agents=agents, map=grid_map(), objects=[], quests=[]))
+        return world
+
+    def test_moves_onto_walkable_tile(self):
+        behavior = ScriptedBehavior("a1")
+        behavior.step = 1  # down
+        world = self.make_world([{"agent_id": "a1", "x": 1, "y": 1}])
+        assert behavior._compute_move(world) == {"x": 1, "y": 2}
+
+    def test_skips_occupied_neighbors(self):
+        behavior = ScriptedBehavior("a1")
+        behavior.step = 2  # left, a wall
+        world = self.make_world([{"agent_id": "a1", "x": 1, "y": 2},
+                                 {"agent_id": "a2", "x": 2, "y": 2}])
+        assert behavior._compute_move(world) == {"x": 1, "y": 1}
+
+    def test_without_map_stays_put(self):
+        behavior = ScriptedBehavior("a1")
+        world = WorldStateStore("a1")
+        world.apply(AgentJoinedMessage(agent={"agent_id": "a1", "x": 3, "y": 3}))
+        assert behavior._compute_move(world) == {"x": 4, "y": 3}
@@ -0,0 +1,160 @@
+"""Tests for the incremental client-side world state."""
+from protocol import (
+    ActionResultMessage, AgentJoinedMessage, AgentLeftMessage, FogRevealMessage,
+    MapChangeMessage, QuestUpdateMessage, WorldStateMessage, decode_message,
+)
+from test_protocol import big_world_state
+from world_store import WorldStateStore
+
+
+def agent(agent_id, x=0, y=0):
+    return {"agent_id": agent_id, "name": agent_id.title(), "role": "Explorer", "x": x, "y": y}
+
+
+def world_state(tick=1, agents=None, objects=None):
+    return WorldStateMessage(
+        tick=tick,
+        agents=agents if agents is not None else [agent("a1", 1, 1), agent("a2", 5, 5)],
+        map={"width": 4, "height": 3, "tile_size": 32, "tiles": [[0] * 4] * 3},
+        objects=objects if objects is not None else [{"id": "o1", "type": "file", "x": 2, "y": 1}],
+        quests=[],
+    )
+
+
+def move(agent_id, x, y, success=True):
+    return ActionResultMessage(turn_id=0, agent_id=agent_id, action="move",
+                               params={"x": x, "y": y}, success=success)
+
+
+class TestWorldState:
+    def test_indexes_agents_and_objects(self):
+        world = WorldStateStore("a1")
+        assert world.apply(world_state()) is True
+        assert world.ready
+        assert world.tick == 1
+        assert set(world.agents) == {"a1", "a2"}
+        assert world.me["x"] == 1
+        assert world.objects["o1"]["x"] == 2
+        assert world.map["width"] == 4
+
+    def test_ignores_older_partial_snapshots(self):
+        world = WorldStateStore("a1")
+        world.apply(world_state(tick=5))
+        stale = decode_message('{"type": "world:state", "tick": 4, "agents": []}')
+        assert world.apply(stale) is False
+        assert world.tick == 5
+        assert "a1" in world.agents
+
+    def test_accepts_a_full_snapshot_after_a_server_restart(self):
+        world = WorldStateStore("a1")
+        world.apply(world_state(tick=500))
+        assert world.apply(world_state(tick=0, agents=[agent("a1", 3, 3)])) is True
+        assert world.tick == 0
+        assert set(world.agents) == {"a1"}
+        # Ticks move forward from the restart
+        assert world.apply(world_state(tick=1, agents=[agent("a1", 4, 3)])) is True
+        assert world.me["x"] == 4
+
+    def test_restart_snapshot_stays_unparsed(self):
+        data, raw = big_world_state(tick=0)
+        msg = decode_message(raw)
+        world = WorldStateStore("a1")
+        world.apply(world_state(tick=500))
+        assert world.apply(msg) is True
+        assert world.tick == 0
+        assert sorted(msg.deferred) == ["map", "objects"]
+
+    def test_snapshot_replaces_deltas(self):
+        world = WorldStateStore("a1")
+        world.apply(world_state(tick=1))
+        world.apply(AgentJoinedMessage(agent=agent("a3")))
+        world.apply(world_state(tick=2))
+        assert "a3" not in world.agents
+
+    def test_leaves_lazy_fields_unparsed_until_read(self):
+        data, raw = big_world_state()
+        msg = decode_message(raw)
+        world = WorldStateStore("a1")
+        world.apply(msg)
+        assert world.me["x"] == 1
+        assert sorted(msg.deferred) == ["map", "objects"]
+        assert len(world.objects) == len(data["objects"])
+        assert msg.deferred == ["map"]
+
+
+class TestDeltas:
+    def test_successful_move_updates_position(self):
+        world = WorldStateStore("a1")
+        world.apply(world_state())
+        before = world.agents["a2"]
+        assert world.apply(move("a2", 6, 5)) is True
+        assert (world.agents["a2"]["x"], world.agents["a2"]["y"]) == (6, 5)
+        # Records are replaced, not edited
+        assert before["x"] == 5
+
+    def test_failed_move_is_ignored(self):
+        world = WorldStateStore("a1")
+        world.apply(world_state())
+        assert world.apply(move("a2", 6, 5, success=False)) is False
+        assert world.agents["a2"]["x"] == 5
+
+    def test_move_of_unknown_agent_is_ignored(self):
+        world = WorldStateStore("a1")
+        world.apply(world_state())
+        assert world.apply(move("ghost", 1, 1)) is False
+        assert "ghost" not in world.agents
+
+    def test_agent_joined_and_left(self):
+        world = WorldStateStore("a1")
+        world.apply(world_state())
+        world.apply(AgentJoinedMessage(agent=agent("a3", 2, 2)))
+        assert world.agents["a3"]["x"] == 2
+        assert world.apply(AgentLeftMessage(agent_id="a2")) is True
+        assert "a2" not in world.agents
+        assert world.apply(AgentLeftMessage(agent_id="a2")) is False
+
+    def test_map_change_replaces_map_and_moves_self(self):
+        world = WorldStateStore("a1")
+        world.apply(world_state())
+        world.apply(FogRevealMessage(tiles=[{"x": 0, "y": 0}], agentId="a1"))
+        new_map = {"width": 8, "height": 8, "tile_size": 32, "tiles": [[0] * 8] * 8}
+        world.apply(MapChangeMessage(path="src", map=new_map,
+                                     objects=[{"id": "o9", "type": "file", "x": 3, "y": 3}],
+                                     position={"x": 4, "y": 2}, breadcrumb={"x": 4, "y": 2}))
+        assert world.map is new_map
+        assert set(world.objects) == {"o9"}
+        assert world.path == "src"
+        assert (world.me["x"], world.me["y"]) == (4, 2)
+        assert world.revealed == set()
+
+    def test_fog_reveal_accumulates_tiles(self):
+        world = WorldStateStore("a1")
+        world.apply(FogRevealMessage(tiles=[{"x": 1, "y": 2}], agentId="a1"))
+        world.apply(FogRevealMessage(tiles=[{"x": 3, "y": 4}, {"x": 1, "y": 2}], agentId="oracle"))
+        assert world.revealed == {(1, 2), (3, 4)}
+
+    def test_other_messages_are_ignored(self):
+        world = WorldStateStore("a1")
+        assert world.apply(QuestUpdateMessage(quest_id="q1", status="done")) is False
+
+
+class TestSnapshot:
+    def test_snapshot_is_unaffected_by_later_deltas(self):
+        world = WorldStateStore("a1")
+        world.apply(world_state())
+        view = world.snapshot()
+        world.apply(move("a1", 2, 1))
+        world.apply(AgentLeftMessage(agent_id="a2"))
+        world.apply(FogRevealMessage(tiles=[{"x": 0, "y": 0}], agentId="a1"))
+        assert view.me["x"] == 1
+        assert "a2" in view.agents
+        assert view.revealed == set()
+        assert world.me["x"] == 2
+
+    def test_snapshot_reads_lazy_fields(self):
+        data, raw = big_world_state()
+        world = WorldStateStore("a1")
+        world.apply(decode_message(raw))
+        view = world.snapshot()
+        assert view.map == data["map"]
+        assert set(view.objects) == {obj["id"] for obj in data["objects"]}
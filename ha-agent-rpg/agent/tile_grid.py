@@ -0,0 +1,185 @@
+"""
+Compact tile maps for walkability queries.
+
+A TileGrid keeps a map's tiles as one row-major bytes object (a byte per
+tile) instead of a list of lists of ints (a pointer per tile plus a list
+per row), and answers is_walkable() with a table lookup. Grids are
+immutable, so shared_grid() hands every behavior in the process the same
+instance for the same map.
+
+    grid = shared_grid(world.map)
+    if grid.is_walkable(x + 1, y):
+        ...
+    for nx, ny in grid.neighbors(x, y):
+        ...
+"""
+
+import threading
+from typing import Iterable, Iterator, Tuple
+
+from protocol import TileMapData, parse_message
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Mirrors WorldState.isWalkable on the server:
+# 0=grass, 3=door, 4=floor, 6=hill, 7=sand, 8=path
+WALKABLE_TILES = frozenset({0, 3, 4, 6, 7, 8})
+
+# Tile outside the map, as the server's getTile() reports it
+WALL = 1
+
+# Stands in for tile ids that do not fit in a byte (none do today)
+UNKNOWN_TILE = 255
+
+# Right, down, left, up
+DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+# Maps retained by shared_grid()
+SHARED_GRIDS = 16
+
+
+def _table(tile_ids: Iterable[int]) -> bytes:
+    """translate() table mapping the given tile ids to 1 and all others to 0."""
+    ids = set(tile_ids)
+    return bytes(1 if tile in ids else 0 for tile in range(256))
+
+
+_WALKABLE = _table(WALKABLE_TILES)
+
+
+def _row_bytes(row) -> bytes:
+    try:
+        return bytes(row)
+    except ValueError:
+        return bytes(tile if 0 <= tile < 256 else UNKNOWN_TILE for tile in row)
+
+
+class TileGrid:
+    """An immutable width x height map of tile ids, one byte per tile."""
+
+    __slots__ = ("width", "height", "tile_size", "tiles", "_walkable_mask")
+
+    def __init__(self, width: int, height: int, tiles: bytes, tile_size: int = 32):
+        if len(tiles) != width * height:
+            raise ValueError(f"Expected {width * height} tiles, got {len(tiles)}")
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.tiles = bytes(tiles)
+        self._walkable_mask: bytes | None = None
+
+    @classmethod
+    def from_map(cls, map_data: TileMapData) -> "TileGrid":
+        """Build a grid from the protocol's TileMapData."""
+        width, height = map_data.get("width", 0), map_data.get("height", 0)
+        rows = map_data.get("tiles") or []
+        # Short or missing rows are walls, as they are off the server's map
+        blank = bytes([WALL]) * width
+        tiles = b"".join(
+            (_row_bytes(rows[y][:width]) + blank)[:width] if y < len(rows) else blank
+            for y in range(height)
+        )
+        return cls(width, height, tiles, map_data.get("tile_size", 32))
+
+    def tile(self, x: int, y: int) -> int:
+        """Tile id at (x, y); WALL outside the map."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.tiles[y * self.width + x]
+        return WALL
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_walkable(self, x: int, y: int) -> bool:
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return _WALKABLE[self.tiles[y * self.width + x]] == 1
+        return False
+
+    def neighbors(self, x: int, y: int, directions=DIRECTIONS) -> Iterator[Tuple[int, int]]:
+        """Walkable tiles next to (x, y), in the order of directions."""
+        for dx, dy in directions:
+            if self.is_walkable(x + dx, y + dy):
+                yield x + dx, y + dy
+
+    # ── Bulk masks ──
+
+    def mask(self, tile_ids: Iterable[int]) -> bytes:
+        """Row-major bytes, 1 where the tile is one of tile_ids and 0 elsewhere."""
+        return self.tiles.translate(_table(tile_ids))
+
+    @property
+    def walkable_mask(self) -> bytes:
+        """mask(WALKABLE_TILES), computed once."""
+        if self._walkable_mask is None:
+            self._walkable_mask = self.tiles.translate(_WALKABLE)
+        return self._walkable_mask
+
+    def walkable_count(self) -> int:
+        return self.walkable_mask.count(1)
+
+    # ── NumPy interop ──
+
+    def to_numpy(self):
+        """The tiles as a read-only (height, width) uint8 array sharing this grid's memory."""
+        if numpy is None:
+            raise ImportError("to_numpy() requires numpy (pip install numpy)")
+        return numpy.frombuffer(self.tiles, dtype=numpy.uint8).reshape(self.height, self.width)
+
+    @classmethod
+    def from_numpy(cls, array, tile_size: int = 32) -> "TileGrid":
+        """Build a grid from a (height, width) array of tile ids."""
+        if numpy is None:
+            raise ImportError("from_numpy() requires numpy (pip install numpy)")
+        array = numpy.asarray(array)
+        if array.ndim != 2:
+            raise ValueError(f"Expected a 2-D array, got {array.ndim}-D")
+        height, width = array.shape
+        array = numpy.where((array >= 0) & (array < 256), array, UNKNOWN_TILE)
+        return cls(width, height, array.astype(numpy.uint8).tobytes(), tile_size)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TileGrid):
+            return NotImplemented
+        return (self.width, self.height, self.tile_size, self.tiles) == \
+            (other.width, other.height, other.tile_size, other.tiles)
+
+    def __hash__(self) -> int:
+        return hash((self.width, self.height, self.tile_size, self.tiles))
+
+    def __repr__(self) -> str:
+        return f"TileGrid({self.width}x{self.height})"
+
+
+# ── Sharing ──
+
+_shared: dict = {}
+_shared_lock = threading.Lock()
+
+
+def _remember(key, grid: TileGrid) -> TileGrid:
+    with _shared_lock:
+        grid = _shared.setdefault(key, grid)
+        while len(_shared) > SHARED_GRIDS:
+            del _shared[next(iter(_shared))]
+    return grid
+
+
+def shared_grid(map_data: TileMapData | str) -> TileGrid:
+    """
+    The TileGrid for a map, one instance per distinct map.
+
+    map_data may also be the map's JSON text (LazyWorldState keeps it
+    until the map is read); a map already seen as text is then returned
+    without parsing it again.
+    """
+    if isinstance(map_data, str):
+        with _shared_lock:
+            grid = _shared.get(map_data)
+        if grid is not None:
+            return grid
+        return _remember(map_data, shared_grid(parse_message(map_data)))
+    grid = TileGrid.from_map(map_data)
+    return _remember(grid, grid)
@@ -0,0 +1,212 @@
+"""
+Client-side world state, kept current from the server's messages.
+
+world:state snapshots replace the store's contents (tick only moves
+forward, unless a full snapshot shows the server restarted); action:result,
+agent:joined, agent:left, map:change and fog:reveal are applied on top as
+deltas. Agents and objects are indexed by id, and by position in a
+SpatialIndex, so applying a delta, looking up an agent or finding what is
+nearby costs the same however many agents and objects there are.
+
+    world = WorldStateStore(agent_id="agent_1")
+    async for raw in ws:
+        world.apply(decode_message(raw))
+    me = world.me
+"""
+
+from typing import Callable, Dict, List, Set, Tuple
+
+from protocol import (
+    ActionResultMessage, AgentInfo, AgentJoinedMessage, AgentLeftMessage,
+    FogRevealMessage, LazyWorldState, MapChangeMessage, MapObject, Message,
+    Quest, SpectatorInfo, TileMapData, WorldStateMessage,
+)
+from spatial_index import SpatialIndex
+from tile_grid import TileGrid, shared_grid
+
+
+class WorldStateStore:
+    """
+    The world as this agent knows it.
+
+    Agent records are replaced rather than edited when they change, and
+    the object index is only ever replaced as a whole, so snapshot() can
+    hand a consistent copy to a behavior deciding on another thread.
+    """
+
+    def __init__(self, agent_id: str | None = None):
+        self.agent_id = agent_id
+        self.tick = 0
+        self.agents: Dict[str, AgentInfo] = {}
+        # Agent positions, kept in step with agents
+        self.agent_index = SpatialIndex()
+        self.quests: List[Quest] = []
+        self.spectators: List[SpectatorInfo] = []
+        # Tiles revealed by fog:reveal since the last map:change
+        self.revealed: Set[Tuple[int, int]] = set()
+        # Folder path of the current map, once a map:change moved us
+        self.path: str | None = None
+        self.ready = False
+
+        self._map: TileMapData | None = None
+        self._grid: TileGrid | None = None
+        self._objects: Dict[str, MapObject] = {}
+        self._object_index: SpatialIndex | None = None
+        # Snapshot whose map/objects have not been read yet (see LazyWorldState)
+        self._map_source: WorldStateMessage | None = None
+        self._objects_source: WorldStateMessage | None = None
+
+    @property
+    def map(self) -> TileMapData | None:
+        if self._map_source is not None:
+            self._map, self._map_source = self._map_source.map, None
+        return self._map
+
+    @property
+    def grid(self) -> TileGrid | None:
+        """The current map as a TileGrid, shared with other stores on the same map."""
+        if self._grid is None:
+            source = self._map_source
+            raw = source.deferred_json("map") if isinstance(source, LazyWorldState) else None
+            if raw is not None:
+                # An unchanged map is found by its text, without parsing it
+                self._grid = shared_grid(raw)
+            elif self.map is not None:
+                self._grid = shared_grid(self.map)
+        return self._grid
+
+    @property
+    def objects(self) -> Dict[str, MapObject]:
+        """Map objects by id."""
+        if self._objects_source is not None:
+            self._objects = {obj["id"]: obj for obj in self._objects_source.objects or []}
+            self._objects_source = None
+        return self._objects
+
+    @property
+    def object_index(self) -> SpatialIndex:
+        """Object positions, indexed when first needed after the objects change."""
+        if self._object_index is None:
+            self._object_index = SpatialIndex.build(
+                (obj_id, obj["x"], obj["y"]) for obj_id, obj in self.objects.items()
+            )
+        return self._object_index
+
+    def objects_near(self, x: int, y: int, radius: int) -> List[Tuple[MapObject, int]]:
+        """(object, distance) within Manhattan distance radius of (x, y), nearest first."""
+        objects = self.objects
+        return [(objects[obj_id], distance) for obj_id, distance in self.object_index.within(x, y, radius)]
+
+    def occupied(self, x: int, y: int, ignore: str | None = None) -> bool:
+        """Whether an agent other than ignore stands on (x, y)."""
+        return self.agent_index.occupied(x, y, ignore)
+
+    @property
+    def me(self) -> AgentInfo | None:
+        """This agent's record, once the server knows about it."""
+        return self.agents.get(self.agent_id)
+
+    def apply(self, msg: Message) -> bool:
+        """
+        Update the store from a server message.
+
+        Returns:
+            True if the message changed the store, False if it was ignored
+            (other message types, or a partial world:state older than the
+            last one)
+        """
+        handler = self._HANDLERS.get(msg.type)
+        return handler(self, msg) if handler else False
+
+    def snapshot(self) -> "WorldStateStore":
+        """A copy that later apply() calls do not change."""
+        copy = WorldStateStore.__new__(WorldStateStore)
+        copy.__dict__.update(self.__dict__)
+        copy.agents = dict(self.agents)
+        copy.agent_index = self.agent_index.copy()
+        copy.revealed = set(self.revealed)
+        return copy
+
+    # ── Handlers ──
+
+    def _apply_world_state(self, msg: WorldStateMessage) -> bool:
+        if msg.tick is not None:
+            # A full snapshot from an earlier tick means the server started
+            # over (its tick restarts at 0); anything else is stale
+            if msg.tick < self.tick and not _is_full_snapshot(msg):
+                return False
+            self.tick = msg.tick
+        self.agents = {agent["agent_id"]: agent for agent in msg.agents or []}
+        self.agent_index = SpatialIndex.build(
+            (agent_id, agent["x"], agent["y"]) for agent_id, agent in self.agents.items() if "x" in agent
+        )
+        self.quests = msg.quests or []
+        self.spectators = msg.spectators or []
+        # Read on first use, so a lazily decoded map stays unparsed until needed
+        self._map_source = self._objects_source = msg
+        self._grid = None
+        self._object_index = None
+        self.ready = True
+        return True
+
+    def _apply_action_result(self, msg: ActionResultMessage) -> bool:
+        agent = self.agents.get(msg.agent_id)
+        params = msg.params or {}
+        if not (msg.success and msg.action == "move" and agent and "x" in params and "y" in params):
+            return False
+        self._move_agent(msg.agent_id, agent, params["x"], params["y"])
+        return True
+
+    def _apply_agent_joined(self, msg: AgentJoinedMessage) -> bool:
+        if not msg.agent or "agent_id" not in msg.agent:
+            return False
+        agent = msg.agent
+        self.agents[agent["agent_id"]] = agent
+        if "x" in agent:
+            self.agent_index.add(agent["agent_id"], agent["x"], agent["y"])
+        else:
+            self.agent_index.remove(agent["agent_id"])
+        return True
+
+    def _apply_agent_left(self, msg: AgentLeftMessage) -> bool:
+        self.agent_index.remove(msg.agent_id)
+        return self.agents.pop(msg.agent_id, None) is not None
+
+    def _apply_map_change(self, msg: MapChangeMessage) -> bool:
+        # Sent only to the agent that moved, placing it on the new map
+        self._map, self._map_source = msg.map, None
+        self._grid = None
+        self._objects = {obj["id"]: obj for obj in msg.objects or []}
+        self._objects_source = self._object_index = None
+        self.path = msg.path
+        self.revealed = set()
+        me = self.me
+        if me is not None and msg.position:
+            self._move_agent(self.agent_id, me, msg.position["x"], msg.position["y"])
+        return True
+
+    def _move_agent(self, agent_id: str, agent: AgentInfo, x: int, y: int):
+        self.agents[agent_id] = {**agent, "x": x, "y": y}
+        self.agent_index.move(agent_id, x, y)
+
+    def _apply_fog_reveal(self, msg: FogRevealMessage) -> bool:
+        self.revealed.update((tile["x"], tile["y"]) for tile in msg.tiles or [])
+        return bool(msg.tiles)
+
+    _HANDLERS: Dict[str, Callable[["WorldStateStore", Message], bool]] = {
+        "world:state": _apply_world_state,
+        "action:result": _apply_action_result,
+        "agent:joined": _apply_agent_joined,
+        "agent:left": _apply_agent_left,
+        "map:change": _apply_map_change,
+        "fog:reveal": _apply_fog_reveal,
+    }
+
+
+def _is_full_snapshot(msg: WorldStateMessage) -> bool:
+    """Whether a world:state carries the whole world, without parsing its map."""
+    if msg.agents is None:
+        return False
+    if isinstance(msg, LazyWorldState) and msg.deferred_json("map") is not None:
+        return True
+    return msg.map is not None
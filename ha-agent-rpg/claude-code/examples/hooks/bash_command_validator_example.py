@@ -29,26 +29,68 @@ Make sure to change your path to your actual script.
 """
 
 import json
-import re
+import os
+import shlex
 import sys
 
-# Define validation rules as a list of (regex pattern, message) tuples
+# Define validation rules as (program, check, message) tuples. Each rule is
+# checked against every command in the line, so "cd src && grep x" is
+# caught too. check gets the command's arguments and whether the command
+# is one stage of a longer pipeline.
 _VALIDATION_RULES = [
     (
-        r"^grep\b(?!.*\|)",
+        "grep",
+        lambda args, piped: not piped,
         "Use 'rg' (ripgrep) instead of 'grep' for better performance and features",
     ),
     (
-        r"^find\s+\S+\s+-name\b",
+        "find",
+        lambda args, piped: len(args) >= 2 and args[1] == "-name",
         "Use 'rg --files | rg pattern' or 'rg --files -g pattern' instead of 'find -name' for better performance",
     ),
 ]
 
+# Tokens that end a command; "|" also continues the pipeline
+_SEPARATORS = {"&&", "||", ";", "&", "\n", "(", ")"}
+
+
+def _parse_pipelines(command: str) -> list[list[list[str]]]:
+    """Split a command line into pipelines of argument lists."""
+    lexer = shlex.shlex(command, posix=True, punctuation_chars=True)
+    lexer.whitespace = " \t"
+    lexer.commenters = "#"
+    pipelines, stages, argv = [], [], []
+    for token in lexer:
+        if token in _SEPARATORS or token in ("|", "|&"):
+            if argv:
+                stages.append(argv)
+            argv = []
+            if token not in ("|", "|&") and stages:
+                pipelines.append(stages)
+                stages = []
+        else:
+            argv.append(token)
+    if argv:
+        stages.append(argv)
+    if stages:
+        pipelines.append(stages)
+    return pipelines
+
 
 def _validate_command(command: str) -> list[str]:
+    try:
+        pipelines = _parse_pipelines(command)
+    except ValueError:
+        # Unbalanced quotes: let bash report the syntax error
+        return []
+
     issues = []
-    for pattern, message in _VALIDATION_RULES:
-        if re.search(pattern, command):
+    for program, check, message in _VALIDATION_RULES:
+        if any(
+            os.path.basename(argv[0]) == program and check(argv[1:], len(stages) > 1)
+            for stages in pipelines
+            for argv in stages
+        ):
             issues.append(message)
     return issues
 
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Benchmark the compiled evaluation plan against per-condition evaluation.
+
+Compares RuleEngine.evaluate_rules with a reference evaluator that works
+the way the engine did before evaluation plans: every condition re-extracts
+its field, conditions run in file order, tool_matcher is split per call and
+each regex goes through the shared 128-entry compile cache.
+
+Usage:
+    python3 benchmarks/evaluation_plan.py [--rules 100 300 1000] [--repeat 20]
+
+"cold" includes compiling the plan (a one-shot hook process); "warm" reuses
+it (the rule daemon). The decision cache is off throughout, so every call
+really evaluates the rules.
+"""
+
+import os
+import sys
+
+if __name__ == '__main__':
+    _plugin_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.path.dirname(_plugin_root))
+
+import argparse
+import random
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from hookify.core.config_loader import Condition, Rule
+from hookify.core.rule_engine import RuleEngine, compile_regex
+from hookify.utils.cache import CACHE_DIR_ENV
+
+
+def synthetic_rules(count: int, seed: int = 0) -> List[Rule]:
+    """Generate a mixed bash/file rule set resembling real team rules."""
+    rng = random.Random(seed)
+    rules = []
+    for i in range(count):
+        kind = rng.choice(('bash', 'file', 'file'))
+        if kind == 'bash':
+            conditions = [
+                Condition('command', 'regex_match', rf'\btool{i}\s+--opt{rng.randint(0, 9)}'),
+                Condition('command', 'contains', f'arg{i}'),
+            ]
+            tool_matcher = 'Bash'
+        else:
+            conditions = [
+                Condition('new_text', 'regex_match', rf'(secret|token)_{i}\s*=\s*["\']'),
+                Condition('file_path', 'ends_with', rng.choice(('.py', '.ts', '.env', '.yml'))),
+                Condition('content', 'not_contains', f'allow-{i}'),
+            ]
+            tool_matcher = rng.choice(('Edit|Write|MultiEdit', 'Write', '*'))
+        rules.append(Rule(
+            name=f'rule-{i}', enabled=True, event=kind, conditions=conditions,
+            action=rng.choice(('warn', 'block')), tool_matcher=tool_matcher,
+            message=f'Rule {i} matched',
+        ))
+    return rules
+
+
+def synthetic_inputs(content_bytes: int = 16384) -> List[Dict[str, Any]]:
+    """Hook inputs for a Bash call, an Edit and a large Write."""
+    line = 'value = compute(items, key="abc")  # ordinary source line\n'
+    content = (line * (content_bytes // len(line) + 1))[:content_bytes]
+    return [
+        {'hook_event_name': 'PreToolUse', 'tool_name': 'Bash',
+         'tool_input': {'command': 'git status && npm test -- --watch=false'}},
+        {'hook_event_name': 'PreToolUse', 'tool_name': 'Edit',
+         'tool_input': {'file_path': '/repo/src/app.py', 'old_string': 'a = 1',
+                        'new_string': 'a = compute(1)'}},
+        {'hook_event_name': 'PreToolUse', 'tool_name': 'Write',
+         'tool_input': {'file_path': '/repo/src/big.py', 'content': content}},
+    ]
+
+
+def reference_matches(engine: RuleEngine, rules: List[Rule], input_data: Dict[str, Any]) -> List[Rule]:
+    """Evaluate rules one condition at a time (pre-plan behaviour)."""
+    tool_name = input_data.get('tool_name', '')
+    tool_input = input_data.get('tool_input', {})
+    matched = []
+    for rule in rules:
+        if rule.tool_matcher and rule.tool_matcher != '*' and tool_name not in rule.tool_matcher.split('|'):
+            continue
+        if not rule.conditions:
+            continue
+        for condition in rule.conditions:
+            value = engine._extract_field(condition.field, tool_name, tool_input, input_data)
+            if value is None:
+                break
+            op, pattern = condition.operator, condition.pattern
+            if op == 'regex_match':
+                ok = bool(compile_regex(pattern).search(value))
+            elif op == 'contains':
+                ok = pattern in value
+            elif op == 'equals':
+                ok = pattern == value
+            elif op == 'not_contains':
+                ok = pattern not in value
+            elif op == 'starts_with':
+                ok = value.startswith(pattern)
+            elif op == 'ends_with':
+                ok = value.endswith(pattern)
+            else:
+                ok = False
+            if not ok:
+                break
+        else:
+            matched.append(rule)
+    return matched
+
+
+def _time_ms(fn: Callable[[], Any], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rules', type=int, nargs='+', default=[100, 300, 1000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    # Keep the regex safety cache out of the project's cache directory
+    scratch_cache = tempfile.TemporaryDirectory(prefix='hookify-bench-cache-')
+    os.environ[CACHE_DIR_ENV] = scratch_cache.name
+
+    inputs = synthetic_inputs()
+    print(f"{'rules':>6} {'reference ms':>13} {'plan cold ms':>13} {'plan warm ms':>13} {'speedup':>8}")
+    for count in args.rules:
+        rules = synthetic_rules(count)
+        engine = RuleEngine(decision_cache=False)
+
+        def reference():
+            for data in inputs:
+                reference_matches(engine, rules, data)
+
+        def cold():
+            fresh = RuleEngine(decision_cache=False)
+            for data in inputs:
+                fresh.evaluate_rules(rules, data)
+
+        def warm():
+            for data in inputs:
+                engine.evaluate_rules(rules, data)
+
+        warm()
+        ref_ms = _time_ms(reference, args.repeat)
+        cold_ms = _time_ms(cold, args.repeat)
+        warm_ms = _time_ms(warm, args.repeat)
+        print(f"{count:>6} {ref_ms:>13.2f} {cold_ms:>13.2f} {warm_ms:>13.2f} {ref_ms / warm_ms:>7.1f}x")
+
+    scratch_cache.cleanup()
+
+
+if __name__ == '__main__':
+    main()
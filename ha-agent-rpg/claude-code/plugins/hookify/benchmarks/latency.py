@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""Latency benchmark and replay suite for hookify plugin.
+
+Reports p50/p99 latency in three modes:
+
+- warm: decode the raw input and evaluate_rules on a long-lived RuleEngine
+  (the rule daemon)
+- cold: the same on a fresh RuleEngine, so the evaluation plan is rebuilt
+  every time (a hook process, minus interpreter start-up)
+- hook: a full hook-script run in a subprocess, from interpreter start to
+  JSON output, with rule files on disk and no daemon
+
+Synthetic warm and cold runs bypass the decision cache, since every sample
+repeats the same input; hook and replay runs use it as hooks do.
+
+Synthetic runs cross rule counts (10 to 10,000 rules) with tool inputs of
+each kind (bash, edit, write, and output: a PostToolUse Bash result) and
+size (bytes to megabytes). Replay runs
+(--replay) use inputs recorded with HOOKIFY_RECORD=path and the rules of
+the project in the current directory.
+
+Results are saved as JSON (benchmarks/results/<commit>.json by default);
+--compare reports the change against an earlier results file and exits 1
+if any case's p50 regressed by more than --threshold.
+
+Usage:
+    python3 benchmarks/latency.py [--rules 10 100] [--sizes 100 10000] [--modes warm hook]
+    python3 benchmarks/latency.py --replay hook-inputs.jsonl
+    python3 benchmarks/latency.py --compare benchmarks/results/abc1234.json
+"""
+
+import os
+import sys
+
+if __name__ == '__main__':
+    _plugin_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.path.dirname(_plugin_root))
+
+import argparse
+import json
+import math
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from hookify.benchmarks.evaluation_plan import synthetic_rules
+from hookify.core.client import RECORD_ENV, SOCKET_ENV
+from hookify.core.config_loader import Condition, Rule
+from hookify.core.daemon import RuleServer
+from hookify.core.dispatch import evaluate_hook, rule_event_for
+from hookify.core.rule_engine import RuleEngine
+from hookify.utils.cache import CACHE_DIR_ENV
+from hookify.utils.hook_input import load_hook_input
+
+PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(PLUGIN_ROOT, 'benchmarks', 'results')
+RESULTS_VERSION = 1
+
+# Slowdowns smaller than this are timer noise, whatever the percentage
+MIN_REGRESSION_MS = 0.05
+
+MODES = ('warm', 'cold', 'hook')
+INPUT_KINDS = ('bash', 'edit', 'write', 'output')
+
+# Added to every synthetic rule set so the output kind reads tool output
+OUTPUT_RULES = [
+    Rule(name='output-failure', enabled=True, event='bash', tool_matcher='Bash',
+         conditions=[Condition('output_tail', 'regex_match', r'\b(FAILED|Error:)')],
+         message='Command failed'),
+    Rule(name='output-credential', enabled=True, event='bash', tool_matcher='Bash',
+         conditions=[Condition('output', 'contains', 'AKIA')],
+         message='Credential in command output'),
+]
+
+HOOK_SCRIPTS = {
+    'PreToolUse': 'pretooluse.py',
+    'PostToolUse': 'posttooluse.py',
+    'Stop': 'stop.py',
+    'UserPromptSubmit': 'userpromptsubmit.py',
+}
+
+
+def synthetic_input(kind: str, size: int) -> Dict[str, Any]:
+    """Build a hook input whose main field is size bytes long."""
+    if kind == 'output':
+        line = 'PASS tests/test_app.py::test_case ok\n'
+        stdout = (line * (size // len(line) + 1))[:size]
+        return {'hook_event_name': 'PostToolUse', 'tool_name': 'Bash',
+                'tool_input': {'command': 'npm test'},
+                'tool_response': {'stdout': stdout, 'stderr': '', 'interrupted': False}}
+    if kind == 'bash':
+        command = ('git status && npm test -- --watch=false ' * (size // 40 + 1))[:size]
+        return {'hook_event_name': 'PreToolUse', 'tool_name': 'Bash',
+                'tool_input': {'command': command}}
+
+    line = 'value = compute(items, key="abc")  # ordinary source line\n'
+    text = (line * (size // len(line) + 1))[:size]
+    if kind == 'edit':
+        return {'hook_event_name': 'PreToolUse', 'tool_name': 'Edit',
+                'tool_input': {'file_path': '/repo/src/app.py', 'old_string': 'a = 1',
+                               'new_string': text}}
+    return {'hook_event_name': 'PreToolUse', 'tool_name': 'Write',
+            'tool_input': {'file_path': '/repo/src/app.py', 'content': text}}
+
+
+def rule_markdown(rule: Rule) -> str:
+    """Serialize a rule in the .local.md format read by config_loader."""
+    lines = ['---', f'name: {rule.name}', f'enabled: {str(rule.enabled).lower()}',
+             f'event: {rule.event}', f'action: {rule.action}']
+    if rule.tool_matcher:
+        lines.append(f'tool_matcher: {rule.tool_matcher}')
+    lines.append('conditions:')
+    for condition in rule.conditions:
+        lines.append(f'  - field: {condition.field}')
+        lines.append(f'    operator: {condition.operator}')
+        lines.append(f'    pattern: {condition.pattern}')
+    lines += ['---', '', rule.message, '']
+    return '\n'.join(lines)
+
+
+def write_project(directory: str, rules: List[Rule]) -> None:
+    """Write rules as rule files under directory/.claude."""
+    claude_dir = os.path.join(directory, '.claude')
+    os.makedirs(claude_dir, exist_ok=True)
+    # Old enough that the rule bundle cache accepts them right away
+    past = time.time() - 60
+    for rule in rules:
+        path = os.path.join(claude_dir, f'hookify.{rule.name}.local.md')
+        with open(path, 'w') as f:
+            f.write(rule_markdown(rule))
+        os.utime(path, (past, past))
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of samples."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def measure(fn: Callable[[], Any], min_samples: int, max_samples: int, max_seconds: float) -> List[float]:
+    """Time fn repeatedly, returning per-call latencies in milliseconds."""
+    samples: List[float] = []
+    deadline = time.perf_counter() + max_seconds
+    while len(samples) < max_samples and (len(samples) < min_samples or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(case: str, samples: List[float], **details: Any) -> Dict[str, Any]:
+    """Build a result entry for one case."""
+    entry = {'case': case}
+    entry.update(details)
+    entry.update({
+        'samples': len(samples),
+        'p50_ms': round(percentile(samples, 0.50), 3),
+        'p99_ms': round(percentile(samples, 0.99), 3),
+        'mean_ms': round(sum(samples) / len(samples), 3),
+    })
+    return entry
+
+
+def hook_env(directory: str) -> Dict[str, str]:
+    """Environment for hook subprocesses: no daemon, no recording."""
+    env = dict(os.environ)
+    env['CLAUDE_PLUGIN_ROOT'] = PLUGIN_ROOT
+    env[SOCKET_ENV] = os.path.join(directory, 'no-daemon.sock')
+    env.pop(RECORD_ENV, None)
+    return env
+
+
+def run_hook_script(hook_event: str, raw_input: bytes, cwd: str, env: Dict[str, str]) -> None:
+    script = os.path.join(PLUGIN_ROOT, 'hooks', HOOK_SCRIPTS[hook_event])
+    subprocess.run([sys.executable, script], input=raw_input, cwd=cwd, env=env,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+
+
+def bench_synthetic(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Run every rule count x input kind x input size x mode case."""
+    results = []
+    for count in args.rules:
+        rules = synthetic_rules(count) + OUTPUT_RULES
+        with tempfile.TemporaryDirectory(prefix='hookify-bench-') as project:
+            if 'hook' in args.modes:
+                write_project(project, rules)
+            env = hook_env(project)
+            # Synthetic inputs repeat, so the decision cache would answer
+            # every sample; it is measured by --replay and the hook mode
+            engine = RuleEngine(decision_cache=False)
+
+            for kind in args.kinds:
+                for size in args.sizes:
+                    data = synthetic_input(kind, size)
+                    event = rule_event_for(data['hook_event_name'], data['tool_name'])
+                    event_rules = [r for r in rules if r.event in (event, 'all')]
+                    raw_input = json.dumps(data).encode('utf-8')
+
+                    runners: Dict[str, Callable[[], Any]] = {
+                        'warm': lambda: engine.evaluate_rules(event_rules, load_hook_input(raw_input)),
+                        'cold': lambda: RuleEngine(decision_cache=False).evaluate_rules(
+                            event_rules, load_hook_input(raw_input)),
+                        'hook': lambda: run_hook_script(data['hook_event_name'], raw_input, project, env),
+                    }
+                    for mode in args.modes:
+                        runner = runners[mode]
+                        runner()  # warm-up: compile plans, write caches
+                        samples = measure(runner, args.min_samples, args.max_samples, args.max_seconds)
+                        entry = summarize(f'{mode}/{count}r/{kind}-{size}B', samples,
+                                          mode=mode, rules=count, kind=kind, bytes=size)
+                        results.append(entry)
+                        print_entry(entry)
+    return results
+
+
+def load_recordings(paths: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Read recorded hook inputs, grouped by hook event.
+
+    Accepts HOOKIFY_RECORD files ({"hook": ..., "input": ...} per line) and
+    plain hook inputs, one JSON object per line; unreadable lines are skipped.
+    """
+    by_hook: Dict[str, List[Dict[str, Any]]] = {}
+    for path in paths:
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(record, dict):
+                    continue
+                if isinstance(record.get('input'), dict):
+                    hook_event, data = record.get('hook', ''), record['input']
+                else:
+                    hook_event, data = record.get('hook_event_name', ''), record
+                if hook_event in HOOK_SCRIPTS:
+                    by_hook.setdefault(hook_event, []).append(data)
+    return by_hook
+
+
+def bench_replay(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Replay recorded inputs against the current project's rules."""
+    results = []
+    project = os.getcwd()
+    server = RuleServer()
+    for hook_event, inputs in sorted(load_recordings(args.replay).items()):
+        raw_inputs = [json.dumps(data).encode('utf-8') for data in inputs]
+        with tempfile.TemporaryDirectory(prefix='hookify-bench-') as scratch:
+            env = hook_env(scratch)
+            for mode in args.modes:
+                position = [0]
+
+                def run_next(mode=mode):
+                    i = position[0] % len(inputs)
+                    position[0] += 1
+                    if mode == 'warm':
+                        server.handle(hook_event, load_hook_input(raw_inputs[i]))
+                    elif mode == 'cold':
+                        evaluate_hook(hook_event, load_hook_input(raw_inputs[i]))
+                    else:
+                        run_hook_script(hook_event, raw_inputs[i], project, env)
+
+                for _ in range(min(len(inputs), args.max_samples)):
+                    run_next()  # warm-up pass over every recording
+                samples = measure(run_next, max(args.min_samples, min(len(inputs), args.max_samples)),
+                                  args.max_samples, args.max_seconds)
+                entry = summarize(f'replay-{mode}/{hook_event}', samples,
+                                  mode=mode, hook=hook_event, inputs=len(inputs))
+                results.append(entry)
+                print_entry(entry)
+    return results
+
+
+def print_entry(entry: Dict[str, Any]) -> None:
+    print(f"{entry['case']:<40} {entry['samples']:>7} {entry['p50_ms']:>10.2f} {entry['p99_ms']:>10.2f}",
+          flush=True)
+
+
+def git_commit() -> Optional[str]:
+    """Short commit hash of the plugin checkout (with -dirty if modified)."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PLUGIN_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--', '.'], cwd=PLUGIN_ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f'{commit}-dirty' if dirty else commit
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float) -> List[str]:
+    """Print per-case changes between two result sets; return regressed cases."""
+    old_cases = {entry['case']: entry for entry in old.get('results', [])}
+    regressions = []
+    print(f"\nCompared with {old.get('commit') or 'unknown commit'} ({old.get('timestamp', '?')})")
+    print(f"{'case':<40} {'p50 old':>9} {'p50 new':>9} {'change':>8} {'p99 old':>9} {'p99 new':>9}")
+    for entry in new['results']:
+        before = old_cases.get(entry['case'])
+        if before is None:
+            continue
+        change = (entry['p50_ms'] - before['p50_ms']) / before['p50_ms'] if before['p50_ms'] else 0.0
+        flag = ''
+        if change > threshold and entry['p50_ms'] - before['p50_ms'] > MIN_REGRESSION_MS:
+            regressions.append(entry['case'])
+            flag = '  REGRESSION'
+        print(f"{entry['case']:<40} {before['p50_ms']:>9.2f} {entry['p50_ms']:>9.2f} {change:>+7.0%} "
+              f"{before['p99_ms']:>9.2f} {entry['p99_ms']:>9.2f}{flag}")
+    return regressions
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rules', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10000, 1000000],
+                        help="Tool input sizes in bytes")
+    parser.add_argument('--kinds', nargs='+', choices=INPUT_KINDS, default=list(INPUT_KINDS))
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--replay', nargs='+', metavar='FILE',
+                        help="Replay recorded hook inputs instead of synthetic ones")
+    parser.add_argument('--min-samples', type=int, default=5)
+    parser.add_argument('--max-samples', type=int, default=200)
+    parser.add_argument('--max-seconds', type=float, default=2.0,
+                        help="Stop sampling a case after this long (once min-samples is reached)")
+    parser.add_argument('--output', help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--no-save', action='store_true', help="Do not write a results file")
+    parser.add_argument('--compare', metavar='FILE', help="Earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="p50 slowdown counted as a regression (default: 0.10 = 10%%)")
+    args = parser.parse_args()
+
+    # Keep the benchmark's caches out of the project's cache directory
+    scratch_cache = tempfile.TemporaryDirectory(prefix='hookify-bench-cache-')
+    os.environ[CACHE_DIR_ENV] = scratch_cache.name
+
+    print(f"{'case':<40} {'samples':>7} {'p50 ms':>10} {'p99 ms':>10}")
+    results = bench_replay(args) if args.replay else bench_synthetic(args)
+
+    commit = git_commit()
+    report = {
+        'version': RESULTS_VERSION,
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+    if not args.no_save:
+        output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'unknown'}.json")
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
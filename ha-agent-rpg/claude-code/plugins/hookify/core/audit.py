@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""Offline rule audit for hookify plugin.
+
+Replays archived session transcripts through the project's rules to tune
+them and to find incidents they missed (or would have caught). Each
+transcript is streamed line by line and turned back into the hook inputs
+the session produced:
+
+- every tool_use block an assistant message contains -> PreToolUse
+- every tool_result block -> PostToolUse, with the tool's input and the
+  structured result recorded alongside it (toolUseResult) when present
+- every prompt the user typed -> UserPromptSubmit
+- the end of the transcript -> one Stop, with transcript_path set (so
+  transcript conditions see the whole session)
+
+Transcripts are spread over a process pool, one file per task, and each
+worker returns only counts and a few example hits, so memory stays
+bounded by the largest single transcript line however many transcripts
+are audited. The audit evaluates with RuleEngine.evaluate_many and
+bypasses the decision cache, stats and other on-disk caches.
+
+Usage (from the project root):
+    python3 ${CLAUDE_PLUGIN_ROOT}/core/audit.py [--jobs N] [--examples N] [--json] PATH...
+
+PATH is a transcript (.jsonl) or a directory searched recursively for
+them, e.g. ~/.claude/projects.
+"""
+
+import os
+import sys
+
+# Allow running as a script: make the "hookify" package importable
+if __name__ == '__main__':
+    _plugin_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    _parent_dir = os.path.dirname(_plugin_root)
+    if _parent_dir not in sys.path:
+        sys.path.insert(0, _parent_dir)
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from hookify.core.config_loader import Rule
+from hookify.core.rule_engine import RuleEngine
+from hookify.core.stats import STATS_ENV
+from hookify.utils.cache import DISABLE_CACHE_ENV
+
+# Tool uses remembered while waiting for their results; a transcript cut
+# short can leave some unanswered
+MAX_PENDING_TOOL_USES = 1024
+
+# Characters of the matching input shown per example hit
+EXAMPLE_CHARS = 160
+
+_worker_engine: Optional[RuleEngine] = None
+_worker_rules: List[Rule] = []
+_worker_examples = 0
+
+
+def transcript_events(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Stream the hook inputs a session transcript records.
+
+    Args:
+        path: Transcript JSONL file
+
+    Yields:
+        (line number, hook input) in transcript order; malformed lines are
+        skipped
+    """
+    pending: 'OrderedDict[str, Tuple[str, Any]]' = OrderedDict()
+    session_id = ''
+    cwd = ''
+    number = 0
+
+    with open(path, 'rb') as f:
+        for number, line in enumerate(f, 1):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(record, dict):
+                continue
+            message = record.get('message')
+            if not isinstance(message, dict):
+                continue
+            session_id = record.get('sessionId') or session_id
+            cwd = record.get('cwd') or cwd
+            common = {'session_id': session_id, 'cwd': cwd}
+
+            content = message.get('content')
+            if record.get('type') == 'assistant' and isinstance(content, list):
+                for block in content:
+                    if isinstance(block, dict) and block.get('type') == 'tool_use':
+                        tool_name, tool_input = block.get('name', ''), block.get('input') or {}
+                        pending[block.get('id', '')] = (tool_name, tool_input)
+                        if len(pending) > MAX_PENDING_TOOL_USES:
+                            pending.popitem(last=False)
+                        yield number, dict(common, hook_event_name='PreToolUse',
+                                           tool_name=tool_name, tool_input=tool_input)
+
+            elif record.get('type') == 'user' and not record.get('isMeta'):
+                if isinstance(content, str):
+                    yield number, _prompt_input(common, content)
+                    continue
+                if not isinstance(content, list):
+                    continue
+                texts = []
+                for block in content:
+                    if not isinstance(block, dict):
+                        continue
+                    if block.get('type') == 'text':
+                        texts.append(block.get('text', ''))
+                    elif block.get('type') == 'tool_result':
+                        tool_use = pending.pop(block.get('tool_use_id', ''), None)
+                        if tool_use is None:
+                            continue
+                        response = record.get('toolUseResult')
+                        if response is None:
+                            response = _result_text(block.get('content'))
+                        yield number, dict(common, hook_event_name='PostToolUse', tool_name=tool_use[0],
+                                           tool_input=tool_use[1], tool_response=response)
+                if texts:
+                    yield number, _prompt_input(common, '\n'.join(texts))
+
+    if session_id:
+        yield number, {'hook_event_name': 'Stop', 'session_id': session_id, 'cwd': cwd,
+                       'transcript_path': path, 'stop_hook_active': False}
+
+
+def _prompt_input(common: Dict[str, Any], prompt: str) -> Dict[str, Any]:
+    # Claude Code sends "prompt"; rules read it as the user_prompt field
+    return dict(common, hook_event_name='UserPromptSubmit', prompt=prompt, user_prompt=prompt)
+
+
+def _result_text(content: Any) -> str:
+    """Flatten a tool_result's content (a string or text blocks)."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return '\n'.join(block.get('text', '') for block in content if isinstance(block, dict))
+    return ''
+
+
+def empty_summary() -> Dict[str, Any]:
+    """Return an audit summary with nothing counted yet."""
+    return {'transcripts': 0, 'bytes': 0, 'errors': [], 'events': {}, 'rules': {}}
+
+
+def audit_transcript(path: str, engine: RuleEngine, rules: List[Rule],
+                     examples: int = 3) -> Dict[str, Any]:
+    """Audit one transcript.
+
+    Returns:
+        A summary: events per hook event, and per rule [hits, transcripts
+        with a hit, example hits as [path, line, hook event, excerpt]]
+    """
+    summary = empty_summary()
+    summary['transcripts'] = 1
+    try:
+        summary['bytes'] = os.path.getsize(path)
+        events, numbered = itertools.tee(transcript_events(path))
+        matches = engine.evaluate_many(rules, (input_data for _, input_data in events))
+        for (line, _), (input_data, matched) in zip(numbered, matches):
+            hook_event = input_data['hook_event_name']
+            summary['events'][hook_event] = summary['events'].get(hook_event, 0) + 1
+            for rule in matched:
+                counts = summary['rules'].get(rule.name)
+                if counts is None:
+                    counts = summary['rules'][rule.name] = [0, 1, []]
+                counts[0] += 1
+                if len(counts[2]) < examples:
+                    counts[2].append([path, line, hook_event, _excerpt(input_data)])
+    except Exception as e:
+        # One unreadable transcript must not end a long audit
+        summary['errors'].append(f'{path}: {e}')
+    return summary
+
+
+def _excerpt(input_data: Dict[str, Any]) -> str:
+    """Return the most telling part of a hook input, shortened."""
+    tool_input = input_data.get('tool_input') or {}
+    text = (tool_input.get('command') or tool_input.get('file_path')
+            or input_data.get('user_prompt') or input_data.get('transcript_path') or '')
+    text = ' '.join(str(text).split())
+    return text if len(text) <= EXAMPLE_CHARS else text[:EXAMPLE_CHARS - 3] + '...'
+
+
+def merge_summary(total: Dict[str, Any], summary: Dict[str, Any], examples: int = 3) -> None:
+    """Add one transcript's (or worker's) summary into a running total."""
+    total['transcripts'] += summary['transcripts']
+    total['bytes'] += summary['bytes']
+    total['errors'].extend(summary['errors'])
+    for hook_event, count in summary['events'].items():
+        total['events'][hook_event] = total['events'].get(hook_event, 0) + count
+    for name, (hits, transcripts, found) in summary['rules'].items():
+        counts = total['rules'].setdefault(name, [0, 0, []])
+        counts[0] += hits
+        counts[1] += transcripts
+        counts[2].extend(found[:examples - len(counts[2])])
+
+
+def find_transcripts(paths: Iterable[str]) -> List[str]:
+    """Expand files and directories into transcript files, largest first.
+
+    Largest first keeps the pool busy: a long transcript started last
+    would leave every other worker idle while it finishes.
+    """
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                found.extend(os.path.join(directory, name) for name in names if name.endswith('.jsonl'))
+        else:
+            found.append(path)
+    sizes = {}
+    for path in found:
+        try:
+            sizes[path] = os.path.getsize(path)
+        except OSError:
+            sizes[path] = 0
+    return sorted(dict.fromkeys(found), key=lambda path: sizes[path], reverse=True)
+
+
+def audit(paths: Iterable[str], rules: List[Rule], jobs: int = 0, examples: int = 3) -> Dict[str, Any]:
+    """Audit transcripts against rules, across a process pool.
+
+    Args:
+        paths: Transcript files and directories containing them
+        rules: Rules to audit (disabled rules are skipped)
+        jobs: Worker processes (0 = one per CPU, 1 = no pool)
+        examples: Example hits kept per rule
+
+    Returns:
+        Summary: transcripts, bytes, errors, events {hook event: count},
+        rules {name: [hits, transcripts, examples]} and seconds elapsed
+    """
+    start = time.monotonic()
+    transcripts = find_transcripts(paths)
+    total = empty_summary()
+    jobs = jobs or os.cpu_count() or 1
+
+    if jobs == 1 or len(transcripts) <= 1:
+        engine = RuleEngine(decision_cache=False)
+        for path in transcripts:
+            merge_summary(total, audit_transcript(path, engine, rules, examples), examples)
+    else:
+        with multiprocessing.Pool(min(jobs, len(transcripts)), initializer=_init_worker,
+                                  initargs=(rules, examples)) as pool:
+            for summary in pool.imap_unordered(_audit_in_worker, transcripts):
+                merge_summary(total, summary, examples)
+
+    total['seconds'] = time.monotonic() - start
+    return total
+
+
+def _init_worker(rules: List[Rule], examples: int) -> None:
+    global _worker_engine, _worker_rules, _worker_examples
+    _worker_engine = RuleEngine(decision_cache=False)
+    _worker_rules = rules
+    _worker_examples = examples
+
+
+def _audit_in_worker(path: str) -> Dict[str, Any]:
+    return audit_transcript(path, _worker_engine, _worker_rules, _worker_examples)
+
+
+def format_report(summary: Dict[str, Any], rule_names: Optional[List[str]] = None) -> str:
+    """Render an audit summary as markdown tables.
+
+    Args:
+        summary: Output of audit()
+        rule_names: Names of the audited rules; those that never matched
+            are listed
+    """
+    lines = ['## Hookify Audit', '']
+    events = summary['events']
+    count = sum(events.values())
+    seconds = summary.get('seconds', 0) or 1e-9
+    lines.append(f"{summary['transcripts']} transcripts, {summary['bytes'] / 1e6:.1f} MB, "
+                 f"{count} hook events in {seconds:.1f}s ({count / seconds:.0f} events/s)")
+    lines.append('')
+
+    if events:
+        lines.append('| Hook | Events |')
+        lines.append('|------|--------|')
+        for name, events_seen in sorted(events.items()):
+            lines.append(f'| {name} | {events_seen} |')
+        lines.append('')
+
+    rules = summary['rules']
+    if rules:
+        lines.append('### Rule hits')
+        lines.append('')
+        lines.append('| Rule | Hits | Transcripts | Example |')
+        lines.append('|------|------|-------------|---------|')
+        for name, (hits, transcripts, found) in sorted(rules.items(), key=lambda item: item[1][0], reverse=True):
+            example = ''
+            if found:
+                path, line, hook_event, excerpt = found[0]
+                example = f"{os.path.basename(path)}:{line} {hook_event} `{excerpt}`".replace('|', '\\|')
+            lines.append(f'| {name} | {hits} | {transcripts} | {example} |')
+        lines.append('')
+
+    if rule_names is not None:
+        lines.append('### Rules that never matched')
+        lines.append('')
+        dead = [name for name in rule_names if name not in rules]
+        if dead:
+            lines.extend(f'- {name}' for name in dead)
+        else:
+            lines.append('Every audited rule matched at least once.')
+        lines.append('')
+
+    if summary['errors']:
+        lines.append('### Unreadable transcripts')
+        lines.append('')
+        lines.extend(f'- {error}' for error in summary['errors'])
+        lines.append('')
+
+    return '\n'.join(lines)
+
+
+def main():
+    """Audit transcripts against the rules of the project in the current directory."""
+    parser = argparse.ArgumentParser(description="Replay session transcripts through hookify rules")
+    parser.add_argument('paths', nargs='+', help="Transcript files or directories of them")
+    parser.add_argument('--jobs', type=int, default=0, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--examples', type=int, default=3, help="Example hits kept per rule (default 3)")
+    parser.add_argument('--json', action='store_true', help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    from hookify.core.config_loader import load_rules
+    rules = load_rules()
+    if not rules:
+        print("No enabled hookify rules in .claude/ - nothing to audit.", file=sys.stderr)
+        sys.exit(1)
+
+    # Archived sessions must not touch the project's caches or stats
+    os.environ[DISABLE_CACHE_ENV] = '1'
+    os.environ.pop(STATS_ENV, None)
+
+    summary = audit(args.paths, rules, jobs=args.jobs, examples=args.examples)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(format_report(summary, rule_names=list(dict.fromkeys(rule.name for rule in rules))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Thin hook client for hookify plugin.
+
+Hook scripts call run_hook(). If the rule manifest (see manifest.py) shows
+no enabled rule for the invocation, it answers {} straight away. Otherwise,
+if a rule daemon (see daemon.py) is listening on the project's socket, the
+raw hook input is forwarded to it and its response printed; failing that,
+rules are loaded and evaluated in-process.
+
+This module deliberately imports only the standard library (and hookify's
+stdlib-only helpers) so that the fast path and the daemon path never pay
+for importing the rule engine.
+"""
+
+import json
+import os
+import sys
+from typing import Any, Dict, Optional
+
+from hookify.core.manifest import needs_evaluation
+
+# Socket location, relative to the project directory (the hook's cwd).
+# Relative paths also keep us clear of the AF_UNIX path length limit.
+SOCKET_ENV = 'HOOKIFY_SOCKET'
+DEFAULT_SOCKET_PATH = os.path.join('.claude', 'hookify.sock')
+
+# Connecting to a live daemon is near-instant; anything slower means the
+# daemon is gone or wedged and we should fall back right away.
+CONNECT_TIMEOUT = 0.1
+# Must stay below the 10s timeout in hooks.json so a fallback is possible
+RESPONSE_TIMEOUT = 5.0
+
+# Set to a file path to append every hook input to it as JSON lines of
+# {"hook": ..., "input": ...}; benchmarks/latency.py --replay reads them
+RECORD_ENV = 'HOOKIFY_RECORD'
+
+
+def get_socket_path() -> str:
+    """Return the daemon socket path for the current project."""
+    return os.environ.get(SOCKET_ENV) or DEFAULT_SOCKET_PATH
+
+
+def request_daemon(hook_event: str, raw_input: bytes) -> Optional[Dict[str, Any]]:
+    """Send a hook invocation to the rule daemon.
+
+    Args:
+        hook_event: Claude Code hook event name
+        raw_input: Raw hook input JSON as read from stdin
+
+    Returns:
+        Daemon response dict, or None if no daemon is available
+    """
+    socket_path = get_socket_path()
+    if not os.path.exists(socket_path):
+        return None
+
+    # Imported here so the no-rules fast path skips it
+    import socket
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(socket_path)
+        sock.settimeout(RESPONSE_TIMEOUT)
+
+        header = json.dumps({'hook': hook_event}).encode('utf-8') + b'\n'
+        sock.sendall(header + raw_input)
+        sock.shutdown(socket.SHUT_WR)
+
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+        response = json.loads(b''.join(chunks))
+        if not isinstance(response, dict):
+            return None
+        return response
+
+    except (OSError, ValueError):
+        # Stale socket, daemon shutting down, timeout or garbled reply
+        return None
+    finally:
+        sock.close()
+
+
+def record_input(hook_event: str, raw_input: bytes) -> None:
+    """Append a hook input to the HOOKIFY_RECORD file, if one is set."""
+    record_path = os.environ.get(RECORD_ENV)
+    if not record_path:
+        return
+    line = b'{"hook": ' + json.dumps(hook_event).encode('utf-8') + b', "input": ' + raw_input.strip() + b'}\n'
+    try:
+        # One O_APPEND write per record keeps concurrent hooks from interleaving
+        fd = os.open(record_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def evaluate_in_process(hook_event: str, raw_input: bytes) -> Dict[str, Any]:
+    """Load and evaluate rules in this process (no daemon available)."""
+    try:
+        from hookify.core.dispatch import evaluate_hook
+        from hookify.utils.hook_input import load_hook_input
+    except ImportError as e:
+        return {"systemMessage": f"Hookify import error: {e}"}
+
+    return evaluate_hook(hook_event, load_hook_input(raw_input))
+
+
+def run_hook(hook_event: str) -> None:
+    """Evaluate hookify rules for one hook invocation and print the result.
+
+    Always exits 0 - hook errors never block operations.
+    """
+    try:
+        raw_input = sys.stdin.buffer.read()
+        record_input(hook_event, raw_input)
+
+        if not needs_evaluation(hook_event, raw_input):
+            # No rule can apply - skip the daemon and the engine entirely
+            result = {}
+        else:
+            result = request_daemon(hook_event, raw_input)
+            if result is None:
+                result = evaluate_in_process(hook_event, raw_input)
+
+        # Always output JSON (even if empty), before any cache writes at exit
+        print(json.dumps(result), file=sys.stdout, flush=True)
+
+    except Exception as e:
+        # On any error, allow the operation and log
+        error_output = {
+            "systemMessage": f"Hookify error: {str(e)}"
+        }
+        print(json.dumps(error_output), file=sys.stdout)
+
+    finally:
+        # ALWAYS exit 0 - never block operations due to hook errors
+        sys.exit(0)
@@ -7,9 +7,25 @@ Loads and parses .claude/hookify.*.local.md files.
 import os
 import sys
 import glob
+import json
 import re
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass, field
+import time
+from typing import List, Optional, Dict, Any, FrozenSet, Tuple
+from dataclasses import dataclass, field, asdict
+
+from hookify.utils.cache import cache_enabled, read_cache_file, write_cache_file
+
+# Rule files live in the project's .claude directory
+RULE_FILE_PATTERN = os.path.join('.claude', 'hookify.*.local.md')
+
+# Compiled rule bundle (see load_rule_files); bump the version whenever
+# the cached Rule/Condition layout changes
+RULE_BUNDLE_FILE = 'rules.json'
+RULE_BUNDLE_VERSION = 1
+
+# Files modified this recently are not cached: a second write within the
+# same mtime tick could leave mtime and size unchanged
+RACY_MTIME_WINDOW_NS = 2 * 1_000_000_000
 
 
 @dataclass
@@ -41,6 +57,15 @@ class Rule:
     tool_matcher: Optional[str] = None  # Override tool matching
     message: str = ""  # Message body from markdown
 
+    def __post_init__(self):
+        # Split tool_matcher once at load rather than on every evaluation.
+        # None means "any tool". Kept off the dataclass fields so it is not
+        # serialized into the rule bundle.
+        if not self.tool_matcher or self.tool_matcher == '*':
+            self.tool_names: Optional[FrozenSet[str]] = None
+        else:
+            self.tool_names = frozenset(self.tool_matcher.split('|'))
+
     @classmethod
     def from_dict(cls, frontmatter: Dict[str, Any], message: str) -> 'Rule':
         """Create Rule from frontmatter dict and message body."""
@@ -195,6 +220,22 @@ def extract_frontmatter(content: str) -> tuple[Dict[str, Any], str]:
     return frontmatter, message
 
 
+def rule_files_signature() -> Tuple[Tuple[str, int, int], ...]:
+    """Return (path, mtime_ns, size) for every rule file, sorted by path.
+
+    Cheap to compute (one glob plus one stat per file), so long-running
+    callers can compare signatures to detect added, removed or edited rules.
+    """
+    signature = []
+    for file_path in sorted(glob.glob(RULE_FILE_PATTERN)):
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            continue
+        signature.append((file_path, st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+
 def load_rules(event: Optional[str] = None) -> List[Rule]:
     """Load all hookify rules from .claude directory.
 
@@ -206,39 +247,111 @@ def load_rules(event: Optional[str] = None) -> List[Rule]:
     """
     rules = []
 
-    # Find all hookify.*.local.md files
-    pattern = os.path.join('.claude', 'hookify.*.local.md')
-    files = glob.glob(pattern)
+    for file_path, rule in load_rule_files():
+        if not rule:
+            continue
 
-    for file_path in files:
-        try:
-            rule = load_rule_file(file_path)
-            if not rule:
+        # Filter by event if specified
+        if event:
+            if rule.event != 'all' and rule.event != event:
                 continue
 
-            # Filter by event if specified
-            if event:
-                if rule.event != 'all' and rule.event != event:
-                    continue
+        # Only include enabled rules
+        if rule.enabled:
+            rules.append(rule)
+
+    return rules
+
 
-            # Only include enabled rules
-            if rule.enabled:
-                rules.append(rule)
+def load_rule_files() -> List[Tuple[str, Optional[Rule]]]:
+    """Load every rule file, reusing the compiled rule bundle when possible.
 
+    The bundle caches parsed rules keyed by each file's path, mtime and
+    size, so a warm call costs one glob, one stat per file and a single
+    read - no frontmatter parsing. Changed or new files are re-parsed and
+    the bundle is rewritten atomically, which keeps it safe when several
+    sessions run hooks in the same project concurrently.
+
+    Returns:
+        List of (file_path, Rule or None if the file is invalid)
+    """
+    results = []
+    use_cache = cache_enabled()
+    cached = _read_rule_bundle() if use_cache else {}
+    entries = {}
+    # Files edited within the racy window: not cached yet (see below)
+    racy = set()
+    now_ns = time.time_ns()
+
+    # Signature is taken before reading: a file changing after its stat
+    # then gets a newer mtime and is re-parsed next time
+    for file_path, mtime_ns, size in rule_files_signature():
+        entry = cached.get(file_path)
+        if entry and entry['mtime_ns'] == mtime_ns and entry['size'] == size:
+            try:
+                results.append((file_path, _rule_from_bundle(entry['rule'])))
+                entries[file_path] = entry
+                continue
+            except (ValueError, KeyError, TypeError):
+                pass  # Corrupt entry - fall through and re-parse
+
+        try:
+            rule = load_rule_file(file_path)
         except (IOError, OSError, PermissionError) as e:
             # File I/O errors - log and continue
             print(f"Warning: Failed to read {file_path}: {e}", file=sys.stderr)
-            continue
+            rule = None
         except (ValueError, KeyError, AttributeError, TypeError) as e:
             # Parsing errors - log and continue
             print(f"Warning: Failed to parse {file_path}: {e}", file=sys.stderr)
-            continue
+            rule = None
         except Exception as e:
             # Unexpected errors - log with type details
             print(f"Warning: Unexpected error loading {file_path} ({type(e).__name__}): {e}", file=sys.stderr)
-            continue
+            rule = None
 
-    return rules
+        results.append((file_path, rule))
+        # Invalid files are never cached so their warnings keep showing
+        if now_ns - mtime_ns <= RACY_MTIME_WINDOW_NS:
+            racy.add(file_path)
+        elif rule:
+            entries[file_path] = {'mtime_ns': mtime_ns, 'size': size, 'rule': asdict(rule)}
+
+    # A racy file's stale entry never matches its mtime, so it can stay
+    # until the file settles; dropping it would rewrite the bundle on
+    # every call inside the window
+    if use_cache and entries != {path: entry for path, entry in cached.items() if path not in racy}:
+        _write_rule_bundle(entries)
+
+    return results
+
+
+def _read_rule_bundle() -> Dict[str, Dict[str, Any]]:
+    """Read cached rule entries, or {} if missing, corrupt or outdated."""
+    raw = read_cache_file(RULE_BUNDLE_FILE)
+    if not raw:
+        return {}
+    try:
+        bundle = json.loads(raw)
+    except ValueError:
+        return {}
+    if not isinstance(bundle, dict) or bundle.get('version') != RULE_BUNDLE_VERSION:
+        return {}
+    entries = bundle.get('files')
+    return entries if isinstance(entries, dict) else {}
+
+
+def _write_rule_bundle(entries: Dict[str, Dict[str, Any]]) -> None:
+    """Atomically replace the cached rule bundle."""
+    bundle = {'version': RULE_BUNDLE_VERSION, 'files': entries}
+    write_cache_file(RULE_BUNDLE_FILE, json.dumps(bundle).encode('utf-8'))
+
+
+def _rule_from_bundle(data: Dict[str, Any]) -> Rule:
+    """Rebuild a Rule (and its Conditions) from its cached dict form."""
+    data = dict(data)
+    data['conditions'] = [Condition(**c) for c in data.get('conditions', [])]
+    return Rule(**data)
 
 
 def load_rule_file(file_path: str) -> Optional[Rule]:
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Optional rule daemon for hookify plugin.
+
+Every hook invocation normally starts a fresh python3 process that imports
+the engine, globs and parses every rule file, and compiles every regex.
+The daemon keeps all of that warm: it listens on a Unix socket in the
+project's .claude directory, serves hook clients (see client.py), and
+reloads rules whenever a rule file is added, removed or modified.
+
+Usage (from the project root):
+    python3 ${CLAUDE_PLUGIN_ROOT}/core/daemon.py [--socket PATH] [--idle-timeout SECONDS]
+
+Hooks keep working without it - they fall back to in-process evaluation
+whenever the socket is missing or unresponsive.
+"""
+
+import os
+import sys
+
+# Allow running as a script: make the "hookify" package importable
+if __name__ == '__main__':
+    _plugin_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    _parent_dir = os.path.dirname(_plugin_root)
+    if _parent_dir not in sys.path:
+        sys.path.insert(0, _parent_dir)
+
+import argparse
+import json
+import signal
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from hookify.core.client import get_socket_path
+from hookify.core.config_loader import Rule, load_rules, rule_files_signature
+from hookify.core.dispatch import evaluate_hook
+from hookify.core.rule_engine import RuleEngine
+from hookify.utils.hook_input import load_hook_input
+
+# With HOOKIFY_STATS=1, write one combined stats record this often
+STATS_FLUSH_SECONDS = 5.0
+
+
+class RuleServer:
+    """Holds parsed rules and a warm RuleEngine between hook invocations."""
+
+    def __init__(self):
+        """Initialize with an empty rule cache."""
+        self.engine = RuleEngine(stats_flush_seconds=STATS_FLUSH_SECONDS)
+        self._lock = threading.Lock()
+        self._signature = None
+        self._rules_by_event: Dict[Optional[str], List[Rule]] = {}
+
+    def rules_for(self, event: Optional[str]) -> List[Rule]:
+        """Return rules for an event, reloading if any rule file changed."""
+        signature = rule_files_signature()
+        with self._lock:
+            if signature != self._signature:
+                self._signature = signature
+                self._rules_by_event = {}
+
+            rules = self._rules_by_event.get(event)
+            if rules is None:
+                rules = load_rules(event=event)
+                self._rules_by_event[event] = rules
+            return rules
+
+    def handle(self, hook_event: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Evaluate one hook invocation."""
+        return evaluate_hook(hook_event, input_data,
+                             engine=self.engine, rules_loader=self.rules_for)
+
+
+class _HookRequestHandler(socketserver.StreamRequestHandler):
+    """Reads a header line plus raw hook input, writes the JSON response."""
+
+    # A stalled client must not hold up the requests queued behind it
+    timeout = 5.0
+
+    def handle(self):
+        self.server.last_activity = time.monotonic()
+        try:
+            header = json.loads(self.rfile.readline())
+            input_data = load_hook_input(self.rfile.read())
+            result = self.server.rule_server.handle(header.get('hook', ''), input_data)
+        except Exception as e:
+            # Same contract as the hook scripts: report, never block
+            result = {"systemMessage": f"Hookify error: {str(e)}"}
+
+        self.wfile.write(json.dumps(result).encode('utf-8'))
+
+
+class RuleDaemon(socketserver.UnixStreamServer):
+    """Unix socket server wrapping a RuleServer.
+
+    Requests are handled one at a time on the main thread: regex time
+    budgets (see matchers/regex_guard.py) rely on SIGALRM, which only the
+    main thread receives. Evaluations take milliseconds, so queued hooks
+    wait very little.
+    """
+
+    def __init__(self, socket_path: str, rule_server: RuleServer):
+        self.rule_server = rule_server
+        self.last_activity = time.monotonic()
+        super().__init__(socket_path, _HookRequestHandler)
+        # Only the owning user may talk to the daemon
+        os.chmod(socket_path, 0o600)
+
+
+def _socket_in_use(socket_path: str) -> bool:
+    """Check whether another daemon is already serving socket_path."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(0.5)
+        sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def serve(socket_path: str, idle_timeout: float = 0) -> None:
+    """Run the daemon until interrupted or idle for idle_timeout seconds.
+
+    Args:
+        socket_path: Unix socket to listen on
+        idle_timeout: Exit after this many seconds without requests (0 = never)
+    """
+    if os.path.exists(socket_path):
+        if _socket_in_use(socket_path):
+            print(f"hookify daemon already running on {socket_path}", file=sys.stderr)
+            return
+        # Left behind by a daemon that did not shut down cleanly
+        os.unlink(socket_path)
+
+    os.makedirs(os.path.dirname(socket_path) or '.', exist_ok=True)
+    server = RuleDaemon(socket_path, RuleServer())
+    server.timeout = 1.0
+
+    # Turn SIGTERM into a normal exit so the socket gets removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    print(f"hookify daemon listening on {socket_path}", file=sys.stderr)
+    try:
+        while True:
+            server.handle_request()
+            # Decisions reach their slot files once the response is sent
+            if server.rule_server.engine.decisions is not None:
+                server.rule_server.engine.decisions.flush()
+            if idle_timeout and time.monotonic() - server.last_activity > idle_timeout:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.rule_server.engine.stats.flush()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Serve hookify rules over a Unix socket")
+    parser.add_argument('--socket', default=get_socket_path(),
+                        help="Socket path (default: .claude/hookify.sock)")
+    parser.add_argument('--idle-timeout', type=float, default=0,
+                        help="Exit after this many idle seconds (default: never)")
+    args = parser.parse_args()
+
+    serve(args.socket, args.idle_timeout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Cross-invocation decision cache for hookify plugin.
+
+Agents repeat themselves: the same Bash command or the same file edit
+often comes up many times in a session, and each hook invocation would
+otherwise check every condition again. The decision cache remembers the
+response evaluate_rules() gave for an input, along with the rules that
+matched (so stats can credit them on a hit, see stats.py).
+
+An entry's key digests the rule set (every rule's contents, see
+rule_set_digest) and only the input fields the rules can read, as the
+engine extracts them. Editing, adding or removing a rule changes the rule
+set digest, so entries made with the old rules are never returned again;
+they are simply overwritten as the slots are reused. Hook input longer
+than DECISION_KEY_MAX_CHARS is not cached at all: extracting and digesting
+its fields up front could cost far more than evaluating rules that stop
+at a cheap condition.
+
+Entries live in a fixed number of slot files (direct-mapped by key), which
+bounds the cache on disk without any bookkeeping: a new entry replaces
+whatever was in its slot. A small in-memory LRU sits in front for the
+rule daemon, whose engine lives across invocations. New entries are
+written to their slots by flush(): the daemon calls it once a response
+has been sent, and a hook process at exit.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from hookify.core.config_loader import Rule
+from hookify.matchers.regex_guard import regex_timeout
+from hookify.utils.cache import cache_enabled, read_cache_file, write_cache_file
+from hookify.utils.tool_output import output_budgets
+
+# Bump whenever evaluation semantics change, so stale decisions are ignored
+DECISION_CACHE_VERSION = 3
+
+# Slot files under the cache directory; at most DECISION_SLOTS exist
+DECISIONS_DIR = 'decisions'
+DECISION_SLOTS = 512
+
+# Decisions kept in memory per engine (the daemon's engine is long-lived)
+DECISIONS_IN_MEMORY = 1024
+
+# Responses larger than this are not cached (a rule message is short)
+MAX_DECISION_BYTES = 64 * 1024
+
+# Hook input longer than this (or, already decoded, whose keyed fields
+# are) is not cached
+DECISION_KEY_MAX_CHARS = 256 * 1024
+
+
+def rule_set_digest(rules: Iterable[Rule]) -> str:
+    """Digest everything about a rule set that can change a decision.
+
+    The regex time budget is included: it decides which patterns are
+    skipped as too slow. So are the output budgets, which decide how much
+    of a tool's output the output fields hold.
+    """
+    parts: List[Any] = [DECISION_CACHE_VERSION, regex_timeout(), output_budgets()]
+    for rule in rules:
+        parts.append([rule.name, rule.enabled, rule.event, rule.action, rule.tool_matcher,
+                      rule.message, [[c.field, c.operator, c.pattern] for c in rule.conditions]])
+    return _digest(json.dumps(parts))
+
+
+def input_digest(rule_set: str, values: Iterable[Optional[str]]) -> str:
+    """Digest a rule set digest and the input values its rules can read.
+
+    None (field absent) and '' are kept distinct.
+    """
+    hasher = hashlib.blake2b(rule_set.encode('ascii'), digest_size=16)
+    for value in values:
+        if value is None:
+            hasher.update(b'-')
+        else:
+            data = value.encode('utf-8', 'surrogatepass')
+            hasher.update(b'+%d:' % len(data))
+            hasher.update(data)
+    return hasher.hexdigest()
+
+
+class DecisionCache:
+    """Hook responses keyed by input_digest(), in memory and on disk.
+
+    Each entry holds the response and the indices (in rule set order) of
+    the rules that matched.
+    """
+
+    def __init__(self):
+        """Initialize with an empty in-memory layer."""
+        self._memory: 'OrderedDict[str, Tuple[bytes, List[int]]]' = OrderedDict()
+        # Slot file name -> entry, waiting for flush()
+        self._pending: Dict[str, bytes] = {}
+        self._flush_at_exit = False
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], List[int]]]:
+        """Return (response, matched rule indices) for key, or None on a miss."""
+        if not cache_enabled():
+            return None
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is None:
+            entry = self._read_slot(key)
+            if entry is None:
+                return None
+            self._remember(key, entry)
+
+        # Decoded on every hit so callers never share a response dict
+        encoded, matched = entry
+        return json.loads(encoded), list(matched)
+
+    def put(self, key: str, response: Dict[str, Any], matched: List[int]) -> None:
+        """Cache a response (best-effort, never raises on I/O errors)."""
+        if not cache_enabled():
+            return
+
+        encoded = json.dumps(response).encode('utf-8')
+        if len(encoded) > MAX_DECISION_BYTES:
+            return
+        self._remember(key, (encoded, list(matched)))
+        entry = (b'{"key": "' + key.encode('ascii') + b'", "matched": ' + json.dumps(matched).encode('ascii')
+                 + b', "response": ' + encoded + b'}')
+        with self._lock:
+            self._pending[_slot_name(key)] = entry
+            if not self._flush_at_exit:
+                self._flush_at_exit = True
+                atexit.register(self.flush)
+
+    def flush(self) -> None:
+        """Write entries added since the last flush to their slot files."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for name, entry in pending.items():
+            write_cache_file(name, entry)
+
+    def _remember(self, key: str, entry: Tuple[bytes, List[int]]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            if len(self._memory) > DECISIONS_IN_MEMORY:
+                self._memory.popitem(last=False)
+
+    def _read_slot(self, key: str) -> Optional[Tuple[bytes, List[int]]]:
+        raw = read_cache_file(_slot_name(key))
+        if not raw:
+            return None
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            return None
+        # The slot may hold a different key that hashed to it
+        if not isinstance(entry, dict) or entry.get('key') != key:
+            return None
+        response = entry.get('response')
+        matched = entry.get('matched')
+        if not isinstance(response, dict) or not isinstance(matched, list) \
+                or not all(isinstance(index, int) for index in matched):
+            return None
+        return json.dumps(response).encode('utf-8'), matched
+
+
+def _slot_name(key: str) -> str:
+    slot = int(key[:8], 16) % DECISION_SLOTS
+    return os.path.join(DECISIONS_DIR, f'{slot:03x}.json')
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
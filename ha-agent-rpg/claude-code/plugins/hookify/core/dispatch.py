@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Hook dispatch for hookify plugin.
+
+Maps a Claude Code hook event to the hookify rule event it filters on and
+evaluates the matching rules. Shared by the in-process hook path and the
+rule daemon so both produce identical results.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from hookify.core.config_loader import Rule, load_rules
+# FILE_TOOLS and HOOK_EVENTS are re-exported for existing importers
+from hookify.core.events import FILE_TOOLS, HOOK_EVENTS, rule_event_for
+from hookify.core.rule_engine import RuleEngine
+
+
+def evaluate_hook(hook_event: str, input_data: Dict[str, Any],
+                  engine: Optional[RuleEngine] = None,
+                  rules_loader: Callable[[Optional[str]], List[Rule]] = None) -> Dict[str, Any]:
+    """Load the rules for a hook invocation and evaluate them.
+
+    Args:
+        hook_event: Claude Code hook event name
+        input_data: Hook input JSON
+        engine: RuleEngine to reuse (a fresh one is created if omitted)
+        rules_loader: Callable returning rules for an event (defaults to load_rules)
+
+    Returns:
+        Hook response dict, {} if no rules match
+    """
+    event = rule_event_for(hook_event, input_data.get('tool_name', ''))
+    loader = rules_loader or (lambda e: load_rules(event=e))
+    rules = loader(event)
+
+    if engine is None:
+        engine = RuleEngine()
+    return engine.evaluate_rules(rules, input_data)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Hook event to rule event mapping for hookify plugin.
+
+Kept free of engine imports so the hook fast path (see manifest.py) can
+use it without loading the rule engine.
+"""
+
+from typing import Optional
+
+# Hook events handled by the hookify hook scripts
+HOOK_EVENTS = ('PreToolUse', 'PostToolUse', 'Stop', 'UserPromptSubmit')
+
+# Tools that trigger "file" rules
+FILE_TOOLS = ('Edit', 'Write', 'MultiEdit')
+
+
+def rule_event_for(hook_event: str, tool_name: str = '') -> Optional[str]:
+    """Return the rule event filter for a hook invocation.
+
+    Args:
+        hook_event: Claude Code hook event name (PreToolUse, Stop, etc.)
+        tool_name: Tool being used (PreToolUse/PostToolUse only)
+
+    Returns:
+        Rule event ("bash", "file", "stop", "prompt") or None to load all rules
+    """
+    if hook_event == 'Stop':
+        return 'stop'
+    if hook_event == 'UserPromptSubmit':
+        return 'prompt'
+
+    # For tool events, we use tool_name to determine "bash" vs "file" event
+    if tool_name == 'Bash':
+        return 'bash'
+    if tool_name in FILE_TOOLS:
+        return 'file'
+    return None
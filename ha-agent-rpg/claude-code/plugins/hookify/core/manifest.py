@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Rule manifest for hookify plugin.
+
+Most tool calls happen in projects with no hookify rules, or none for the
+event at hand. The manifest records which rule events have enabled rules,
+keyed by the .claude directory's mtime and each rule file's mtime and
+size. A hook can then answer "is there anything to evaluate?" with a few
+stat calls, without importing the rule engine or decoding its input.
+
+Adding, removing or renaming a rule file changes the directory's mtime;
+editing one in place changes its own mtime or size. Either invalidates
+the manifest, which is rebuilt from the rule bundle (see config_loader).
+
+Like client.py, this module only imports the standard library and
+hookify's stdlib-only helpers.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, FrozenSet, Optional
+
+from hookify.core.events import rule_event_for
+from hookify.utils.cache import cache_enabled, read_cache_file, write_cache_file
+
+# Directory holding the rule files (see config_loader.RULE_FILE_PATTERN)
+RULES_DIR = '.claude'
+
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# Same reasoning as config_loader.RACY_MTIME_WINDOW_NS: stats this recent
+# may not reflect a second change within the same mtime tick
+RACY_MTIME_WINDOW_NS = 2 * 1_000_000_000
+
+
+def enabled_events() -> FrozenSet[str]:
+    """Return the rule events ("bash", "file", "all", ...) with enabled rules."""
+    try:
+        dir_stat = os.stat(RULES_DIR)
+    except OSError:
+        # No .claude directory - no rules
+        return frozenset()
+
+    if cache_enabled():
+        manifest = _read_manifest()
+        if manifest is not None and _is_current(manifest, dir_stat):
+            return frozenset(manifest['events'])
+
+    return _rebuild(dir_stat)
+
+
+def needs_evaluation(hook_event: str, raw_input: bytes) -> bool:
+    """Check whether any enabled rule could apply to a hook invocation.
+
+    Args:
+        hook_event: Claude Code hook event name
+        raw_input: Raw hook input JSON (only tool_name is looked at)
+
+    Returns:
+        False only when no rule can match, so the hook can answer {}
+    """
+    events = enabled_events()
+    if not events:
+        return False
+
+    tool_name = ''
+    if hook_event in ('PreToolUse', 'PostToolUse'):
+        # Imported here: a project without rules never needs it
+        from hookify.utils.hook_input import peek_string
+        tool_name = peek_string(raw_input, 'tool_name') or ''
+    event = rule_event_for(hook_event, tool_name)
+    if event is None:
+        # Unknown tools are checked against every rule
+        return True
+    return event in events or 'all' in events
+
+
+def _read_manifest() -> Optional[Dict[str, Any]]:
+    raw = read_cache_file(MANIFEST_FILE)
+    if not raw:
+        return None
+    try:
+        manifest = json.loads(raw)
+    except ValueError:
+        return None
+    if (not isinstance(manifest, dict)
+            or manifest.get('version') != MANIFEST_VERSION
+            or not isinstance(manifest.get('files'), dict)
+            or not isinstance(manifest.get('events'), list)):
+        return None
+    return manifest
+
+
+def _is_current(manifest: Dict[str, Any], dir_stat: os.stat_result) -> bool:
+    """Check the manifest against the directory and rule file stats."""
+    if manifest.get('dir_mtime_ns') != dir_stat.st_mtime_ns:
+        return False
+    for path, (mtime_ns, size) in manifest['files'].items():
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if st.st_mtime_ns != mtime_ns or st.st_size != size:
+            return False
+    return True
+
+
+def _rebuild(dir_stat: os.stat_result) -> FrozenSet[str]:
+    """Load the rules (not the engine) and save a fresh manifest."""
+    from hookify.core.config_loader import load_rule_files, rule_files_signature
+
+    # Stats are taken before loading: a change in between leaves the
+    # manifest stale, so it is rebuilt on the next call
+    signature = rule_files_signature()
+    events = sorted({rule.event for _, rule in load_rule_files() if rule and rule.enabled})
+
+    newest_ns = max([dir_stat.st_mtime_ns] + [mtime_ns for _, mtime_ns, _ in signature])
+    if cache_enabled() and time.time_ns() - newest_ns > RACY_MTIME_WINDOW_NS:
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'dir_mtime_ns': dir_stat.st_mtime_ns,
+            'files': {path: [mtime_ns, size] for path, mtime_ns, size in signature},
+            'events': events,
+        }
+        write_cache_file(MANIFEST_FILE, json.dumps(manifest).encode('utf-8'))
+
+    return frozenset(events)
@@ -1,13 +1,83 @@
 #!/usr/bin/env python3
 """Rule evaluation engine for hookify plugin."""
 
+import os
 import re
 import sys
+import threading
+import time
+from collections import OrderedDict
 from functools import lru_cache
-from typing import List, Dict, Any, Optional
+from operator import contains, eq
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set, Tuple
 
 # Import from local module
 from hookify.core.config_loader import Rule, Condition
+from hookify.core.decision_cache import DECISION_KEY_MAX_CHARS, DecisionCache, input_digest, rule_set_digest
+from hookify.core.events import rule_event_for
+from hookify.core.stats import EvaluationStats, StatsRecorder, stats_enabled
+from hookify.matchers.literal_set import AUTOMATON_MIN_LITERALS, LiteralHits, LiteralSet
+from hookify.matchers.path_trie import PathTrie
+from hookify.matchers.regex_guard import RegexTimeout, rejection_reason, time_budget, timeout_handler
+from hookify.matchers.regex_set import RegexSet
+from hookify.utils.hook_input import LazyObject
+from hookify.utils.shell_command import SHELL_FIELDS, ParsedCommand, parse_command
+from hookify.utils.tool_output import OUTPUT_FIELDS, output_field
+from hookify.utils.transcript import TranscriptScanner
+
+# Compiled rule sets kept per engine (one per event in the daemon)
+COMPILED_RULE_SETS = 8
+
+# Operators answered from one LiteralSet scan per field
+LITERAL_OPERATORS = ('contains', 'not_contains', 'starts_with', 'ends_with')
+
+# Relative cost of evaluating each operator; cheap checks run first so a
+# rule that fails them never pays for its scans. A scan (contains, regex)
+# costs in proportion to its field's length, which isn't known before the
+# field is extracted, so scans keep the order the rule file gives them.
+OPERATOR_COST = {
+    'equals': 0,
+    'glob': 1,
+    'starts_with': 1,
+    'ends_with': 1,
+    'contains': 2,
+    'not_contains': 2,
+    'regex_match': 2,
+}
+
+# Operators that compare a pattern with a value directly, as
+# test(value, pattern)
+VALUE_TESTS = {
+    'contains': contains,
+    'equals': eq,
+    'not_contains': lambda value, pattern: pattern not in value,
+    'starts_with': str.startswith,
+    'ends_with': str.endswith,
+}
+
+# Fields not read as one extracted value: the transcript (scanned from
+# transcript_path, see TranscriptScanner) and parsed shell fields
+SCANNED_FIELDS = frozenset(SHELL_FIELDS + ('transcript',))
+
+# Extra cost of extracting a field (transcript scans a file)
+FIELD_COST = {
+    'transcript': 10,
+}
+
+# Regex conditions on a field searched one at a time before its shared
+# RegexSet scan may take over. Rules usually stop at a cheap condition,
+# so most hook inputs only ever need a few of a field's patterns.
+SHARED_SCAN_AFTER = 8
+
+
+def condition_cost(condition: Condition) -> int:
+    """Estimate the cost of checking a condition (lower runs first)."""
+    return OPERATOR_COST.get(condition.operator, 0) + FIELD_COST.get(condition.field, 0)
+
+
+def project_root(input_data: Optional[Dict[str, Any]]) -> str:
+    """Return the project directory glob patterns are relative to."""
+    return (input_data or {}).get('cwd') or os.getcwd()
 
 
 # Cache compiled regexes (max 128 patterns)
@@ -24,19 +94,412 @@ def compile_regex(pattern: str) -> re.Pattern:
     return re.compile(pattern, re.IGNORECASE)
 
 
+@lru_cache(maxsize=128)
+def compile_glob(pattern: str) -> PathTrie:
+    """Compile a single glob pattern with caching."""
+    return PathTrie([pattern])
+
+
+class CompiledRuleSet:
+    """Evaluation plan built once per rule set and shared by every evaluation.
+
+    Each rule's conditions are ordered cheapest first (see condition_cost).
+    Regex conditions are grouped by field into one RegexSet per field, and
+    literal conditions (contains, starts_with, ...) into one LiteralSet per
+    field, and glob conditions into one PathTrie per field, so each field
+    is scanned once per evaluation no matter how many rules inspect it.
+    A shared scan only runs once enough conditions on the field have been
+    reached (see _Evaluation); until then conditions are checked one by
+    one, so rules that stop at a cheap condition cost no more than that.
+    Rules that can't apply to a tool are left out of its plan (plan_for).
+    Transcript conditions are collected separately and answered together
+    by one incremental TranscriptScanner pass. Parsed shell fields (argv0,
+    args, ...) hold several short values each and are checked directly.
+
+    Rule sets without transcript conditions depend only on the hook input,
+    so their decisions can be cached across invocations (see
+    decision_cache.py); digest and fields_for() provide the cache key.
+    """
+
+    def __init__(self, rules: List[Rule]):
+        """Compile matchers for rules."""
+        # Holding the rules keeps their ids valid as a cache key
+        self.rules = list(rules)
+        self._ordered: Dict[int, List[Condition]] = {
+            id(rule): sorted(rule.conditions, key=condition_cost) for rule in self.rules
+        }
+
+        patterns_by_field: Dict[str, List[str]] = {}
+        literals_by_field: Dict[str, List[str]] = {}
+        globs_by_field: Dict[str, List[str]] = {}
+        transcript: Dict[Tuple[str, str], None] = {}
+        for rule in self.rules:
+            for condition in rule.conditions:
+                if condition.field == 'transcript':
+                    transcript[(condition.operator, condition.pattern)] = None
+                elif condition.field in SHELL_FIELDS:
+                    continue
+                elif condition.operator == 'regex_match':
+                    patterns_by_field.setdefault(condition.field, []).append(condition.pattern)
+                elif condition.operator in LITERAL_OPERATORS:
+                    literals_by_field.setdefault(condition.field, []).append(condition.pattern)
+                elif condition.operator == 'glob':
+                    globs_by_field.setdefault(condition.field, []).append(condition.pattern)
+
+        self.regex_sets = {
+            field: RegexSet(patterns) for field, patterns in patterns_by_field.items()
+        }
+        self.literal_sets: Dict[str, LiteralSet] = {}
+        for field, literals in literals_by_field.items():
+            literal_set = LiteralSet(literals)
+            # Fields with too few literals for an automaton are checked directly
+            if literal_set.uses_automaton:
+                self.literal_sets[field] = literal_set
+        self.path_tries = {
+            field: PathTrie(patterns) for field, patterns in globs_by_field.items()
+        }
+        self.transcript_conditions: List[Tuple[str, str]] = list(transcript)
+        # A transcript grows between invocations, so its decisions can't be reused
+        self.cacheable = not self.transcript_conditions
+        self._digest: Optional[str] = None
+        self._fields_by_tool: Dict[str, List[str]] = {}
+        self._plans_by_tool: Dict[str, List[Tuple[int, List[Condition]]]] = {}
+
+    @property
+    def digest(self) -> str:
+        """Digest of the rules' contents (computed on first use)."""
+        if self._digest is None:
+            self._digest = rule_set_digest(self.rules)
+        return self._digest
+
+    def fields_for(self, tool_name: str) -> List[str]:
+        """Return the fields that rules applying to tool_name can read."""
+        fields = self._fields_by_tool.get(tool_name)
+        if fields is None:
+            seen: Dict[str, None] = {}
+            for rule in self.rules:
+                if rule.tool_names is None or tool_name in rule.tool_names:
+                    for condition in rule.conditions:
+                        # Parsed shell fields are derived from the command
+                        field = 'command' if condition.field in SHELL_FIELDS else condition.field
+                        seen[field] = None
+            fields = list(seen)
+            self._fields_by_tool[tool_name] = fields
+        return fields
+
+    def plan_for(self, tool_name: str) -> List[Tuple[int, List[Condition]]]:
+        """Return (index, ordered conditions) for each rule that can match tool_name.
+
+        Rules for other tools, and rules without conditions (which never
+        match), are left out, so evaluations never look at them.
+        """
+        plan = self._plans_by_tool.get(tool_name)
+        if plan is None:
+            plan = [
+                (index, self.conditions_for(rule)) for index, rule in enumerate(self.rules)
+                if rule.conditions and (rule.tool_names is None or tool_name in rule.tool_names)
+            ]
+            self._plans_by_tool[tool_name] = plan
+        return plan
+
+    def conditions_for(self, rule: Rule) -> List[Condition]:
+        """Return a rule's conditions in evaluation order."""
+        ordered = self._ordered.get(id(rule))
+        if ordered is None:
+            ordered = sorted(rule.conditions, key=condition_cost)
+        return ordered
+
+
+class _Evaluation:
+    """Per-call evaluation state (safe to use across daemon threads).
+
+    Extracted field values and per-field scan results are memoized, so each
+    field is extracted and scanned at most once per hook input. Regex and
+    literal conditions are checked one at a time until a field has been
+    asked about enough of them for its shared scan to pay off.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, engine: 'RuleEngine', compiled: CompiledRuleSet,
+                 input_data: Dict[str, Any], stats: Optional[EvaluationStats] = None):
+        self.engine = engine
+        self.compiled = compiled
+        self.input_data = input_data
+        self.stats = stats
+        self.tool_name = input_data.get('tool_name', '')
+        self.tool_input = input_data.get('tool_input', {})
+        self._fields: Dict[str, Optional[str]] = {}
+        self._regex_hits: Dict[str, Set[str]] = {}
+        self._literal_hits: Dict[str, LiteralHits] = {}
+        # Conditions checked one at a time so far, per field and kind
+        self._asked: Dict[Tuple[str, str], int] = {}
+        self._glob_hits: Dict[str, Set[str]] = {}
+        self._parsed: Optional[ParsedCommand] = None
+        self._transcript: Optional[Dict[Tuple[str, str], bool]] = None
+        # Cleared when a regex scan times out: the result then depends on timing
+        self.deterministic = True
+        # Indices of the rules that matched, filled in by RuleEngine._evaluate
+        self.matched: List[int] = []
+        # Rules being checked, and how many are left after the current one
+        # (set by whoever walks them; see regex_match)
+        self.rules_total = 0
+        self.rules_left = 0
+
+    def field_value(self, field: str) -> Optional[str]:
+        """Return the value of a field, extracting it at most once."""
+        value = self._fields.get(field, self._MISSING)
+        if value is self._MISSING:
+            if self.stats is None:
+                value = self.engine._extract_field(field, self.tool_name, self.tool_input, self.input_data)
+            else:
+                start = time.perf_counter_ns()
+                value = self.engine._extract_field(field, self.tool_name, self.tool_input, self.input_data)
+                self.stats.add_field(field, time.perf_counter_ns() - start)
+            self._fields[field] = value
+        return value
+
+    def matching_indices(self) -> List[int]:
+        """Return the indices of the rules that match, in rule set order."""
+        check = self.check
+        matched = []
+        plan = self.compiled.plan_for(self.tool_name)
+        self.rules_total = self.rules_left = len(plan)
+        for index, conditions in plan:
+            self.rules_left -= 1
+            # All conditions must match; cheapest are checked first
+            for condition in conditions:
+                if not check(condition):
+                    break
+            else:
+                matched.append(index)
+        return matched
+
+    def check(self, condition: Condition) -> bool:
+        """Check one condition, from the field's shared scan where planned."""
+        field = condition.field
+        value = self._fields.get(field, self._MISSING)
+        if value is self._MISSING:
+            if field in SCANNED_FIELDS:
+                return self._check_scanned(condition)
+            value = self.field_value(field)
+        if value is None:
+            return False
+
+        operator = condition.operator
+        test = VALUE_TESTS.get(operator)
+        if test is not None:
+            if field in self.compiled.literal_sets and operator in LITERAL_OPERATORS:
+                hits = self.literal_hits(field, value)
+                if hits is not None:
+                    if operator == 'contains':
+                        return hits.contains(condition.pattern)
+                    elif operator == 'not_contains':
+                        return not hits.contains(condition.pattern)
+                    elif operator == 'starts_with':
+                        return hits.starts_with(condition.pattern)
+                    else:
+                        return hits.ends_with(condition.pattern)
+            return test(value, condition.pattern)
+
+        if operator == 'regex_match':
+            found = self.regex_match(field, condition.pattern, value)
+            if found is not None:
+                return found
+
+        elif operator == 'glob':
+            hits = self.glob_hits(field, value)
+            if hits is not None:
+                return condition.pattern in hits
+
+        return self.engine._match_value(operator, condition.pattern, value, self.input_data)
+
+    def _check_scanned(self, condition: Condition) -> bool:
+        # Transcripts are scanned incrementally rather than read whole
+        if condition.field == 'transcript':
+            result = self.transcript_result(condition)
+            if result is not None:
+                return result
+            # Not from transcript_path: check the extracted field
+            self.field_value('transcript')
+            return self.check(condition)
+
+        # Parsed shell fields match when any of their values does
+        return self.engine._match_values(condition.operator, condition.pattern,
+                                         self.shell_values(condition.field), self.input_data)
+
+    def shell_values(self, field: str) -> Optional[Tuple[str, ...]]:
+        """Return the values of a parsed shell field (see shell_command.py)."""
+        if self._parsed is None:
+            command = self.field_value('command')
+            if command is None:
+                return None
+            if self.stats is None:
+                self._parsed = parse_command(command)
+            else:
+                start = time.perf_counter_ns()
+                self._parsed = parse_command(command)
+                self.stats.add_field('shell', time.perf_counter_ns() - start)
+        return self._parsed.values(field)
+
+    def regex_match(self, field: str, pattern: str, text: str) -> Optional[bool]:
+        """Answer a regex condition on a field, or None if it is not in the plan.
+
+        The first SHARED_SCAN_AFTER patterns asked about are searched on
+        their own. After that the field's RegexSet scans for all of them,
+        unless that has proved slower than the searches the remaining rules
+        are expected to need, at the rate they were asked for so far (see
+        RegexSet.scan_pays).
+        """
+        regex_set = self.compiled.regex_sets.get(field)
+        if regex_set is None:
+            return None
+        hits = self._regex_hits.get(field)
+        if hits is not None:
+            return pattern in hits
+
+        timeouts = regex_set.timeouts
+        asked = self._asked.get((field, 'regex'), 0)
+        scan = False
+        if asked >= SHARED_SCAN_AFTER:
+            rules_done = max(self.rules_total - self.rules_left, 1)
+            scan = regex_set.scan_pays(asked * self.rules_left // rules_done)
+        if scan:
+            hits = self._regex_hits[field] = regex_set.matches(text)
+            found = pattern in hits
+        else:
+            self._asked[(field, 'regex')] = asked + 1
+            found = regex_set.search(pattern, text)
+        if regex_set.timeouts != timeouts:
+            self.deterministic = False
+        return found
+
+    def literal_hits(self, field: str, text: str) -> Optional[LiteralHits]:
+        """Return literal occurrences in the field once a shared scan pays off.
+
+        None means the condition should be checked directly: the field's
+        literals are too few for an automaton, or fewer than
+        AUTOMATON_MIN_LITERALS of them have been asked about yet.
+        """
+        hits = self._literal_hits.get(field)
+        if hits is None:
+            literal_set = self.compiled.literal_sets.get(field)
+            if literal_set is None:
+                return None
+            asked = self._asked.get((field, 'literal'), 0)
+            if asked < AUTOMATON_MIN_LITERALS:
+                self._asked[(field, 'literal')] = asked + 1
+                return None
+            hits = literal_set.scan(text)
+            self._literal_hits[field] = hits
+        return hits
+
+    def glob_hits(self, field: str, path: str) -> Optional[Set[str]]:
+        """Return glob patterns matching the field, walking it at most once."""
+        hits = self._glob_hits.get(field)
+        if hits is None:
+            trie = self.compiled.path_tries.get(field)
+            if trie is None:
+                return None
+            hits = trie.match_path(path, project_root(self.input_data))
+            self._glob_hits[field] = hits
+        return hits
+
+    def decision_key(self) -> Optional[str]:
+        """Return the decision cache key for this input, or None if uncacheable.
+
+        The key covers the hook event and tool name (which decide the
+        response format and which rules apply) and every field the
+        applicable rules can read, extracted as the conditions will see it.
+
+        Input longer than DECISION_KEY_MAX_CHARS gets no key: its rules are
+        evaluated directly, so lazily decoded fields that no condition
+        reaches are never decoded.
+        """
+        if not self.compiled.cacheable:
+            return None
+        lazy = isinstance(self.input_data, LazyObject)
+        if lazy and self.input_data.document_size > DECISION_KEY_MAX_CHARS:
+            return None
+        values = [self.input_data.get('hook_event_name', ''), self.tool_name]
+        if self.compiled.path_tries:
+            # Globs match paths relative to the project directory
+            values.append(project_root(self.input_data))
+        size = 0
+        for field in self.compiled.fields_for(self.tool_name):
+            value = self.field_value(field)
+            if not lazy:
+                # Already decoded input is measured field by field
+                size += len(value or '')
+                if size > DECISION_KEY_MAX_CHARS:
+                    return None
+            values.append(value)
+        return input_digest(self.compiled.digest, values)
+
+    def transcript_result(self, condition: Condition) -> Optional[bool]:
+        """Answer a transcript condition without reading the whole file.
+
+        Returns:
+            The condition's result, or None if the transcript does not come
+            from transcript_path or the condition is not in the compiled
+            plan (callers then use the extracted field)
+        """
+        transcript_path = self.input_data.get('transcript_path')
+        if not transcript_path or 'transcript' in self.tool_input:
+            return None
+
+        if self._transcript is None:
+            scanner = TranscriptScanner(transcript_path, self.input_data.get('session_id') or '')
+            self._transcript = scanner.evaluate(self.compiled.transcript_conditions)
+
+        return self._transcript.get((condition.operator, condition.pattern))
+
+
 class RuleEngine:
     """Evaluates rules against hook input data."""
 
-    def __init__(self):
-        """Initialize rule engine."""
-        # No need for instance cache anymore - using global lru_cache
-        pass
+    def __init__(self, decision_cache: bool = True, stats_flush_seconds: float = 0):
+        """Initialize rule engine.
+
+        Args:
+            decision_cache: Reuse responses across invocations (see
+                decision_cache.py); off to always evaluate every rule
+            stats_flush_seconds: How often recorded stats are written when
+                HOOKIFY_STATS=1 (0 = after every evaluation)
+        """
+        self._compiled: 'OrderedDict[Tuple[int, ...], CompiledRuleSet]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.decisions = DecisionCache() if decision_cache else None
+        self.stats = StatsRecorder(stats_flush_seconds)
+
+    def compile(self, rules: List[Rule]) -> CompiledRuleSet:
+        """Return compiled matchers for a rule set, reusing earlier work.
+
+        Rule sets are identified by the identity of their Rule objects, so
+        callers that keep their rule lists (like the daemon) compile once.
+        """
+        key = tuple(map(id, rules))
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self._compiled.move_to_end(key)
+                return compiled
+
+        compiled = CompiledRuleSet(rules)
+        with self._lock:
+            self._compiled[key] = compiled
+            if len(self._compiled) > COMPILED_RULE_SETS:
+                self._compiled.popitem(last=False)
+        return compiled
 
     def evaluate_rules(self, rules: List[Rule], input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Evaluate all rules and return combined results.
 
         Checks all rules and accumulates matches. Blocking rules take priority
-        over warning rules. All matching rule messages are combined.
+        over warning rules. All matching rule messages are combined. An input
+        whose referenced fields were seen before with the same rules gets the
+        cached response (see decision_cache.py). With HOOKIFY_STATS=1, rule
+        timings and outcomes are recorded (see stats.py).
 
         Args:
             rules: List of Rule objects to evaluate
@@ -46,16 +509,94 @@ class RuleEngine:
             Response dict with systemMessage, hookSpecificOutput, etc.
             Empty dict {} if no rules match.
         """
+        stats = EvaluationStats(input_data.get('hook_event_name', '')) if stats_enabled() else None
+        compiled = self.compile(rules)
+        evaluation = _Evaluation(self, compiled, input_data, stats)
+        key = evaluation.decision_key() if self.decisions is not None else None
+        cached = self.decisions.get(key) if key is not None else None
+        if cached is not None:
+            response, matched = cached
+            if stats is not None:
+                # Credit the rules the cached response matched
+                blocked = [index for index in matched if compiled.rules[index].action == 'block']
+                stats.add_cached(len(compiled.rules), matched, blocked)
+        else:
+            # The SIGALRM handler is installed at most once per evaluation
+            with timeout_handler():
+                response = self._evaluate(rules, input_data, evaluation)
+            if key is not None and evaluation.deterministic:
+                self.decisions.put(key, response, evaluation.matched)
+
+        if stats is not None:
+            self.stats.add(stats, compiled.digest, lambda: [rule.name for rule in compiled.rules])
+        return response
+
+    def matching_rules(self, rules: List[Rule], input_data: Dict[str, Any]) -> List[Rule]:
+        """Return the rules that match an input, without building a response.
+
+        Neither the decision cache nor stats are involved.
+        """
+        return self._matching(self.compile(rules), input_data)
+
+    def evaluate_many(self, rules: List[Rule],
+                      inputs: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], List[Rule]]]:
+        """Match a stream of hook inputs against a rule set.
+
+        Each input is checked against the enabled rules its hook would load
+        (see rule_event_for), so results match what the hooks would have
+        done. Inputs are consumed lazily, one at a time, and the regex
+        timeout handler stays installed for the whole batch.
+
+        Args:
+            rules: All rules (filtered per input by event and enabled)
+            inputs: Hook inputs, each with its hook_event_name
+
+        Yields:
+            (input_data, matching rules) for each input, in order
+        """
+        compiled_by_event: Dict[Optional[str], CompiledRuleSet] = {}
+        with timeout_handler():
+            for input_data in inputs:
+                event = rule_event_for(input_data.get('hook_event_name', ''), input_data.get('tool_name', ''))
+                compiled = compiled_by_event.get(event)
+                if compiled is None:
+                    compiled = compiled_by_event[event] = self.compile([
+                        rule for rule in rules
+                        if rule.enabled and (event is None or rule.event in (event, 'all'))
+                    ])
+                yield input_data, self._matching(compiled, input_data)
+
+    def _matching(self, compiled: CompiledRuleSet, input_data: Dict[str, Any]) -> List[Rule]:
+        evaluation = _Evaluation(self, compiled, input_data)
+        return [compiled.rules[index] for index in evaluation.matching_indices()]
+
+    def _evaluate(self, rules: List[Rule], input_data: Dict[str, Any],
+                  evaluation: _Evaluation) -> Dict[str, Any]:
+        """Evaluate rules against one input and build the response."""
         hook_event = input_data.get('hook_event_name', '')
         blocking_rules = []
         warning_rules = []
 
-        for rule in rules:
-            if self._rule_matches(rule, input_data):
-                if rule.action == 'block':
-                    blocking_rules.append(rule)
-                else:
-                    warning_rules.append(rule)
+        stats = evaluation.stats
+        if stats is None:
+            evaluation.matched = evaluation.matching_indices()
+        else:
+            # Every rule is timed, including those for other tools
+            evaluation.rules_total = len(rules)
+            for index, rule in enumerate(rules):
+                evaluation.rules_left = len(rules) - index - 1
+                start = time.perf_counter_ns()
+                matched = self._rule_matches(rule, input_data, evaluation)
+                stats.add_rule(time.perf_counter_ns() - start, matched, matched and rule.action == 'block')
+                if matched:
+                    evaluation.matched.append(index)
+
+        for index in evaluation.matched:
+            rule = rules[index]
+            if rule.action == 'block':
+                blocking_rules.append(rule)
+            else:
+                warning_rules.append(rule)
 
         # If any blocking rules matched, block the operation
         if blocking_rules:
@@ -93,56 +634,36 @@ class RuleEngine:
         # No matches - allow operation
         return {}
 
-    def _rule_matches(self, rule: Rule, input_data: Dict[str, Any]) -> bool:
+    def _rule_matches(self, rule: Rule, input_data: Dict[str, Any],
+                      evaluation: Optional[_Evaluation] = None) -> bool:
         """Check if rule matches input data.
 
         Args:
             rule: Rule to evaluate
             input_data: Hook input data
+            evaluation: Shared per-call state from evaluate_rules
 
         Returns:
             True if rule matches, False otherwise
         """
-        # Extract tool information
-        tool_name = input_data.get('tool_name', '')
-        tool_input = input_data.get('tool_input', {})
+        if evaluation is None:
+            evaluation = _Evaluation(self, CompiledRuleSet([rule]), input_data)
 
-        # Check tool matcher if specified
-        if rule.tool_matcher:
-            if not self._matches_tool(rule.tool_matcher, tool_name):
-                return False
+        # Check tool matcher if specified (pre-split at load)
+        if rule.tool_names is not None and evaluation.tool_name not in rule.tool_names:
+            return False
 
         # If no conditions, don't match
         # (Rules must have at least one condition to be valid)
         if not rule.conditions:
             return False
 
-        # All conditions must match
-        for condition in rule.conditions:
-            if not self._check_condition(condition, tool_name, tool_input, input_data):
-                return False
-
-        return True
-
-    def _matches_tool(self, matcher: str, tool_name: str) -> bool:
-        """Check if tool_name matches the matcher pattern.
-
-        Args:
-            matcher: Pattern like "Bash", "Edit|Write", "*"
-            tool_name: Actual tool name
-
-        Returns:
-            True if matches
-        """
-        if matcher == '*':
-            return True
-
-        # Split on | for OR matching
-        patterns = matcher.split('|')
-        return tool_name in patterns
+        # All conditions must match; cheapest are checked first
+        return all(evaluation.check(condition) for condition in evaluation.compiled.conditions_for(rule))
 
     def _check_condition(self, condition: Condition, tool_name: str,
-                        tool_input: Dict[str, Any], input_data: Dict[str, Any] = None) -> bool:
+                        tool_input: Dict[str, Any], input_data: Dict[str, Any] = None,
+                        evaluation: Optional[_Evaluation] = None) -> bool:
         """Check if a single condition matches.
 
         Args:
@@ -150,31 +671,60 @@ class RuleEngine:
             tool_name: Tool being used
             tool_input: Tool input dict
             input_data: Full hook input data (for Stop events, etc.)
+            evaluation: Shared per-call state from evaluate_rules
 
         Returns:
             True if condition matches
         """
+        if evaluation:
+            return evaluation.check(condition)
+
+        # Parsed shell fields match when any of their values does
+        if condition.field in SHELL_FIELDS:
+            command = self._extract_field('command', tool_name, tool_input, input_data)
+            values = None if command is None else parse_command(command).values(condition.field)
+            return self._match_values(condition.operator, condition.pattern, values, input_data)
+
         # Extract the field value to check
         field_value = self._extract_field(condition.field, tool_name, tool_input, input_data)
         if field_value is None:
             return False
 
-        # Apply operator
-        operator = condition.operator
-        pattern = condition.pattern
+        return self._match_value(condition.operator, condition.pattern, field_value, input_data)
 
-        if operator == 'regex_match':
-            return self._regex_match(pattern, field_value)
-        elif operator == 'contains':
-            return pattern in field_value
-        elif operator == 'equals':
-            return pattern == field_value
-        elif operator == 'not_contains':
-            return pattern not in field_value
-        elif operator == 'starts_with':
-            return field_value.startswith(pattern)
-        elif operator == 'ends_with':
-            return field_value.endswith(pattern)
+    def _match_values(self, operator: str, pattern: str, values: Optional[Tuple[str, ...]],
+                      input_data: Dict[str, Any] = None) -> bool:
+        """Apply an operator to a parsed shell field's values.
+
+        not_contains holds when no value contains the pattern; every other
+        operator when some value matches. A missing field never matches.
+        """
+        if values is None:
+            return False
+        if operator == 'not_contains':
+            return all(pattern not in value for value in values)
+        return any(self._match_value(operator, pattern, value, input_data) for value in values)
+
+    def _match_value(self, operator: str, pattern: str, value: str,
+                     input_data: Dict[str, Any] = None) -> bool:
+        """Apply an operator to a single value, without shared scans.
+
+        Args:
+            operator: Condition operator
+            pattern: Condition pattern
+            value: Value to check
+            input_data: Full hook input data (globs are relative to its cwd)
+
+        Returns:
+            True if the value matches
+        """
+        test = VALUE_TESTS.get(operator)
+        if test is not None:
+            return test(value, pattern)
+        elif operator == 'regex_match':
+            return self._regex_match(pattern, value)
+        elif operator == 'glob':
+            return pattern in compile_glob(pattern).match_path(value, project_root(input_data))
         else:
             # Unknown operator
             return False
@@ -184,7 +734,7 @@ class RuleEngine:
         """Extract field value from tool input or hook input data.
 
         Args:
-            field: Field name like "command", "new_text", "file_path", "reason", "transcript"
+            field: Field name like "command", "new_text", "file_path", "reason", "transcript", "output"
             tool_name: Tool being used (may be empty for Stop events)
             tool_input: Tool input dict
             input_data: Full hook input (for accessing transcript_path, reason, etc.)
@@ -226,6 +776,9 @@ class RuleEngine:
             elif field == 'user_prompt':
                 # For UserPromptSubmit events
                 return input_data.get('user_prompt', '')
+            elif field in OUTPUT_FIELDS:
+                # For PostToolUse events, bounded however large the output
+                return output_field(field, input_data)
 
         # Handle special cases by tool type
         if tool_name == 'Bash':
@@ -261,13 +814,22 @@ class RuleEngine:
             text: Text to match against
 
         Returns:
-            True if pattern matches
+            True if pattern matches (False if it is skipped as unsafe)
         """
+        reason = rejection_reason(pattern)
+        if reason:
+            print(f"Skipping regex pattern '{pattern}': {reason}", file=sys.stderr)
+            return False
+
         try:
             # Use cached compiled regex (LRU cache with max 128 patterns)
             regex = compile_regex(pattern)
-            return bool(regex.search(text))
+            with time_budget():
+                return bool(regex.search(text))
 
+        except RegexTimeout:
+            print(f"Skipping regex pattern '{pattern}': exceeded the time budget", file=sys.stderr)
+            return False
         except re.error as e:
             print(f"Invalid regex pattern '{pattern}': {e}", file=sys.stderr)
             return False
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""Opt-in rule statistics for hookify plugin.
+
+With HOOKIFY_STATS=1 in the hook's (or the daemon's) environment, every
+evaluate_rules call records how long each rule took, whether it matched
+or blocked, and how long each field took to extract. This is enough to
+find the rules that make hooks slow, and rules that never match.
+
+Recording has to stay cheap with thousands of rules, so a record holds
+plain lists aligned with its rule set (identified by the rule set digest,
+see decision_cache.py); the rule names are written once per rule set to
+stats/sets/. A hook appends one record per evaluation to stats/log (a
+single O_APPEND write, like HOOKIFY_RECORD); the daemon appends one
+combined record every few seconds. Once the log passes FOLD_BYTES it is
+folded into per-rule totals in stats/totals.json, so the store stays
+small however long stats are left on.
+
+Rule time includes any shared field scan the rule triggered first (see
+CompiledRuleSet). A response served from the decision cache credits the
+matches and blocks it was cached with, but no evaluation or time, so a
+rule's matches can exceed its evaluations.
+
+Usage (from the project root):
+    python3 ${CLAUDE_PLUGIN_ROOT}/core/stats.py [--top N] [--json] [--reset]
+"""
+
+import os
+import sys
+
+# Allow running as a script: make the "hookify" package importable
+if __name__ == '__main__':
+    _plugin_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    _parent_dir = os.path.dirname(_plugin_root)
+    if _parent_dir not in sys.path:
+        sys.path.insert(0, _parent_dir)
+
+import argparse
+import json
+import threading
+import time
+from operator import add
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from hookify.utils.cache import atomic_write, get_cache_path
+
+# Set to "1" to record rule statistics
+STATS_ENV = 'HOOKIFY_STATS'
+
+STATS_DIR = 'stats'
+STATS_LOG = os.path.join(STATS_DIR, 'log')
+STATS_TOTALS = os.path.join(STATS_DIR, 'totals.json')
+STATS_SETS_DIR = os.path.join(STATS_DIR, 'sets')
+STATS_VERSION = 1
+
+# Log size at which it is folded into the totals
+FOLD_BYTES = 1024 * 1024
+
+# Rule set name files unused for this long are removed when folding
+SET_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+
+def stats_enabled() -> bool:
+    """Return True if rule statistics should be recorded."""
+    return os.environ.get(STATS_ENV, '0') == '1'
+
+
+class EvaluationStats:
+    """Timings and outcomes collected during one evaluate_rules call."""
+
+    def __init__(self, hook_event: str):
+        """Start timing an evaluation of a hook event."""
+        self.hook_event = hook_event
+        self.cached = False
+        # Per rule, in evaluation order: elapsed ns, and which matched/blocked
+        self.rule_ns: List[int] = []
+        self.matched: List[int] = []
+        self.blocked: List[int] = []
+        self.fields: Dict[str, List[int]] = {}
+        self._start_ns = time.perf_counter_ns()
+
+    def add_rule(self, elapsed_ns: int, matched: bool, blocked: bool) -> None:
+        """Record the next rule's evaluation."""
+        if matched:
+            self.matched.append(len(self.rule_ns))
+        if blocked:
+            self.blocked.append(len(self.rule_ns))
+        self.rule_ns.append(elapsed_ns)
+
+    def add_cached(self, rule_count: int, matched: List[int], blocked: List[int]) -> None:
+        """Record a decision cache hit and the rules its response matched."""
+        self.cached = True
+        self.rule_ns = [0] * rule_count
+        self.matched = matched
+        self.blocked = blocked
+
+    def add_field(self, name: str, elapsed_ns: int) -> None:
+        """Record one field extraction."""
+        self.fields[name] = [1, elapsed_ns, elapsed_ns]
+
+    def as_record(self, rule_set: Optional[str]) -> Dict[str, Any]:
+        """Return this evaluation as a stats log record.
+
+        Args:
+            rule_set: Digest of the evaluated rule set
+        """
+        record = {
+            'since': int(time.time()),
+            'events': {self.hook_event: [1, int(self.cached), time.perf_counter_ns() - self._start_ns]},
+            'fields': self.fields,
+            'sets': {},
+        }
+        if rule_set is not None and self.rule_ns:
+            matches = [0] * len(self.rule_ns)
+            for index in self.matched:
+                matches[index] = 1
+            blocks = [0] * len(self.rule_ns)
+            for index in self.blocked:
+                blocks[index] = 1
+            # A cache hit evaluated nothing: it only adds matches and blocks
+            record['sets'][rule_set] = [int(not self.cached), self.rule_ns, self.rule_ns, matches, blocks]
+        return record
+
+
+class StatsRecorder:
+    """Accumulates evaluations and appends them to the stats log.
+
+    A hook process evaluates once, so by default every evaluation is
+    written straight away. The rule daemon passes flush_seconds to write
+    one combined record per interval instead (and flushes on exit).
+    """
+
+    def __init__(self, flush_seconds: float = 0):
+        """Initialize with nothing pending."""
+        self.flush_seconds = flush_seconds
+        self._pending = _empty_record()
+        self._last_flush = time.monotonic()
+        self._known_sets: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def add(self, stats: EvaluationStats, rule_set: Optional[str] = None,
+            rule_names: Callable[[], List[str]] = list) -> None:
+        """Add one evaluation, flushing if the interval has passed.
+
+        Args:
+            stats: The evaluation's stats
+            rule_set: Digest of the evaluated rule set
+            rule_names: Returns the set's rule names, in evaluation order
+                (only called the first time a rule set is seen)
+        """
+        if rule_set is not None and stats.rule_ns and rule_set not in self._known_sets:
+            _save_rule_set(rule_set, rule_names())
+            self._known_sets.add(rule_set)
+
+        record = stats.as_record(rule_set)
+        if self.flush_seconds <= 0:
+            _append_record(record)
+            return
+        with self._lock:
+            _merge_record(self._pending, record)
+        if time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self) -> None:
+        """Append everything pending as one record."""
+        with self._lock:
+            pending, self._pending = self._pending, _empty_record()
+            self._last_flush = time.monotonic()
+        if pending['events']:
+            _append_record(pending)
+
+
+def empty_stats() -> Dict[str, Any]:
+    """Return empty per-rule totals.
+
+    Counters are compact lists: events [count, cached, ns], rules
+    [evaluations, ns, max_ns, matches, blocks], fields [extractions, ns,
+    max_ns].
+    """
+    return {'version': STATS_VERSION, 'since': int(time.time()), 'events': {}, 'rules': {}, 'fields': {}}
+
+
+def fold_log() -> None:
+    """Fold the stats log into the totals and start a new log.
+
+    The log is renamed first, so records appended meanwhile go to a fresh
+    log; a writer that opened the old name just before the rename can
+    still lose its record. Statistics are approximate by design.
+    """
+    log_path = get_cache_path(STATS_LOG)
+    folding_path = f'{log_path}.{os.getpid()}'
+    try:
+        os.rename(log_path, folding_path)
+    except OSError:
+        return  # Another process is folding it
+
+    totals = _read_totals()
+    _apply_log(totals, folding_path)
+    atomic_write(get_cache_path(STATS_TOTALS), json.dumps(totals, separators=(',', ':')).encode('utf-8'))
+    try:
+        os.unlink(folding_path)
+    except OSError:
+        pass
+    _prune_rule_sets()
+
+
+def load_stats() -> Dict[str, Any]:
+    """Return per-rule totals including records not yet folded."""
+    totals = _read_totals()
+    _apply_log(totals, get_cache_path(STATS_LOG))
+    return totals
+
+
+def reset_stats() -> None:
+    """Delete all recorded statistics."""
+    for name in (STATS_LOG, STATS_TOTALS):
+        try:
+            os.unlink(get_cache_path(name))
+        except OSError:
+            pass
+
+
+def _empty_record() -> Dict[str, Any]:
+    return {'since': int(time.time()), 'events': {}, 'fields': {}, 'sets': {}}
+
+
+def _append_record(record: Dict[str, Any]) -> None:
+    """Append a record to the stats log, folding it if large (best-effort)."""
+    line = json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+
+    log_path = get_cache_path(STATS_LOG)
+    try:
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        # One O_APPEND write per record keeps concurrent hooks from interleaving
+        fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line)
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+    except OSError:
+        return
+
+    if size > FOLD_BYTES:
+        fold_log()
+
+
+def _rule_set_path(rule_set: str) -> str:
+    return get_cache_path(os.path.join(STATS_SETS_DIR, f'{rule_set}.json'))
+
+
+def _save_rule_set(rule_set: str, names: List[str]) -> None:
+    """Write a rule set's names once (a pruned file is written again)."""
+    path = _rule_set_path(rule_set)
+    if not os.path.exists(path):
+        atomic_write(path, json.dumps(names).encode('utf-8'))
+
+
+def _load_rule_set(rule_set: str) -> Optional[List[str]]:
+    try:
+        with open(_rule_set_path(rule_set), 'rb') as f:
+            names = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return names if isinstance(names, list) else None
+
+
+def _prune_rule_sets() -> None:
+    """Remove rule set name files that have not been written for a while."""
+    directory = get_cache_path(STATS_SETS_DIR)
+    cutoff = time.time() - SET_MAX_AGE_SECONDS
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+        except OSError:
+            pass
+
+
+def _read_totals() -> Dict[str, Any]:
+    try:
+        with open(get_cache_path(STATS_TOTALS), 'rb') as f:
+            totals = json.load(f)
+    except (OSError, ValueError):
+        return empty_stats()
+    if not isinstance(totals, dict) or totals.get('version') != STATS_VERSION:
+        return empty_stats()
+    return totals
+
+
+def _apply_log(totals: Dict[str, Any], path: str) -> None:
+    """Merge every record in a log file into the per-rule totals."""
+    try:
+        with open(path, 'rb') as f:
+            lines = f.readlines()
+    except OSError:
+        return
+
+    combined = _empty_record()
+    for line in lines:
+        try:
+            record = json.loads(line)
+            _merge_record(combined, record)
+        except (ValueError, KeyError, TypeError, IndexError):
+            continue  # A torn or foreign line
+
+    totals['since'] = min(totals['since'], combined['since'])
+    _merge_counters(totals['events'], combined['events'], _merge_event)
+    _merge_counters(totals['fields'], combined['fields'], _merge_field)
+
+    # Expand each rule set's lists into per-rule totals
+    rules = totals['rules']
+    for rule_set, (count, ns, max_ns, matches, blocks) in combined['sets'].items():
+        names = _load_rule_set(rule_set)
+        if names is None or len(names) != len(ns):
+            continue
+        for i, name in enumerate(names):
+            values = [count, ns[i], max_ns[i], matches[i], blocks[i]]
+            current = rules.get(name)
+            if current is None:
+                rules[name] = values
+            else:
+                _merge_rule(current, values)
+
+
+def _merge_record(combined: Dict[str, Any], record: Dict[str, Any]) -> None:
+    """Add one log record to another (both in log record format)."""
+    combined['since'] = min(combined['since'], record['since'])
+    _merge_counters(combined['events'], record['events'], _merge_event)
+    _merge_counters(combined['fields'], record['fields'], _merge_field)
+    sets = combined['sets']
+    for rule_set, values in record['sets'].items():
+        current = sets.get(rule_set)
+        if current is None:
+            sets[rule_set] = [values[0]] + [list(column) for column in values[1:]]
+            continue
+        # Whole columns at once: a rule set can hold thousands of rules
+        current[0] += values[0]
+        current[1] = list(map(add, current[1], values[1]))
+        current[2] = list(map(max, current[2], values[2]))
+        current[3] = list(map(add, current[3], values[3]))
+        current[4] = list(map(add, current[4], values[4]))
+
+
+def _merge_counters(counters: Dict[str, List[int]], new: Dict[str, List[int]],
+                    merge: Callable[[List[int], List[int]], None]) -> None:
+    for name, values in new.items():
+        current = counters.get(name)
+        if current is None:
+            counters[name] = list(values)
+        else:
+            merge(current, values)
+
+
+def _merge_event(current: List[int], values: List[int]) -> None:
+    current[0] += values[0]
+    current[1] += values[1]
+    current[2] += values[2]
+
+
+def _merge_rule(current: List[int], values: List[int]) -> None:
+    current[0] += values[0]
+    current[1] += values[1]
+    if values[2] > current[2]:
+        current[2] = values[2]
+    current[3] += values[3]
+    current[4] += values[4]
+
+
+def _merge_field(current: List[int], values: List[int]) -> None:
+    current[0] += values[0]
+    current[1] += values[1]
+    if values[2] > current[2]:
+        current[2] = values[2]
+
+
+def _ms(ns: float) -> str:
+    return f'{ns / 1e6:.2f}'
+
+
+def _us(ns: float) -> str:
+    return f'{ns / 1e3:.1f}'
+
+
+def format_report(totals: Dict[str, Any], top: int = 20,
+                  rule_names: Optional[List[str]] = None) -> str:
+    """Render per-rule totals as markdown tables.
+
+    Args:
+        totals: Output of load_stats()
+        top: Rows to show in the slowest-rules table
+        rule_names: Names of the currently enabled rules; those that never
+            matched are listed as dead
+    """
+    lines = []
+    since = time.strftime('%Y-%m-%d %H:%M', time.localtime(totals.get('since', time.time())))
+    lines.append(f'## Hookify Stats (since {since})')
+    lines.append('')
+
+    events = totals['events']
+    if not events:
+        lines.append(f'No evaluations recorded yet. Set {STATS_ENV}=1 for the hooks (and the daemon, if used).')
+        return '\n'.join(lines)
+
+    lines.append('| Hook | Evaluations | Cached | Total ms | Mean ms |')
+    lines.append('|------|-------------|--------|----------|---------|')
+    for name, (count, cached, ns) in sorted(events.items()):
+        lines.append(f"| {name} | {count} | {cached} | {_ms(ns)} | {_ms(ns / count)} |")
+    lines.append('')
+
+    rules = totals['rules']
+    if rules:
+        lines.append(f'### Slowest rules (top {top} by total time)')
+        lines.append('')
+        lines.append('| Rule | Evaluations | Matches | Blocks | Total ms | Mean µs | Max µs |')
+        lines.append('|------|-------------|---------|--------|----------|---------|--------|')
+        ranked = sorted(rules.items(), key=lambda item: item[1][1], reverse=True)
+        for name, (evaluations, ns, max_ns, matches, blocks) in ranked[:top]:
+            lines.append(f"| {name} | {evaluations} | {matches} | {blocks} "
+                         f"| {_ms(ns)} | {_us(ns / evaluations if evaluations else 0)} | {_us(max_ns)} |")
+        lines.append('')
+
+    fields = totals['fields']
+    if fields:
+        lines.append('### Field extraction')
+        lines.append('')
+        lines.append('| Field | Extractions | Total ms | Mean µs | Max µs |')
+        lines.append('|-------|-------------|----------|---------|--------|')
+        for name, (extractions, ns, max_ns) in sorted(fields.items(), key=lambda item: item[1][1], reverse=True):
+            lines.append(f"| {name} | {extractions} | {_ms(ns)} | {_us(ns / extractions)} | {_us(max_ns)} |")
+        lines.append('')
+
+    if rule_names is not None:
+        # rules[name][3] is the match count
+        dead = [name for name in rule_names if name not in rules or not rules[name][3]]
+        lines.append('### Rules that never matched')
+        lines.append('')
+        if dead:
+            for name in dead:
+                evaluations = rules[name][0] if name in rules else 0
+                lines.append(f'- {name} ({evaluations} evaluations)')
+        else:
+            lines.append('Every enabled rule has matched at least once.')
+        lines.append('')
+
+    return '\n'.join(lines)
+
+
+def main():
+    """Print recorded statistics for the project in the current directory."""
+    parser = argparse.ArgumentParser(description="Show hookify rule statistics")
+    parser.add_argument('--top', type=int, default=20, help="Slowest rules to list (default 20)")
+    parser.add_argument('--json', action='store_true', help="Print the raw totals as JSON")
+    parser.add_argument('--reset', action='store_true', help="Delete all recorded statistics")
+    args = parser.parse_args()
+
+    if args.reset:
+        reset_stats()
+        print("Hookify stats reset.")
+        return
+
+    totals = load_stats()
+    if args.json:
+        print(json.dumps(totals, indent=2))
+        return
+
+    from hookify.core.config_loader import load_rules
+    rule_names = list(dict.fromkeys(rule.name for rule in load_rules()))
+    print(format_report(totals, top=args.top, rule_names=rule_names))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,8 @@
 """PostToolUse hook executor for hookify plugin.
 
 This script is called by Claude Code after a tool executes.
-It reads .claude/hookify.*.local.md files and evaluates rules.
+It forwards the hook input to the hookify rule daemon when one is running,
+otherwise it reads .claude/hookify.*.local.md files and evaluates rules in-process.
 """
 
 import os
@@ -19,9 +20,9 @@ if PLUGIN_ROOT:
         sys.path.insert(0, PLUGIN_ROOT)
 
 try:
-    from hookify.core.config_loader import load_rules
-    from hookify.core.rule_engine import RuleEngine
+    from hookify.core.client import run_hook
 except ImportError as e:
+    # If imports fail, allow operation and log error
     error_msg = {"systemMessage": f"Hookify import error: {e}"}
     print(json.dumps(error_msg), file=sys.stdout)
     sys.exit(0)
@@ -29,37 +30,8 @@ except ImportError as e:
 
 def main():
     """Main entry point for PostToolUse hook."""
-    try:
-        # Read input from stdin
-        input_data = json.load(sys.stdin)
-
-        # Determine event type based on tool
-        tool_name = input_data.get('tool_name', '')
-        event = None
-        if tool_name == 'Bash':
-            event = 'bash'
-        elif tool_name in ['Edit', 'Write', 'MultiEdit']:
-            event = 'file'
-
-        # Load rules
-        rules = load_rules(event=event)
-
-        # Evaluate rules
-        engine = RuleEngine()
-        result = engine.evaluate_rules(rules, input_data)
-
-        # Always output JSON (even if empty)
-        print(json.dumps(result), file=sys.stdout)
-
-    except Exception as e:
-        error_output = {
-            "systemMessage": f"Hookify error: {str(e)}"
-        }
-        print(json.dumps(error_output), file=sys.stdout)
-
-    finally:
-        # ALWAYS exit 0
-        sys.exit(0)
+    # Daemon first, in-process fallback; always prints JSON and exits 0
+    run_hook('PostToolUse')
 
 
 if __name__ == '__main__':
@@ -2,7 +2,8 @@
 """Stop hook executor for hookify plugin.
 
 This script is called by Claude Code when agent wants to stop.
-It reads .claude/hookify.*.local.md files and evaluates stop rules.
+It forwards the hook input to the hookify rule daemon when one is running,
+otherwise it reads .claude/hookify.*.local.md files and evaluates stop rules in-process.
 """
 
 import os
@@ -19,9 +20,9 @@ if PLUGIN_ROOT:
         sys.path.insert(0, PLUGIN_ROOT)
 
 try:
-    from hookify.core.config_loader import load_rules
-    from hookify.core.rule_engine import RuleEngine
+    from hookify.core.client import run_hook
 except ImportError as e:
+    # If imports fail, allow operation and log error
     error_msg = {"systemMessage": f"Hookify import error: {e}"}
     print(json.dumps(error_msg), file=sys.stdout)
     sys.exit(0)
@@ -29,30 +30,8 @@ except ImportError as e:
 
 def main():
     """Main entry point for Stop hook."""
-    try:
-        # Read input from stdin
-        input_data = json.load(sys.stdin)
-
-        # Load stop rules
-        rules = load_rules(event='stop')
-
-        # Evaluate rules
-        engine = RuleEngine()
-        result = engine.evaluate_rules(rules, input_data)
-
-        # Always output JSON (even if empty)
-        print(json.dumps(result), file=sys.stdout)
-
-    except Exception as e:
-        # On any error, allow the operation
-        error_output = {
-            "systemMessage": f"Hookify error: {str(e)}"
-        }
-        print(json.dumps(error_output), file=sys.stdout)
-
-    finally:
-        # ALWAYS exit 0
-        sys.exit(0)
+    # Daemon first, in-process fallback; always prints JSON and exits 0
+    run_hook('Stop')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Multi-literal matching for hookify plugin.
+
+A LiteralSet finds every occurrence of many literal strings in one pass
+over a text using an Aho-Corasick automaton, and answers contains,
+starts_with and ends_with for each literal from that single pass.
+
+The automaton walks the text in Python, while a plain substring test runs
+in C, so small literal sets are still checked with str methods directly;
+the automaton takes over once a field has enough literals that one
+linear pass beats one substring scan per literal. Callers that only need
+a few of the literals should test those directly too (see uses_automaton
+and RuleEngine). While the automaton sits at its root it skips ahead (via
+a C-level character-class search) to the next character that can start a
+literal.
+"""
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+
+# Literals per field before the automaton replaces direct substring tests
+AUTOMATON_MIN_LITERALS = 96
+
+
+class LiteralHits:
+    """Result of scanning one text for a LiteralSet's literals."""
+
+    __slots__ = ('found', 'starts', 'ends')
+
+    def __init__(self, found: Set[str], starts: Set[str], ends: Set[str]):
+        self.found = found
+        self.starts = starts
+        self.ends = ends
+
+    def contains(self, literal: str) -> bool:
+        return literal in self.found
+
+    def starts_with(self, literal: str) -> bool:
+        return literal in self.starts
+
+    def ends_with(self, literal: str) -> bool:
+        return literal in self.ends
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton over a fixed set of non-empty literals."""
+
+    def __init__(self, literals: Iterable[str]):
+        """Build the trie, failure links and merged outputs."""
+        self.literals: List[str] = list(dict.fromkeys(lit for lit in literals if lit))
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+
+        for index, literal in enumerate(self.literals):
+            state = 0
+            for ch in literal:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(index)
+
+        # Breadth-first failure links; outputs inherit their fail state's
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = [tuple(out) for out in outputs]
+        first_chars = ''.join(sorted(goto[0]))
+        self._root_skip = re.compile('[' + re.escape(first_chars) + ']') if first_chars else None
+
+    def scan(self, text: str) -> LiteralHits:
+        """Find every literal in text in a single pass."""
+        found: Set[str] = set()
+        starts: Set[str] = set()
+        ends: Set[str] = set()
+        if self._root_skip is None:
+            return LiteralHits(found, starts, ends)
+
+        goto, fail, outputs, literals = self._goto, self._fail, self._outputs, self.literals
+        skip = self._root_skip.search
+        last = len(text) - 1
+        state = 0
+        i = 0
+
+        while i <= last:
+            if state == 0:
+                m = skip(text, i)
+                if m is None:
+                    break
+                i = m.start()
+
+            ch = text[i]
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            for index in outputs[state]:
+                literal = literals[index]
+                found.add(literal)
+                if i == len(literal) - 1:
+                    starts.add(literal)
+                if i == last:
+                    ends.add(literal)
+            i += 1
+
+        return LiteralHits(found, starts, ends)
+
+
+class LiteralSet:
+    """A set of literals answered from one scan per text."""
+
+    def __init__(self, literals: Iterable[str]):
+        """Prepare the literals; a large set's automaton is built on first scan."""
+        self.literals: List[str] = list(dict.fromkeys(literals))
+        # The empty string is contained in, starts and ends every text
+        self._has_empty = '' in self.literals
+        self._direct = [lit for lit in self.literals if lit]
+        self.uses_automaton = len(self._direct) >= AUTOMATON_MIN_LITERALS
+        self._automaton: Optional[AhoCorasick] = None
+
+    def __len__(self) -> int:
+        return len(self.literals)
+
+    def scan(self, text: str) -> LiteralHits:
+        """Find which literals occur in text, and where."""
+        if self.uses_automaton:
+            if self._automaton is None:
+                self._automaton = AhoCorasick(self._direct)
+            hits = self._automaton.scan(text)
+        else:
+            hits = LiteralHits(
+                {lit for lit in self._direct if lit in text},
+                {lit for lit in self._direct if text.startswith(lit)},
+                {lit for lit in self._direct if text.endswith(lit)},
+            )
+
+        if self._has_empty:
+            hits.found.add('')
+            hits.starts.add('')
+            hits.ends.add('')
+        return hits
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""Path glob matching for hookify plugin.
+
+A PathTrie answers "which of these glob patterns match this path?" with
+one walk over the path's segments, however many patterns there are.
+Patterns are split into path segments and merged into a trie: literal
+segments are dict lookups, wildcard segments (*, ?, [...]) are tested
+with a regex, and ** matches any number of segments. The walk keeps the
+set of trie nodes the path prefix can be in, so a path of depth d costs
+O(d) dict lookups plus the wildcard tests at the nodes it reaches.
+
+Pattern syntax (gitignore-like):
+    *.env           no slash: the name, at any depth
+    src/gen/**      a slash inside: relative to the project directory
+                    (the hook's cwd)
+    vendor/         trailing slash: everything below a directory of that
+                    name, at any depth (like **/vendor/**)
+    /etc/**         leading slash: an absolute path outside the project
+    **/secrets/*    ** spans any number of directories (including none);
+                    a trailing ** matches one or more
+
+Paths inside the project are matched relative to it, others as absolute
+paths, so "src/**" never matches /tmp/src/x. Matching is case-sensitive.
+"""
+
+import fnmatch
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+# First segment of an absolute path outside the project directory; never
+# produced by splitting a relative path
+ROOT_SEGMENT = '/'
+
+# Characters that make a segment a wildcard
+_WILDCARD = re.compile(r'[*?\[]')
+
+
+class _Node:
+    """One trie node: the state after matching some pattern segments."""
+
+    __slots__ = ('literal', 'wildcard', 'any_depth', 'repeats', 'patterns')
+
+    def __init__(self, repeats: bool = False):
+        self.literal: Dict[str, '_Node'] = {}
+        self.wildcard: List[tuple] = []  # (compiled segment regex, node)
+        # Node reached through a ** segment (it repeats: consumes any
+        # segment and stays)
+        self.any_depth: Optional['_Node'] = None
+        self.repeats = repeats
+        self.patterns: List[str] = []
+
+
+def pattern_segments(pattern: str) -> List[str]:
+    """Split a glob pattern into the segments it matches, in order."""
+    pattern = pattern.strip()
+    # As in gitignore, only a slash before the end anchors the pattern
+    anchored = '/' in pattern.rstrip('/')
+    if pattern.endswith('/'):
+        pattern += '**'
+    if pattern.startswith('/'):
+        prefix = [ROOT_SEGMENT]
+    elif not anchored:
+        prefix = ['**']
+    else:
+        prefix = []
+    segments = [seg for seg in pattern.split('/') if seg and seg != '.']
+    if not segments:
+        return []
+    # A trailing ** only matches inside the directory, not the directory itself
+    if segments[-1] == '**':
+        segments[-1:] = ['*', '**']
+    return prefix + segments
+
+
+def path_segments(path: str, root: str) -> List[str]:
+    """Split a path into segments, relative to root when inside it.
+
+    Args:
+        path: File path (relative paths are taken relative to root)
+        root: Project directory
+
+    Returns:
+        Segments of the path relative to root, or ROOT_SEGMENT followed by
+        the absolute path's segments when it lies outside root
+    """
+    root = os.path.normpath(root)
+    path = os.path.normpath(os.path.join(root, path))
+    if path == root:
+        return []
+    if path.startswith(root.rstrip(os.sep) + os.sep):
+        return path[len(root.rstrip(os.sep)) + 1:].split(os.sep)
+    return [ROOT_SEGMENT] + [seg for seg in path.split(os.sep) if seg]
+
+
+class PathTrie:
+    """A set of glob patterns matched against paths in one walk."""
+
+    def __init__(self, patterns: Iterable[str]):
+        """Merge the patterns' segments into a trie.
+
+        Args:
+            patterns: Glob patterns (duplicates are fine; empty ones never match)
+        """
+        self.patterns: List[str] = list(dict.fromkeys(patterns))
+        self._root = _Node()
+        wildcards: Dict[str, re.Pattern] = {}
+
+        for pattern in self.patterns:
+            segments = pattern_segments(pattern)
+            if not segments:
+                continue
+            node = self._root
+            for segment in segments:
+                if segment == '**':
+                    if node.any_depth is None:
+                        node.any_depth = _Node(repeats=True)
+                    node = node.any_depth
+                elif _WILDCARD.search(segment):
+                    compiled = wildcards.get(segment)
+                    if compiled is None:
+                        compiled = wildcards[segment] = re.compile(fnmatch.translate(segment))
+                    for existing, child in node.wildcard:
+                        if existing is compiled:
+                            node = child
+                            break
+                    else:
+                        child = _Node()
+                        node.wildcard.append((compiled, child))
+                        node = child
+                else:
+                    child = node.literal.get(segment)
+                    if child is None:
+                        child = node.literal[segment] = _Node()
+                    node = child
+            node.patterns.append(pattern)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def matches(self, segments: List[str]) -> Set[str]:
+        """Return the patterns matching a path (see path_segments)."""
+        states = _closure([self._root])
+        for segment in segments:
+            following: List[_Node] = []
+            for node in states:
+                child = node.literal.get(segment)
+                if child is not None:
+                    following.append(child)
+                for compiled, child in node.wildcard:
+                    if compiled.match(segment):
+                        following.append(child)
+            # Nodes reached through ** also consume this segment and stay
+            following.extend(node for node in states if node.repeats)
+            if not following:
+                return set()
+            states = _closure(following)
+
+        matched: Set[str] = set()
+        for node in states:
+            matched.update(node.patterns)
+        return matched
+
+    def match_path(self, path: str, root: str) -> Set[str]:
+        """Return the patterns matching a file path under a project root."""
+        return self.matches(path_segments(path, root))
+
+
+def _closure(nodes: List[_Node]) -> List[_Node]:
+    """Add the nodes reachable through ** without consuming a segment."""
+    result: Dict[int, _Node] = {}
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        if id(node) in result:
+            continue
+        result[id(node)] = node
+        if node.any_depth is not None:
+            stack.append(node.any_depth)
+    return list(result.values())
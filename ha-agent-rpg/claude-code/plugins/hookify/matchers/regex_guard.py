@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""Catastrophic-backtracking protection for hookify plugin.
+
+Rule patterns are user-written and run against arbitrarily large content
+and transcripts, so a single pattern like "(a+)+$" could stall every tool
+call until the hook is killed. Two layers keep that from happening:
+
+- analyze_pattern() inspects a pattern's parse tree when rules are
+  compiled. Nested quantifiers that can split the same text in many ways,
+  and quantified alternations whose branches overlap, backtrack
+  exponentially; adjacent overlapping quantifiers ("\\w+\\s*\\w+")
+  backtrack polynomially. Both are flagged with a warning and run on their
+  own, so a timeout is attributed to them alone.
+- time_budget() bounds every search that could be slow with an interval
+  timer. sre checks for pending signals while it backtracks, so the
+  SIGALRM raised when the budget runs out interrupts the search, and the
+  pattern is skipped with a warning. Signals only reach the main thread;
+  elsewhere, or with the budget disabled, searches run unbounded and
+  exponential patterns are rejected instead (see rejection_reason).
+
+A flagged pattern usually runs fine on real input, and dropping it would
+quietly turn a block rule off, so it is only skipped once it actually runs
+out of time.
+"""
+
+import json
+import os
+import re
+import signal
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants  # Python 3.11+
+except ImportError:
+    import sre_parse
+    import sre_constants
+
+from hookify.utils.cache import cache_enabled, read_cache_file, write_cache_file
+
+# Per-search time budget in milliseconds ("0" disables the budget)
+REGEX_TIMEOUT_ENV = 'HOOKIFY_REGEX_TIMEOUT_MS'
+DEFAULT_REGEX_TIMEOUT_MS = 100
+
+# analyze_pattern() severities
+EXPONENTIAL = 'exponential'
+POLYNOMIAL = 'polynomial'
+
+# Saved analyze_pattern() verdicts (see analyze_patterns)
+VERDICT_CACHE_FILE = 'regex-safety.json'
+VERDICT_CACHE_VERSION = 2
+MAX_CACHED_VERDICTS = 4096
+
+_UNBOUNDED_QUANTIFIER = re.compile(r'[*+]|\{\d*,\}')
+_QUANTIFIER = re.compile(r'[*+?]|\{\d*,?\d*\}')
+
+
+class RegexTimeout(Exception):
+    """Raised when a search exceeds its time budget."""
+
+
+def regex_timeout() -> float:
+    """Return the per-search time budget in seconds (0 = unbounded)."""
+    try:
+        return max(0.0, float(os.environ.get(REGEX_TIMEOUT_ENV, DEFAULT_REGEX_TIMEOUT_MS)) / 1000)
+    except ValueError:
+        return DEFAULT_REGEX_TIMEOUT_MS / 1000
+
+
+# Open timeout_handler() blocks (main thread only), and the SIGALRM
+# handler they replaced once the first time_budget() installed ours
+_handler_depth = 0
+_NOT_INSTALLED = object()
+_previous_handler: Any = _NOT_INSTALLED
+
+
+def _raise_timeout(signum, frame):
+    raise RegexTimeout()
+
+
+def _signals_usable() -> bool:
+    return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+
+@contextmanager
+def timeout_handler() -> Iterator[None]:
+    """Keep the SIGALRM handler installed across many time_budget() blocks.
+
+    Installing the handler costs more than a typical search, so batch
+    callers (see RuleEngine.evaluate_many) install it once for the batch.
+    It is installed by the first time_budget() that needs it, so a block
+    whose searches all run unbounded never pays for it.
+    """
+    global _handler_depth, _previous_handler
+    if not _signals_usable():
+        yield
+        return
+
+    _handler_depth += 1
+    try:
+        yield
+    finally:
+        _handler_depth -= 1
+        if _handler_depth == 0 and _previous_handler is not _NOT_INSTALLED:
+            signal.signal(signal.SIGALRM, _previous_handler)
+            _previous_handler = _NOT_INSTALLED
+
+
+@contextmanager
+def time_budget(seconds: Optional[float] = None) -> Iterator[None]:
+    """Raise RegexTimeout in the block once seconds have elapsed.
+
+    Does nothing off the main thread, where signals cannot be delivered,
+    or on platforms without interval timers.
+    """
+    if seconds is None:
+        seconds = regex_timeout()
+    if seconds <= 0 or not _signals_usable():
+        yield
+        return
+
+    global _previous_handler
+    with timeout_handler():
+        if _previous_handler is _NOT_INSTALLED:
+            _previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+        try:
+            yield
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+# Character sets are bitmasks over Latin-1 plus one bit standing for every
+# other character, so overlap tests are a single "&"
+_OTHER = 1 << 256
+_ALL = (1 << 257) - 1
+_ANY = _ALL & ~(1 << ord('\n'))
+
+_MAX_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+_POSSESSIVE_REPEAT = getattr(sre_constants, 'POSSESSIVE_REPEAT', None)
+_ATOMIC_GROUP = getattr(sre_constants, 'ATOMIC_GROUP', None)
+
+
+def _char(code: int) -> int:
+    """Mask for one character and its case variants (rules ignore case)."""
+    if code > 255:
+        return _OTHER
+    mask = 0
+    for variant in {chr(code), chr(code).lower(), chr(code).upper()}:
+        mask |= (1 << ord(variant)) if ord(variant) <= 255 else _OTHER
+    return mask
+
+
+def _category_mask(regex: str) -> int:
+    compiled = re.compile(regex)
+    mask = _OTHER
+    for code in range(256):
+        if compiled.match(chr(code)):
+            mask |= 1 << code
+    return mask
+
+
+_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: _category_mask(r'\d'),
+    sre_constants.CATEGORY_NOT_DIGIT: _category_mask(r'\D'),
+    sre_constants.CATEGORY_SPACE: _category_mask(r'\s'),
+    sre_constants.CATEGORY_NOT_SPACE: _category_mask(r'\S'),
+    sre_constants.CATEGORY_WORD: _category_mask(r'\w'),
+    sre_constants.CATEGORY_NOT_WORD: _category_mask(r'\W'),
+}
+
+
+def _class_mask(items) -> int:
+    """Mask for a [...] character class."""
+    mask = 0
+    negate = False
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL:
+            mask |= _char(av)
+        elif op is sre_constants.RANGE:
+            low, high = av
+            for code in range(low, min(high, 255) + 1):
+                mask |= _char(code)
+            if high > 255:
+                mask |= _OTHER
+        else:
+            mask |= _CATEGORIES.get(av, _ALL) if op is sre_constants.CATEGORY else _ALL
+    if negate:
+        mask = (_ALL & ~mask) | _OTHER
+    return mask
+
+
+def _is_unbounded(op, av) -> bool:
+    return op in _MAX_REPEATS and av[1] == sre_constants.MAXREPEAT
+
+
+def _children(op, av) -> List[list]:
+    """Sub-sequences of a node that participate in matching."""
+    if op is sre_constants.SUBPATTERN:
+        return [av[-1]]
+    if op is sre_constants.BRANCH:
+        return list(av[1])
+    if op in _MAX_REPEATS or (op is _POSSESSIVE_REPEAT and op is not None):
+        return [av[2]]
+    if op is _ATOMIC_GROUP and op is not None:
+        return [av]
+    return []
+
+
+def _node_first(op, av) -> Tuple[int, bool]:
+    """Return (mask of possible first characters, can match empty)."""
+    if op is sre_constants.LITERAL:
+        return _char(av), False
+    if op is sre_constants.ANY:
+        # Rules are compiled without DOTALL
+        return _ANY, False
+    if op is sre_constants.NOT_LITERAL:
+        return _ALL & ~_char(av), False
+    if op is sre_constants.IN:
+        return _class_mask(av), False
+    if op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        return 0, True
+    if op is sre_constants.BRANCH:
+        mask, nullable = 0, False
+        for alternative in av[1]:
+            alt_mask, alt_nullable = _first(alternative)
+            mask |= alt_mask
+            nullable = nullable or alt_nullable
+        return mask, nullable
+    children = _children(op, av)
+    if children:
+        mask, nullable = _first(children[0])
+        if op in _MAX_REPEATS or op is _POSSESSIVE_REPEAT:
+            nullable = nullable or av[0] == 0
+        return mask, nullable
+    # Backreferences, conditionals: anything, possibly nothing
+    return _ALL, True
+
+
+def _first(seq) -> Tuple[int, bool]:
+    """First-character mask and nullability of a node sequence."""
+    mask = 0
+    for op, av in seq:
+        node_mask, nullable = _node_first(op, av)
+        mask |= node_mask
+        if not nullable:
+            return mask, False
+    return mask, True
+
+
+def _chars(seq) -> int:
+    """Mask of every character a node sequence can consume."""
+    mask = 0
+    for op, av in seq:
+        children = _children(op, av)
+        if children:
+            for child in children:
+                mask |= _chars(child)
+        elif op not in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            mask |= _node_first(op, av)[0]
+    return mask
+
+
+def _follow(seq, start: int, follow: int) -> int:
+    """Mask of characters that can come next after seq[:start]."""
+    mask, nullable = _first(seq[start:])
+    return mask | follow if nullable else mask
+
+
+def _ambiguous(seq, follow: int) -> bool:
+    """Check a repeat body for text it could match in more than one way.
+
+    That happens when a variable-length node (a quantifier, or an
+    alternation with an empty branch) can consume characters that could
+    also start whatever follows it, including the next repetition, or
+    when two alternatives can start with the same character or both match
+    the empty string. sre factors a common prefix out of alternatives, so
+    "(a|a)" reaches here as "a" followed by two empty alternatives.
+    """
+    for i, (op, av) in enumerate(seq):
+        after = _follow(seq, i + 1, follow)
+        if op in _MAX_REPEATS and av[0] != av[1] and _chars(av[2]) & after:
+            return True
+        if op is sre_constants.BRANCH:
+            seen = 0
+            seen_empty = False
+            for alternative in av[1]:
+                mask, nullable = _first(alternative)
+                if mask & seen or (nullable and (seen_empty or _chars(seq[i:i + 1]) & after)):
+                    return True
+                seen |= mask
+                seen_empty = seen_empty or nullable
+        for child in _children(op, av):
+            child_follow = after
+            if op in _MAX_REPEATS:
+                child_follow |= _first(child)[0]
+            if _ambiguous(child, child_follow):
+                return True
+    return False
+
+
+def _walk(seq, follow: int) -> Optional[Tuple[str, str]]:
+    """Find the most severe backtracking hazard in a node sequence."""
+    seq = list(seq)
+    verdict = None
+    for i, (op, av) in enumerate(seq):
+        if _is_unbounded(op, av):
+            body = list(av[2])
+            if _ambiguous(body, _first(body)[0]):
+                return EXPONENTIAL, "nested quantifiers can backtrack exponentially"
+
+            # Another overlapping unbounded repeat reachable through
+            # optional nodes only: the two split the same run of text
+            chars = _chars(body)
+            for next_op, next_av in seq[i + 1:]:
+                if _is_unbounded(next_op, next_av) and chars & _chars(next_av[2]):
+                    verdict = verdict or (POLYNOMIAL, "adjacent overlapping quantifiers can backtrack polynomially")
+                    break
+                if not _node_first(next_op, next_av)[1]:
+                    break
+
+        children = _children(op, av)
+        if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            children = [av[1]]
+        if children:
+            after = _follow(seq, i + 1, follow)
+            for child in children:
+                child_follow = after | (_first(child)[0] if op in _MAX_REPEATS else 0)
+                child_verdict = _walk(child, child_follow)
+                if child_verdict and child_verdict[0] == EXPONENTIAL:
+                    return child_verdict
+                verdict = verdict or child_verdict
+
+    return verdict
+
+
+def _needs_analysis(pattern: str) -> bool:
+    """Cheap pre-check: hazards need an unbounded quantifier plus another
+    quantifier or an alternation."""
+    if not _UNBOUNDED_QUANTIFIER.search(pattern):
+        return False
+    return '|' in pattern or len(_QUANTIFIER.findall(pattern)) >= 2
+
+
+@lru_cache(maxsize=1024)
+def analyze_pattern(pattern: str) -> Optional[Tuple[str, str]]:
+    """Statically check a pattern for super-linear backtracking.
+
+    Args:
+        pattern: Regex pattern string
+
+    Returns:
+        (severity, reason) with severity EXPONENTIAL or POLYNOMIAL, or None
+        if no hazard was found (invalid patterns also return None; compiling
+        them reports the error)
+    """
+    if not _needs_analysis(pattern):
+        return None
+    try:
+        return _walk(sre_parse.parse(pattern, re.IGNORECASE), 0)
+    except (re.error, RecursionError, OverflowError):
+        return None
+
+
+def budget_enforced() -> bool:
+    """Return True if time_budget() can interrupt a search here."""
+    return regex_timeout() > 0 and _signals_usable()
+
+
+def rejection_reason(pattern: str, verdict: Any = None) -> Optional[str]:
+    """Return why a pattern must not run at all, or None if it may.
+
+    Exponential patterns run under the time budget; they are only rejected
+    where no budget can stop them (see budget_enforced).
+
+    Args:
+        pattern: Regex pattern string
+        verdict: analyze_pattern(pattern), if the caller already has it
+    """
+    if verdict is None:
+        verdict = analyze_pattern(pattern)
+    if verdict and verdict[0] == EXPONENTIAL and not budget_enforced():
+        return f"{verdict[1]}, and no time budget applies"
+    return None
+
+
+def analyze_patterns(patterns: Iterable[str]) -> Dict[str, Tuple[str, str]]:
+    """Analyze many patterns, reusing verdicts saved by earlier processes.
+
+    Parsing every pattern would add noticeably to each hook process's
+    start-up, so verdicts are kept in the hookify cache directory.
+
+    Returns:
+        Mapping of each hazardous pattern to its (severity, reason)
+    """
+    candidates = [p for p in dict.fromkeys(patterns) if _needs_analysis(p)]
+    if not candidates:
+        return {}
+
+    saved: Dict[str, Any] = {}
+    if cache_enabled():
+        try:
+            data = json.loads(read_cache_file(VERDICT_CACHE_FILE) or b'{}')
+            if data.get('version') == VERDICT_CACHE_VERSION and isinstance(data.get('verdicts'), dict):
+                saved = data['verdicts']
+        except (ValueError, AttributeError):
+            pass
+
+    hazards: Dict[str, Tuple[str, str]] = {}
+    missing = False
+    for pattern in candidates:
+        if pattern in saved:
+            verdict = tuple(saved[pattern]) if saved[pattern] else None
+        else:
+            verdict = analyze_pattern(pattern)
+            saved[pattern] = list(verdict) if verdict else None
+            missing = True
+        if verdict:
+            hazards[pattern] = verdict
+
+    if missing and cache_enabled():
+        if len(saved) > MAX_CACHED_VERDICTS:
+            saved = {p: saved[p] for p in candidates}
+        write_cache_file(VERDICT_CACHE_FILE, json.dumps(
+            {'version': VERDICT_CACHE_VERSION, 'verdicts': saved}).encode('utf-8'))
+    return hazards
+
+
+# For testing
+if __name__ == '__main__':
+    import time
+
+    for test_pattern in [r'rm\s+-rf', r'(a+)+$', r'(\w+\.)+com', r'(a|ab)*c', r'(a|aa)*b',
+                         r'(\d{1,3})+x', r'\w+\s*\w+=', r'(\w+\s?)+$', r'console\.log\(']:
+        print(f"{test_pattern!r:20} {analyze_pattern(test_pattern)}")
+
+    start = time.perf_counter()
+    try:
+        with time_budget(0.05):
+            re.search(r'(a+)+$', 'a' * 40 + 'b')
+    except RegexTimeout:
+        print(f"Interrupted after {(time.perf_counter() - start) * 1000:.0f}ms")
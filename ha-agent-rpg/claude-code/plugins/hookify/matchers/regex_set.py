@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""Multi-pattern regex matching for hookify plugin.
+
+A RegexSet answers "which of these patterns match this text?" without
+running one search per pattern. Patterns are merged into a single
+non-capturing alternation (named groups would hide the alternation's
+first-character prefilter from sre and make every position expensive),
+and each hit is attributed by re-matching the candidates anchored at the
+hit position. An alternation consumes the text it matches, so after a
+scan the patterns already found are dropped and the rest rescanned until
+a scan finds nothing new - the result is exact, and the common case (no
+pattern or one pattern matches) costs one or two passes over the text.
+
+A combined pass only pays off when many of the patterns are needed,
+and not for every pattern set: sre finds a lone pattern's literal prefix
+or first character quickly, which an alternation of dissimilar patterns
+can't. search() checks one pattern on its own, compiling nothing else,
+and scan_pays() compares the two as timed on this set so far.
+
+Patterns that regex_guard flags (as exponential or polynomial) are kept
+out of the combined alternation and searched alone. Every scan that could
+be slow runs under a time budget. A chunk that exceeds it is split into
+individual patterns, and a pattern that exceeds it alone is skipped from
+then on. Where no budget applies, exponential patterns are rejected up
+front and never match (see regex_guard.rejection_reason).
+"""
+
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+from hookify.matchers.regex_guard import (
+    RegexTimeout, analyze_pattern, analyze_patterns, regex_timeout, rejection_reason, time_budget,
+)
+
+# Alternatives per combined regex. Smaller chunks keep the cost of
+# recompiling a chunk's subset low when a rescan is needed.
+CHUNK_SIZE = 128
+
+# Stop a scan early once this many consecutive matches found nothing
+# new (e.g. a pattern like "\s" matching everywhere) and rescan without
+# the patterns already found.
+STALE_MATCH_LIMIT = 32
+
+# Combined scans per chunk before the remaining patterns are searched one
+# by one. Texts that match many patterns need many rescans, and past this
+# point individual searches are cheaper than recompiling subsets.
+MAX_COMBINED_SCANS = 3
+
+# Compiled subsets kept per chunk for rescans
+SUBSET_CACHE_SIZE = 32
+
+# search() and matches() calls timed per set for scan_pays(); later
+# calls aren't timed. Scans are assumed to pay until TIMED_SCANS of them
+# have been timed, since one sample can be far off.
+TIMED_SEARCHES = 16
+TIMED_SCANS = 4
+
+# Texts up to this long are searched without a time budget by patterns
+# regex_guard finds no hazard in (and that have no backreferences): such
+# a search takes microseconds, less than arming the budget's timer
+UNTIMED_TEXT_CHARS = 4096
+
+# Constructs that cannot be merged into a shared alternation: named groups
+# (names would clash), numbered or named backreferences, conditionals, and
+# global inline flags (which must appear at the very start of a pattern)
+_UNMERGEABLE = re.compile(r'\(\?P<|\\[1-9]|\(\?P=|\(\?\(|^\(\?[aiLmsux]+\)')
+
+
+def _balanced(pattern: str) -> bool:
+    """Check that a pattern's groups are balanced outside escapes and classes.
+
+    An unbalanced pattern like "a)|(b" is invalid alone but would compile
+    once wrapped in a group, so it must not be merged.
+    """
+    depth = 0
+    i, n = 0, len(pattern)
+    while i < n:
+        ch = pattern[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if ch == '[':
+            # Skip the character class; "]" right after "[" or "[^" is literal
+            i += 1
+            if i < n and pattern[i] == '^':
+                i += 1
+            if i < n and pattern[i] == ']':
+                i += 1
+            while i < n and pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+            if i >= n:
+                return False
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+            if depth < 0:
+                return False
+        i += 1
+    return depth == 0
+
+
+def _add_cost(cost: List[int], start_ns: int, text: str) -> None:
+    """Add one timed call on text to a [calls, ns, characters] record.
+
+    Concurrent calls may lose an update; the record is only an estimate.
+    """
+    cost[0] += 1
+    cost[1] += time.perf_counter_ns() - start_ns
+    cost[2] += len(text)
+
+
+class _Chunk:
+    """A group of mergeable patterns scanned together."""
+
+    def __init__(self, patterns: List[str], flags: int, compiled: re.Pattern):
+        self.patterns = patterns
+        self.flags = flags
+        self.compiled = compiled
+        # Individual patterns are only needed to attribute hits, which are
+        # rare, so they are compiled on first use
+        self._singles: List[Optional[re.Pattern]] = [None] * len(patterns)
+        self._subsets: 'OrderedDict[FrozenSet[int], re.Pattern]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _single(self, index: int) -> re.Pattern:
+        single = self._singles[index]
+        if single is None:
+            single = re.compile(self.patterns[index], self.flags)
+            self._singles[index] = single
+        return single
+
+    def _compile(self, indices: FrozenSet[int]) -> re.Pattern:
+        with self._lock:
+            cached = self._subsets.get(indices)
+            if cached is not None:
+                self._subsets.move_to_end(indices)
+                return cached
+
+        combined = '|'.join(f'(?:{self.patterns[i]})' for i in sorted(indices))
+        compiled = re.compile(combined, self.flags)
+
+        with self._lock:
+            self._subsets[indices] = compiled
+            if len(self._subsets) > SUBSET_CACHE_SIZE:
+                self._subsets.popitem(last=False)
+        return compiled
+
+    def match_indices(self, text: str) -> Set[int]:
+        """Return indices of every pattern in this chunk matching text."""
+        found: Set[int] = set()
+        pending = frozenset(range(len(self.patterns)))
+        regex = self.compiled
+        single = self._single
+        scans = 0
+
+        while pending:
+            if scans == MAX_COMBINED_SCANS:
+                found.update(i for i in pending if single(i).search(text))
+                break
+            scans += 1
+
+            new: Set[int] = set()
+            stale = 0
+            for m in regex.finditer(text):
+                pos = m.start()
+                # Every pending pattern matching here, not just the winner
+                hit = [i for i in pending if i not in new and single(i).match(text, pos)]
+                if hit:
+                    new.update(hit)
+                    stale = 0
+                else:
+                    stale += 1
+                    if stale >= STALE_MATCH_LIMIT:
+                        break
+
+            if not new:
+                # None of the pending patterns match anywhere
+                break
+
+            found |= new
+            pending = pending - new
+            if pending and scans < MAX_COMBINED_SCANS:
+                regex = self._compile(pending)
+
+        return found
+
+
+class RegexSet:
+    """A set of regex patterns matched against text in combined passes."""
+
+    _MISSING = object()
+
+    def __init__(self, patterns: Iterable[str], flags: int = re.IGNORECASE):
+        """Collect patterns; compilation is deferred to the first match.
+
+        A hook process often never needs the set for a given field (a Bash
+        call never reads new_text), so nothing is compiled until then.
+        Invalid, rejected and timed-out patterns are reported once and
+        never match.
+
+        Args:
+            patterns: Regex pattern strings (duplicates are fine)
+            flags: re flags applied to every pattern
+        """
+        self.patterns: List[str] = list(dict.fromkeys(patterns))
+        self.flags = flags
+        self.invalid: Set[str] = set()
+        self.skipped: Set[str] = set()
+        # Scans cut short by the time budget (their results are incomplete)
+        self.timeouts = 0
+        self._chunks: List[_Chunk] = []
+        self._standalone: Dict[str, re.Pattern] = {}
+        # Patterns compiled alone for search() (None: invalid or skipped)
+        self._singles: Dict[str, Optional[re.Pattern]] = {}
+        # Singles safe to search short texts with no time budget
+        self._untimed: Set[str] = set()
+        # [calls, ns, characters] timed for search() and matches()
+        self._search_cost = [0, 0, 0]
+        self._scan_cost = [0, 0, 0]
+        self._scans = 0
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _compile_one(self, pattern: str) -> None:
+        try:
+            self._standalone[pattern] = re.compile(pattern, self.flags)
+        except re.error as e:
+            print(f"Invalid regex pattern '{pattern}': {e}", file=sys.stderr)
+            self.invalid.add(pattern)
+
+    def _skip(self, pattern: str, reason: str) -> None:
+        print(f"Skipping regex pattern '{pattern}': {reason}", file=sys.stderr)
+        self.skipped.add(pattern)
+        self._standalone.pop(pattern, None)
+
+    def _prepare(self) -> None:
+        """Compile combined chunks and standalone patterns."""
+        with self._lock:
+            if self._ready:
+                return
+
+            hazards = analyze_patterns(self.patterns)
+            mergeable = []
+            for pattern in self.patterns:
+                hazard = hazards.get(pattern)
+                reason = rejection_reason(pattern, hazard) if hazard else None
+                if pattern in self.invalid or pattern in self.skipped:
+                    continue  # Already reported by search()
+                elif reason:
+                    self._skip(pattern, reason)
+                elif hazard:
+                    if pattern not in self._singles:
+                        print(f"Warning: Regex pattern '{pattern}' may be slow: {hazard[1]}", file=sys.stderr)
+                    self._compile_one(pattern)
+                elif _UNMERGEABLE.search(pattern) or not _balanced(pattern):
+                    self._compile_one(pattern)
+                else:
+                    mergeable.append(pattern)
+
+            for i in range(0, len(mergeable), CHUNK_SIZE):
+                batch = mergeable[i:i + CHUNK_SIZE]
+                combined = '|'.join(f'(?:{p})' for p in batch)
+                try:
+                    compiled = re.compile(combined, self.flags)
+                except re.error:
+                    # Some pattern is invalid (or only valid alone) - compile
+                    # them one by one to report and isolate it
+                    for pattern in batch:
+                        self._compile_one(pattern)
+                    continue
+                self._chunks.append(_Chunk(batch, self.flags, compiled))
+
+            self._ready = True
+
+    def matches(self, text: str) -> Set[str]:
+        """Return the set of patterns that match somewhere in text."""
+        if not self._ready:
+            self._prepare()
+        self._scans += 1
+        # The first scan also compiles the patterns it attributes hits to
+        if self._scans == 1 or self._scan_cost[0] >= TIMED_SCANS:
+            return self._matches(text)
+        start = time.perf_counter_ns()
+        matched = self._matches(text)
+        _add_cost(self._scan_cost, start, text)
+        return matched
+
+    def _matches(self, text: str) -> Set[str]:
+        # Chunks only hold patterns without hazards
+        budget = regex_timeout() if len(text) > UNTIMED_TEXT_CHARS else 0
+        matched: Set[str] = set()
+        for chunk in list(self._chunks):
+            try:
+                with time_budget(budget):
+                    indices = chunk.match_indices(text)
+            except RegexTimeout:
+                self.timeouts += 1
+                self._split(chunk)
+                continue
+            for index in indices:
+                matched.add(chunk.patterns[index])
+
+        budget = regex_timeout()
+        for pattern, compiled in list(self._standalone.items()):
+            try:
+                with time_budget(budget):
+                    found = compiled.search(text)
+            except RegexTimeout:
+                self.timeouts += 1
+                self._skip(pattern, f"exceeded the {budget * 1000:.0f}ms time budget")
+                continue
+            if found:
+                matched.add(pattern)
+        # A pattern search() skipped may still sit in a chunk
+        return matched - self.skipped if self.skipped else matched
+
+    def search(self, pattern: str, text: str) -> bool:
+        """Check one of the set's patterns against text on its own.
+
+        Gives the same answer as checking matches() for the pattern, as
+        long as neither runs out of time.
+        """
+        compiled = self._singles.get(pattern, self._MISSING)
+        if compiled is self._MISSING:
+            compiled = self._compile_single(pattern)
+        if compiled is None:
+            return False
+        if self._search_cost[0] >= TIMED_SEARCHES:
+            return self._search(pattern, compiled, text)
+        start = time.perf_counter_ns()
+        found = self._search(pattern, compiled, text)
+        _add_cost(self._search_cost, start, text)
+        return found
+
+    def scan_pays(self, searches: int) -> bool:
+        """Whether one matches() call should cost less than `searches` search() calls.
+
+        Before the first scan, compiling the set costs about what compiling
+        each pattern alone would, so a scan pays once at least half the
+        patterns are to be searched. After it, costs are compared per
+        character of text searched, as timed on this set; until TIMED_SCANS
+        scans have been timed, a scan is assumed to pay so that it gets timed.
+        """
+        if not self._scans:
+            return searches * 2 >= len(self.patterns)
+        searched, search_ns, search_chars = self._search_cost
+        scanned, scan_ns, scan_chars = self._scan_cost
+        if not searched or scanned < TIMED_SCANS:
+            return True
+        # One more than the length, so empty texts count too
+        return scan_ns / (scan_chars + scanned) < searches * search_ns / (search_chars + searched)
+
+    def _search(self, pattern: str, compiled: re.Pattern, text: str) -> bool:
+        if len(text) <= UNTIMED_TEXT_CHARS and pattern in self._untimed:
+            return compiled.search(text) is not None
+
+        budget = regex_timeout()
+        try:
+            with time_budget(budget):
+                return compiled.search(text) is not None
+        except RegexTimeout:
+            self.timeouts += 1
+            self._skip(pattern, f"exceeded the {budget * 1000:.0f}ms time budget")
+            self._singles[pattern] = None
+            return False
+
+    def _compile_single(self, pattern: str) -> Optional[re.Pattern]:
+        compiled = None
+        if pattern in self._standalone:
+            compiled = self._standalone[pattern]
+        elif pattern not in self.invalid and pattern not in self.skipped:
+            hazard = analyze_pattern(pattern)
+            reason = rejection_reason(pattern, hazard) if hazard else None
+            if reason:
+                self._skip(pattern, reason)
+            else:
+                if hazard:
+                    print(f"Warning: Regex pattern '{pattern}' may be slow: {hazard[1]}", file=sys.stderr)
+                try:
+                    compiled = re.compile(pattern, self.flags)
+                except re.error as e:
+                    print(f"Invalid regex pattern '{pattern}': {e}", file=sys.stderr)
+                    self.invalid.add(pattern)
+                else:
+                    if not hazard and not _UNMERGEABLE.search(pattern):
+                        self._untimed.add(pattern)
+        self._singles[pattern] = compiled
+        return compiled
+
+    def _split(self, chunk: _Chunk) -> None:
+        """Replace a chunk that ran out of time with standalone patterns."""
+        with self._lock:
+            if chunk in self._chunks:
+                self._chunks.remove(chunk)
+                for pattern in chunk.patterns:
+                    self._compile_one(pattern)
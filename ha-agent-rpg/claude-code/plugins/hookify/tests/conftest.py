@@ -0,0 +1,34 @@
+"""Shared fixtures for hookify tests.
+
+Every test runs in a fresh project directory (its own .claude rules and
+cache), with hookify's environment settings cleared.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Make the "hookify" package importable, as the hook scripts do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+@pytest.fixture(autouse=True)
+def project(tmp_path, monkeypatch):
+    """Run the test from an empty project directory."""
+    for name in list(os.environ):
+        if name.startswith('HOOKIFY_'):
+            monkeypatch.delenv(name)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / '.claude').mkdir()
+    return tmp_path
+
+
+@pytest.fixture
+def write_rule(project):
+    """Return a function writing .claude/hookify.<name>.local.md."""
+    def write(name, frontmatter, message='Rule matched'):
+        path = project / '.claude' / f'hookify.{name}.local.md'
+        path.write_text(f'---\nname: {name}\n{frontmatter.strip()}\n---\n\n{message}\n')
+        return path
+    return write
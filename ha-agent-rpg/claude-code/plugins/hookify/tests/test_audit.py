@@ -0,0 +1,178 @@
+"""Tests for the offline transcript audit."""
+
+import json
+import random
+
+import pytest
+
+from hookify.core.audit import audit, find_transcripts, format_report, transcript_events
+from hookify.core.config_loader import Condition, Rule
+
+RULES = [
+    Rule(name='no-rm', enabled=True, event='bash', action='block',
+         conditions=[Condition('command', 'contains', 'rm -rf')]),
+    Rule(name='deploy-prompt', enabled=True, event='prompt', action='warn',
+         conditions=[Condition('user_prompt', 'contains', 'deploy')]),
+    Rule(name='never', enabled=True, event='bash', action='warn',
+         conditions=[Condition('command', 'contains', 'no command says this')]),
+    Rule(name='disabled', enabled=False, event='bash', action='warn',
+         conditions=[Condition('command', 'contains', 'rm')]),
+]
+
+
+def tool_use(id, command):
+    return {'type': 'assistant', 'sessionId': 's1', 'cwd': '/work',
+            'message': {'role': 'assistant', 'content': [
+                {'type': 'text', 'text': 'Running it'},
+                {'type': 'tool_use', 'id': id, 'name': 'Bash', 'input': {'command': command}},
+            ]}}
+
+
+def tool_result(id, text, structured=None):
+    record = {'type': 'user', 'sessionId': 's1', 'cwd': '/work',
+              'message': {'role': 'user', 'content': [
+                  {'type': 'tool_result', 'tool_use_id': id, 'content': [{'type': 'text', 'text': text}]},
+              ]}}
+    if structured is not None:
+        record['toolUseResult'] = structured
+    return record
+
+
+def prompt(text):
+    return {'type': 'user', 'sessionId': 's1', 'cwd': '/work', 'message': {'role': 'user', 'content': text}}
+
+
+def write_transcript(path, records, junk=()):
+    lines = [json.dumps(record) for record in records]
+    for index, line in junk:
+        lines.insert(index, line)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text('\n'.join(lines) + '\n')
+    return str(path)
+
+
+class TestTranscriptEvents:
+    def test_records_become_hook_inputs(self, tmp_path):
+        path = write_transcript(tmp_path / 't.jsonl', [
+            prompt('please deploy'),
+            tool_use('a', 'ls'),
+            tool_result('a', 'file.txt'),
+            tool_use('b', 'rm -rf build'),
+            tool_result('b', 'done', structured={'stdout': 'done', 'stderr': ''}),
+        ])
+        events = list(transcript_events(path))
+        assert [(line, data['hook_event_name']) for line, data in events] == [
+            (1, 'UserPromptSubmit'), (2, 'PreToolUse'), (3, 'PostToolUse'),
+            (4, 'PreToolUse'), (5, 'PostToolUse'), (5, 'Stop'),
+        ]
+        assert events[0][1]['user_prompt'] == 'please deploy'
+        assert events[1][1]['tool_input'] == {'command': 'ls'}
+        assert events[2][1]['tool_response'] == 'file.txt'
+        assert events[4][1]['tool_input'] == {'command': 'rm -rf build'}
+        assert events[4][1]['tool_response'] == {'stdout': 'done', 'stderr': ''}
+        assert events[5][1]['transcript_path'] == path
+        assert all(data['session_id'] == 's1' and data['cwd'] == '/work' for _, data in events)
+
+    def test_torn_and_foreign_lines_are_skipped(self, tmp_path):
+        path = write_transcript(tmp_path / 't.jsonl', [tool_use('a', 'ls'), tool_result('a', 'ok')],
+                                junk=[(0, '{"type": "assistant", "mess'), (1, '[1, 2]'), (2, '{"type": "summary"}'),
+                                      (3, 'not json at all')])
+        assert [data['hook_event_name'] for _, data in transcript_events(path)] == [
+            'PreToolUse', 'PostToolUse', 'Stop']
+
+    def test_unanswered_and_unknown_results(self, tmp_path):
+        path = write_transcript(tmp_path / 't.jsonl', [tool_use('a', 'sleep 100'), tool_result('zzz', 'orphan')])
+        assert [data['hook_event_name'] for _, data in transcript_events(path)] == ['PreToolUse', 'Stop']
+
+    def test_meta_messages_are_not_prompts(self, tmp_path):
+        meta = dict(prompt('<command-name>/clear</command-name>'), isMeta=True)
+        path = write_transcript(tmp_path / 't.jsonl', [meta, prompt('hello')])
+        events = [data for _, data in transcript_events(path)]
+        assert [data.get('user_prompt') for data in events[:-1]] == ['hello']
+
+    def test_no_session_no_stop(self, tmp_path):
+        path = tmp_path / 'empty.jsonl'
+        path.write_text('')
+        assert list(transcript_events(str(path))) == []
+
+
+def random_session(rng, count):
+    records = []
+    for i in range(count):
+        kind = rng.randrange(3)
+        if kind == 0:
+            records.append(prompt(rng.choice(['deploy now', 'hello', 'fix the tests'])))
+        else:
+            id = f't{i}'
+            records.append(tool_use(id, rng.choice(['ls', 'rm -rf /tmp/x', 'git status', 'echo rm'])))
+            if kind == 2:
+                records.append(tool_result(id, 'output'))
+    return records
+
+
+class TestAudit:
+    @pytest.fixture
+    def transcripts(self, tmp_path):
+        rng = random.Random(7)
+        root = tmp_path / 'projects'
+        for i in range(6):
+            write_transcript(root / f'p{i % 2}' / f's{i}.jsonl', random_session(rng, rng.randint(5, 40)))
+        (root / 'p0' / 'notes.txt').write_text('not a transcript')
+        return root
+
+    def expected(self, root):
+        hits = {}
+        for path in sorted(root.rglob('*.jsonl')):
+            for _, data in transcript_events(str(path)):
+                command = data.get('tool_input', {}).get('command', '')
+                if data['hook_event_name'] in ('PreToolUse', 'PostToolUse') and 'rm -rf' in command:
+                    hits['no-rm'] = hits.get('no-rm', 0) + 1
+                if 'deploy' in data.get('user_prompt', ''):
+                    hits['deploy-prompt'] = hits.get('deploy-prompt', 0) + 1
+        return hits
+
+    def test_find_transcripts_recurses_largest_first(self, transcripts, tmp_path):
+        single = write_transcript(tmp_path / 'single.jsonl', [prompt('hi')])
+        found = find_transcripts([str(transcripts), single, single])
+        assert sorted(found) == sorted([str(path) for path in transcripts.rglob('*.jsonl')] + [single])
+        sizes = [len(open(path, 'rb').read()) for path in found]
+        assert sizes == sorted(sizes, reverse=True)
+
+    def test_counts_hits_per_rule(self, transcripts):
+        summary = audit([str(transcripts)], RULES, jobs=1)
+        assert summary['transcripts'] == 6
+        assert summary['errors'] == []
+        assert summary['events']['Stop'] == 6
+        assert {name: counts[0] for name, counts in summary['rules'].items()} == self.expected(transcripts)
+        assert 'never' not in summary['rules'] and 'disabled' not in summary['rules']
+        for hits, seen, examples in summary['rules'].values():
+            assert 1 <= seen <= 6 and len(examples) <= 3
+
+    def test_pool_matches_serial(self, transcripts):
+        serial = audit([str(transcripts)], RULES, jobs=1)
+        pooled = audit([str(transcripts)], RULES, jobs=2)
+        for key in ('transcripts', 'bytes', 'errors', 'events'):
+            assert pooled[key] == serial[key]
+        assert ({name: counts[:2] for name, counts in pooled['rules'].items()}
+                == {name: counts[:2] for name, counts in serial['rules'].items()})
+
+    def test_unreadable_transcript_is_reported(self, tmp_path):
+        good = write_transcript(tmp_path / 'good.jsonl', [tool_use('a', 'rm -rf x')])
+        summary = audit([good, str(tmp_path / 'missing.jsonl')], RULES, jobs=1)
+        assert summary['transcripts'] == 2
+        assert len(summary['errors']) == 1 and 'missing.jsonl' in summary['errors'][0]
+        assert summary['rules']['no-rm'][0] == 1
+
+
+class TestReport:
+    def test_lists_hits_and_rules_that_never_matched(self, tmp_path):
+        path = write_transcript(tmp_path / 's.jsonl', [tool_use('a', 'rm -rf a|b')])
+        report = format_report(audit([path], RULES, jobs=1), [rule.name for rule in RULES if rule.enabled])
+        assert '| no-rm | 1 | 1 | s.jsonl:1 PreToolUse `rm -rf a\\|b` |' in report
+        dead = report.split('### Rules that never matched')[1]
+        assert '- deploy-prompt' in dead and '- never' in dead and 'no-rm' not in dead
+
+    def test_every_rule_matched(self, tmp_path):
+        path = write_transcript(tmp_path / 's.jsonl', [tool_use('a', 'rm -rf a')])
+        report = format_report(audit([path], RULES, jobs=1), ['no-rm'])
+        assert 'Every audited rule matched at least once.' in report
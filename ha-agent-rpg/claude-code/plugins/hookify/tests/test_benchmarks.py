@@ -0,0 +1,61 @@
+"""Tests for the latency benchmark's rule files, recordings and comparisons."""
+
+import json
+import os
+import subprocess
+import sys
+
+from hookify.benchmarks.evaluation_plan import synthetic_rules
+from hookify.benchmarks.latency import (
+    OUTPUT_RULES, PLUGIN_ROOT, compare, hook_env, load_recordings, percentile, write_project,
+)
+from hookify.core.config_loader import load_rules
+
+
+def result(case, p50):
+    return {'case': case, 'p50_ms': p50, 'p99_ms': p50 * 2}
+
+
+def test_rule_files_round_trip(project):
+    rules = synthetic_rules(20) + OUTPUT_RULES
+    write_project(str(project), rules)
+    loaded = {rule.name: rule for rule in load_rules()}
+    for rule in rules:
+        assert loaded[rule.name].conditions == rule.conditions
+        assert loaded[rule.name].tool_matcher == rule.tool_matcher
+        assert loaded[rule.name].action == rule.action
+
+
+def test_hook_inputs_are_recorded_for_replay(project):
+    env = dict(hook_env(str(project)), HOOKIFY_RECORD=str(project / 'inputs.jsonl'))
+    data = {'hook_event_name': 'PreToolUse', 'tool_name': 'Bash', 'tool_input': {'command': 'ls'}}
+    for _ in range(2):
+        subprocess.run([sys.executable, os.path.join(PLUGIN_ROOT, 'hooks', 'pretooluse.py')],
+                       input=json.dumps(data).encode('utf-8'), cwd=project, env=env,
+                       capture_output=True, check=True)
+    assert load_recordings([str(project / 'inputs.jsonl')]) == {'PreToolUse': [data, data]}
+
+
+def test_recordings_accept_plain_inputs_and_skip_junk(project):
+    path = project / 'inputs.jsonl'
+    stop = {'hook_event_name': 'Stop', 'reason': 'done'}
+    prompt = {'hook': 'UserPromptSubmit', 'input': {'user_prompt': 'hi'}}
+    path.write_text('\n'.join([json.dumps(stop), 'not json', '[1, 2]', json.dumps({'hook': 'Other', 'input': {}}),
+                               json.dumps(prompt)]) + '\n')
+    assert load_recordings([str(path)]) == {'Stop': [stop], 'UserPromptSubmit': [{'user_prompt': 'hi'}]}
+
+
+def test_percentile():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 0.5) == 50
+    assert percentile(samples, 0.99) == 99
+    assert percentile([3.0], 0.99) == 3
+
+
+def test_compare_flags_only_real_regressions(capsys):
+    old = {'results': [result('a', 1.0), result('b', 0.01), result('c', 2.0), result('gone', 1.0)]}
+    new = {'results': [result('a', 1.5), result('b', 0.03), result('c', 2.1), result('added', 9.0)]}
+    assert compare(old, new, 0.10) == ['a']
+    output = capsys.readouterr().out
+    assert 'REGRESSION' in output
+    assert 'added' not in output
@@ -0,0 +1,90 @@
+"""Tests for the rule daemon and its thin hook client."""
+
+import json
+import os
+import threading
+
+import pytest
+
+from hookify.core.client import evaluate_in_process, request_daemon
+from hookify.core.daemon import RuleDaemon, RuleServer, _socket_in_use
+
+BLOCK_RM = """
+event: bash
+action: block
+conditions:
+  - field: command
+    operator: contains
+    pattern: rm -rf
+"""
+
+
+def bash_input(command):
+    return json.dumps({'hook_event_name': 'PreToolUse', 'tool_name': 'Bash',
+                       'tool_input': {'command': command}}).encode('utf-8')
+
+
+@pytest.fixture
+def daemon(project):
+    socket_path = os.path.join('.claude', 'hookify.sock')
+    server = RuleDaemon(socket_path, RuleServer())
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+class TestProtocol:
+    def test_daemon_answers_like_in_process_evaluation(self, daemon, write_rule):
+        write_rule('no-rm', BLOCK_RM, 'Do not delete recursively')
+        for command in ('rm -rf build', 'ls -la'):
+            raw = bash_input(command)
+            assert request_daemon('PreToolUse', raw) == evaluate_in_process('PreToolUse', raw)
+
+    def test_block_response(self, daemon, write_rule):
+        write_rule('no-rm', BLOCK_RM, 'Do not delete recursively')
+        response = request_daemon('PreToolUse', bash_input('rm -rf build'))
+        assert response['hookSpecificOutput']['permissionDecision'] == 'deny'
+        assert 'Do not delete recursively' in response['systemMessage']
+        assert request_daemon('PreToolUse', bash_input('ls')) == {}
+
+    def test_garbled_input_is_reported_not_raised(self, daemon, write_rule):
+        write_rule('no-rm', BLOCK_RM)
+        response = request_daemon('PreToolUse', b'{"tool_name": ')
+        assert response['systemMessage'].startswith('Hookify error:')
+
+    def test_no_socket_means_no_daemon(self, project):
+        assert request_daemon('PreToolUse', bash_input('ls')) is None
+
+    def test_stale_socket_means_no_daemon(self, project):
+        socket_path = os.path.join('.claude', 'hookify.sock')
+        open(socket_path, 'w').close()
+        assert not _socket_in_use(socket_path)
+        assert request_daemon('PreToolUse', bash_input('ls')) is None
+
+
+class TestReload:
+    def test_edited_rule_is_picked_up(self, daemon, write_rule):
+        write_rule('no-rm', BLOCK_RM, 'First message')
+        assert 'First message' in request_daemon('PreToolUse', bash_input('rm -rf x'))['systemMessage']
+
+        write_rule('no-rm', BLOCK_RM, 'Second, longer message')
+        assert 'Second, longer message' in request_daemon('PreToolUse', bash_input('rm -rf x'))['systemMessage']
+
+    def test_added_and_removed_rules(self, daemon, write_rule):
+        assert request_daemon('PreToolUse', bash_input('rm -rf x')) == {}
+        path = write_rule('no-rm', BLOCK_RM)
+        assert request_daemon('PreToolUse', bash_input('rm -rf x')) != {}
+        path.unlink()
+        assert request_daemon('PreToolUse', bash_input('rm -rf x')) == {}
+
+    def test_rules_are_reused_until_a_file_changes(self, write_rule):
+        write_rule('no-rm', BLOCK_RM)
+        server = RuleServer()
+        first = server.rules_for('bash')
+        assert server.rules_for('bash') is first
+        write_rule('other', BLOCK_RM)
+        assert server.rules_for('bash') is not first
+        assert len(server.rules_for('bash')) == 2
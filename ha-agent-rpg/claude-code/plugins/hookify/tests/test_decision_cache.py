@@ -0,0 +1,152 @@
+"""Tests for the cross-invocation decision cache."""
+
+import json
+
+import pytest
+
+from hookify.core import decision_cache
+from hookify.core.config_loader import Condition, Rule
+from hookify.core.decision_cache import DecisionCache, input_digest, rule_set_digest
+from hookify.core.rule_engine import RuleEngine
+from hookify.utils.cache import get_cache_path
+from hookify.utils.hook_input import load_hook_input
+
+
+def bash_rule(pattern='rm -rf', message='No'):
+    return Rule(name='no-rm', enabled=True, event='bash', action='block', message=message,
+                conditions=[Condition('command', 'contains', pattern)])
+
+
+def bash(command, **extra):
+    return {'hook_event_name': 'PreToolUse', 'tool_name': 'Bash',
+            'tool_input': dict(extra, command=command)}
+
+
+@pytest.fixture
+def evaluations(monkeypatch):
+    """Count evaluations that were not answered from the cache."""
+    calls = []
+    original = RuleEngine._evaluate
+
+    def counting(self, rules, input_data, evaluation):
+        calls.append(input_data)
+        return original(self, rules, input_data, evaluation)
+
+    monkeypatch.setattr(RuleEngine, '_evaluate', counting)
+    return calls
+
+
+class TestEngine:
+    def test_repeated_input_is_answered_from_the_cache(self, evaluations):
+        engine = RuleEngine()
+        rules = [bash_rule()]
+        first = engine.evaluate_rules(rules, bash('rm -rf /tmp/x'))
+        assert engine.evaluate_rules(rules, bash('rm -rf /tmp/x')) == first
+        assert len(evaluations) == 1
+
+    def test_only_fields_the_rules_read_are_keyed(self, evaluations):
+        engine = RuleEngine()
+        rules = [bash_rule()]
+        engine.evaluate_rules(rules, bash('ls', description='one'))
+        engine.evaluate_rules(rules, bash('ls', description='two'))
+        assert len(evaluations) == 1
+        engine.evaluate_rules(rules, bash('ls -la'))
+        assert len(evaluations) == 2
+
+    def test_edited_rules_miss(self, evaluations):
+        engine = RuleEngine()
+        engine.evaluate_rules([bash_rule(message='First')], bash('rm -rf x'))
+        response = engine.evaluate_rules([bash_rule(message='Second')], bash('rm -rf x'))
+        assert 'Second' in response['systemMessage']
+        assert len(evaluations) == 2
+
+    def test_decisions_outlive_the_process(self, evaluations):
+        engine = RuleEngine()
+        first = engine.evaluate_rules([bash_rule()], bash('rm -rf x'))
+        engine.decisions.flush()
+        assert RuleEngine().evaluate_rules([bash_rule()], bash('rm -rf x')) == first
+        assert len(evaluations) == 1
+
+    def test_lazy_and_decoded_input_share_keys(self, evaluations):
+        engine = RuleEngine()
+        data = bash('rm -rf x')
+        first = engine.evaluate_rules([bash_rule()], data)
+        assert engine.evaluate_rules([bash_rule()], load_hook_input(json.dumps(data).encode('utf-8'))) == first
+        assert len(evaluations) == 1
+
+    def test_cached_responses_are_not_shared(self):
+        engine = RuleEngine()
+        engine.evaluate_rules([bash_rule()], bash('rm -rf x'))['systemMessage'] = 'changed'
+        assert engine.evaluate_rules([bash_rule()], bash('rm -rf x'))['systemMessage'] != 'changed'
+
+    def test_transcript_rules_are_never_cached(self, evaluations, project):
+        (project / 't.jsonl').write_text('"done"\n')
+        rule = Rule(name='t', enabled=True, event='stop', conditions=[Condition('transcript', 'contains', 'done')])
+        data = {'hook_event_name': 'Stop', 'transcript_path': str(project / 't.jsonl')}
+        engine = RuleEngine()
+        engine.evaluate_rules([rule], data)
+        engine.evaluate_rules([rule], data)
+        assert len(evaluations) == 2
+
+    def test_timed_out_evaluations_are_not_cached(self, evaluations, monkeypatch):
+        monkeypatch.setenv('HOOKIFY_REGEX_TIMEOUT_MS', '20')
+        rule = Rule(name='slow', enabled=True, event='bash',
+                    conditions=[Condition('command', 'regex_match', r'(a+)+$')])
+        engine = RuleEngine()
+        engine.evaluate_rules([rule], bash('a' * 40 + 'b'))
+        engine.evaluate_rules([rule], bash('a' * 40 + 'b'))
+        assert len(evaluations) == 2
+
+    def test_oversized_input_is_not_cached(self, evaluations, monkeypatch):
+        monkeypatch.setattr(decision_cache, 'DECISION_KEY_MAX_CHARS', 100)
+        monkeypatch.setattr('hookify.core.rule_engine.DECISION_KEY_MAX_CHARS', 100)
+        engine = RuleEngine()
+        for _ in range(2):
+            engine.evaluate_rules([bash_rule()], bash('x' * 200))
+            engine.evaluate_rules([bash_rule()], load_hook_input(json.dumps(bash('y' * 200)).encode('utf-8')))
+        assert len(evaluations) == 4
+
+    def test_disabled_cache(self, evaluations, monkeypatch):
+        monkeypatch.setenv('HOOKIFY_NO_CACHE', '1')
+        engine = RuleEngine()
+        engine.evaluate_rules([bash_rule()], bash('ls'))
+        engine.evaluate_rules([bash_rule()], bash('ls'))
+        assert len(evaluations) == 2
+
+
+class TestDigests:
+    def test_missing_and_empty_fields_differ(self):
+        assert input_digest('r', [None]) != input_digest('r', [''])
+        assert input_digest('r', ['ab', 'c']) != input_digest('r', ['a', 'bc'])
+
+    def test_regex_budget_is_part_of_the_rule_set(self, monkeypatch):
+        before = rule_set_digest([bash_rule()])
+        monkeypatch.setenv('HOOKIFY_REGEX_TIMEOUT_MS', '5')
+        assert rule_set_digest([bash_rule()]) != before
+
+
+class TestSlots:
+    def test_colliding_key_misses(self):
+        cache = DecisionCache()
+        key = input_digest('r', ['a'])
+        cache.put(key, {'systemMessage': 'x'}, [0])
+        cache.flush()
+        other = key[:8] + '0' * 24
+        assert DecisionCache().get(key) == ({'systemMessage': 'x'}, [0])
+        assert DecisionCache().get(other) is None
+
+    def test_corrupt_slot_misses(self):
+        cache = DecisionCache()
+        key = input_digest('r', ['a'])
+        cache.put(key, {}, [])
+        cache.flush()
+        with open(get_cache_path(decision_cache._slot_name(key)), 'w') as f:
+            f.write('{"key": ')
+        assert DecisionCache().get(key) is None
+
+    def test_memory_layer_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(decision_cache, 'DECISIONS_IN_MEMORY', 2)
+        cache = DecisionCache()
+        for i in range(3):
+            cache.put(input_digest('r', [str(i)]), {}, [])
+        assert len(cache._memory) == 2
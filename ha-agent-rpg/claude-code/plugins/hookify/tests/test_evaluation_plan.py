@@ -0,0 +1,124 @@
+"""Differential tests: the evaluation plan against per-condition evaluation.
+
+benchmarks/evaluation_plan.reference_matches evaluates rules the way the
+engine did before evaluation plans. Random rule sets and inputs must get
+the same matching rules from both, whichever path (individual searches,
+shared scans, literal automata) the plan picks.
+"""
+
+import random
+
+import pytest
+
+from hookify.benchmarks.evaluation_plan import reference_matches, synthetic_inputs, synthetic_rules
+from hookify.core.config_loader import Condition, Rule
+from hookify.core.rule_engine import RuleEngine
+
+WORDS = ['rm', '-rf', 'sudo', 'git', 'push', 'eval(', 'API_KEY', 'console.log', '.env',
+         'src/app.py', 'test', 'npm', 'AB', 'ab', '/', '&&', '|', 'echo', 'secret']
+PATTERNS = [r'rm\s+-rf', r'sudo\s+', r'console\.log\(', r'\.env$', r'(API_KEY|SECRET)', r'a+',
+            r'^git', r'push$', r'x|y', r'(a)\1', r'(?i)ab', r'(?P<n>rm)', r'\s', r'e.*t', '',
+            r'(a+)+$', r'\bsrc/\w+\.py\b']
+FIELDS = ['command', 'new_text', 'old_text', 'file_path', 'content', 'user_prompt', 'reason']
+OPERATORS = ['regex_match', 'contains', 'equals', 'not_contains', 'starts_with', 'ends_with']
+TOOL_MATCHERS = [None, '*', 'Bash', 'Edit|Write', 'Read|Bash', 'MultiEdit']
+TOOLS = ['Bash', 'Write', 'Edit', 'MultiEdit', 'Read', '']
+
+
+def random_text(rng):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(0, 6)))
+
+
+def random_rules(rng, count):
+    rules = []
+    for i in range(count):
+        conditions = []
+        for _ in range(rng.randint(0, 3)):
+            operator = rng.choice(OPERATORS)
+            pattern = rng.choice(PATTERNS) if operator == 'regex_match' else rng.choice(WORDS + [''])
+            conditions.append(Condition(rng.choice(FIELDS), operator, pattern))
+        rules.append(Rule(name=f'r{i}', enabled=True, event='all', conditions=conditions,
+                          action=rng.choice(['warn', 'block']), tool_matcher=rng.choice(TOOL_MATCHERS)))
+    return rules
+
+
+def random_input(rng):
+    tool_name = rng.choice(TOOLS)
+    tool_input = {key: random_text(rng) for key in ('command', 'content', 'new_string', 'old_string', 'file_path')
+                  if rng.random() < 0.5}
+    if tool_name == 'MultiEdit':
+        tool_input['edits'] = [{'new_string': random_text(rng)} for _ in range(rng.randint(0, 3))]
+    input_data = {'hook_event_name': rng.choice(['PreToolUse', 'PostToolUse', 'UserPromptSubmit']),
+                  'tool_name': tool_name, 'tool_input': tool_input}
+    for key in ('user_prompt', 'reason'):
+        if rng.random() < 0.3:
+            input_data[key] = random_text(rng)
+    return input_data
+
+
+def names(rules):
+    return [rule.name for rule in rules]
+
+
+@pytest.mark.parametrize('seed', range(8))
+@pytest.mark.parametrize('count', [5, 40, 250])
+def test_random_rules_match_reference(seed, count):
+    rng = random.Random(seed)
+    engine = RuleEngine(decision_cache=False)
+    for _ in range(4):
+        rules = random_rules(rng, count)
+        # Repeated inputs let the plan time scans and switch paths
+        for _ in range(15):
+            input_data = random_input(rng)
+            expected = names(reference_matches(engine, rules, input_data))
+            assert names(engine.matching_rules(rules, input_data)) == expected, input_data
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_shared_scans_match_reference(seed):
+    # Many distinct patterns and literals on one field, so the plan
+    # moves on to shared regex scans and literal automata
+    rng = random.Random(seed)
+    rules = []
+    for i in range(400):
+        operator = rng.choice(OPERATORS)
+        pattern = rf'\btool{i}\b|--opt{i}=' if operator == 'regex_match' else f'arg{i}'
+        conditions = [Condition('command', operator, pattern)]
+        if rng.random() < 0.3:
+            conditions.append(Condition('command', rng.choice(OPERATORS), rng.choice(PATTERNS)))
+        rules.append(Rule(name=f'r{i}', enabled=True, event='bash', conditions=conditions, tool_matcher='Bash'))
+    engine = RuleEngine(decision_cache=False)
+    for _ in range(30):
+        command = ' '.join(rng.choice([f'tool{rng.randrange(400)}', f'--opt{rng.randrange(400)}=1',
+                                       f'arg{rng.randrange(400)}', rng.choice(WORDS)]) for _ in range(8))
+        input_data = {'hook_event_name': 'PreToolUse', 'tool_name': 'Bash', 'tool_input': {'command': command}}
+        assert names(engine.matching_rules(rules, input_data)) == names(reference_matches(engine, rules, input_data))
+
+
+@pytest.mark.parametrize('count', [100, 1000])
+def test_benchmark_rules_match_reference(count):
+    rules = synthetic_rules(count)
+    engine = RuleEngine(decision_cache=False)
+    for _ in range(10):
+        for input_data in synthetic_inputs(4096):
+            assert names(engine.matching_rules(rules, input_data)) == names(reference_matches(engine, rules, input_data))
+
+
+def test_stats_and_plain_evaluation_agree(monkeypatch):
+    rng = random.Random(99)
+    rules = random_rules(rng, 60)
+    inputs = [random_input(rng) for _ in range(40)]
+    plain = RuleEngine(decision_cache=False)
+    expected = [plain.evaluate_rules(rules, data) for data in inputs]
+
+    monkeypatch.setenv('HOOKIFY_STATS', '1')
+    timed = RuleEngine(decision_cache=False)
+    assert [timed.evaluate_rules(rules, data) for data in inputs] == expected
+
+
+def test_plan_is_compiled_once_per_rule_set():
+    rules = random_rules(random.Random(1), 10)
+    engine = RuleEngine(decision_cache=False)
+    assert engine.compile(rules) is engine.compile(rules)
+    assert engine.compile(list(rules)) is engine.compile(rules)
+    assert engine.compile(rules[:5]) is not engine.compile(rules)
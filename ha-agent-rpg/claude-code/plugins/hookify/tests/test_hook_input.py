@@ -0,0 +1,164 @@
+"""Tests for lazy hook input decoding and peek_string."""
+
+import json
+import random
+
+import pytest
+
+from hookify.utils import hook_input
+from hookify.utils.hook_input import PEEK_WINDOW, LazyObject, load_hook_input, peek_string
+
+STRINGS = ['', 'plain', 'quote " inside', 'back\\slash', 'tab\tnew\nline', 'é ключ', '😀 emoji',
+           ' ', '\\"', '"' * 5, 'ends with \\']
+
+
+def random_value(rng, depth=0):
+    kind = rng.randrange(7 if depth < 3 else 4)
+    if kind == 0:
+        return rng.choice(STRINGS) * rng.randint(1, 3)
+    if kind == 1:
+        return rng.choice([0, -1, 3.5, 1e20, 12345678901234567890])
+    if kind == 2:
+        return rng.choice([True, False, None])
+    if kind == 3:
+        return ''.join(rng.choice('ab"\\\n😀é') for _ in range(rng.randint(0, 30)))
+    if kind == 4:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {rng.choice(['a', 'b', 'tool_name', 'content', 'é', '"k"']) + str(i): random_value(rng, depth + 1)
+            for i in range(rng.randint(0, 4))}
+
+
+def dumps(rng, value):
+    return json.dumps(value, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 2]),
+                      separators=rng.choice([None, (',', ':')])).encode('utf-8')
+
+
+def plain(value):
+    """Turn LazyObjects back into dicts."""
+    if isinstance(value, LazyObject):
+        return {key: plain(value[key]) for key in value}
+    if isinstance(value, list):
+        return [plain(item) for item in value]
+    return value
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_random_documents_decode_like_json_loads(seed):
+    rng = random.Random(seed)
+    document = {'tool_name': 'Write', 'tool_input': random_value(rng, 1), 'tool_response': random_value(rng, 1)}
+    for i in range(rng.randint(0, 3)):
+        document[f'extra{i}'] = random_value(rng, 1)
+    raw = dumps(rng, document)
+    expected = json.loads(raw)
+
+    data = load_hook_input(raw)
+    keys = list(expected)
+    rng.shuffle(keys)
+    for key in keys:
+        assert plain(data[key]) == expected[key]
+        if isinstance(expected[key], str):
+            assert data.encoded_string(key).decode() == expected[key]
+    assert plain(data) == expected
+    assert peek_string(raw, 'tool_name') == 'Write'
+
+
+class TestLaziness:
+    def test_unread_values_are_never_decoded(self):
+        raw = json.dumps({'tool_name': 'Write', 'tool_input': {'file_path': '/a.py', 'content': 'x' * 100000}})
+        data = load_hook_input(raw.encode('utf-8'))
+        assert data['tool_input']['file_path'] == '/a.py'
+        assert 'content' not in data['tool_input']._values
+        assert len(data['tool_input'].encoded_string('content')) == 100000
+
+    def test_duplicate_keys_resolve_to_the_first(self):
+        assert load_hook_input(b'{"a": 1, "a": 2}')['a'] == 1
+
+    def test_missing_key(self):
+        data = load_hook_input(b'{"a": 1}')
+        assert 'b' not in data
+        assert data.get('b') is None
+        with pytest.raises(KeyError):
+            data['b']
+
+    def test_not_an_object(self):
+        assert load_hook_input(b' [1, 2]') == [1, 2]
+        with pytest.raises(ValueError):
+            load_hook_input(b'[1, ')
+
+    def test_errors_past_the_key_surface_at_lookup(self):
+        data = load_hook_input(b'{"a": 1, "b": oops}')
+        assert data['a'] == 1
+        with pytest.raises(ValueError):
+            data['b']
+
+    def test_empty_object(self):
+        data = load_hook_input(b'  {  }  ')
+        assert not data
+        assert len(data) == 0
+
+
+class TestRawJSON:
+    def test_values_as_written(self):
+        raw = b'{"a": [1, {"b": "x\\"}"}] , "c": "s", "d": {}}'
+        data = load_hook_input(raw)
+        assert data.raw_json('a').decode() == '[1, {"b": "x\\"}"}]'
+        assert data.raw_json('c').decode() == '"s"'
+        assert data.raw_json('missing') is None
+        assert data.raw_json('a').head(4) == '[1, '
+        assert data.raw_json('a').tail(3) == '"}]'
+        assert data.raw_json('d').tail(10) == '{}'
+        assert plain(data) == json.loads(raw)
+
+
+class TestEncodedString:
+    @pytest.mark.parametrize('seed', range(10))
+    def test_escape_dense_strings_are_scanned_in_windows(self, seed, monkeypatch):
+        monkeypatch.setattr(hook_input, 'QUOTE_PROBES', 0)
+        monkeypatch.setattr(hook_input, 'STRING_SCAN_WINDOW', 8 + seed)
+        rng = random.Random(seed)
+        for _ in range(50):
+            value = ''.join(rng.choice(['a', '"', '\\', '\n', '\u00e9', '\U0001f600', '\\u']) for _ in range(40))
+            raw = json.dumps({'s': value, 't': 1}, ensure_ascii=rng.random() < 0.5).encode('utf-8')
+            data = load_hook_input(raw)
+            assert data.encoded_string('s').decode() == value
+            assert data['t'] == 1
+
+
+    @pytest.mark.parametrize('seed', range(10))
+    def test_slices_never_split_escapes(self, seed):
+        rng = random.Random(seed)
+        value = ''.join(rng.choice(['a', '"', '\\', '\n', '\u00e9', '\U0001f600', '\u2028']) for _ in range(200))
+        ascii_only = rng.random() < 0.5
+        raw = json.dumps({'s': value}, ensure_ascii=ascii_only).encode('utf-8')
+        encoded = load_hook_input(raw).encoded_string('s')
+        for size in range(0, len(encoded) + 2, 7):
+            for part, fits in ((encoded.head(size), value.startswith), (encoded.tail(size), value.endswith)):
+                assert fits(part)
+                # Cut short by at most one escape (a surrogate pair is 12)
+                assert size - 12 < len(json.dumps(part, ensure_ascii=ascii_only)) - 2 <= size or part == value
+
+    def test_non_strings_have_no_encoding(self):
+        data = load_hook_input(b'{"n": 1, "o": {}}')
+        assert data.encoded_string('n') is None
+        assert data.encoded_string('o') is None
+        assert data.encoded_string('missing') is None
+
+
+class TestPeekString:
+    def test_top_level_keys_only(self):
+        raw = b'{"tool_input": {"tool_name": "Inner"}, "tool_name": "Bash"}'
+        assert peek_string(raw, 'tool_name') == 'Bash'
+
+    def test_non_strings_and_missing_keys(self):
+        assert peek_string(b'{"tool_name": 5}', 'tool_name') is None
+        assert peek_string(b'{"other": "x"}', 'tool_name') is None
+        assert peek_string(b'not json', 'tool_name') is None
+        assert peek_string(b'["tool_name", "x"]', 'tool_name') is None
+
+    def test_escaped_values(self):
+        raw = json.dumps({'tool_name': 'a"b\\cé'}).encode('utf-8')
+        assert peek_string(raw, 'tool_name') == 'a"b\\cé'
+
+    def test_key_past_the_window(self):
+        raw = json.dumps({'content': 'x' * (PEEK_WINDOW * 2), 'tool_name': 'Write'}).encode('utf-8')
+        assert peek_string(raw, 'tool_name') == 'Write'
@@ -0,0 +1,71 @@
+"""Tests for LiteralSet answers against plain str methods."""
+
+import random
+
+import pytest
+
+from hookify.core.config_loader import Condition, Rule
+from hookify.core.rule_engine import RuleEngine
+from hookify.matchers.literal_set import AUTOMATON_MIN_LITERALS, AhoCorasick, LiteralSet
+
+
+def check(literal_set, text):
+    hits = literal_set.scan(text)
+    for literal in literal_set.literals:
+        assert hits.contains(literal) == (literal in text), literal
+        assert hits.starts_with(literal) == text.startswith(literal), literal
+        assert hits.ends_with(literal) == text.endswith(literal), literal
+
+
+class TestAhoCorasick:
+    def test_overlapping_and_nested_literals(self):
+        hits = AhoCorasick(['he', 'she', 'his', 'hers', 'e']).scan('ushers')
+        assert hits.found == {'he', 'she', 'hers', 'e'}
+        assert hits.starts == set()
+        assert hits.ends == {'hers'}
+
+    def test_literal_spanning_the_whole_text(self):
+        hits = AhoCorasick(['abc', 'b']).scan('abc')
+        assert hits.starts == {'abc'}
+        assert hits.ends == {'abc'}
+
+    def test_no_literals(self):
+        hits = AhoCorasick(['']).scan('anything')
+        assert not hits.found
+
+
+class TestLiteralSet:
+    def test_empty_literal_matches_everything(self):
+        check(LiteralSet(['', 'x']), 'abc')
+        check(LiteralSet(['', 'x']), '')
+
+    @pytest.mark.parametrize('count', [3, AUTOMATON_MIN_LITERALS, AUTOMATON_MIN_LITERALS * 3])
+    @pytest.mark.parametrize('seed', range(5))
+    def test_random_sets_match_str_methods(self, count, seed):
+        rng = random.Random(seed)
+        literals = [''.join(rng.choice('abcd') for _ in range(rng.randint(1, 5))) for _ in range(count)]
+        literal_set = LiteralSet(literals)
+        assert literal_set.uses_automaton == (len(set(literals)) >= AUTOMATON_MIN_LITERALS)
+        for _ in range(20):
+            check(literal_set, ''.join(rng.choice('abcde') for _ in range(rng.randint(0, 30))))
+
+    def test_unicode_literals(self):
+        literals = [f'ключ{i}' for i in range(AUTOMATON_MIN_LITERALS)] + ['🔑', 'é']
+        check(LiteralSet(literals), 'café ключ7 🔑')
+
+
+class TestEngineOperators:
+    def test_large_literal_rule_sets_match_per_condition_answers(self):
+        rng = random.Random(0)
+        rules = []
+        for i in range(AUTOMATON_MIN_LITERALS * 2):
+            operator = rng.choice(['contains', 'not_contains', 'starts_with', 'ends_with'])
+            literal = rng.choice(['git', 'rm', 'push', '--force', 'sudo', 'ls']) + str(i % 7)
+            rules.append(Rule(name=f'r{i}', enabled=True, event='bash',
+                              conditions=[Condition('command', operator, literal)], action='warn'))
+        engine = RuleEngine(decision_cache=False)
+        for command in ['git3 push0 --force1', 'sudo4 rm5', 'ls6', '']:
+            data = {'hook_event_name': 'PreToolUse', 'tool_name': 'Bash', 'tool_input': {'command': command}}
+            expected = [rule.name for rule in rules if engine._check_condition(rule.conditions[0], 'Bash',
+                                                                                 data['tool_input'], data)]
+            assert [rule.name for rule in engine.matching_rules(rules, data)] == expected
@@ -0,0 +1,118 @@
+"""Tests for the zero-rule fast path and its rule manifest."""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from hookify.core import manifest
+from hookify.core.manifest import MANIFEST_FILE, enabled_events, needs_evaluation
+from hookify.utils.cache import get_cache_path
+
+PLUGIN_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BASH_RULE = """
+event: bash
+pattern: rm -rf
+"""
+
+
+def settle(*paths):
+    """Move mtimes out of the racy window."""
+    past = time.time() - 60
+    for path in paths:
+        os.utime(path, (past, past))
+
+
+def tool_input(tool_name):
+    return json.dumps({'tool_name': tool_name, 'tool_input': {}}).encode('utf-8')
+
+
+@pytest.fixture
+def rebuilds(monkeypatch):
+    calls = []
+    original = manifest._rebuild
+
+    def counting(dir_stat):
+        calls.append(dir_stat)
+        return original(dir_stat)
+
+    monkeypatch.setattr(manifest, '_rebuild', counting)
+    return calls
+
+
+class TestNeedsEvaluation:
+    def test_no_rules_directory(self, project):
+        os.rmdir(project / '.claude')
+        assert not needs_evaluation('PreToolUse', tool_input('Bash'))
+
+    def test_event_filtering(self, write_rule):
+        write_rule('rm', BASH_RULE)
+        assert needs_evaluation('PreToolUse', tool_input('Bash'))
+        assert not needs_evaluation('PreToolUse', tool_input('Write'))
+        assert not needs_evaluation('Stop', b'{}')
+        # Rules for unknown tools are not filtered by event
+        assert needs_evaluation('PreToolUse', tool_input('WebFetch'))
+
+    def test_all_rules_apply_everywhere(self, write_rule):
+        write_rule('any', 'event: all\npattern: x')
+        assert needs_evaluation('Stop', b'{}')
+        assert needs_evaluation('UserPromptSubmit', b'{}')
+
+    def test_disabled_rules_do_not_count(self, write_rule):
+        write_rule('rm', BASH_RULE + 'enabled: false\n')
+        assert not needs_evaluation('PreToolUse', tool_input('Bash'))
+
+
+class TestManifest:
+    def test_settled_manifest_is_reused(self, project, write_rule, rebuilds):
+        os.makedirs(get_cache_path(''))
+        settle(write_rule('rm', BASH_RULE), project / '.claude')
+        assert enabled_events() == {'bash'}
+        assert os.path.exists(get_cache_path(MANIFEST_FILE))
+        assert enabled_events() == {'bash'}
+        assert len(rebuilds) == 1
+
+    def test_added_rule_invalidates(self, project, write_rule):
+        settle(write_rule('rm', BASH_RULE), project / '.claude')
+        assert enabled_events() == {'bash'}
+        write_rule('stop', 'event: stop\npattern: x')
+        assert enabled_events() == {'bash', 'stop'}
+
+    def test_edited_rule_invalidates(self, project, write_rule):
+        path = write_rule('rm', BASH_RULE)
+        settle(path, project / '.claude')
+        assert enabled_events() == {'bash'}
+        write_rule('rm', BASH_RULE + 'enabled: false\n')
+        assert enabled_events() == frozenset()
+
+    def test_racy_state_is_not_saved(self, write_rule):
+        write_rule('rm', BASH_RULE)
+        assert enabled_events() == {'bash'}
+        assert not os.path.exists(get_cache_path(MANIFEST_FILE))
+
+
+def test_fast_path_skips_the_engine(project, write_rule):
+    os.makedirs(get_cache_path(''))
+    settle(write_rule('stop', 'event: stop\npattern: x'), project / '.claude')
+    enabled_events()
+    script = ('import sys; from hookify.core.client import needs_evaluation; '
+              'print(needs_evaluation("PreToolUse", b\'{"tool_name": "Bash"}\'), '
+              '"hookify.core.rule_engine" in sys.modules, "hookify.core.config_loader" in sys.modules)')
+    env = dict(os.environ, PYTHONPATH=PLUGIN_PARENT)
+    output = subprocess.run([sys.executable, '-c', script], cwd=project, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.split() == ['False', 'False', 'False']
+
+
+def test_no_rules_skip_the_hook_input_decoder(project):
+    script = ('import sys; from hookify.core.client import needs_evaluation; '
+              'print(needs_evaluation("PreToolUse", b\'{"tool_name": "Bash"}\'), '
+              '"hookify.utils.hook_input" in sys.modules)')
+    env = dict(os.environ, PYTHONPATH=PLUGIN_PARENT)
+    output = subprocess.run([sys.executable, '-c', script], cwd=project, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.split() == ['False', 'False']
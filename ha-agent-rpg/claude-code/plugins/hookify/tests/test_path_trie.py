@@ -0,0 +1,93 @@
+"""Tests for glob matching with PathTrie."""
+
+import random
+
+import pytest
+
+from hookify.core.config_loader import Condition, Rule
+from hookify.core.rule_engine import RuleEngine
+from hookify.matchers.path_trie import PathTrie, path_segments
+
+ROOT = '/repo'
+
+
+@pytest.mark.parametrize('pattern, path, expected', [
+    # No slash: the name at any depth
+    ('*.env', '/repo/.env', True),
+    ('*.env', '/repo/config/prod.env', True),
+    ('*.env', '/repo/prod.env.bak', False),
+    ('.env', 'deploy/.env', True),
+    ('secrets', '/repo/a/secrets', True),
+    # A slash inside: relative to the project
+    ('src/gen/**', '/repo/src/gen/a/b.py', True),
+    ('src/gen/**', '/repo/lib/src/gen/a.py', False),
+    ('src/gen/**', '/repo/src/gen', False),
+    ('src/*.py', '/repo/src/app.py', True),
+    ('src/*.py', '/repo/src/sub/app.py', False),
+    ('src/**', '/tmp/src/x', False),
+    # Trailing slash: everything below a directory of that name
+    ('vendor/', '/repo/vendor/lib.js', True),
+    ('vendor/', '/repo/a/vendor/b/lib.js', True),
+    ('vendor/', '/repo/vendor', False),
+    # Leading slash: absolute paths outside the project
+    ('/etc/**', '/etc/passwd', True),
+    ('/etc/**', '/repo/etc/passwd', False),
+    # ** spans any number of directories, including none
+    ('**/secrets/*', '/repo/secrets/key', True),
+    ('**/secrets/*', '/repo/a/b/secrets/key', True),
+    ('**/secrets/*', '/repo/secrets/a/key', False),
+    ('a/**/b', '/repo/a/b', True),
+    ('a/**/b', '/repo/a/x/y/b', True),
+    ('**', '/repo/a', True),
+    ('**', '/repo', False),
+    # Wildcards within a segment
+    ('test_?.py', '/repo/tests/test_1.py', True),
+    ('test_?.py', '/repo/tests/test_10.py', False),
+    ('[ab].txt', '/repo/b.txt', True),
+    ('*.PY', '/repo/app.py', False),
+    # Relative paths are taken relative to the project
+    ('src/*.py', 'src/app.py', True),
+    ('src/*.py', './src/../src/app.py', True),
+    ('', '/repo/x', False),
+])
+def test_pattern(pattern, path, expected):
+    assert bool(PathTrie([pattern]).match_path(path, ROOT)) == expected
+
+
+def test_path_segments():
+    assert path_segments('/repo/a/b', ROOT) == ['a', 'b']
+    assert path_segments('a/b', ROOT) == ['a', 'b']
+    assert path_segments('/repo', ROOT) == []
+    assert path_segments('/repository/a', ROOT) == ['/', 'repository', 'a']
+    assert path_segments('../x', ROOT) == ['/', 'x']
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_merged_trie_matches_single_patterns(seed):
+    rng = random.Random(seed)
+    segments = ['src', 'lib', 'a', '*', '**', '*.py', 'test_*', '?', '[ab]*', '.env']
+    patterns = []
+    for _ in range(50):
+        pattern = '/'.join(rng.choice(segments) for _ in range(rng.randint(1, 4)))
+        patterns.append(rng.choice(['', '/', '**/']) + pattern + rng.choice(['', '', '/']))
+    trie = PathTrie(patterns)
+    names = ['src', 'lib', 'a', 'b', 'app.py', 'test_x', '.env', 'x']
+    for _ in range(50):
+        path = '/'.join(rng.choice(names) for _ in range(rng.randint(1, 5)))
+        path = rng.choice(['/repo/', '/tmp/', '']) + path
+        expected = {pattern for pattern in patterns if PathTrie([pattern]).match_path(path, ROOT)}
+        assert trie.match_path(path, ROOT) == expected, path
+
+
+def test_glob_operator_uses_the_hook_cwd():
+    rule = Rule(name='env', enabled=True, event='file', action='block',
+                conditions=[Condition('file_path', 'glob', 'config/*.env')])
+    engine = RuleEngine(decision_cache=False)
+
+    def write(path, cwd):
+        return {'hook_event_name': 'PreToolUse', 'tool_name': 'Write', 'cwd': cwd,
+                'tool_input': {'file_path': path, 'content': ''}}
+
+    assert engine.matching_rules([rule], write('/repo/config/prod.env', '/repo')) == [rule]
+    assert engine.matching_rules([rule], write('/repo/config/prod.env', '/repo/config')) == []
+    assert engine.matching_rules([rule], write('/other/config/prod.env', '/repo')) == []
@@ -0,0 +1,153 @@
+"""Tests for backtracking analysis and regex time budgets."""
+
+import re
+import signal
+import threading
+import time
+
+import pytest
+
+from hookify.core.config_loader import Condition, Rule
+from hookify.core.rule_engine import RuleEngine
+from hookify.matchers import regex_guard
+from hookify.matchers.regex_guard import (
+    EXPONENTIAL, POLYNOMIAL, RegexTimeout, analyze_pattern, analyze_patterns, regex_timeout,
+    rejection_reason, time_budget, timeout_handler,
+)
+from hookify.matchers.regex_set import RegexSet
+
+EVIL = 'a' * 40 + 'b'
+
+
+@pytest.mark.parametrize('pattern, severity', [
+    (r'(a+)+$', EXPONENTIAL),
+    (r'(\w+\s?)+$', EXPONENTIAL),
+    (r'(a|aa)*b', EXPONENTIAL),
+    (r'(a|a)*b', EXPONENTIAL),
+    (r'(?:ab|ab)*c', EXPONENTIAL),
+    (r'(\d{1,3})+x', EXPONENTIAL),
+    (r'(?:\w+)*x', EXPONENTIAL),
+    (r'\w+\s*\w+=', POLYNOMIAL),
+    (r'\d+\s+\d+', POLYNOMIAL),
+    (r'rm\s+-rf', None),
+    (r'(\w+\.)+com', None),
+    (r'(a|ab)*c', None),
+    (r'(ab|ac)*b', None),
+    (r'(foo|bar)+', None),
+    (r'[a-z]+\d+', None),
+    (r'a*b*c*', None),
+    (r'console\.log\(', None),
+    (r'[unclosed', None),
+])
+def test_verdicts(pattern, severity):
+    verdict = analyze_pattern(pattern)
+    assert (verdict[0] if verdict else None) == severity
+
+
+def test_verdicts_are_saved_for_later_processes(monkeypatch):
+    patterns = [r'(a+)+$', r'\w+\s*\w+=', r'(\w+\.)+com']
+    first = analyze_patterns(patterns)
+    assert set(first) == {r'(a+)+$', r'\w+\s*\w+='}
+
+    def fail(pattern):
+        raise AssertionError(f'{pattern} analyzed again')
+
+    monkeypatch.setattr(regex_guard, 'analyze_pattern', fail)
+    assert analyze_patterns(patterns) == first
+
+
+@pytest.mark.parametrize('value, seconds', [(None, 0.1), ('250', 0.25), ('0', 0.0), ('-5', 0.0), ('soon', 0.1)])
+def test_regex_timeout_setting(monkeypatch, value, seconds):
+    if value is not None:
+        monkeypatch.setenv('HOOKIFY_REGEX_TIMEOUT_MS', value)
+    assert regex_timeout() == seconds
+
+
+class TestTimeBudget:
+    def test_interrupts_a_catastrophic_search(self):
+        start = time.perf_counter()
+        with pytest.raises(RegexTimeout):
+            with time_budget(0.02):
+                re.search(r'(a+)+$', EVIL)
+        assert time.perf_counter() - start < 1
+
+    def test_restores_the_previous_handler(self):
+        previous = signal.getsignal(signal.SIGALRM)
+        with timeout_handler():
+            with time_budget(0.5):
+                pass
+            assert signal.getsignal(signal.SIGALRM) is not previous
+            with time_budget(0.5):
+                pass
+        assert signal.getsignal(signal.SIGALRM) is previous
+
+    def test_unused_handler_is_never_installed(self):
+        previous = signal.getsignal(signal.SIGALRM)
+        with timeout_handler():
+            with time_budget(0):
+                assert signal.getsignal(signal.SIGALRM) is previous
+
+    def test_does_nothing_off_the_main_thread(self):
+        errors = []
+
+        def search():
+            try:
+                with time_budget(0.001):
+                    time.sleep(0.01)
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=search)
+        thread.start()
+        thread.join()
+        assert errors == []
+
+
+class TestRejection:
+    def test_exponential_patterns_run_under_a_budget(self):
+        assert rejection_reason(r'(a+)+$') is None
+
+    def test_exponential_patterns_are_rejected_without_a_budget(self, monkeypatch):
+        monkeypatch.setenv('HOOKIFY_REGEX_TIMEOUT_MS', '0')
+        assert 'no time budget' in rejection_reason(r'(a+)+$')
+        assert rejection_reason(r'\w+\s*\w+=') is None
+        assert rejection_reason(r'rm\s+-rf') is None
+
+    def test_exponential_patterns_are_rejected_off_the_main_thread(self):
+        reasons = []
+        thread = threading.Thread(target=lambda: reasons.append(rejection_reason(r'(a+)+$')))
+        thread.start()
+        thread.join()
+        assert reasons[0] is not None
+
+
+class TestFlaggedPatterns:
+    def test_flagged_pattern_matches_ordinary_text(self, capsys):
+        regex_set = RegexSet([r'(a+)+$', 'plain'])
+        assert regex_set.matches('xaaa') == {r'(a+)+$'}
+        assert regex_set.search(r'(a+)+$', 'xaaa')
+        assert 'may be slow' in capsys.readouterr().err
+
+    def test_flagged_pattern_is_skipped_once_it_times_out(self, monkeypatch, capsys):
+        monkeypatch.setenv('HOOKIFY_REGEX_TIMEOUT_MS', '20')
+        regex_set = RegexSet([r'(a+)+$', 'a'])
+        assert regex_set.matches(EVIL) == {'a'}
+        assert regex_set.skipped == {r'(a+)+$'}
+        assert regex_set.timeouts == 1
+        assert 'exceeded the 20ms time budget' in capsys.readouterr().err
+        assert regex_set.matches('aaa') == {'a'}
+
+    def test_flagged_block_rule_still_blocks(self):
+        rule = Rule(name='no-repeat', enabled=True, event='bash', action='block',
+                    conditions=[Condition('command', 'regex_match', r'(\w+\s?)+$')])
+        data = {'hook_event_name': 'PreToolUse', 'tool_name': 'Bash', 'tool_input': {'command': 'echo hi'}}
+        response = RuleEngine(decision_cache=False).evaluate_rules([rule], data)
+        assert response['hookSpecificOutput']['permissionDecision'] == 'deny'
+
+    def test_rejected_pattern_never_matches(self, monkeypatch, capsys):
+        monkeypatch.setenv('HOOKIFY_REGEX_TIMEOUT_MS', '0')
+        regex_set = RegexSet([r'(a+)+$', 'a'])
+        assert regex_set.matches('aaa') == {'a'}
+        assert regex_set.skipped == {r'(a+)+$'}
+        assert not regex_set.search(r'(a+)+$', 'aaa')
+        assert capsys.readouterr().err.count('Skipping') == 1
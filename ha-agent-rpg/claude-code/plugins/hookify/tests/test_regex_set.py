@@ -0,0 +1,97 @@
+"""Tests for RegexSet attribution against one search per pattern."""
+
+import random
+import re
+
+import pytest
+
+from hookify.matchers.regex_set import CHUNK_SIZE, STALE_MATCH_LIMIT, RegexSet
+
+
+def expected(patterns, text, flags=re.IGNORECASE):
+    """One search per pattern; invalid patterns never match."""
+    found = set()
+    for pattern in patterns:
+        try:
+            if re.search(pattern, text, flags):
+                found.add(pattern)
+        except re.error:
+            pass
+    return found
+
+
+class TestAttribution:
+    def test_overlapping_matches_are_all_found(self):
+        patterns = ['abc', 'bcd', 'cd', 'b', r'a\w+', 'x']
+        assert RegexSet(patterns).matches('abcd') == expected(patterns, 'abcd')
+
+    def test_nested_matches_are_all_found(self):
+        patterns = ['password', 'pass', 'word', 'ass', r'p\w+d']
+        text = 'export PASSWORD=1'
+        assert RegexSet(patterns).matches(text) == set(patterns)
+
+    def test_many_patterns_matching_one_text(self):
+        patterns = [f'item{i}\\b' for i in range(40)] + ['item', r'\d+']
+        text = ' '.join(f'item{i}' for i in range(0, 40, 3))
+        assert RegexSet(patterns).matches(text) == expected(patterns, text)
+
+    def test_pattern_matching_everywhere(self):
+        patterns = [r'\s', r'\w', 'needle']
+        text = 'a b ' * (STALE_MATCH_LIMIT * 4) + 'needle'
+        assert RegexSet(patterns).matches(text) == set(patterns)
+
+    def test_patterns_across_chunks(self):
+        patterns = [f'tok{i:04d}' for i in range(CHUNK_SIZE * 2 + 5)]
+        text = 'tok0003 tok0200 tok0260'
+        assert RegexSet(patterns).matches(text) == {'tok0003', 'tok0200', 'tok0260'}
+
+    def test_unmergeable_patterns(self):
+        patterns = [r'(a)\1', r'(?P<x>b)(?P=x)', r'(?i)CASE', r'(?P<y>c)d', 'plain']
+        text = 'aa bb case cd plain'
+        assert RegexSet(patterns, flags=0).matches(text) == set(patterns)
+
+    def test_invalid_patterns_never_match(self):
+        regex_set = RegexSet(['a)|(b', '[unclosed', 'ok'])
+        assert regex_set.matches('a b ok [unclosed') == {'ok'}
+        assert regex_set.invalid == {'a)|(b', '[unclosed'}
+
+    def test_flags_apply_to_every_pattern(self):
+        assert RegexSet(['abc', 'DEF']).matches('ABC def') == {'abc', 'DEF'}
+        assert RegexSet(['abc', 'DEF'], flags=0).matches('ABC def') == set()
+
+    def test_duplicates_are_collapsed(self):
+        regex_set = RegexSet(['a', 'a', 'b'])
+        assert len(regex_set) == 2
+        assert regex_set.matches('ab') == {'a', 'b'}
+
+    @pytest.mark.parametrize('seed', range(20))
+    def test_random_sets_match_individual_searches(self, seed):
+        rng = random.Random(seed)
+        atoms = ['a', 'b', 'ab', 'ba', r'\w', r'\d', 'c?', '[ab]', '(?:ab|c)', r'\b']
+        patterns = [''.join(rng.choice(atoms) for _ in range(rng.randint(1, 4)))
+                    + rng.choice(['', '+', '*', '$']) for _ in range(rng.randint(1, 60))]
+        regex_set = RegexSet(patterns)
+        for _ in range(10):
+            text = ''.join(rng.choice('abc 1\n') for _ in range(rng.randint(0, 40)))
+            assert regex_set.matches(text) == expected(patterns, text), text
+            for pattern in patterns:
+                assert regex_set.search(pattern, text) == (pattern in expected(patterns, text))
+
+
+class TestSearch:
+    def test_search_compiles_only_the_pattern_asked_for(self):
+        regex_set = RegexSet(['foo', 'bar'])
+        assert regex_set.search('foo', 'a foo')
+        assert not regex_set.search('bar', 'a foo')
+        assert not regex_set._chunks
+
+    def test_invalid_pattern_is_reported_once(self, capsys):
+        regex_set = RegexSet(['[bad', 'ok'])
+        assert not regex_set.search('[bad', 'x')
+        assert regex_set.matches('ok [bad') == {'ok'}
+        assert capsys.readouterr().err.count('[bad') == 1
+
+    def test_scan_pays_once_half_the_patterns_are_needed(self):
+        regex_set = RegexSet([f'p{i}' for i in range(10)])
+        assert not regex_set.scan_pays(4)
+        assert regex_set.scan_pays(5)
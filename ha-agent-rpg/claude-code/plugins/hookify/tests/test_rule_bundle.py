@@ -0,0 +1,158 @@
+"""Tests for the compiled rule bundle behind config_loader.load_rules."""
+
+import json
+import os
+import time
+
+import pytest
+
+from hookify.core import config_loader
+from hookify.core.config_loader import RULE_BUNDLE_FILE, load_rule_files, load_rules
+from hookify.utils.cache import get_cache_path
+
+RULE = """
+event: bash
+conditions:
+  - field: command
+    operator: contains
+    pattern: {pattern}
+"""
+
+
+def settle(path):
+    """Move a rule file's mtime out of the racy window."""
+    past = time.time() - 60
+    os.utime(path, (past, past))
+
+
+def bundle_files():
+    try:
+        with open(get_cache_path(RULE_BUNDLE_FILE)) as f:
+            return json.load(f)['files']
+    except FileNotFoundError:
+        return {}
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Count calls to load_rule_file (a bundle hit makes none)."""
+    calls = []
+    original = config_loader.load_rule_file
+
+    def counting(file_path):
+        calls.append(file_path)
+        return original(file_path)
+
+    monkeypatch.setattr(config_loader, 'load_rule_file', counting)
+    return calls
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """Count rewrites of the rule bundle."""
+    calls = []
+    original = config_loader._write_rule_bundle
+
+    def counting(entries):
+        calls.append(entries)
+        original(entries)
+
+    monkeypatch.setattr(config_loader, '_write_rule_bundle', counting)
+    return calls
+
+
+class TestBundle:
+    def test_settled_rules_load_without_parsing(self, write_rule, parses):
+        settle(write_rule('a', RULE.format(pattern='rm')))
+        settle(write_rule('b', RULE.format(pattern='dd')))
+        first = load_rules('bash')
+        assert len(parses) == 2
+
+        second = load_rules('bash')
+        assert len(parses) == 2
+        assert second == first
+
+    def test_edited_rule_is_reparsed(self, write_rule, parses):
+        path = write_rule('a', RULE.format(pattern='rm'))
+        settle(path)
+        load_rules()
+        settle(write_rule('a', RULE.format(pattern='shred')))
+        assert [c.pattern for c in load_rules()[0].conditions] == ['shred']
+        assert len(parses) == 2
+
+    def test_removed_rule_leaves_the_bundle(self, write_rule):
+        settle(write_rule('a', RULE.format(pattern='rm')))
+        path = write_rule('b', RULE.format(pattern='dd'))
+        settle(path)
+        load_rules()
+        path.unlink()
+        assert [rule.name for rule in load_rules()] == ['a']
+        assert list(bundle_files()) == [os.path.join('.claude', 'hookify.a.local.md')]
+
+    def test_invalid_files_are_not_cached(self, project):
+        path = project / '.claude' / 'hookify.broken.local.md'
+        path.write_text('no frontmatter here\n')
+        settle(path)
+        assert load_rule_files() == [(os.path.join('.claude', 'hookify.broken.local.md'), None)]
+        assert bundle_files() == {}
+
+    @pytest.mark.parametrize('error, message', [
+        (ValueError('bad operator'), 'Failed to parse'),
+        (OSError('gone'), 'Failed to read'),
+        (RuntimeError('bug'), 'Unexpected error loading'),
+    ])
+    def test_load_errors_are_told_apart(self, write_rule, monkeypatch, capsys, error, message):
+        write_rule('a', RULE.format(pattern='rm'))
+
+        def fail(file_path):
+            raise error
+        monkeypatch.setattr(config_loader, 'load_rule_file', fail)
+        assert load_rule_files() == [(os.path.join('.claude', 'hookify.a.local.md'), None)]
+        assert message in capsys.readouterr().err
+
+    def test_corrupt_bundle_is_ignored(self, write_rule):
+        settle(write_rule('a', RULE.format(pattern='rm')))
+        load_rules()
+        with open(get_cache_path(RULE_BUNDLE_FILE), 'w') as f:
+            f.write('{"version": 1, "files": ')
+        assert [rule.name for rule in load_rules()] == ['a']
+
+    def test_disabled_cache_writes_nothing(self, write_rule, monkeypatch):
+        monkeypatch.setenv('HOOKIFY_NO_CACHE', '1')
+        settle(write_rule('a', RULE.format(pattern='rm')))
+        assert [rule.name for rule in load_rules()] == ['a']
+        assert not os.path.exists(get_cache_path(RULE_BUNDLE_FILE))
+
+
+class TestRacyWindow:
+    def test_freshly_written_rule_is_not_cached(self, write_rule, parses):
+        write_rule('a', RULE.format(pattern='rm'))
+        load_rules()
+        load_rules()
+        assert len(parses) == 2
+        assert bundle_files() == {}
+
+    def test_racy_rule_does_not_rewrite_the_bundle(self, write_rule, writes):
+        settle(write_rule('a', RULE.format(pattern='rm')))
+        load_rules()
+        assert len(writes) == 1
+
+        settle_later = write_rule('b', RULE.format(pattern='dd'))
+        for _ in range(3):
+            load_rules()
+        assert len(writes) == 1
+
+        settle(settle_later)
+        load_rules()
+        assert len(writes) == 2
+        assert len(bundle_files()) == 2
+
+    def test_racy_edit_keeps_the_stale_entry_out_of_use(self, write_rule, parses):
+        path = write_rule('a', RULE.format(pattern='rm'))
+        settle(path)
+        load_rules()
+        # Same size, fresh mtime: must be re-parsed, not served from the bundle
+        write_rule('a', RULE.format(pattern='dd'))
+        assert [c.pattern for c in load_rules()[0].conditions] == ['dd']
+        assert [c.pattern for c in load_rules()[0].conditions] == ['dd']
+        assert len(parses) == 3
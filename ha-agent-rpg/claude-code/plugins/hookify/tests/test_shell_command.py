@@ -0,0 +1,110 @@
+"""Tests for parsed shell command fields."""
+
+import random
+
+import pytest
+
+from hookify.core.config_loader import Condition, Rule
+from hookify.core.rule_engine import RuleEngine
+from hookify.utils.shell_command import SHELL_FIELDS, parse_command
+
+
+def fields(command):
+    parsed = parse_command(command)
+    return {field: list(parsed.values(field)) for field in SHELL_FIELDS}
+
+
+class TestParse:
+    def test_documented_example(self):
+        assert fields('cd /tmp && FOO=1 rm -rf "a b" 2>/dev/null | tee log') == {
+            'argv0': ['cd', 'rm', 'tee'],
+            'args': ['/tmp', '-rf', 'a b', 'log'],
+            'segment': ['cd /tmp', 'rm -rf a b', 'tee log'],
+            'pipeline': ['cd', 'rm | tee'],
+            'redirect': ['/dev/null'],
+        }
+
+    def test_quotes_and_escapes(self):
+        assert fields("echo 'a;b' a\\ b \"$HOME/x\"")['args'] == ['a;b', 'a b', '$HOME/x']
+
+    def test_program_directory_is_dropped(self):
+        assert fields('/usr/bin/sudo rm x')['argv0'] == ['sudo']
+
+    def test_substitutions_are_parsed_as_commands(self):
+        result = fields('echo $(rm -rf /) `ls -l` <(git log)')
+        assert result['argv0'] == ['rm', 'ls', 'git', 'echo']
+        assert 'rm -rf /' in result['segment']
+
+    def test_here_documents_are_not_commands(self):
+        result = fields('cat <<EOF\nrm -rf /\nEOF\necho done')
+        assert result['argv0'] == ['cat', 'echo']
+        assert result['redirect'] == []
+
+    def test_comments_are_ignored(self):
+        assert fields('ls # rm -rf /')['segment'] == ['ls']
+
+    def test_compound_command_keywords(self):
+        assert fields('if true; then git push --force; fi')['argv0'] == ['true', 'git']
+        assert fields('for f in *; do rm "$f"; done')['segment'] == ['rm $f']
+
+    def test_fd_duplication_is_not_a_file(self):
+        assert fields('make > out.log 2>&1 < in.txt')['redirect'] == ['out.log', 'in.txt']
+
+    def test_malformed_input_parses_as_far_as_it_goes(self):
+        assert fields('echo "unclosed')['args'] == ['unclosed']
+        assert fields('echo $(ls')['argv0'] == ['ls', 'echo']
+
+    def test_deep_nesting_does_not_recurse_forever(self):
+        fields('echo ' + '$(' * 500 + 'x' + ')' * 500)
+
+    @pytest.mark.parametrize('seed', range(20))
+    def test_random_input_never_raises(self, seed):
+        rng = random.Random(seed)
+        alphabet = ['a', ' ', '"', "'", '\\', '$(', ')', '`', '|', '&&', ';', '>', '<<', 'EOF', '\n', '#', '{', '}']
+        for _ in range(50):
+            fields(''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))))
+
+    def test_parses_are_cached(self):
+        assert parse_command('git status') is parse_command('git status')
+
+
+class TestRules:
+    def rule(self, field, operator, pattern, name='r'):
+        return Rule(name=name, enabled=True, event='bash', conditions=[Condition(field, operator, pattern)])
+
+    def matches(self, rules, command):
+        data = {'hook_event_name': 'PreToolUse', 'tool_name': 'Bash', 'tool_input': {'command': command}}
+        return [rule.name for rule in RuleEngine(decision_cache=False).matching_rules(rules, data)]
+
+    def test_any_value_matches(self):
+        rules = [self.rule('argv0', 'equals', 'rm')]
+        assert self.matches(rules, 'cd x && rm -rf y') == ['r']
+        assert self.matches(rules, 'echo rm') == []
+
+    def test_not_contains_holds_for_every_value(self):
+        rules = [self.rule('args', 'not_contains', '--force')]
+        assert self.matches(rules, 'git push origin') == ['r']
+        assert self.matches(rules, 'git fetch && git push --force') == []
+
+    def test_regex_on_segments(self):
+        rules = [self.rule('segment', 'regex_match', r'^git push .*--force')]
+        assert self.matches(rules, 'cd repo && git push origin main --force') == ['r']
+        assert self.matches(rules, 'echo "git push --force"') == []
+
+    @pytest.mark.parametrize('seed', range(5))
+    def test_shared_scans_match_per_value_answers(self, seed):
+        rng = random.Random(seed)
+        operators = ['regex_match', 'contains', 'equals', 'not_contains', 'starts_with', 'ends_with']
+        words = ['git', 'push', '--force', 'rm', '-rf', 'sudo', 'ls', 'tee', 'log', 'a b']
+        rules = [self.rule(rng.choice(SHELL_FIELDS), rng.choice(operators),
+                           rng.choice(words) + str(i % 3), name=f'r{i}') for i in range(300)]
+        engine = RuleEngine(decision_cache=False)
+        for _ in range(20):
+            command = ' '.join(rng.choice(words + ['&&', '|', '>', ';']) + str(rng.randrange(3))
+                               for _ in range(rng.randint(1, 10)))
+            parsed = parse_command(command)
+            expected = [rule.name for rule in rules
+                        if engine._match_values(rule.conditions[0].operator, rule.conditions[0].pattern,
+                                                parsed.values(rule.conditions[0].field))]
+            data = {'hook_event_name': 'PreToolUse', 'tool_name': 'Bash', 'tool_input': {'command': command}}
+            assert [rule.name for rule in engine.matching_rules(rules, data)] == expected, command
@@ -0,0 +1,115 @@
+"""Tests for per-rule stats recording, folding and reporting."""
+
+import os
+
+import pytest
+
+from hookify.core import stats
+from hookify.core.config_loader import Condition, Rule
+from hookify.core.rule_engine import RuleEngine
+from hookify.core.stats import (
+    STATS_LOG, fold_log, format_report, load_stats, reset_stats,
+)
+from hookify.utils.cache import get_cache_path
+
+RULES = [
+    Rule(name='no-rm', enabled=True, event='bash', action='block',
+         conditions=[Condition('command', 'contains', 'rm -rf')]),
+    Rule(name='no-sudo', enabled=True, event='bash', action='warn',
+         conditions=[Condition('command', 'regex_match', r'^sudo\b')]),
+    Rule(name='file-only', enabled=True, event='file', tool_matcher='Write',
+         conditions=[Condition('content', 'contains', 'TODO')]),
+]
+
+
+def bash(command):
+    return {'hook_event_name': 'PreToolUse', 'tool_name': 'Bash', 'tool_input': {'command': command}}
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setenv('HOOKIFY_STATS', '1')
+
+
+def run(engine, *commands):
+    for command in commands:
+        engine.evaluate_rules(RULES, bash(command))
+
+
+class TestRecording:
+    def test_rule_outcomes(self, enabled):
+        run(RuleEngine(decision_cache=False), 'rm -rf x', 'sudo ls', 'sudo rm -rf x', 'ls')
+        totals = load_stats()
+        assert totals['events']['PreToolUse'][:2] == [4, 0]
+        # [evaluations, ns, max_ns, matches, blocks] per rule
+        counts = {name: (values[0], values[3], values[4]) for name, values in totals['rules'].items()}
+        assert counts == {'no-rm': (4, 2, 2), 'no-sudo': (4, 2, 0), 'file-only': (4, 0, 0)}
+        assert 'command' in totals['fields']
+
+    def test_cache_hits_credit_matches_but_not_evaluations(self, enabled):
+        engine = RuleEngine()
+        run(engine, 'rm -rf x', 'rm -rf x', 'rm -rf x')
+        totals = load_stats()
+        assert totals['events']['PreToolUse'][:2] == [3, 2]
+        assert totals['rules']['no-rm'][0] == 1
+        assert totals['rules']['no-rm'][3:] == [3, 3]
+
+    def test_daemon_records_are_combined(self, enabled):
+        engine = RuleEngine(decision_cache=False, stats_flush_seconds=3600)
+        run(engine, 'rm -rf x', 'ls')
+        assert not os.path.exists(get_cache_path(STATS_LOG))
+        engine.stats.flush()
+        with open(get_cache_path(STATS_LOG)) as f:
+            assert len(f.readlines()) == 1
+        assert load_stats()['rules']['no-rm'][0] == 2
+
+    def test_nothing_is_recorded_when_disabled(self):
+        run(RuleEngine(decision_cache=False), 'rm -rf x')
+        assert load_stats()['events'] == {}
+
+
+class TestStore:
+    def test_folding_keeps_the_totals(self, enabled):
+        run(RuleEngine(decision_cache=False), 'rm -rf x', 'sudo ls')
+        before = load_stats()
+        fold_log()
+        assert not os.path.exists(get_cache_path(STATS_LOG))
+        after = load_stats()
+        assert after['rules'] == before['rules']
+        assert after['events'] == before['events']
+
+        run(RuleEngine(decision_cache=False), 'ls')
+        assert load_stats()['rules']['no-rm'][0] == 3
+
+    def test_large_log_is_folded(self, enabled, monkeypatch):
+        monkeypatch.setattr(stats, 'FOLD_BYTES', 100)
+        run(RuleEngine(decision_cache=False), 'rm -rf x', 'ls')
+        assert os.path.exists(get_cache_path(stats.STATS_TOTALS))
+        assert load_stats()['rules']['no-rm'][0] == 2
+
+    def test_torn_lines_are_skipped(self, enabled):
+        run(RuleEngine(decision_cache=False), 'rm -rf x')
+        with open(get_cache_path(STATS_LOG), 'a') as f:
+            f.write('{"since": 1, "events": {"Pre\n')
+        run(RuleEngine(decision_cache=False), 'ls')
+        assert load_stats()['rules']['no-rm'][0] == 2
+
+    def test_reset(self, enabled):
+        run(RuleEngine(decision_cache=False), 'rm -rf x')
+        fold_log()
+        run(RuleEngine(decision_cache=False), 'ls')
+        reset_stats()
+        assert load_stats()['events'] == {}
+
+
+class TestReport:
+    def test_lists_rules_that_never_matched(self, enabled):
+        run(RuleEngine(decision_cache=False), 'rm -rf x')
+        report = format_report(load_stats(), rule_names=['no-rm', 'no-sudo', 'unused'])
+        dead = report.split('### Rules that never matched')[1]
+        assert '- no-sudo (1 evaluations)' in dead
+        assert '- unused (0 evaluations)' in dead
+        assert 'no-rm' not in dead
+
+    def test_empty_report(self):
+        assert 'No evaluations recorded yet' in format_report(load_stats())
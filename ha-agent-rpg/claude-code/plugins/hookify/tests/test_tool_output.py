@@ -0,0 +1,136 @@
+"""Tests for the bounded output fields of PostToolUse rules."""
+
+import json
+import time
+import tracemalloc
+
+import pytest
+
+from hookify.core.config_loader import Condition, Rule
+from hookify.core.rule_engine import RuleEngine
+from hookify.utils.hook_input import load_hook_input
+from hookify.utils.tool_output import DEFAULT_OUTPUT_BYTES, ELISION, OUTPUT_FIELDS, output_field
+
+
+def post(tool_response, tool_name='Bash'):
+    return {'hook_event_name': 'PostToolUse', 'tool_name': tool_name,
+            'tool_input': {}, 'tool_response': tool_response}
+
+
+def encode(data):
+    """Encode hook input the way Claude Code does (JSON.stringify)."""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def both(data):
+    """The input as a dict and as lazily decoded hook input."""
+    return [data, load_hook_input(encode(data))]
+
+
+@pytest.fixture
+def small_budgets(monkeypatch):
+    monkeypatch.setenv('HOOKIFY_OUTPUT_BYTES', '40')
+    monkeypatch.setenv('HOOKIFY_OUTPUT_WINDOW_BYTES', '10')
+
+
+class TestSources:
+    @pytest.mark.parametrize('response, text', [
+        ({'stdout': 'out', 'stderr': 'err'}, 'out\nerr'),
+        ({'stdout': 'out', 'stderr': ''}, 'out'),
+        ({'file': {'content': 'line 1'}}, 'line 1'),
+        ('plain string', 'plain string'),
+        ({'success': True}, '{"success":true}'),
+        ({'filePath': '/a.py', 'oldString': 'é', 'newString': 'b'},
+         '{"filePath":"/a.py","oldString":"é","newString":"b"}'),
+        ([{'type': 'text', 'text': 'hi'}], '[{"type":"text","text":"hi"}]'),
+    ])
+    def test_output_text(self, response, text):
+        for data in both(post(response)):
+            assert output_field('output', data) == text
+
+    def test_no_tool_response(self):
+        for data in both({'hook_event_name': 'PreToolUse', 'tool_name': 'Bash', 'tool_input': {}}):
+            for field in OUTPUT_FIELDS:
+                assert output_field(field, data) is None
+
+
+class TestBudgets:
+    def test_json_responses_are_sliced(self, small_budgets):
+        response = [{'type': 'text', 'text': 'a' * 100}, {'type': 'text', 'text': 'FAILED'}]
+        text = json.dumps(response, separators=(',', ':'))
+        for data in both(post(response, tool_name='mcp__tests__run')):
+            assert output_field('output', data) == text[:20] + ELISION + text[-20:]
+            assert output_field('output_head', data) == '[{"type":"'
+            assert output_field('output_tail', data) == '"FAILED"}]'
+
+    def test_small_output_is_whole(self, small_budgets):
+        for data in both(post({'stdout': 'a' * 20, 'stderr': 'b' * 19})):
+            assert output_field('output', data) == 'a' * 20 + '\n' + 'b' * 19
+            assert output_field('output_head', data) == 'a' * 10
+            assert output_field('output_tail', data) == 'b' * 10
+
+    def test_large_output_keeps_head_and_tail(self, small_budgets):
+        stdout = ''.join(chr(ord('a') + i % 26) for i in range(1000))
+        for data in both(post({'stdout': stdout})):
+            assert output_field('output', data) == stdout[:20] + ELISION + stdout[-20:]
+
+    def test_windows_span_streams(self, small_budgets):
+        for data in both(post({'stdout': 'abcdef', 'stderr': 'uvwxyz'})):
+            assert output_field('output_head', data) == 'abcdef\nuvw'
+            assert output_field('output_tail', data) == 'def\nuvwxyz'
+
+    def test_escapes_are_never_split(self, small_budgets):
+        stdout = 'é"\\\n' * 100
+        data = load_hook_input(encode(post({'stdout': stdout})))
+        for field, fits in (('output_head', stdout.startswith), ('output_tail', stdout.endswith)):
+            assert fits(output_field(field, data))
+
+    def test_budgets_change_the_decision_cache_key(self, monkeypatch):
+        rule = Rule(name='fail', enabled=True, event='bash',
+                    conditions=[Condition('output', 'contains', 'FAILED')])
+        engine = RuleEngine()
+        data = post({'stdout': 'x' * 100 + 'FAILED' + 'x' * 100})
+        assert engine.evaluate_rules([rule], data)
+        monkeypatch.setenv('HOOKIFY_OUTPUT_BYTES', '40')
+        assert engine.evaluate_rules([rule], data) == {}
+
+
+def test_tail_rule_on_huge_output():
+    rule = Rule(name='fail', enabled=True, event='bash', tool_matcher='Bash',
+                conditions=[Condition('output_tail', 'regex_match', r'\bFAILED\b')])
+    stdout = 'PASS test_ok\n' * 200000 + 'FAILED test_broken\n'
+    engine = RuleEngine(decision_cache=False)
+    for data in both(post({'stdout': stdout})):
+        assert engine.matching_rules([rule], data) == [rule]
+    assert engine.matching_rules([rule], post({'stdout': 'FAILED early\n' + stdout[:-19]})) == []
+
+
+@pytest.mark.parametrize('response', [
+    {'filePath': '/big.py', 'oldString': 'x', 'newString': 'y', 'originalFile': 'print("x")\n' * 300000},
+    [{'type': 'text', 'text': 'print("x")\n' * 300000}],
+], ids=['edit', 'content-blocks'])
+def test_json_responses_are_never_decoded(response):
+    raw = encode(post(response, tool_name='mcp__big'))
+    baseline = encode(post({'stdout': 'print("x")\n' * 300000}))
+
+    def cost(raw):
+        start = time.perf_counter()
+        for field in OUTPUT_FIELDS:
+            output_field(field, load_hook_input(raw))
+        return time.perf_counter() - start
+
+    # Within a few times a stdout response of the same size, whose output
+    # is only decoded in windows
+    assert cost(raw) < 5 * cost(baseline) + 0.01
+
+    lazy = load_hook_input(raw)
+    tracemalloc.start()
+    try:
+        for field in OUTPUT_FIELDS:
+            output_field(field, lazy)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # Bounded by the budgets, not the response
+    assert len(raw) > 10 * DEFAULT_OUTPUT_BYTES
+    assert peak < 4 * DEFAULT_OUTPUT_BYTES
@@ -0,0 +1,157 @@
+"""Tests for incremental transcript scanning."""
+
+import json
+import random
+
+import pytest
+
+from hookify.utils import transcript
+from hookify.utils.transcript import TranscriptScanner, _check_text
+
+
+def record(text):
+    return json.dumps({'message': text}) + '\n'
+
+
+@pytest.fixture
+def log(project):
+    path = project / 'session.jsonl'
+    path.write_text('')
+    return path
+
+
+def append(path, text):
+    with open(path, 'a') as f:
+        f.write(text)
+
+
+def evaluate(path, *conditions):
+    return TranscriptScanner(str(path), 'session').evaluate(conditions)
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    """Record the offset every scan starts from."""
+    starts = []
+    original = transcript._scan
+
+    def recording(mm, condition, start):
+        starts.append(start)
+        return original(mm, condition, start)
+
+    monkeypatch.setattr(transcript, '_scan', recording)
+    return starts
+
+
+class TestIncremental:
+    def test_only_appended_bytes_are_scanned(self, log, scans):
+        append(log, record('hello'))
+        size = log.stat().st_size
+        assert evaluate(log, ('contains', 'npm test')) == {('contains', 'npm test'): False}
+        append(log, record('ran npm test'))
+        assert evaluate(log, ('contains', 'npm test')) == {('contains', 'npm test'): True}
+        assert scans[0] == 0
+        assert size - len('npm test') < scans[1] <= size
+
+    def test_found_conditions_are_not_scanned_again(self, log, scans):
+        append(log, record('pytest passed'))
+        assert evaluate(log, ('regex_match', r'pytest\s+passed'))[('regex_match', r'pytest\s+passed')]
+        append(log, record('more'))
+        assert evaluate(log, ('regex_match', r'pytest\s+passed'))[('regex_match', r'pytest\s+passed')]
+        assert len(scans) == 1
+
+    def test_literal_split_across_appends(self, log):
+        append(log, '{"message": "npm te')
+        assert not evaluate(log, ('contains', 'npm test'))[('contains', 'npm test')]
+        append(log, 'st"}\n')
+        assert evaluate(log, ('contains', 'npm test'))[('contains', 'npm test')]
+
+    def test_partial_last_line_is_scanned_again(self, log):
+        append(log, record('one'))
+        append(log, '{"message": "npm te')
+        assert not evaluate(log, ('regex_match', r'npm\s+test'))[('regex_match', r'npm\s+test')]
+        append(log, 'st"}\n')
+        assert evaluate(log, ('regex_match', r'npm\s+test'))[('regex_match', r'npm\s+test')]
+
+    def test_not_contains(self, log):
+        append(log, record('a'))
+        assert evaluate(log, ('not_contains', 'secret'))[('not_contains', 'secret')]
+        append(log, record('secret'))
+        assert not evaluate(log, ('not_contains', 'secret'))[('not_contains', 'secret')]
+
+    def test_rewritten_transcript_is_scanned_from_the_start(self, log):
+        append(log, record('deploy done'))
+        assert evaluate(log, ('contains', 'deploy'))[('contains', 'deploy')]
+        log.write_text(record('fresh start'))
+        assert not evaluate(log, ('contains', 'deploy'))[('contains', 'deploy')]
+
+    def test_disabled_cache_keeps_no_state(self, log, scans, monkeypatch):
+        monkeypatch.setenv('HOOKIFY_NO_CACHE', '1')
+        append(log, record('x'))
+        evaluate(log, ('contains', 'y'))
+        evaluate(log, ('contains', 'y'))
+        assert scans == [0, 0]
+
+    @pytest.mark.parametrize('seed', range(10))
+    def test_random_appends_match_whole_file_answers(self, log, seed):
+        rng = random.Random(seed)
+        words = ['npm', 'test', 'pytest', 'passed', 'failed', 'rm -rf', 'done', '\\n']
+        conditions = [('contains', 'npm test'), ('not_contains', 'failed'), ('regex_match', r'pytest\s+passed'),
+                      ('regex_match', r'done$'), ('regex_match', r'^\{'), ('starts_with', '{"message": "npm'),
+                      ('ends_with', 'done"}\n'), ('equals', ''), ('contains', 'rm -rf'), ('regex_match', r'te?st')]
+        for _ in range(15):
+            text = ' '.join(rng.choice(words) for _ in range(rng.randint(0, 5)))
+            append(log, record(text) if rng.random() < 0.8 else text)
+            whole = log.read_text()
+            expected = {condition: _check_text(condition, whole) for condition in conditions}
+            assert evaluate(log, *conditions) == expected
+
+
+class TestWholeFile:
+    def test_anchored_regex_sees_the_whole_transcript(self, log):
+        append(log, record('first'))
+        append(log, record('last'))
+        assert evaluate(log, ('regex_match', r'^\{"message": "first'))[('regex_match', r'^\{"message": "first')]
+        assert not evaluate(log, ('regex_match', r'^\{"message": "last'))[('regex_match', r'^\{"message": "last')]
+
+    def test_head_and_tail_operators(self, log):
+        append(log, record('first'))
+        append(log, record('last'))
+        result = evaluate(log, ('starts_with', '{"message": "first'), ('ends_with', '"last"}\n'),
+                          ('equals', record('first')))
+        assert list(result.values()) == [True, True, False]
+
+    def test_missing_transcript_is_empty(self, project, capsys):
+        result = evaluate(project / 'missing.jsonl', ('contains', 'x'), ('not_contains', 'x'))
+        assert list(result.values()) == [False, True]
+        assert 'not found' in capsys.readouterr().err
+
+
+class TestTimeouts:
+    def test_timed_out_chunk_is_searched_again(self, log, monkeypatch):
+        append(log, record('no match here') * 3)
+        append(log, record('pytest passed'))
+        condition = ('regex_match', r'pytest\s+passed')
+        original = transcript._search_guarded
+        monkeypatch.setattr(transcript, '_search_guarded', lambda regex, text: None)
+        assert not evaluate(log, condition)[condition]
+
+        monkeypatch.setattr(transcript, '_search_guarded', original)
+        assert evaluate(log, condition)[condition]
+
+    def test_later_chunk_is_still_searched_after_a_timeout(self, log, monkeypatch):
+        monkeypatch.setattr(transcript, 'CHUNK_BYTES', 64)
+        append(log, record('x' * 80))
+        append(log, record('pytest passed'))
+        original = transcript._search_guarded
+        first = []
+
+        def flaky(regex, text):
+            if not first:
+                first.append(text)
+                return None
+            return original(regex, text)
+
+        monkeypatch.setattr(transcript, '_search_guarded', flaky)
+        condition = ('regex_match', r'pytest\s+passed')
+        assert evaluate(log, condition)[condition]
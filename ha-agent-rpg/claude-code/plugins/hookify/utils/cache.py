@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Cache directory helpers for hookify plugin.
+
+Hookify keeps small derived files (compiled rule bundles and the like) in
+a per-project cache directory. Several Claude sessions can run hooks in
+the same project at once, so every write goes through atomic_write():
+readers see either the old file or the new one, never a torn write.
+"""
+
+import os
+from typing import Optional
+
+# Cache location, relative to the project directory (the hook's cwd)
+CACHE_DIR_ENV = 'HOOKIFY_CACHE_DIR'
+DEFAULT_CACHE_DIR = os.path.join('.claude', 'hookify-cache')
+
+# Set to "1" to bypass all on-disk caches
+DISABLE_CACHE_ENV = 'HOOKIFY_NO_CACHE'
+
+
+def cache_enabled() -> bool:
+    """Return False if on-disk caching has been disabled."""
+    return os.environ.get(DISABLE_CACHE_ENV, '0') != '1'
+
+
+def get_cache_dir() -> str:
+    """Return the hookify cache directory for the current project."""
+    return os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+
+
+def get_cache_path(name: str) -> str:
+    """Return the path of a named file in the cache directory."""
+    return os.path.join(get_cache_dir(), name)
+
+
+def read_cache_file(name: str) -> Optional[bytes]:
+    """Read a cache file, returning None if it is missing or unreadable."""
+    try:
+        with open(get_cache_path(name), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def atomic_write(path: str, data: bytes) -> bool:
+    """Write data to path atomically via a temp file and rename.
+
+    Returns:
+        True if written, False on any I/O error (caches are best-effort)
+    """
+    # Imported here: hooks that only read caches never pay for tempfile
+    import tempfile
+
+    directory = os.path.dirname(path) or '.'
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    except OSError:
+        return False
+
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        return False
+
+
+def write_cache_file(name: str, data: bytes) -> bool:
+    """Atomically write a named file in the cache directory."""
+    return atomic_write(get_cache_path(name), data)
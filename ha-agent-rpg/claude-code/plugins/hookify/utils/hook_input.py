@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""Cheap access to raw hook input for hookify plugin.
+
+Hook input can carry megabytes of file content, yet deciding whether any
+rule applies only needs a short top-level string such as tool_name.
+peek_string() tokenizes just the start of the document to find it - in
+Claude Code's hook input the small keys come before tool_input - and only
+decodes the whole document when the key is not within that window.
+
+When rules do apply, load_hook_input() decodes the input lazily: values
+are only decoded when a rule condition reads them, so a multi-megabyte
+Write content is never materialized for rules on file_path alone. Long
+strings can also be decoded in slices (see EncodedString), so a rule on
+the end of a huge tool output never decodes the rest of it, and any value
+can be sliced as JSON text without being decoded at all (see RawJSON).
+"""
+
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+# Bytes tokenized before falling back to decoding the whole input
+PEEK_WINDOW = 64 * 1024
+
+# One JSON token after optional whitespace: a string, a structural
+# character, or a bare scalar (number, true, false, null)
+_TOKEN = re.compile(rb'\s*("[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\],:]|[^\s{}\[\],:"]+)')
+
+# Object values that load_hook_input() wraps in a LazyObject of their own,
+# with the keys to treat the same way inside them (Read's tool_response
+# holds the file content under "file")
+LAZY_KEYS: Mapping[str, Mapping] = {'tool_input': {}, 'tool_response': {'file': {}}}
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_SCALAR = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null|NaN|-?Infinity')
+# Escaped quotes _string_end() steps over before decoding the string instead
+QUOTE_PROBES = 1024
+# Characters of such a string decoded at a time while looking for its end
+STRING_SCAN_WINDOW = 64 * 1024
+
+# Characters that open/close a container or start a string
+_STRUCTURE = re.compile(r'[{}\[\]"]')
+_HIGH_SURROGATE = re.compile(r'\\u[dD][89abAB][0-9a-fA-F]{2}')
+_LOW_SURROGATE = re.compile(r'\\u[dD][c-fC-F][0-9a-fA-F]{2}')
+
+
+def peek_string(raw: bytes, key: str) -> Optional[str]:
+    """Return the string value of a top-level key in a JSON object.
+
+    Args:
+        raw: Raw JSON bytes (a hook input object)
+        key: Top-level key to find
+
+    Returns:
+        The decoded string, or None if the key is missing, its value is not
+        a string, or the input is not valid JSON
+    """
+    end = min(len(raw), PEEK_WINDOW)
+    depth = 0
+    pos = 0
+    expecting_key = False
+    key_found = False
+
+    while True:
+        m = _TOKEN.match(raw, pos, end)
+        if m is None:
+            # Ran out of window (or hit malformed input): decode it all
+            return _lookup(raw, key) if end < len(raw) else None
+        token = m.group(1)
+        pos = m.end()
+
+        if key_found and token != b':':
+            if not token.startswith(b'"'):
+                return None
+            try:
+                return json.loads(token)
+            except ValueError:
+                return None
+
+        if token in (b'{', b'['):
+            depth += 1
+            expecting_key = depth == 1 and token == b'{'
+        elif token in (b'}', b']'):
+            depth -= 1
+            if depth <= 0:
+                return None
+        elif depth == 1:
+            if token == b',':
+                expecting_key = True
+            elif expecting_key:
+                expecting_key = False
+                try:
+                    key_found = json.loads(token) == key
+                except ValueError:
+                    return None
+
+
+def _lookup(raw: bytes, key: str) -> Optional[str]:
+    """Decode the whole input and return a top-level string value."""
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return None
+    value = data.get(key) if isinstance(data, dict) else None
+    return value if isinstance(value, str) else None
+
+
+def load_hook_input(raw: bytes) -> Mapping[str, Any]:
+    """Decode hook input, deferring its large values until they are read.
+
+    Args:
+        raw: Raw hook input JSON
+
+    Returns:
+        A read-only mapping over the top-level object. Values are decoded
+        the first time they are looked up; tool_input and tool_response
+        are themselves lazy, so a rule on file_path never decodes content.
+
+    Raises:
+        ValueError: If the input is not valid JSON. Errors past the
+            top-level key being looked up surface at lookup time instead.
+    """
+    text = raw.decode(json.detect_encoding(raw), 'surrogatepass') if isinstance(raw, bytes) else raw
+    start = _skip_whitespace(text, 0)
+    if not text.startswith('{', start):
+        # Not an object: keep json.loads's result and error messages
+        return json.loads(text)
+    return LazyObject(text, start, lazy_keys=LAZY_KEYS)
+
+
+class LazyObject(Mapping):
+    """Read-only mapping over one JSON object inside a decoded document.
+
+    Entries are indexed in document order only as far as a lookup needs.
+    Values passed over on the way are skipped, not kept: strings by jumping
+    to their closing quote, containers by scanning their structure. Claude
+    Code writes the short keys (tool_name, file_path, ...) before the long
+    ones (tool_input, content), so most lookups never reach a large value.
+
+    Duplicate keys resolve to their first occurrence (json.loads keeps the
+    last); JSON.stringify, which produces hook input, never emits them.
+    """
+
+    def __init__(self, text: str, start: int, lazy_keys: Mapping[str, Mapping] = {}):
+        self._text = text
+        self._pos = start + 1  # just past '{', or the last value's start
+        self._lazy_keys = lazy_keys
+        self._starts: Dict[str, int] = {}
+        self._values: Dict[str, Any] = {}
+        self._encoded: Dict[str, 'EncodedString'] = {}
+        # Value start -> end, for values already scanned by encoded_string() or raw_json()
+        self._value_ends: Dict[int, int] = {}
+        self._indexed = False
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._values:
+            return self._values[key]
+        value_start = self._find(key)
+        if value_start is None:
+            raise KeyError(key)
+        if key in self._lazy_keys and self._text.startswith('{', value_start):
+            value = LazyObject(self._text, value_start, lazy_keys=self._lazy_keys[key])
+        else:
+            value = _DECODER.raw_decode(self._text, value_start)[0]
+        self._values[key] = value
+        return value
+
+    @property
+    def document_size(self) -> int:
+        """Length of the whole JSON document this object is part of."""
+        return len(self._text)
+
+    def encoded_string(self, key: str) -> Optional['EncodedString']:
+        """Return a string value without decoding it, or None if not a string."""
+        encoded = self._encoded.get(key)
+        if encoded is None:
+            value_start = self._find(key)
+            if value_start is None or not self._text.startswith('"', value_start):
+                return None
+            end = _string_end(self._text, value_start + 1)
+            encoded = self._encoded[key] = EncodedString(self._text, value_start + 1, end)
+            self._value_ends[value_start] = end + 1
+        return encoded
+
+    def raw_json(self, key: str) -> Optional['RawJSON']:
+        """Return a value's JSON text without decoding it, or None if missing."""
+        value_start = self._find(key)
+        if value_start is None:
+            return None
+        end = self._value_ends.get(value_start)
+        if end is None:
+            end = self._value_ends[value_start] = _skip_value(self._text, value_start)
+        return RawJSON(self._text, value_start, end)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._find(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        self._index_all()
+        return iter(self._starts)
+
+    def __len__(self) -> int:
+        self._index_all()
+        return len(self._starts)
+
+    def __bool__(self) -> bool:
+        # Only needs the first entry, not the whole index
+        return bool(self._starts) or self._next_entry() is not None
+
+    def __repr__(self) -> str:
+        return f"LazyObject({dict(self)!r})"
+
+    def _find(self, key: str) -> Optional[int]:
+        """Return where key's value starts, indexing up to it if needed."""
+        value_start = self._starts.get(key)
+        while value_start is None and not self._indexed:
+            if self._next_entry() == key:
+                value_start = self._starts[key]
+        return value_start
+
+    def _index_all(self) -> None:
+        while not self._indexed:
+            self._next_entry()
+
+    def _next_entry(self) -> Optional[str]:
+        """Index the next key; None once the object is exhausted.
+
+        The value is only skipped when the entry after it is indexed, so
+        finding tool_input never walks tool_input itself.
+        """
+        if self._indexed:
+            return None
+        text = self._text
+        pos = self._pos
+        if self._starts:
+            pos = self._value_ends.get(pos) or _skip_value(text, pos)
+        pos = _skip_whitespace(text, pos)
+        if self._starts:
+            if text.startswith(',', pos):
+                pos = _skip_whitespace(text, pos + 1)
+            elif text.startswith('}', pos):
+                self._indexed = True
+                return None
+            else:
+                raise _error("Expecting ',' delimiter", text, pos)
+        elif text.startswith('}', pos):
+            self._indexed = True
+            return None
+
+        if not text.startswith('"', pos):
+            raise _error('Expecting property name enclosed in double quotes', text, pos)
+        key, pos = scanstring(text, pos + 1)
+        pos = _skip_whitespace(text, pos)
+        if not text.startswith(':', pos):
+            raise _error("Expecting ':' delimiter", text, pos)
+        self._pos = _skip_whitespace(text, pos + 1)
+        self._starts.setdefault(key, self._pos)
+        return key
+
+
+class EncodedString:
+    """A JSON string inside a document, decoded whole or in slices.
+
+    Slices are measured in encoded characters and cut only between escape
+    sequences, so head() and tail() decode (and copy) at most size
+    characters however long the string is.
+    """
+
+    def __init__(self, text: str, start: int, end: int):
+        self._text = text
+        self._start = start  # just past the opening quote
+        self._end = end      # the closing quote
+
+    def __len__(self) -> int:
+        """Encoded length (an upper bound on the decoded length)."""
+        return self._end - self._start
+
+    def decode(self) -> str:
+        return self._decode(self._start, self._end)
+
+    def head(self, size: int) -> str:
+        """Decode at most the first size encoded characters."""
+        if size >= len(self):
+            return self.decode()
+        cut = self._start + size
+        escape = self._escape_at(cut)
+        return self._decode(self._start, cut if escape is None else escape[0])
+
+    def tail(self, size: int) -> str:
+        """Decode at most the last size encoded characters."""
+        if size >= len(self):
+            return self.decode()
+        cut = self._end - size
+        escape = self._escape_at(cut)
+        return self._decode(cut if escape is None else escape[1], self._end)
+
+    def _escape_at(self, pos: int) -> Optional[tuple]:
+        """Return (start, end) of an escape sequence straddling pos, if any."""
+        text = self._text
+        backslash = text.rfind('\\', max(self._start, pos - 6), pos)
+        if backslash < 0:
+            return None
+        # A backslash starts an escape when an even number precede it
+        run_start = backslash
+        while run_start > self._start and text[run_start - 1] == '\\':
+            run_start -= 1
+        if (backslash - run_start) % 2:
+            return None
+        start = backslash
+        end = backslash + (6 if text.startswith('u', backslash + 1) else 2)
+        # A surrogate pair (\ud83d\ude00) is one escape: never split it
+        if _HIGH_SURROGATE.match(text, start) and _LOW_SURROGATE.match(text, end):
+            end += 6
+        elif _LOW_SURROGATE.match(text, start) and _HIGH_SURROGATE.match(text, start - 6):
+            start -= 6
+        return (start, end) if end > pos else None
+
+    def _decode(self, start: int, end: int) -> str:
+        return scanstring(self._text[start:end] + '"', 0, False)[0]
+
+
+class RawJSON:
+    """A JSON value's text inside a document, sliced without decoding.
+
+    head() and tail() copy at most size characters of the text as it
+    appears in the document, whatever the value holds.
+    """
+
+    def __init__(self, text: str, start: int, end: int):
+        self._text = text
+        self._start = start
+        self._end = end  # just past the value
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def decode(self) -> str:
+        """Return the whole JSON text (not the decoded value)."""
+        return self._text[self._start:self._end]
+
+    def head(self, size: int) -> str:
+        """Return at most the first size characters."""
+        return self._text[self._start:self._start + min(max(size, 0), len(self))]
+
+    def tail(self, size: int) -> str:
+        """Return at most the last size characters."""
+        return self._text[self._end - min(max(size, 0), len(self)):self._end]
+
+
+def _string_end(text: str, pos: int) -> int:
+    """Return the index of the quote closing the string whose body is at pos.
+
+    Jumps from quote to quote without decoding anything; strings with many
+    escaped quotes are handed to the C string scanner instead, a window at
+    a time, so finding the end never copies more than a window.
+    """
+    for _ in range(QUOTE_PROBES):
+        quote = text.find('"', pos)
+        if quote < 0:
+            raise _error('Unterminated string starting at', text, pos - 1)
+        backslash = quote
+        while text[backslash - 1] == '\\':
+            backslash -= 1
+        if (quote - backslash) % 2 == 0:
+            return quote
+        pos = quote + 1
+
+    while True:
+        cut = min(pos + STRING_SCAN_WINDOW, len(text))
+        # Never cut inside an escape: back up to the start of the last run
+        # of backslashes near the cut, keeping its whole \\ pairs
+        backslash = text.rfind('\\', max(pos, cut - 6), cut) if cut < len(text) else -1
+        if backslash >= 0:
+            run_start = backslash
+            while run_start > pos and text[run_start - 1] == '\\':
+                run_start -= 1
+            cut = run_start + (backslash + 1 - run_start) // 2 * 2
+        window = text[pos:cut] + '"'
+        try:
+            end = scanstring(window, 0, False)[1]
+        except json.JSONDecodeError as e:
+            raise _error(e.msg, text, pos + e.pos) from None
+        if end < len(window):
+            return pos + end - 1
+        if cut >= len(text):
+            raise _error('Unterminated string starting at', text, pos - 1)
+        pos = cut
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _skip_value(text: str, pos: int) -> int:
+    """Return the index just past the JSON value starting at pos."""
+    char = text[pos:pos + 1]
+    if char == '"':
+        return _string_end(text, pos + 1) + 1
+    if char in ('{', '['):
+        return _skip_container(text, pos)
+    m = _SCALAR.match(text, pos)
+    if m is None:
+        raise _error('Expecting value', text, pos)
+    return m.end()
+
+
+def _skip_container(text: str, pos: int) -> int:
+    """Skip an object or array by matching brackets outside strings.
+
+    Only the nesting is checked here, and strings are stepped over without
+    being decoded; the contents are validated when (if) the value is
+    decoded.
+    """
+    depth = 0
+    while True:
+        m = _STRUCTURE.search(text, pos)
+        if m is None:
+            raise _error('Unterminated container', text, pos)
+        char = m.group()
+        if char == '"':
+            pos = _string_end(text, m.end()) + 1
+            continue
+        pos = m.end()
+        depth += 1 if char in '{[' else -1
+        if depth == 0:
+            return pos
+
+
+def _error(message: str, text: str, pos: int) -> json.JSONDecodeError:
+    return json.JSONDecodeError(message, text, pos)
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""Shell command parsing for hookify plugin.
+
+Bash rules that test the raw command string need regexes that see through
+pipelines, && chains, quoting and redirections, and such regexes are slow
+and easy to get wrong. parse_command() tokenizes a command once into
+simple commands (one per pipeline stage) and exposes list fields that
+conditions can target directly:
+
+    argv0     each simple command's program name, without its directory
+    args      every argument of every simple command, unquoted
+    segment   each simple command's words, unquoted, joined by one space
+    pipeline  each pipeline's program names joined by " | "
+    redirect  each file redirection target (>, >>, <, &>, ...)
+
+For `cd /tmp && FOO=1 rm -rf "a b" 2>/dev/null | tee log`, argv0 is
+cd, rm and tee; segment is "cd /tmp", "rm -rf a b" and "tee log";
+pipeline is "cd" and "rm | tee"; redirect is /dev/null.
+
+The parser approximates bash: quotes, escapes, comments, here-documents,
+leading variable assignments and compound-command keywords (if, then, do,
+...) are handled, and commands inside $(...), `...` and <(...) are parsed
+as pipelines of their own. Nothing is expanded: $HOME stays "$HOME".
+
+Parses are cached in memory by command digest, so the rule daemon and
+rules with many conditions on one command parse it once.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Fields computed from the parsed command (each holds a list of values)
+SHELL_FIELDS = ('argv0', 'args', 'segment', 'pipeline', 'redirect')
+
+# Parsed commands kept in memory, keyed by command digest
+PARSE_CACHE_SIZE = 256
+
+# Substitutions nested deeper than this are kept as text, not parsed
+MAX_NESTING = 32
+
+# Control operators and redirections, longest first
+_OPERATORS = ('&>>', '<<<', '<<-', '&&', '||', ';;', '|&', '&>', '>>', '<<', '>&', '<&',
+              '<>', '>|', '|', ';', '&', '(', ')', '\n', '>', '<')
+_REDIRECTS = frozenset(('&>>', '<<<', '<<-', '&>', '>>', '<<', '>&', '<&', '<>', '>|', '>', '<'))
+_HEREDOCS = frozenset(('<<', '<<-'))
+
+# Keywords dropped from the front of a simple command
+_KEYWORDS = frozenset(('if', 'then', 'else', 'elif', 'fi', 'do', 'done', 'while', 'until',
+                       '!', '{', '}', 'time'))
+# Keywords whose whole simple command is a header, not a program run
+_HEADER_KEYWORDS = frozenset(('for', 'select', 'case', 'esac', 'function'))
+
+_ASSIGNMENT = re.compile(r'[A-Za-z_][A-Za-z0-9_]*(\[[^\]]*\])?\+?=')
+_IO_NUMBER = re.compile(r'\d+(?=[<>])')
+_PLAIN = re.compile(r'[^\s;&|()<>\\\'"$`]+')
+_PLAIN_DOUBLE_QUOTED = re.compile(r'[^"\\$`]+')
+_BLANKS = re.compile(r'[ \t\r]+')
+
+
+class SimpleCommand:
+    """One pipeline stage: its words and file redirections."""
+
+    __slots__ = ('argv', 'redirects')
+
+    def __init__(self, argv: Tuple[str, ...], redirects: Tuple[Tuple[str, str], ...]):
+        self.argv = argv
+        # (operator, target) pairs, e.g. ('>>', 'log.txt')
+        self.redirects = redirects
+
+    def __repr__(self) -> str:
+        return f'SimpleCommand({self.argv!r}, {self.redirects!r})'
+
+
+class ParsedCommand:
+    """A command line split into pipelines of simple commands."""
+
+    def __init__(self, pipelines: List[Tuple[SimpleCommand, ...]]):
+        self.pipelines = pipelines
+        self.commands = [command for pipeline in pipelines for command in pipeline]
+        self._values: Dict[str, Tuple[str, ...]] = {}
+
+    def values(self, field: str) -> Tuple[str, ...]:
+        """Return a field's values (see SHELL_FIELDS)."""
+        values = self._values.get(field)
+        if values is None:
+            values = self._values[field] = tuple(self._compute(field))
+        return values
+
+    def _compute(self, field: str) -> List[str]:
+        commands = self.commands
+        if field == 'argv0':
+            return [os.path.basename(c.argv[0]) for c in commands if c.argv]
+        elif field == 'args':
+            return [arg for c in commands for arg in c.argv[1:]]
+        elif field == 'segment':
+            return [' '.join(c.argv) for c in commands if c.argv]
+        elif field == 'pipeline':
+            return [' | '.join(os.path.basename(c.argv[0]) for c in pipeline if c.argv)
+                    for pipeline in self.pipelines if any(c.argv for c in pipeline)]
+        elif field == 'redirect':
+            return [target for c in commands for op, target in c.redirects
+                    # Not files: here-documents/strings and fd duplication (2>&1)
+                    if op not in _HEREDOCS and op != '<<<'
+                    and not (op in ('>&', '<&') and (target.isdigit() or target == '-'))]
+        return []
+
+
+_parsed: 'OrderedDict[bytes, ParsedCommand]' = OrderedDict()
+_parsed_lock = threading.Lock()
+
+
+def parse_command(command: str) -> ParsedCommand:
+    """Parse a shell command, reusing the parse of an identical command.
+
+    Never raises: malformed input (an unclosed quote, say) is parsed as far
+    as it goes.
+    """
+    key = hashlib.blake2b(command.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    with _parsed_lock:
+        parsed = _parsed.get(key)
+        if parsed is not None:
+            _parsed.move_to_end(key)
+            return parsed
+
+    parsed = ParsedCommand(_Parser(command).parse())
+    with _parsed_lock:
+        _parsed[key] = parsed
+        if len(_parsed) > PARSE_CACHE_SIZE:
+            _parsed.popitem(last=False)
+    return parsed
+
+
+class _Parser:
+    """Single-pass tokenizer building pipelines of simple commands."""
+
+    def __init__(self, text: str, nesting: int = 0):
+        self.text = text
+        self.pos = 0
+        self.nesting = nesting
+        self.pipelines: List[Tuple[SimpleCommand, ...]] = []
+        # Delimiters of here-documents whose bodies start at the next newline
+        self.heredocs: List[Tuple[str, bool]] = []
+
+    def parse(self) -> List[Tuple[SimpleCommand, ...]]:
+        self.parse_list()
+        return self.pipelines
+
+    def parse_list(self, closing: Optional[str] = None) -> None:
+        """Parse commands until the end of text or an unmatched closing ')'."""
+        text = self.text
+        stages: List[SimpleCommand] = []
+        argv: List[str] = []
+        redirects: List[Tuple[str, str]] = []
+        redirect_op: Optional[str] = None
+        depth = 0
+
+        def finish_command():
+            words = argv[:]
+            argv.clear()
+            while words and words[0] in _KEYWORDS:
+                del words[0]
+            if words and words[0] in _HEADER_KEYWORDS:
+                words = []
+            while words and _ASSIGNMENT.match(words[0]):
+                del words[0]
+            if words or redirects:
+                stages.append(SimpleCommand(tuple(words), tuple(redirects)))
+            redirects.clear()
+
+        def finish_pipeline():
+            finish_command()
+            if stages:
+                self.pipelines.append(tuple(stages))
+                stages.clear()
+
+        while self.pos < len(text):
+            match = _BLANKS.match(text, self.pos)
+            if match:
+                self.pos = match.end()
+                continue
+
+            char = text[self.pos]
+            if char == '\\' and text.startswith('\\\n', self.pos):
+                self.pos += 2
+                continue
+            if char == '#':
+                end = text.find('\n', self.pos)
+                self.pos = len(text) if end < 0 else end
+                continue
+            if char == ')' and closing and depth == 0:
+                self.pos += 1
+                break
+
+            if text.startswith(('<(', '>('), self.pos):
+                word = self._substitution()
+            else:
+                operator = self._operator()
+                if operator is not None:
+                    redirect_op = None
+                    if operator in _REDIRECTS:
+                        redirect_op = operator
+                    elif operator in ('|', '|&'):
+                        finish_command()
+                    else:
+                        if operator == '(':
+                            depth += 1
+                        elif operator == ')':
+                            depth = max(depth - 1, 0)
+                        finish_pipeline()
+                        if operator == '\n':
+                            self._skip_heredocs()
+                    continue
+
+                match = _IO_NUMBER.match(text, self.pos)
+                if match:
+                    # The "2" of 2>file belongs to the redirection
+                    self.pos = match.end()
+                    continue
+                word = self._word()
+
+            if redirect_op is not None:
+                if redirect_op in _HEREDOCS:
+                    self.heredocs.append((word, redirect_op == '<<-'))
+                redirects.append((redirect_op, word))
+                redirect_op = None
+            else:
+                argv.append(word)
+
+        finish_pipeline()
+
+    def _operator(self) -> Optional[str]:
+        for operator in _OPERATORS:
+            if self.text.startswith(operator, self.pos):
+                self.pos += len(operator)
+                return operator
+        return None
+
+    def _word(self) -> str:
+        """Read one word, removing quotes and escapes."""
+        text = self.text
+        parts: List[str] = []
+        while self.pos < len(text):
+            match = _PLAIN.match(text, self.pos)
+            if match:
+                parts.append(match.group())
+                self.pos = match.end()
+                continue
+
+            char = text[self.pos]
+            if char == '\\':
+                if text.startswith('\\\n', self.pos):
+                    self.pos += 2
+                else:
+                    parts.append(text[self.pos + 1:self.pos + 2])
+                    self.pos += 2
+            elif char == "'":
+                end = text.find("'", self.pos + 1)
+                end = len(text) if end < 0 else end
+                parts.append(text[self.pos + 1:end])
+                self.pos = end + 1
+            elif char == '"':
+                self._double_quoted(parts)
+            elif char == '`' or text.startswith('$(', self.pos):
+                parts.append(self._substitution())
+            elif text.startswith('${', self.pos):
+                end = text.find('}', self.pos)
+                end = len(text) if end < 0 else end + 1
+                parts.append(text[self.pos:end])
+                self.pos = end
+            elif char == '$':
+                parts.append(char)
+                self.pos += 1
+            else:
+                # Blank or operator character: the word ends here
+                break
+        return ''.join(parts)
+
+    def _double_quoted(self, parts: List[str]) -> None:
+        text = self.text
+        self.pos += 1
+        while self.pos < len(text):
+            match = _PLAIN_DOUBLE_QUOTED.match(text, self.pos)
+            if match:
+                parts.append(match.group())
+                self.pos = match.end()
+                continue
+
+            char = text[self.pos]
+            if char == '"':
+                self.pos += 1
+                return
+            if char == '\\':
+                escaped = text[self.pos + 1:self.pos + 2]
+                if escaped not in ('$', '`', '"', '\\', '\n'):
+                    parts.append(char)
+                elif escaped != '\n':
+                    parts.append(escaped)
+                self.pos += 1 + len(escaped)
+            elif char == '`' or text.startswith('$(', self.pos):
+                parts.append(self._substitution())
+            else:
+                parts.append(char)
+                self.pos += 1
+
+    def _substitution(self) -> str:
+        """Parse $(...), `...`, <(...) or >(...) and return its text."""
+        text = self.text
+        start = self.pos
+        if text.startswith('$((', start) or self.nesting >= MAX_NESTING:
+            # Arithmetic (or nested too deep): skip to the matching paren
+            self._skip_parens(start + 1)
+        elif text[start] == '`':
+            end = start + 1
+            while end < len(text) and text[end] != '`':
+                end += 2 if text[end] == '\\' else 1
+            inner = re.sub(r'\\([$`\\])', r'\1', text[start + 1:end])
+            self.pipelines.extend(_Parser(inner, self.nesting + 1).parse())
+            self.pos = min(end + 1, len(text))
+        else:
+            self.pos = start + 2
+            self.nesting += 1
+            self.parse_list(closing=')')
+            self.nesting -= 1
+        return text[start:self.pos]
+
+    def _skip_parens(self, pos: int) -> None:
+        text = self.text
+        depth = 0
+        while pos < len(text):
+            char = text[pos]
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+                if depth == 0:
+                    pos += 1
+                    break
+            pos += 1
+        self.pos = pos
+
+    def _skip_heredocs(self) -> None:
+        """Skip the bodies of here-documents begun on the previous line."""
+        for delimiter, strip_tabs in self.heredocs:
+            tabs = r'\t*' if strip_tabs else ''
+            end = re.compile(f'^{tabs}{re.escape(delimiter)}$', re.MULTILINE).search(self.text, self.pos)
+            self.pos = len(self.text) if end is None else end.end()
+        self.heredocs.clear()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Bounded views of tool output for hookify plugin.
+
+PostToolUse hook input carries the tool's result in tool_response, which
+can be megabytes of command output or file content. Rules read it through
+three fields whose size is capped however large the output gets:
+
+    output       the whole output when it fits in HOOKIFY_OUTPUT_BYTES,
+                 otherwise its first and last halves of that budget
+                 joined by an ELISION marker
+    output_head  the first HOOKIFY_OUTPUT_WINDOW_BYTES of the output
+    output_tail  the last HOOKIFY_OUTPUT_WINDOW_BYTES of the output
+
+Output text is Bash's stdout followed by its stderr, the file content for
+Read, and a string response as is; other responses (Edit's, MCP tools'
+lists of content blocks) are taken as their compact JSON, the text Claude
+Code sends. Budgets count characters of the JSON-encoded hook input
+(bytes, for ASCII output). With lazily decoded hook input (see
+hook_input.py), only the windows are decoded and copied - other responses
+are sliced from the hook input's JSON without decoding them at all - so
+matching time and memory stay within the budgets.
+"""
+
+import json
+import os
+from typing import Any, List, Mapping, Optional, Tuple, Union
+
+from hookify.utils.hook_input import EncodedString, LazyObject, RawJSON
+
+# Output fields answered from tool_response
+OUTPUT_FIELDS = ('output', 'output_head', 'output_tail')
+
+# Largest output the output field holds whole
+OUTPUT_BYTES_ENV = 'HOOKIFY_OUTPUT_BYTES'
+DEFAULT_OUTPUT_BYTES = 256 * 1024
+
+# Size of output_head and output_tail
+OUTPUT_WINDOW_BYTES_ENV = 'HOOKIFY_OUTPUT_WINDOW_BYTES'
+DEFAULT_OUTPUT_WINDOW_BYTES = 16 * 1024
+
+# Joins the head and tail of an output too large for the output field
+ELISION = '\n[...]\n'
+
+# tool_response keys holding output text, in output order
+OUTPUT_KEYS = ('stdout', 'stderr', 'output', 'content', 'result')
+
+_Text = Union[str, EncodedString, RawJSON]
+
+
+def output_budgets() -> Tuple[int, int]:
+    """Return the (output, window) budgets in bytes."""
+    return (_budget(OUTPUT_BYTES_ENV, DEFAULT_OUTPUT_BYTES),
+            _budget(OUTPUT_WINDOW_BYTES_ENV, DEFAULT_OUTPUT_WINDOW_BYTES))
+
+
+def output_field(field: str, input_data: Mapping[str, Any]) -> Optional[str]:
+    """Return an output field's value, or None without a tool_response.
+
+    Args:
+        field: One of OUTPUT_FIELDS
+        input_data: Full hook input
+
+    Returns:
+        The field's text, at most its budget long
+    """
+    parts = _output_parts(input_data)
+    if parts is None:
+        return None
+
+    output_bytes, window_bytes = output_budgets()
+    if field == 'output_head':
+        return _head(parts, window_bytes)
+    elif field == 'output_tail':
+        return _tail(parts, window_bytes)
+    elif field == 'output':
+        if sum(len(part) for part in parts) + len(parts) - 1 <= output_bytes:
+            return '\n'.join(_decode(part) for part in parts)
+        return _head(parts, output_bytes // 2) + ELISION + _tail(parts, output_bytes // 2)
+    return None
+
+
+def _budget(env: str, default: int) -> int:
+    try:
+        return max(0, int(os.environ.get(env, default)))
+    except ValueError:
+        return default
+
+
+def _output_parts(input_data: Mapping[str, Any]) -> Optional[List[_Text]]:
+    """Return the output's pieces in order (joined by newlines)."""
+    if 'tool_response' not in input_data:
+        return None
+    text = _string(input_data, 'tool_response')
+    if text is not None:
+        return [text]
+
+    # Looking up a list response would decode all of it
+    raw = input_data.raw_json('tool_response') if isinstance(input_data, LazyObject) else None
+    if raw is None or raw.head(1) == '{':
+        response = input_data['tool_response']
+        if isinstance(response, Mapping):
+            parts = [_string(response, key) for key in OUTPUT_KEYS]
+            file = response.get('file')
+            if isinstance(file, Mapping):
+                parts.append(_string(file, 'content'))
+            if any(part is not None for part in parts):
+                # Empty streams (no stderr, say) add nothing
+                return [part for part in parts if part]
+    if raw is not None:
+        return [raw]
+    # Lazily decoded objects are Mappings, not dicts
+    return [json.dumps(response, default=dict, ensure_ascii=False, separators=(',', ':'))]
+
+
+def _string(mapping: Mapping[str, Any], key: str) -> Optional[_Text]:
+    """Return a string value, still encoded if the input is lazily decoded."""
+    if isinstance(mapping, LazyObject):
+        # Never decode a value that is not a string just to find out
+        return mapping.encoded_string(key)
+    value = mapping.get(key)
+    return value if isinstance(value, str) else None
+
+
+def _decode(part: _Text) -> str:
+    return part if isinstance(part, str) else part.decode()
+
+
+def _head(parts: List[_Text], size: int) -> str:
+    """Return the first size bytes of the joined parts."""
+    pieces = []
+    for part in parts:
+        if size <= 0:
+            break
+        pieces.append(part[:size] if isinstance(part, str) else part.head(size))
+        size -= len(part) + 1
+    return '\n'.join(pieces)
+
+
+def _tail(parts: List[_Text], size: int) -> str:
+    """Return the last size bytes of the joined parts."""
+    pieces = []
+    for part in reversed(parts):
+        if size <= 0:
+            break
+        pieces.append(part[-size:] if isinstance(part, str) else part.tail(size))
+        size -= len(part) + 1
+    return '\n'.join(reversed(pieces))
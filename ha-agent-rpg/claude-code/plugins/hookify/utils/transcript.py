@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""Incremental transcript scanning for hookify plugin.
+
+Stop rules commonly test the session transcript, which grows with every
+turn and can reach many megabytes. Rather than reading the whole file on
+every Stop, TranscriptScanner memory-maps it and remembers, per session,
+how far each condition has already been scanned and whether it has
+matched. Transcripts are append-only, so a literal or regex that matched
+once keeps matching and only bytes appended since the previous Stop need
+scanning.
+
+Conditions that cannot be answered incrementally are still answered
+without materializing the transcript where possible: starts_with and
+ends_with read only the head or tail, equals compares the size first.
+Regexes anchored to the start or end of the text (^, $, \\A, \\Z) are
+evaluated over the whole file.
+
+Regexes are scanned in line-aligned chunks of about CHUNK_BYTES. A match
+spanning two JSONL records is only found if both land in the same chunk,
+so patterns should match within one record. A chunk whose search runs out
+of time is searched again on the next Stop; until then the condition
+does not match.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from hookify.matchers.regex_guard import RegexTimeout, rejection_reason, time_budget
+from hookify.utils.cache import cache_enabled, get_cache_dir, atomic_write
+
+# Regex chunk size; chunks are extended to the next line boundary
+CHUNK_BYTES = 1024 * 1024
+
+# Bytes before the saved offset hashed to detect a rewritten transcript
+ANCHOR_BYTES = 64
+
+# Per-session state older than this is pruned when a new session starts
+STATE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+STATE_VERSION = 1
+
+# Regex constructs whose result can change as the text grows. Escaped
+# or bracketed carets and dollars are caught too, which only costs a
+# full scan.
+_POSITION_ANCHORS = re.compile(r'[\^$]|\\[AZ]')
+
+# A condition as (operator, pattern)
+ConditionKey = Tuple[str, str]
+
+
+def _state_key(condition: ConditionKey) -> str:
+    return f'{condition[0]}:{condition[1]}'
+
+
+def _is_incremental(condition: ConditionKey) -> bool:
+    """Check whether a condition can be answered from appended bytes only."""
+    operator, pattern = condition
+    if operator in ('contains', 'not_contains'):
+        return True
+    if operator == 'regex_match':
+        return not _POSITION_ANCHORS.search(pattern)
+    return False
+
+
+class TranscriptScanner:
+    """Evaluates transcript conditions for one session incrementally."""
+
+    def __init__(self, transcript_path: str, session_id: str = ''):
+        """Prepare a scanner for a transcript file.
+
+        Args:
+            transcript_path: Path to the session's JSONL transcript
+            session_id: Claude session id (keys the saved scan state)
+        """
+        self.transcript_path = transcript_path
+        digest = hashlib.sha1(f'{session_id}\0{transcript_path}'.encode('utf-8')).hexdigest()
+        self.state_path = os.path.join(get_cache_dir(), 'transcripts', f'{digest[:20]}.json')
+
+    def evaluate(self, conditions: Iterable[ConditionKey]) -> Dict[ConditionKey, bool]:
+        """Evaluate conditions against the transcript.
+
+        Args:
+            conditions: (operator, pattern) pairs
+
+        Returns:
+            Mapping of each condition to whether it matches. If the file
+            cannot be read, a warning is printed and conditions are
+            evaluated against an empty transcript.
+        """
+        conditions = list(dict.fromkeys(conditions))
+        try:
+            with open(self.transcript_path, 'rb') as f:
+                st = os.fstat(f.fileno())
+                if st.st_size == 0:
+                    return {c: _check_text(c, '') for c in conditions}
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return self._evaluate_mapped(mm, st, conditions)
+        except FileNotFoundError:
+            print(f"Warning: Transcript file not found: {self.transcript_path}", file=sys.stderr)
+        except PermissionError:
+            print(f"Warning: Permission denied reading transcript: {self.transcript_path}", file=sys.stderr)
+        except (IOError, OSError, ValueError) as e:
+            print(f"Warning: Error reading transcript {self.transcript_path}: {e}", file=sys.stderr)
+        return {c: _check_text(c, '') for c in conditions}
+
+    def _evaluate_mapped(self, mm: mmap.mmap, st: os.stat_result,
+                         conditions: List[ConditionKey]) -> Dict[ConditionKey, bool]:
+        size = len(mm)
+        state = self._load_state(mm, st)
+        entries = state['conditions']
+        results: Dict[ConditionKey, bool] = {}
+        whole_text: Optional[str] = None
+
+        # Offsets only advance to a line boundary so a partially written
+        # last line is scanned again next time
+        boundary = mm.rfind(b'\n') + 1
+
+        for condition in conditions:
+            operator, pattern = condition
+            if not _is_incremental(condition):
+                if operator == 'starts_with':
+                    encoded = pattern.encode('utf-8')
+                    results[condition] = mm[:len(encoded)] == encoded
+                elif operator == 'ends_with':
+                    encoded = pattern.encode('utf-8')
+                    results[condition] = mm[size - len(encoded):] == encoded
+                elif operator == 'equals' and len(pattern.encode('utf-8')) != size:
+                    results[condition] = False
+                else:
+                    if whole_text is None:
+                        whole_text = mm[:].decode('utf-8', errors='replace')
+                    results[condition] = _check_text(condition, whole_text)
+                continue
+
+            key = _state_key(condition)
+            entry = entries.get(key) or {'offset': 0, 'found': False}
+            if not entry['found'] and entry['offset'] < size:
+                entry['found'], timed_out_at = _scan(mm, condition, entry['offset'])
+                if timed_out_at is not None and not entry['found']:
+                    # Incomplete: resume at the chunk that ran out of time
+                    entry['offset'] = timed_out_at
+                elif not entry['found']:
+                    entry['offset'] = max(entry['offset'], _resume_offset(condition, size, boundary))
+            entries[key] = entry
+
+            found = entry['found']
+            results[condition] = not found if operator == 'not_contains' else found
+
+        state['size'] = boundary
+        state['anchor'] = _anchor(mm, boundary)
+        self._save_state(state)
+        return results
+
+    def _load_state(self, mm: mmap.mmap, st: os.stat_result) -> dict:
+        """Load saved scan state, resetting it if the file was replaced."""
+        fresh = {
+            'version': STATE_VERSION,
+            'path': self.transcript_path,
+            'inode': [st.st_dev, st.st_ino],
+            'size': 0,
+            'anchor': '',
+            'conditions': {},
+        }
+        if not cache_enabled():
+            return fresh
+
+        try:
+            with open(self.state_path, 'rb') as f:
+                state = json.loads(f.read())
+        except (OSError, ValueError):
+            self._prune_states()
+            return fresh
+
+        if (not isinstance(state, dict)
+                or state.get('version') != STATE_VERSION
+                or state.get('inode') != fresh['inode']
+                or not isinstance(state.get('conditions'), dict)
+                or state.get('size', 0) > len(mm)
+                or state.get('anchor') != _anchor(mm, state.get('size', 0))):
+            return fresh
+        return state
+
+    def _save_state(self, state: dict) -> None:
+        if cache_enabled():
+            atomic_write(self.state_path, json.dumps(state).encode('utf-8'))
+
+    def _prune_states(self) -> None:
+        """Remove scan state left by sessions that ended long ago."""
+        directory = os.path.dirname(self.state_path)
+        cutoff = time.time() - STATE_TTL_SECONDS
+        try:
+            for entry in os.scandir(directory):
+                if entry.name.endswith('.json') and entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+        except OSError:
+            pass
+
+
+def _anchor(mm: mmap.mmap, offset: int) -> str:
+    """Fingerprint the bytes just before offset."""
+    return hashlib.sha1(mm[max(0, offset - ANCHOR_BYTES):offset]).hexdigest()
+
+
+def _resume_offset(condition: ConditionKey, size: int, boundary: int) -> int:
+    """Return where the next scan must start after a miss up to size."""
+    operator, pattern = condition
+    if operator == 'regex_match':
+        return boundary
+    # A literal found later must end past size, so it starts within its
+    # own length of the end
+    return max(0, size - len(pattern.encode('utf-8')) + 1)
+
+
+def _scan(mm: mmap.mmap, condition: ConditionKey, start: int) -> Tuple[bool, Optional[int]]:
+    """Scan the mapped transcript from start for a literal or regex.
+
+    Returns:
+        (found, timed_out_at): timed_out_at is the start of the first
+        regex chunk whose search ran out of time, or None if every chunk
+        was searched. Later chunks are still searched, so a match after it
+        is found.
+    """
+    operator, pattern = condition
+    if operator in ('contains', 'not_contains'):
+        return mm.find(pattern.encode('utf-8'), start) != -1, None
+
+    regex = _compile_guarded(pattern)
+    if regex is None:
+        return False, None
+
+    size = len(mm)
+    pos = start
+    timed_out_at = None
+    while pos < size:
+        end = mm.rfind(b'\n', pos, min(size, pos + CHUNK_BYTES)) + 1
+        if end <= pos:
+            # A single line longer than the chunk size: take all of it
+            end = mm.find(b'\n', pos) + 1 or size
+        found = _search_guarded(regex, mm[pos:end].decode('utf-8', errors='replace'))
+        if found:
+            return True, None
+        if found is None and timed_out_at is None:
+            timed_out_at = pos
+        pos = end
+    return False, timed_out_at
+
+
+def _compile_guarded(pattern: str) -> Optional[re.Pattern]:
+    """Compile a pattern, or report why it will not run and return None."""
+    reason = rejection_reason(pattern)
+    if reason:
+        print(f"Skipping regex pattern '{pattern}': {reason}", file=sys.stderr)
+        return None
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error as e:
+        print(f"Invalid regex pattern '{pattern}': {e}", file=sys.stderr)
+        return None
+
+
+def _search_guarded(regex: re.Pattern, text: str) -> Optional[bool]:
+    """Search within the time budget, returning None on timeout."""
+    try:
+        with time_budget():
+            return bool(regex.search(text))
+    except RegexTimeout:
+        print(f"Skipping regex pattern '{regex.pattern}': exceeded the time budget", file=sys.stderr)
+        return None
+
+
+def _check_text(condition: ConditionKey, text: str) -> bool:
+    """Evaluate a condition against an in-memory string."""
+    operator, pattern = condition
+    if operator == 'regex_match':
+        regex = _compile_guarded(pattern)
+        return regex is not None and bool(_search_guarded(regex, text))
+    elif operator == 'contains':
+        return pattern in text
+    elif operator == 'equals':
+        return pattern == text
+    elif operator == 'not_contains':
+        return pattern not in text
+    elif operator == 'starts_with':
+        return text.startswith(pattern)
+    elif operator == 'ends_with':
+        return text.endswith(pattern)
+    return False
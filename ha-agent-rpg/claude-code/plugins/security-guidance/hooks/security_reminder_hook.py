@@ -7,7 +7,11 @@ This hook checks for security patterns in file edits and warns about potential v
 import json
 import os
 import random
+import re
+import sqlite3
 import sys
+import time
+from collections import Counter
 from datetime import datetime
 
 # Debug log file
@@ -25,8 +29,6 @@ def debug_log(message):
         pass
 
 
-# State file to track warnings shown (session-scoped using session ID)
-
 # Security patterns configuration
 SECURITY_PATTERNS = [
     {
@@ -126,77 +128,311 @@ Only use exec() if you absolutely need shell features and the input is guarantee
 ]
 
 
-def get_state_file(session_id):
-    """Get session-specific state file path."""
-    return os.path.expanduser(f"~/.claude/security_warnings_state_{session_id}.json")
+# Warnings already shown, keyed by session; one indexed store for all sessions
+STATE_DB_FILE = "~/.claude/security_warnings.db"
+
+# Shown warnings are forgotten after this long
+STATE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+# How long to wait for another hook's write to finish
+STATE_BUSY_TIMEOUT = 2.0
+
+
+def open_state_db():
+    """Open the shown-warnings store, creating it on first use."""
+    path = os.path.expanduser(STATE_DB_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Autocommit: each statement below is its own transaction
+    db = sqlite3.connect(path, timeout=STATE_BUSY_TIMEOUT, isolation_level=None)
+    # WAL lets concurrent hooks read while one writes
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS shown_warnings ("
+        " session_id TEXT NOT NULL,"
+        " warning_key TEXT NOT NULL,"
+        " shown_at REAL NOT NULL,"
+        " PRIMARY KEY (session_id, warning_key)"
+        ") WITHOUT ROWID"
+    )
+    db.execute(
+        "CREATE INDEX IF NOT EXISTS shown_warnings_by_age ON shown_warnings (shown_at)"
+    )
+    return db
+
+
+def expire_old_warnings(db):
+    """Forget warnings older than STATE_TTL_SECONDS (an indexed range delete)."""
+    try:
+        db.execute(
+            "DELETE FROM shown_warnings WHERE shown_at < ?",
+            (time.time() - STATE_TTL_SECONDS,),
+        )
+    except sqlite3.Error as e:
+        debug_log(f"Failed to expire old warnings: {e}")
 
 
-def cleanup_old_state_files():
-    """Remove state files older than 30 days."""
-    try:
-        state_dir = os.path.expanduser("~/.claude")
-        if not os.path.exists(state_dir):
-            return
-
-        current_time = datetime.now().timestamp()
-        thirty_days_ago = current_time - (30 * 24 * 60 * 60)
-
-        for filename in os.listdir(state_dir):
-            if filename.startswith("security_warnings_state_") and filename.endswith(
-                ".json"
-            ):
-                file_path = os.path.join(state_dir, filename)
-                try:
-                    file_mtime = os.path.getmtime(file_path)
-                    if file_mtime < thirty_days_ago:
-                        os.remove(file_path)
-                except (OSError, IOError):
-                    pass  # Ignore errors for individual file cleanup
-    except Exception:
-        pass  # Silently ignore cleanup errors
-
-
-def load_state(session_id):
-    """Load the state of shown warnings from file."""
-    state_file = get_state_file(session_id)
-    if os.path.exists(state_file):
-        try:
-            with open(state_file, "r") as f:
-                return set(json.load(f))
-        except (json.JSONDecodeError, IOError):
-            return set()
-    return set()
-
-
-def save_state(session_id, shown_warnings):
-    """Save the state of shown warnings to file."""
-    state_file = get_state_file(session_id)
-    try:
-        os.makedirs(os.path.dirname(state_file), exist_ok=True)
-        with open(state_file, "w") as f:
-            json.dump(list(shown_warnings), f)
-    except IOError as e:
-        debug_log(f"Failed to save state file: {e}")
-        pass  # Fail silently if we can't save state
+def claim_warnings(session_id, warning_keys):
+    """Record warnings as shown and return the ones not shown before.
 
+    Each key is inserted with INSERT OR IGNORE, so when two hooks race on
+    the same warning exactly one of them gets to show it. If the store
+    cannot be used, every warning is treated as new.
+    """
+    try:
+        db = open_state_db()
+    except (sqlite3.Error, OSError) as e:
+        debug_log(f"Failed to open state store: {e}")
+        return list(warning_keys)
 
-def check_patterns(file_path, content):
-    """Check if file path or content matches any security patterns."""
+    try:
+        # Periodically expire old warnings (10% chance per run)
+        if random.random() < 0.1:
+            expire_old_warnings(db)
+
+        now = time.time()
+        new_keys = []
+        for warning_key in warning_keys:
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO shown_warnings"
+                " (session_id, warning_key, shown_at) VALUES (?, ?, ?)",
+                (session_id, warning_key, now),
+            )
+            if cursor.rowcount:
+                new_keys.append(warning_key)
+        return new_keys
+    except sqlite3.Error as e:
+        debug_log(f"Failed to update state store: {e}")
+        return list(warning_keys)
+    finally:
+        db.close()
+
+
+# Occurrences located per substring; the rest are only counted
+MAX_REPORTED_LINES = 10
+
+
+def _index_substrings(patterns):
+    """Map each content substring to the rules that look for it."""
+    index = {}
+    for position, pattern in enumerate(patterns):
+        for substring in pattern.get("substrings", ()):
+            rules = index.setdefault(substring, [])
+            if position not in rules:
+                rules.append(position)
+    return index
+
+
+# Built once: a substring shared by several rules is searched for once
+SUBSTRING_RULES = _index_substrings(SECURITY_PATTERNS)
+
+
+def _line_numbers(content, offsets):
+    """Convert sorted character offsets into distinct 1-based line numbers."""
+    lines = []
+    line, position = 1, 0
+    for offset in offsets:
+        line += content.count("\n", position, offset)
+        position = offset
+        if not lines or lines[-1] != line:
+            lines.append(line)
+    return lines
+
+
+def check_patterns(file_path, content, line_numbers=None):
+    """Find every security pattern the file path or content matches.
+
+    Each substring is searched for once with str.find/str.count, which run
+    at memchr speed; in CPython that beats a single pass of one combined
+    regex several times over. Only the first MAX_REPORTED_LINES
+    occurrences of a substring are located; the rest are counted.
+
+    Returns a list of (rule_name, reminder, lines, occurrences) in
+    SECURITY_PATTERNS order, where lines holds the 1-based content lines
+    of the located occurrences (empty for path-based patterns). When
+    content is a selection of lines (see changed_lines), line_numbers maps
+    its lines back to the file's.
+    """
     # Normalize path by removing leading slashes
     normalized_path = file_path.lstrip("/")
 
-    for pattern in SECURITY_PATTERNS:
+    offsets = {}
+    occurrences = {}
+    if content:
+        for substring, rules in SUBSTRING_RULES.items():
+            found = []
+            start = content.find(substring)
+            while start >= 0 and len(found) < MAX_REPORTED_LINES:
+                found.append(start)
+                start = content.find(substring, start + 1)
+            if not found:
+                continue
+            count = len(found)
+            if start >= 0:
+                count += content.count(substring, start)
+            for position in rules:
+                offsets.setdefault(position, []).extend(found)
+                occurrences[position] = occurrences.get(position, 0) + count
+
+    findings = []
+    for position, pattern in enumerate(SECURITY_PATTERNS):
         # Check path-based patterns
         if "path_check" in pattern and pattern["path_check"](normalized_path):
-            return pattern["ruleName"], pattern["reminder"]
-
+            findings.append((pattern["ruleName"], pattern["reminder"], [], 0))
         # Check content-based patterns
-        if "substrings" in pattern and content:
-            for substring in pattern["substrings"]:
-                if substring in content:
-                    return pattern["ruleName"], pattern["reminder"]
+        elif position in offsets:
+            lines = _line_numbers(content, sorted(offsets[position]))
+            if line_numbers is not None:
+                lines = [line_numbers[line - 1] for line in lines]
+            findings.append(
+                (
+                    pattern["ruleName"],
+                    pattern["reminder"],
+                    lines[:MAX_REPORTED_LINES],
+                    occurrences[position],
+                )
+            )
+
+    return findings
+
+
+# Characters compared at a time when looking for the first difference
+COMPARE_CHUNK = 64 * 1024
+
+
+def _common_prefix_length(a, b, limit):
+    """Length of the common prefix of a and b, at most limit."""
+    low = 0
+    # Whole chunks first, then a binary search inside the differing one
+    while low + COMPARE_CHUNK <= limit:
+        if a[low : low + COMPARE_CHUNK] != b[low : low + COMPARE_CHUNK]:
+            break
+        low += COMPARE_CHUNK
+    high = min(low + COMPARE_CHUNK, limit)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix_length(a, b, limit):
+    """Length of the common suffix of a and b, at most limit."""
+    # The common prefix of the reversed strings, without reversing them
+    low = 0
+    while low + COMPARE_CHUNK <= limit:
+        if a[len(a) - low - COMPARE_CHUNK : len(a) - low] != b[
+            len(b) - low - COMPARE_CHUNK : len(b) - low
+        ]:
+            break
+        low += COMPARE_CHUNK
+    high = min(low + COMPARE_CHUNK, limit)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle : len(a) - low] == b[len(b) - middle : len(b) - low]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def changed_lines(file_path, content):
+    """Select the lines a Write adds to or changes in the file on disk.
+
+    Whole lines shared at the start and end of both versions are skipped
+    by comparing chunks of both strings, which runs at memcmp speed.
+    Between them, lines of the current file are counted by content (a hash
+    multiset), so a new line is unchanged only if the file still holds an
+    unmatched copy of it there: moved lines count as unchanged, and a line
+    duplicated by the write counts as added. Patterns never span lines, so
+    scanning the selected lines finds exactly the occurrences the write
+    introduces, and the work tracks the size of the change.
+
+    Returns (text, line_numbers): the selected lines joined by newlines,
+    and the 1-based line in content of each. Returns None when there is no
+    readable file to compare against, so the whole content is scanned.
+    """
+    try:
+        with open(file_path, "r", encoding="utf-8", errors="replace", newline="") as f:
+            existing = f.read()
+    except (OSError, ValueError):
+        return None
+
+    # Both versions agree on the lines before start and from end_new (in
+    # content) or end_old (in existing) on. Both boundaries follow a
+    # newline inside the shared text, so they are line starts in both.
+    limit = min(len(existing), len(content))
+    prefix = _common_prefix_length(existing, content, limit)
+    start = content.rfind("\n", 0, prefix) + 1
+    suffix = _common_suffix_length(existing, content, limit - prefix)
+    newline = content.find("\n", len(content) - suffix)
+    end_new = len(content) if newline < 0 else newline + 1
+    end_old = len(existing) - (len(content) - end_new)
+
+    changed = content[start:end_new]
+    if not any(substring in changed for substring in SUBSTRING_RULES):
+        # Nothing to find in the changed region: skip hashing its lines
+        return "", []
+
+    old_lines = existing[start:end_old].split("\n")
+    new_lines = changed.split("\n")
+    if newline >= 0:
+        # Both end with the newline before the shared tail; no line follows it
+        del old_lines[-1], new_lines[-1]
+    else:
+        # Both run to the end of the file, where a final newline ends the
+        # last line rather than starting an empty one
+        for lines in (old_lines, new_lines):
+            if lines and not lines[-1]:
+                del lines[-1]
+
+    counts = Counter(old_lines)
+    first_line = content.count("\n", 0, start) + 1
+    selected = []
+    line_numbers = []
+    for number, line in enumerate(new_lines, first_line):
+        if counts[line] > 0:
+            counts[line] -= 1
+        else:
+            selected.append(line)
+            line_numbers.append(number)
+    return "\n".join(selected), line_numbers
+
+
+def format_location(lines, occurrences):
+    """Describe where a content pattern was found, e.g. "lines 3, 17"."""
+    if not lines:
+        return ""
+    location = "line" if len(lines) == 1 else "lines"
+    location += " " + ", ".join(str(line) for line in lines)
+    if occurrences > len(lines):
+        location += f" ({occurrences} occurrences)"
+    return location
+
+
+# A top-level "tool_name" key with a plain string value. A JSON string can
+# only contain '"' escaped, so this never matches inside a string value.
+TOOL_NAME_PATTERN = re.compile(rb'"tool_name"\s*:\s*"([^"\\]*)"')
+
+# How far into the hook input to look for tool_name
+TOOL_NAME_WINDOW = 64 * 1024
 
-    return None, None
+
+def peek_tool_name(raw_input):
+    """Find tool_name in raw hook input without decoding the whole payload.
+
+    Claude Code writes tool_name before tool_input, so a match ahead of any
+    "tool_input" key is the top-level one. Returns None when it cannot tell.
+    """
+    match = TOOL_NAME_PATTERN.search(raw_input, 0, TOOL_NAME_WINDOW)
+    if match is None or b'"tool_input"' in raw_input[: match.start()]:
+        return None
+    try:
+        return match.group(1).decode("utf-8")
+    except UnicodeDecodeError:
+        return None
 
 
 def extract_content_from_input(tool_name, tool_input):
@@ -223,15 +459,16 @@ def main():
     if security_reminder_enabled == "0":
         sys.exit(0)
 
-    # Periodically clean up old state files (10% chance per run)
-    if random.random() < 0.1:
-        cleanup_old_state_files()
-
     # Read input from stdin
+    raw_input = sys.stdin.buffer.read()
+
+    # Skip decoding a possibly multi-megabyte payload for non-file tools
+    if peek_tool_name(raw_input) not in (None, "Edit", "Write", "MultiEdit"):
+        sys.exit(0)
+
     try:
-        raw_input = sys.stdin.read()
         input_data = json.loads(raw_input)
-    except json.JSONDecodeError as e:
+    except ValueError as e:  # JSONDecodeError, or undecodable bytes
         debug_log(f"JSON decode error: {e}")
         sys.exit(0)  # Allow tool to proceed if we can't parse input
 
@@ -252,24 +489,32 @@ def main():
     # Extract content to check
     content = extract_content_from_input(tool_name, tool_input)
 
-    # Check for security patterns
-    rule_name, reminder = check_patterns(file_path, content)
-
-    if rule_name and reminder:
-        # Create unique warning key
-        warning_key = f"{file_path}-{rule_name}"
+    # Rewriting an existing file: only scan the lines the write changes, so
+    # untouched code does not fire reminders again
+    line_numbers = None
+    if tool_name == "Write" and content:
+        changed = changed_lines(file_path, content)
+        if changed is not None:
+            content, line_numbers = changed
 
-        # Load existing warnings for this session
-        shown_warnings = load_state(session_id)
-
-        # Check if we've already shown this warning in this session
-        if warning_key not in shown_warnings:
-            # Add to shown warnings and save
-            shown_warnings.add(warning_key)
-            save_state(session_id, shown_warnings)
-
-            # Output the warning to stderr and block execution
-            print(reminder, file=sys.stderr)
+    # Check for security patterns
+    findings = check_patterns(file_path, content, line_numbers)
+
+    if findings:
+        # Report every rule not already shown for this file at once, so
+        # the retry is not blocked again by the next rule
+        reminders = {}
+        for rule_name, reminder, lines, occurrences in findings:
+            location = format_location(lines, occurrences)
+            if location:
+                reminder = f"[{rule_name}: {location} of the new content]\n{reminder}"
+            # Create unique warning key
+            reminders[f"{file_path}-{rule_name}"] = reminder
+
+        new_keys = claim_warnings(session_id, list(reminders))
+        if new_keys:
+            # Output the warnings to stderr and block execution
+            print("\n\n".join(reminders[key] for key in new_keys), file=sys.stderr)
             sys.exit(2)  # Block tool execution (exit code 2 for PreToolUse hooks)
 
     # Allow tool to proceed
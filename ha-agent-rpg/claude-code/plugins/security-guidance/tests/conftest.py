@@ -0,0 +1,42 @@
+"""Shared fixtures for security-guidance tests.
+
+Every test runs with its own home directory, so its own shown-warnings
+store, and its own debug log.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+HOOK = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                    'hooks', 'security_reminder_hook.py')
+
+# Make the hook importable as a module
+sys.path.insert(0, os.path.dirname(HOOK))
+
+import security_reminder_hook  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def home(tmp_path, monkeypatch):
+    """Run the test with an empty home directory."""
+    home = tmp_path / 'home'
+    home.mkdir()
+    monkeypatch.setenv('HOME', str(home))
+    monkeypatch.delenv('ENABLE_SECURITY_REMINDER', raising=False)
+    monkeypatch.setattr(security_reminder_hook, 'DEBUG_LOG_FILE', str(tmp_path / 'debug.log'))
+    return home
+
+
+@pytest.fixture
+def run_hook(home):
+    """Return a function running the hook script on one tool input."""
+    def run(tool_name, tool_input, session_id='session'):
+        payload = {'session_id': session_id, 'hook_event_name': 'PreToolUse',
+                   'tool_name': tool_name, 'tool_input': tool_input}
+        return subprocess.run([sys.executable, HOOK], input=json.dumps(payload).encode('utf-8'),
+                              capture_output=True)
+    return run
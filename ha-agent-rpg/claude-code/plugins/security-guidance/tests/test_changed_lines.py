@@ -0,0 +1,129 @@
+"""Tests for the diff-aware scan of Writes to existing files."""
+
+import random
+from collections import Counter
+
+import pytest
+
+import security_reminder_hook
+from security_reminder_hook import SUBSTRING_RULES, changed_lines, check_patterns
+
+
+@pytest.fixture
+def existing(tmp_path):
+    """Return a function writing the file on disk and returning its path."""
+    def write(text):
+        path = tmp_path / 'app.py'
+        path.write_bytes(text.encode('utf-8'))
+        return str(path)
+    return write
+
+
+class TestChangedLines:
+    def test_unchanged_rewrite(self, existing):
+        text = 'a = 1\nresult = eval(x)\npickle.load(f)\n'
+        assert changed_lines(existing(text), text) == ('', [])
+
+    def test_appended_line(self, existing):
+        path = existing('a = 1\neval(x)\n')
+        assert changed_lines(path, 'a = 1\neval(x)\nos.system(c)\n') == ('os.system(c)', [3])
+
+    def test_inserted_line(self, existing):
+        path = existing('a = 1\nb = 2\n')
+        assert changed_lines(path, 'a = 1\neval(x)\nb = 2\n') == ('eval(x)', [2])
+
+    def test_changed_line(self, existing):
+        path = existing('a = 1\nb = load(f)\nc = 3\n')
+        assert changed_lines(path, 'a = 1\nb = pickle.load(f)\nc = 3\n') == ('b = pickle.load(f)', [2])
+
+    def test_duplicated_existing_line(self, existing):
+        path = existing('a = 1\neval(x)\nb = 2\n')
+        text, line_numbers = changed_lines(path, 'a = 1\neval(x)\nb = 2\neval(x)\nc = 3\n')
+        assert (text, line_numbers) == ('eval(x)\nc = 3', [4, 5])
+
+    def test_duplicate_next_to_its_copy(self, existing):
+        path = existing('eval(x)\nb = 2\n')
+        text, line_numbers = changed_lines(path, 'eval(x)\neval(x)\nb = 2\n')
+        # One copy is new; which one is reported does not matter
+        assert text == 'eval(x)' and line_numbers in ([1], [2])
+
+    def test_moved_line(self, existing):
+        path = existing('eval(x)\na = 1\nb = 2\n')
+        assert changed_lines(path, 'a = 1\nb = 2\neval(x)\n') == ('', [])
+
+    def test_no_trailing_newline(self, existing):
+        path = existing('a = 1\nb = 2')
+        assert changed_lines(path, 'a = 1\nb = 2\neval(x)') == ('eval(x)', [3])
+        path = existing('a = 1\neval(x)')
+        assert changed_lines(path, 'a = 1\neval(x)') == ('', [])
+        assert changed_lines(path, 'a = 1\neval(x)\n') == ('', [])
+        assert changed_lines(path, 'eval(x)\na = 1\neval(x)') == ('eval(x)', [1])
+
+    def test_nothing_to_find_in_the_change(self, existing):
+        path = existing('eval(x)\na = 1\n')
+        assert changed_lines(path, 'eval(x)\na = 2\nb = 3\n') == ('', [])
+
+    def test_missing_file_scans_everything(self, tmp_path):
+        path = str(tmp_path / 'new.py')
+        content = 'eval(x)\npickle.load(f)\n'
+        assert changed_lines(path, content) is None
+        names = [(name, lines) for name, _, lines, _ in check_patterns(path, content)]
+        assert names == [('eval_injection', [1]), ('pickle_deserialization', [2])]
+
+    def test_unreadable_path_scans_everything(self, tmp_path):
+        assert changed_lines(str(tmp_path), 'eval(x)\n') is None
+
+    def test_large_files_compare_in_chunks(self, existing, monkeypatch):
+        monkeypatch.setattr(security_reminder_hook, 'COMPARE_CHUNK', 16)
+        before = ''.join(f'line {i}\n' for i in range(500))
+        after = before.replace('line 250\n', 'line 250\neval(x)\n')
+        assert changed_lines(existing(before), after) == ('eval(x)', [252])
+
+
+LINES = ['a = 1', 'b = 2', '', 'eval(x)', 'pickle.load(f)', 'os.system(c)', 'x.innerHTML = y']
+
+
+def interesting(line):
+    return any(substring in line for substring in SUBSTRING_RULES)
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_random_rewrites_report_the_added_lines(seed, existing, monkeypatch):
+    rng = random.Random(seed)
+    monkeypatch.setattr(security_reminder_hook, 'COMPARE_CHUNK', rng.choice([4, 64, 64 * 1024]))
+    old = [rng.choice(LINES) for _ in range(rng.randint(0, 30))]
+    new = list(old)
+    for _ in range(rng.randint(0, 5)):
+        edit = rng.randrange(3)
+        if edit == 0 or not new:
+            new.insert(rng.randint(0, len(new)), rng.choice(LINES))
+        elif edit == 1:
+            del new[rng.randrange(len(new))]
+        else:
+            new.insert(rng.randint(0, len(new) - 1), new.pop(rng.randrange(len(new))))
+    old_text = '\n'.join(old) + rng.choice(['', '\n'])
+    new_text = '\n'.join(new) + rng.choice(['', '\n'])
+
+    text, line_numbers = changed_lines(existing(old_text), new_text)
+    selected = text.split('\n') if line_numbers else []
+    assert len(selected) == len(line_numbers)
+    new_lines = new_text.split('\n')
+    for line, number in zip(selected, line_numbers):
+        assert new_lines[number - 1] == line
+    # Exactly the lines the rewrite adds, counted as a multiset
+    added = Counter(new_text.split('\n')) - Counter(old_text.split('\n'))
+    assert (Counter(line for line in selected if interesting(line))
+            == Counter({line: count for line, count in added.items() if interesting(line)}))
+
+
+def test_hook_reports_only_what_a_rewrite_adds(run_hook, existing):
+    path = existing('import pickle\nresult = eval(x)\n')
+    result = run_hook('Write', {'file_path': path, 'content': 'import pickle\nresult = eval(x)\nos.system(c)\n'})
+    assert result.returncode == 2
+    stderr = result.stderr.decode('utf-8')
+    assert '[os_system_injection: line 3 of the new content]' in stderr
+    assert 'eval_injection' not in stderr and 'pickle' not in stderr
+    # Rewriting it unchanged reminds of nothing
+    result = run_hook('Write', {'file_path': path, 'content': 'import pickle\nresult = eval(x)\n'},
+                      session_id='other')
+    assert result.returncode == 0
@@ -0,0 +1,100 @@
+"""Tests for multi-finding pattern checks and their reported locations."""
+
+from security_reminder_hook import MAX_REPORTED_LINES, check_patterns, format_location
+
+
+def summary(findings):
+    """Findings without their (long) reminder text."""
+    return [(name, lines, occurrences) for name, _, lines, occurrences in findings]
+
+
+class TestCheckPatterns:
+    def test_every_rule_that_fires_is_reported(self):
+        content = 'import os\nresult = eval(text)\ndata = pickle.loads(blob)\n\nos.system(cmd)\n'
+        assert summary(check_patterns('app.py', content)) == [
+            ('eval_injection', [2], 1),
+            ('pickle_deserialization', [3], 1),
+            ('os_system_injection', [5], 1),
+        ]
+
+    def test_findings_follow_rule_order_not_content_order(self):
+        content = 'os.system(a)\nel.innerHTML = b\neval(c)\n'
+        names = [name for name, _, _, _ in check_patterns('app.js', content)]
+        assert names == ['eval_injection', 'innerHTML_xss', 'os_system_injection']
+
+    def test_path_and_content_rules_together(self):
+        findings = check_patterns('/repo/.github/workflows/ci.yml', 'run: eval(x)\n')
+        assert summary(findings) == [('github_actions_workflow', [], 0), ('eval_injection', [1], 1)]
+
+    def test_no_findings(self):
+        assert check_patterns('app.py', 'print("hello")\n') == []
+        assert check_patterns('app.py', '') == []
+
+    def test_repeats_on_one_line_are_one_line(self):
+        assert summary(check_patterns('a.py', 'eval(eval(eval(x)))\n')) == [('eval_injection', [1], 3)]
+
+    def test_rule_substrings_are_merged(self):
+        # innerHTML_xss looks for both spellings
+        content = 'a.innerHTML = x\nb.innerHTML=y\n'
+        assert summary(check_patterns('a.js', content)) == [('innerHTML_xss', [1, 2], 2)]
+
+
+class TestTruncation:
+    def test_lines_past_the_limit_are_only_counted(self):
+        count = MAX_REPORTED_LINES + 15
+        content = ''.join(f'x{i} = eval(y)\n' for i in range(count))
+        [(name, lines, occurrences)] = summary(check_patterns('a.py', content))
+        assert lines == list(range(1, MAX_REPORTED_LINES + 1))
+        assert occurrences == count
+
+    def test_each_substring_is_located_up_to_the_limit(self):
+        content = 'a.innerHTML = x\n' * MAX_REPORTED_LINES + 'b.innerHTML=y\n' * 3
+        [(name, lines, occurrences)] = summary(check_patterns('a.js', content))
+        # Both substrings were located; the earliest lines are kept
+        assert lines == list(range(1, MAX_REPORTED_LINES + 1))
+        assert occurrences == MAX_REPORTED_LINES + 3
+
+
+class TestLineNumbers:
+    def test_selected_lines_map_back_to_the_file(self):
+        # Lines 4, 9 and 12 of the file, as changed_lines selects them
+        content = 'safe()\npickle.load(f)\neval(x)'
+        findings = check_patterns('a.py', content, line_numbers=[4, 9, 12])
+        assert summary(findings) == [('eval_injection', [12], 1), ('pickle_deserialization', [9], 1)]
+
+    def test_truncation_applies_after_mapping(self):
+        count = MAX_REPORTED_LINES + 2
+        content = '\n'.join(['eval(x)'] * count)
+        line_numbers = [100 + 2 * i for i in range(count)]
+        [(name, lines, occurrences)] = summary(check_patterns('a.py', content, line_numbers))
+        assert lines == line_numbers[:MAX_REPORTED_LINES]
+        assert occurrences == count
+
+
+class TestFormatLocation:
+    def test_path_findings_have_no_location(self):
+        assert format_location([], 0) == ''
+
+    def test_lines(self):
+        assert format_location([3], 1) == 'line 3'
+        assert format_location([3, 17], 2) == 'lines 3, 17'
+
+    def test_more_occurrences_than_lines(self):
+        assert format_location([3], 4) == 'line 3 (4 occurrences)'
+        assert format_location(list(range(1, 11)), 25) == 'lines 1, 2, 3, 4, 5, 6, 7, 8, 9, 10 (25 occurrences)'
+
+
+def test_hook_reports_every_rule_at_once(run_hook, tmp_path):
+    path = str(tmp_path / 'app.py')
+    result = run_hook('Write', {'file_path': path, 'content': 'x = 1\ny = eval(s)\nos.system(c)\n'})
+    assert result.returncode == 2
+    stderr = result.stderr.decode('utf-8')
+    assert '[eval_injection: line 2 of the new content]' in stderr
+    assert '[os_system_injection: line 3 of the new content]' in stderr
+    assert stderr.index('eval_injection') < stderr.index('os_system_injection')
+
+
+def test_hook_ignores_safe_content_and_other_tools(run_hook, tmp_path):
+    path = str(tmp_path / 'app.py')
+    assert run_hook('Write', {'file_path': path, 'content': 'print(1)\n'}).returncode == 0
+    assert run_hook('Bash', {'command': 'eval(x)'}).returncode == 0
@@ -0,0 +1,120 @@
+"""Tests for the shown-warnings SQLite store."""
+
+import multiprocessing
+import os
+import sqlite3
+import time
+
+import security_reminder_hook
+from security_reminder_hook import (
+    STATE_TTL_SECONDS, claim_warnings, expire_old_warnings, open_state_db,
+)
+
+
+def rows():
+    db = open_state_db()
+    try:
+        return sorted(db.execute('SELECT session_id, warning_key FROM shown_warnings'))
+    finally:
+        db.close()
+
+
+def backdate(session_id, warning_key, seconds):
+    db = open_state_db()
+    try:
+        db.execute('UPDATE shown_warnings SET shown_at = ? WHERE session_id = ? AND warning_key = ?',
+                   (time.time() - seconds, session_id, warning_key))
+    finally:
+        db.close()
+
+
+class TestClaims:
+    def test_store_is_created_in_home(self, home):
+        assert claim_warnings('s1', ['a.py-eval_injection']) == ['a.py-eval_injection']
+        assert (home / '.claude' / 'security_warnings.db').is_file()
+
+    def test_each_key_is_claimed_once_per_session(self):
+        assert claim_warnings('s1', ['a', 'b']) == ['a', 'b']
+        assert claim_warnings('s1', ['b', 'c', 'a']) == ['c']
+        assert claim_warnings('s1', ['a', 'b', 'c']) == []
+        # Other sessions see every warning once too
+        assert claim_warnings('s2', ['b', 'a']) == ['b', 'a']
+        assert rows() == [('s1', 'a'), ('s1', 'b'), ('s1', 'c'), ('s2', 'a'), ('s2', 'b')]
+
+    def test_repeated_key_in_one_claim(self):
+        assert claim_warnings('s1', ['a', 'a']) == ['a']
+
+    def test_no_keys(self):
+        assert claim_warnings('s1', []) == []
+
+
+def _claim_in_process(keys):
+    return claim_warnings('shared', keys)
+
+
+def test_concurrent_claims_show_each_warning_once(home):
+    keys = [f'file{i}.py-eval_injection' for i in range(40)]
+    open_state_db().close()  # create the schema before the race
+    context = multiprocessing.get_context('fork')
+    with context.Pool(8) as pool:
+        claimed = pool.map(_claim_in_process, [keys[i % 7:] + keys[:i % 7] for i in range(16)])
+    winners = [key for keys_won in claimed for key in keys_won]
+    assert sorted(winners) == sorted(keys)
+
+
+class TestExpiry:
+    def test_old_warnings_are_forgotten(self):
+        claim_warnings('s1', ['old', 'recent'])
+        backdate('s1', 'old', STATE_TTL_SECONDS + 60)
+        backdate('s1', 'recent', STATE_TTL_SECONDS - 60)
+        db = open_state_db()
+        try:
+            expire_old_warnings(db)
+        finally:
+            db.close()
+        assert rows() == [('s1', 'recent')]
+        assert claim_warnings('s1', ['old', 'recent']) == ['old']
+
+    def test_claims_expire_now_and_then(self, monkeypatch):
+        claim_warnings('s1', ['old'])
+        backdate('s1', 'old', STATE_TTL_SECONDS + 60)
+        monkeypatch.setattr(security_reminder_hook.random, 'random', lambda: 0.99)
+        assert claim_warnings('s1', ['old']) == []
+        monkeypatch.setattr(security_reminder_hook.random, 'random', lambda: 0.0)
+        assert claim_warnings('s1', ['old']) == ['old']
+
+
+class TestFallback:
+    def test_unopenable_store_shows_every_warning(self, home, monkeypatch):
+        (home / 'not-a-dir').write_text('')
+        monkeypatch.setattr(security_reminder_hook, 'STATE_DB_FILE', str(home / 'not-a-dir' / 'state.db'))
+        assert claim_warnings('s1', ['a', 'b']) == ['a', 'b']
+        assert claim_warnings('s1', ['a', 'b']) == ['a', 'b']
+
+    def test_corrupt_store_shows_every_warning(self, home):
+        (home / '.claude').mkdir()
+        (home / '.claude' / 'security_warnings.db').write_bytes(b'not a database' * 100)
+        assert claim_warnings('s1', ['a']) == ['a']
+
+    def test_locked_store_shows_every_warning(self, monkeypatch):
+        claim_warnings('s1', ['a'])
+        monkeypatch.setattr(security_reminder_hook, 'STATE_BUSY_TIMEOUT', 0.05)
+        blocker = sqlite3.connect(os.path.expanduser(security_reminder_hook.STATE_DB_FILE),
+                                  isolation_level=None)
+        try:
+            blocker.execute('BEGIN EXCLUSIVE')
+            started = time.monotonic()
+            assert claim_warnings('s1', ['a', 'b']) == ['a', 'b']
+            assert time.monotonic() - started < 1
+        finally:
+            blocker.rollback()
+            blocker.close()
+        # Nothing was recorded while locked
+        assert claim_warnings('s1', ['a', 'b']) == ['b']
+
+
+def test_hook_blocks_each_warning_once_per_session(run_hook, tmp_path):
+    tool_input = {'file_path': str(tmp_path / 'app.py'), 'content': 'eval(x)\n'}
+    assert run_hook('Write', tool_input).returncode == 2
+    assert run_hook('Write', tool_input).returncode == 0
+    assert run_hook('Write', tool_input, session_id='other').returncode == 2